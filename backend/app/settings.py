@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 import os
 from pathlib import Path
+from celery.schedules import crontab
 from corsheaders.defaults import default_headers
 
 def _csv_env(key, default=""):
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'dal',
     'dal_select2',
     'core',
@@ -70,6 +72,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'tenants.middleware.TenantMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -175,6 +178,13 @@ MEDIA_URL = '/media/'
 # Form documents storage path pattern
 FORM_DOCUMENTS_PATH = 'documents/{tenant_id}/{form_type}/{work_item_ref}/'
 
+# Each process keeps one Chromium for PDF rendering (see documents.browser_pool),
+# launched at boot in Celery worker processes.
+PDF_RENDER_CONCURRENCY = int(os.getenv('PDF_RENDER_CONCURRENCY', '2'))
+PDF_BROWSER_MAX_RENDERS = int(os.getenv('PDF_BROWSER_MAX_RENDERS', '200'))  # then relaunched
+PDF_RENDER_TIMEOUT = 30  # seconds
+PDF_BROWSER_WARM_UP = True
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -191,6 +201,11 @@ REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'core.exceptions.json_exception_handler',
 }
 
+# List endpoints (by cursor_pagination_key) that return cursor-paginated pages by default.
+# Other endpoints using core.pagination.KeysetPagination only paginate when the client
+# sends ?cursor= or ?page_size=, so the frontend can migrate one endpoint at a time.
+CURSOR_PAGINATION_ENDPOINTS = _csv_env('CURSOR_PAGINATION_ENDPOINTS')
+
 LOGIN_REDIRECT_URL = '/'
 
 CRISPY_TEMPLATE_PACK = 'tailwind'
@@ -222,6 +237,27 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
 
 DEFAULT_TENANT_SUBDOMAIN = os.getenv("DJANGO_DEFAULT_TENANT_SUBDOMAIN") or None
 
+# ============================================================================
+# Cache Configuration
+# ============================================================================
+# Shared cache tier for tenant/permission/settings lookups. Without a URL every
+# process falls back to its own local memory cache.
+CACHE_URL = os.getenv('DJANGO_CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'repairshop',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # ============================================================================
 # Celery Configuration
 # ============================================================================
@@ -234,6 +270,55 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BEAT_SCHEDULE = {
+    'flush-usage-counters': {
+        'task': 'core.tasks.flush_usage_counters',
+        'schedule': 30.0,
+    },
+    # Daily cash register checkpoints (see service.closing)
+    'close-cash-registers': {
+        'task': 'service.tasks.close_cash_registers',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    # Dashboard counters drift under concurrent saves of one row (see tasks.dashboard)
+    'rebuild-dashboard-counters': {
+        'task': 'tasks.tasks.rebuild_dashboard_counters',
+        'schedule': crontab(hour=3, minute=30),
+    },
+}
+
+# Write-behind buffer for API key usage / user activity (see core.usage).
+# Without Redis each process buffers in memory and flushes itself.
+USAGE_COUNTERS_REDIS_URL = CACHE_URL
+USAGE_COUNTERS_FLUSH_INTERVAL = 30  # seconds
+
+# Inbound API request logs are written in batches by a background thread
+# (see integrations.request_log). Failures are always logged; successes are sampled.
+INTEGRATION_REQUEST_LOG_SUCCESS_SAMPLE_RATE = float(os.getenv('INTEGRATION_REQUEST_LOG_SUCCESS_SAMPLE_RATE', '1.0'))
+INTEGRATION_REQUEST_LOG_QUEUE_SIZE = 10000
+INTEGRATION_REQUEST_LOG_BATCH_SIZE = 100
+INTEGRATION_REQUEST_LOG_FLUSH_INTERVAL = 2.0  # seconds
+
+# Request/SQL/Celery histograms served at /metrics (see core.metrics). With Redis the
+# histograms of all web and worker processes are aggregated. Set METRICS_TOKEN to
+# require "Authorization: Bearer <token>" on scrapes.
+METRICS_REDIS_URL = CACHE_URL
+METRICS_FLUSH_INTERVAL = 10  # seconds
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# Event channels behind long-poll endpoints (see core.events). With Redis every web
+# process sees every publish. Without it the endpoints tell clients to poll, unless
+# EVENTS_IN_MEMORY is set for a single-process setup (runserver): publishes from
+# other processes (gunicorn workers, Celery) never reach an in-memory log.
+EVENTS_REDIS_URL = CACHE_URL
+EVENTS_IN_MEMORY = os.getenv('EVENTS_IN_MEMORY', 'False').lower() == 'true'
+# Long-poll requests waiting at once per process. Each holds a server thread for up
+# to its timeout (gunicorn runs 8 threads per worker), so keep room for the rest.
+EVENTS_MAX_WAITERS = int(os.getenv('EVENTS_MAX_WAITERS', '4'))
+
+# Region assumed for phone numbers without a country code, e.g. caller IDs sent by
+# the Android app (see calls.caller_id)
+PHONE_DEFAULT_REGION = os.getenv('PHONE_DEFAULT_REGION', 'PL')
 
 # ============================================================================
 # CKEditor Configuration (for HTML template editing)
@@ -22,6 +22,7 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
     SpectacularAPIView,
 )
+from core.metrics import metrics_view
 from core.views import react_app_view
 
 
@@ -38,6 +39,7 @@ urlpatterns = [
     path('api/calls/', include('calls.urls'), name='calls'),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='api-schema'), name='api-docs'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development
@@ -0,0 +1,132 @@
+"""
+Per-tenant caller-ID directory used when a call event comes in.
+
+Every customer and lead phone number of a tenant is normalized to E.164 once and
+kept in a ``{number: (kind, pk)}`` map in the two-tier cache (process memory in
+front of Redis), so resolving a caller is a dict lookup instead of two queries
+matching ``full_phone_number`` verbatim. Because both sides are normalized,
+``600 111 222``, ``+48600111222`` and ``0048 600-111-222`` all find the same
+customer.
+
+Customers win over leads sharing a number, the oldest customer over newer ones and
+the newest lead over older ones (as ``.first()`` on each model did before).
+
+Maps are keyed by a per-tenant version. Saving a customer or lead patches the map
+under the next version once its transaction commits; changes the map can't follow
+(numbers removed, bulk writes, concurrent patches) just bump the version and the
+next lookup reloads it. Rows deleted behind the signals' back can still be named
+by a cached map until then, so writers check the ids they got (``missing()``).
+``manage.py rebuild_caller_ids`` rebuilds them eagerly.
+"""
+import phonenumbers
+from django.conf import settings
+from phonenumbers import NumberParseException
+
+from core.cache import LOCAL_ONLY_TTL, MISSING, TieredCache, VersionCounter
+
+CUSTOMER = 'customer'
+LEAD = 'lead'
+
+directory_versions = VersionCounter("calls:callerid")
+# Without a shared cache other processes never see the version bumps, so maps only expire
+directories = TieredCache(
+    "calls:callerid:map", maxsize=256, local_ttl=60, shared_ttl=24 * 60 * 60, local_only_ttl=LOCAL_ONLY_TTL
+)
+
+
+def normalize(number, region=None):
+    """
+    E.164 form of ``number`` (``+48600111222``), or its bare digits when it does not
+    parse as a phone number; None when it has no digits at all.
+    """
+    if not number:
+        return None
+    try:
+        parsed = phonenumbers.parse(number, region or settings.PHONE_DEFAULT_REGION)
+    except NumberParseException:
+        parsed = None
+    if parsed is not None and phonenumbers.is_possible_number(parsed):
+        return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    return ''.join(filter(str.isdigit, number)) or None
+
+
+def build(tenant_id):
+    """Load the directory of ``tenant_id`` from the database."""
+    from customers.models import Customer, Lead
+
+    directory = {}
+    customers = Customer.objects.filter(tenant_id=tenant_id, full_phone_number__isnull=False).order_by('pk')
+    for pk, number in customers.values_list('pk', 'full_phone_number'):
+        key = normalize(number)
+        if key:
+            directory.setdefault(key, (CUSTOMER, pk))
+    leads = Lead.objects.filter(tenant_id=tenant_id, full_phone_number__isnull=False).order_by('-created_at', '-pk')
+    for pk, number in leads.values_list('pk', 'full_phone_number'):
+        key = normalize(number)
+        if key:
+            directory.setdefault(key, (LEAD, pk))
+    return directory
+
+
+def get_directory(tenant_id):
+    return directories.get_or_load((tenant_id, directory_versions.get(tenant_id)), lambda: build(tenant_id))
+
+
+def resolve(tenant, number):
+    """``(customer_id, lead_id)`` of the caller ``number`` in ``tenant``; both None if unknown."""
+    key = normalize(number)
+    kind, pk = get_directory(tenant.pk).get(key, (None, None)) if key else (None, None)
+    return (pk if kind == CUSTOMER else None), (pk if kind == LEAD else None)
+
+
+def missing(tenant_id, customer_ids=(), lead_ids=()):
+    """True when any of the given customer or lead ids has no row in ``tenant_id``."""
+    from customers.models import Customer, Lead
+
+    for model, ids in ((Customer, customer_ids), (Lead, lead_ids)):
+        ids = set(filter(None, ids))
+        if ids and model.objects.filter(tenant_id=tenant_id, pk__in=ids).count() != len(ids):
+            return True
+    return False
+
+
+def resolve_existing(tenant, number):
+    """
+    ``resolve()`` for callers linking the result to a new row: when the directory
+    names a customer or lead that is gone, it is reloaded and asked again.
+    """
+    customer_id, lead_id = resolve(tenant, number)
+    if missing(tenant.pk, [customer_id], [lead_id]):
+        invalidate(tenant.pk)
+        customer_id, lead_id = resolve(tenant, number)
+    return customer_id, lead_id
+
+
+def invalidate(tenant_id):
+    directory_versions.bump(tenant_id)
+
+
+def rebuild(tenant_id):
+    """Reload the directory of ``tenant_id`` now; returns the number of entries."""
+    directory = build(tenant_id)
+    directories.set((tenant_id, directory_versions.bump(tenant_id)), directory)
+    return len(directory)
+
+
+def add(tenant_id, kind, pk, number):
+    """
+    Point ``number`` at a saved customer or lead, unless a customer already holds it.
+    Patches the cached directory when one is loaded and no other writer bumped the
+    version meanwhile; otherwise leaves it to be reloaded.
+    """
+    key = normalize(number)
+    if not key:
+        return
+    version = directory_versions.get(tenant_id)
+    directory = directories.get((tenant_id, version))
+    new_version = directory_versions.bump(tenant_id)
+    if directory is MISSING or new_version != version + 1:
+        return
+    if directory.get(key, (None,))[0] != CUSTOMER:
+        directory = {**directory, key: (kind, pk)}
+    directories.set((tenant_id, new_version), directory)
@@ -0,0 +1,209 @@
+"""
+Bulk import of call detail records (CDRs) exported by the PBX.
+
+An export is read record by record as JSON lines, CSV (with a header row) or a
+JSON array. Each record needs an ``external_id`` (the PBX's call id), a
+``phone_number`` and ``started_at`` (ISO 8601); ``type`` (incoming/outbound,
+default incoming), ``duration`` (seconds) and ``status`` are optional.
+
+Records are written in batches: every distinct number is normalized once and
+resolved against the tenant's caller-ID directory (``calls.caller_id``, whose
+ids are checked with one query per model), the ids already imported are read with
+one query, and the new calls are inserted with one ``bulk_create``. Importing the
+same export again creates nothing: calls are unique per tenant and
+``external_id``, and repeats are counted as duplicates, including calls a
+concurrent import inserted first (the calls created are counted by their import
+time after the insert).
+
+Imported calls are history, so they are stored as handled and never show up in
+Car Mode, and they skip the model signals.
+"""
+import csv
+import json
+from datetime import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import caller_id
+from .models import Call
+
+BATCH_SIZE = 1000
+FORMATS = ('jsonl', 'csv', 'json')
+TYPES = {choice for choice, _ in Call.TYPE_CHOICES}
+# Errors reported back in detail; the rest are only counted
+MAX_ERRORS = 100
+
+
+def read(lines, fmt):
+    """
+    ``(line number, record)`` of each record in ``lines`` (an iterable of text lines).
+    A record that can't be parsed comes back as a ``ValueError`` instead of a dict.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'json':
+        try:
+            records = json.loads(''.join(lines))
+        except ValueError as error:
+            yield 1, ValueError(f'Invalid JSON: {error}')
+            return
+        if not isinstance(records, list):
+            yield 1, ValueError('Expected a JSON array of records.')
+            return
+        yield from enumerate(records, start=1)
+    elif fmt == 'jsonl':
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as error:
+                yield number, ValueError(f'Invalid JSON: {error}')
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(FORMATS)}")
+
+
+def _text(record, field):
+    value = record.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def clean(record):
+    """Validated call fields of one record; raises ``ValueError`` with a message otherwise."""
+    if not isinstance(record, dict):
+        raise ValueError('Expected an object.')
+    external_id = _text(record, 'external_id')
+    if not external_id:
+        raise ValueError('external_id required.')
+    if len(external_id) > Call._meta.get_field('external_id').max_length:
+        raise ValueError('external_id too long.')
+    phone = _text(record, 'phone_number')
+    if not phone:
+        raise ValueError('phone_number required.')
+    if len(phone) > Call._meta.get_field('phone_number').max_length:
+        raise ValueError('phone_number too long.')
+
+    call_type = _text(record, 'type') or 'incoming'
+    if call_type not in TYPES:
+        raise ValueError(f"Invalid type '{call_type}'.")
+
+    started_at = record.get('started_at')
+    if not isinstance(started_at, datetime):
+        started_at = parse_datetime(_text(record, 'started_at'))
+    if started_at is None:
+        raise ValueError('started_at must be an ISO 8601 date and time.')
+    if timezone.is_naive(started_at):
+        started_at = timezone.make_aware(started_at)
+
+    duration = _text(record, 'duration')
+    if duration and not duration.isdigit():
+        raise ValueError('duration must be a whole number of seconds.')
+    status = _text(record, 'status')
+    if len(status) > Call._meta.get_field('status').max_length:
+        raise ValueError('status too long.')
+
+    return {
+        'external_id': external_id,
+        'phone_number': phone,
+        'type': call_type,
+        'created_at': started_at,
+        'duration': int(duration) if duration else None,
+        'status': status,
+    }
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def import_records(tenant, records, batch_size=BATCH_SIZE):
+    """
+    Create the calls of ``records`` (``(line, record)`` pairs from ``read()``) in
+    ``tenant``, ``batch_size`` at a time. Returns an ``ImportResult``.
+    """
+    result = ImportResult()
+    numbers = {}
+    batch = []
+    for line, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            batch.append(clean(record))
+        except ValueError as error:
+            result.error(line, str(error))
+            continue
+        if len(batch) >= batch_size:
+            _import_batch(tenant, batch, numbers, result)
+            batch = []
+    if batch:
+        _import_batch(tenant, batch, numbers, result)
+    return result
+
+
+def _import_batch(tenant, batch, numbers, result):
+    existing = set(
+        Call.objects.filter(tenant=tenant, external_id__in={row['external_id'] for row in batch})
+        .values_list('external_id', flat=True)
+    )
+    rows = []
+    for row in batch:
+        if row['external_id'] in existing:
+            result.duplicates += 1
+            continue
+        existing.add(row['external_id'])
+        phone = row['phone_number']
+        if phone not in numbers:
+            numbers[phone] = caller_id.normalize(phone)
+        rows.append((row, numbers[phone]))
+
+    directory = caller_id.get_directory(tenant.pk)
+    callers = [directory.get(key, (None, None)) if key else (None, None) for _, key in rows]
+    if caller_id.missing(
+        tenant.pk,
+        [pk for kind, pk in callers if kind == caller_id.CUSTOMER],
+        [pk for kind, pk in callers if kind == caller_id.LEAD],
+    ):
+        # A customer or lead was deleted behind the signals' back: reload the directory
+        caller_id.invalidate(tenant.pk)
+        directory = caller_id.get_directory(tenant.pk)
+        callers = [directory.get(key, (None, None)) if key else (None, None) for _, key in rows]
+
+    imported_at = timezone.now()
+    calls = [
+        Call(
+            tenant=tenant,
+            # Stored in E.164 when it parses, so after-call leads get the right prefix
+            **{**row, 'phone_number': key if key and key.startswith('+') else row['phone_number']},
+            customer_id=pk if kind == caller_id.CUSTOMER else None,
+            lead_id=pk if kind == caller_id.LEAD else None,
+            handled_at=imported_at,
+        )
+        for (row, key), (kind, pk) in zip(rows, callers)
+    ]
+    Call.objects.bulk_create(calls, ignore_conflicts=True)
+    # Rows a concurrent import inserted first were skipped: count only ours
+    created = Call.objects.filter(
+        tenant=tenant, external_id__in=[call.external_id for call in calls], handled_at=imported_at,
+    ).count()
+    result.created += created
+    result.duplicates += len(calls) - created
@@ -0,0 +1,65 @@
+"""
+Management command to import call detail records exported by the PBX.
+
+The file is read as a stream and written in batches (see ``calls.cdr``), so
+exports of any size can be imported. Running it again on the same file only
+reports the records as duplicates.
+
+Usage:
+    python manage.py import_call_records --tenant=acme calls.jsonl
+    python manage.py import_call_records --tenant=acme export.csv
+    python manage.py import_call_records --tenant=acme export.txt --format=csv
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calls import cdr
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Import call detail records (JSON lines, CSV or a JSON array) for a tenant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File with the call records')
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            required=True,
+            help='Subdomain of the tenant the calls belong to'
+        )
+        parser.add_argument(
+            '--format',
+            choices=cdr.FORMATS,
+            help='Format of the file (default: from its extension, else jsonl)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=cdr.BATCH_SIZE,
+            help=f'Records written per batch (default: {cdr.BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(subdomain=options['tenant']).first()
+        if tenant is None:
+            raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        path = options['path']
+        extension = os.path.splitext(path)[1].lstrip('.').lower()
+        fmt = options['format'] or (extension if extension in cdr.FORMATS else 'jsonl')
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as lines:
+                result = cdr.import_records(tenant, cdr.read(lines, fmt), batch_size=options['batch_size'])
+        except OSError as error:
+            raise CommandError(f'Could not read {path}: {error}')
+
+        for error in result.errors:
+            self.stdout.write(self.style.WARNING(f"  line {error['line']}: {error['error']}"))
+        if result.error_count > len(result.errors):
+            self.stdout.write(self.style.WARNING(f'  ... {result.error_count - len(result.errors)} more'))
+        self.stdout.write(self.style.SUCCESS(
+            f'\nImported {result.created} call(s), {result.duplicates} duplicate(s), '
+            f'{result.error_count} error(s)'
+        ))
@@ -0,0 +1,38 @@
+"""
+Management command to rebuild the caller-ID directories used by incoming calls.
+
+Directories follow customer and lead saves on their own; run this after bulk
+imports or ``QuerySet.update()`` calls that changed phone numbers, or to warm the
+cache after a deploy.
+
+Usage:
+    python manage.py rebuild_caller_ids
+    python manage.py rebuild_caller_ids --tenant=acme
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from calls import caller_id
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the caller-ID directories of customer and lead phone numbers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Only rebuild the directory of this tenant subdomain'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all().order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(subdomain=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        for tenant in tenants:
+            self.stdout.write(f'  {tenant.subdomain}: {caller_id.rebuild(tenant.pk)} numbers')
+
+        self.stdout.write(self.style.SUCCESS(f'\nRebuilt {tenants.count()} tenant(s)'))
@@ -1,8 +1,11 @@
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from core.tracking import ChangeTrackingMixin
 from tenants.models import Tenant
 
 
-class Call(models.Model):
+class Call(ChangeTrackingMixin, models.Model):
     TYPE_CHOICES = [('incoming', 'Incoming'), ('outbound', 'Outbound')]
 
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='calls')
@@ -16,15 +19,24 @@ class Call(models.Model):
         'customers.Lead', null=True, blank=True,
         on_delete=models.SET_NULL, related_name='calls'
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    # When the call started; set explicitly for records imported from the PBX
+    created_at = models.DateTimeField(default=timezone.now)
     handled_at = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
     duration = models.PositiveIntegerField(null=True, blank=True)
     status = models.CharField(max_length=30, blank=True, default='')
+    # Id of the call record in the PBX export, for idempotent imports (see calls.cdr)
+    external_id = models.CharField(max_length=100, null=True, blank=True)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [models.Index(fields=['tenant', 'handled_at', 'created_at'])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'external_id'], condition=Q(external_id__isnull=False),
+                name='unique_call_external_id_per_tenant',
+            ),
+        ]
         permissions = [
             ('access_debug_endpoint', 'Can access debug call endpoint'),
         ]
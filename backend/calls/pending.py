@@ -0,0 +1,34 @@
+"""
+Pending calls shown in Car Mode, and the event channel announcing changes to them.
+
+A call is pending from the moment it is registered until it is handled, for at
+most ``PENDING_WINDOW``. Registering and handling a call publish to the tenant's
+channel (see ``core.events``), which wakes the long-poll ``pending/wait/`` requests.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core import events
+from .models import Call
+
+PENDING_WINDOW = timedelta(minutes=5)
+
+
+def channel(tenant_id):
+    return f'calls:pending:{tenant_id}'
+
+
+def pending_calls(tenant):
+    return Call.objects.filter(
+        tenant=tenant,
+        handled_at__isnull=True,
+        created_at__gte=timezone.now() - PENDING_WINDOW
+    ).select_related('customer', 'lead')
+
+
+def announce(call, event):
+    """Publish ``event`` ('call' or 'handled') for ``call`` once the transaction commits."""
+    message = {'event': event, 'id': call.pk}
+    transaction.on_commit(lambda: events.publish(channel(call.tenant_id), message))
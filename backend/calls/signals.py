@@ -0,0 +1,61 @@
+"""
+Signals for the calls app.
+
+- Keep the caller-ID directory (``calls.caller_id``) in step with customer and lead
+  phone numbers, once the change is committed (a rolled back row must not stay in
+  the shared directory)
+- Announce registered and handled calls to Car Mode clients waiting for pending
+  calls (``calls.pending``)
+"""
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from customers.models import Customer, Lead
+from tenants.models import Tenant
+from calls import caller_id, pending
+from calls.models import Call
+
+
+def _number_saved(kind, instance, created):
+    if not created and 'full_phone_number' not in instance.changed_fields():
+        return
+    tenant_id, pk, number = instance.tenant_id, instance.pk, instance.full_phone_number
+    if created or instance.old_value('full_phone_number') is None:
+        transaction.on_commit(lambda: caller_id.add(tenant_id, kind, pk, number))
+    else:
+        # The old number may fall back to another customer or lead
+        transaction.on_commit(lambda: caller_id.invalidate(tenant_id))
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        _number_saved(caller_id.CUSTOMER, instance, created)
+
+
+@receiver(post_save, sender=Lead)
+def lead_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        _number_saved(caller_id.LEAD, instance, created)
+
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Lead)
+def number_deleted(sender, instance, origin=None, **kwargs):
+    deleting_tenant = isinstance(origin, Tenant) or (isinstance(origin, QuerySet) and origin.model is Tenant)
+    if instance.full_phone_number and not deleting_tenant:
+        tenant_id = instance.tenant_id
+        transaction.on_commit(lambda: caller_id.invalidate(tenant_id))
+
+
+@receiver(post_save, sender=Call)
+def call_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        if instance.handled_at is None:
+            pending.announce(instance, 'call')
+    elif 'handled_at' in instance.changed_fields() and instance.old_value('handled_at') is None:
+        pending.announce(instance, 'handled')
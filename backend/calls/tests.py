@@ -1,8 +1,23 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APIClient
 from tenants.models import Tenant
 from customers.models import Customer, Lead
+from calls import caller_id, cdr, pending
+from core import events
+from core.cache import LOCAL_ONLY_TTL
 from calls.models import Call
 from core.models import User
 from tasks.models import Task
@@ -126,8 +141,15 @@ class CallNewFieldsTest(TestCase):
         self.assertEqual(call.status, "")
 
 
+def clear_caller_ids():
+    cache.clear()
+    caller_id.directories.clear_local()
+    caller_id.directory_versions.clear_local()
+
+
 class IncomingCallViewTest(TestCase):
     def setUp(self):
+        clear_caller_ids()
         self.tenant = Tenant.objects.create(name="Incoming Tenant", subdomain="incomingtest")
         self.user = User.objects.create_user(
             email="inc@test.com",
@@ -204,6 +226,320 @@ class IncomingCallViewTest(TestCase):
             self.assertIn(field, data)
 
 
+class CallerIdDirectoryTest(TestCase):
+    def setUp(self):
+        clear_caller_ids()
+        self.tenant = Tenant.objects.create(name="Caller ID Tenant", subdomain="calleridtest")
+        self.customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Anna", prefix="+48", phone_number="600111222",
+        )
+        self.lead = Lead.objects.create(tenant=self.tenant, first_name="Piotr", phone_number="700800900")
+
+    def resolve(self, number):
+        return caller_id.resolve(self.tenant, number)
+
+    def test_number_formats_resolve_to_the_same_caller(self):
+        for number in ("600111222", "600 111 222", "+48 600-111-222", "0048600111222", "+48600111222"):
+            self.assertEqual(self.resolve(number), (self.customer.pk, None), number)
+        # Stored without a country code, called with one
+        self.assertEqual(self.resolve("+48700800900"), (None, self.lead.pk))
+        self.assertEqual(self.resolve("+49700800900"), (None, None))
+        self.assertEqual(self.resolve("unknown"), (None, None))
+
+    def test_directories_of_other_processes_expire_quickly_without_a_shared_cache(self):
+        self.resolve("600111222")
+        # Saved by another process: its directory update never reaches this one
+        customer = Customer.objects.create(tenant=self.tenant, first_name="Ewa", phone_number="511222333")
+        caller_id.directories.clear_local()
+        self.assertEqual(self.resolve("511222333"), (None, None))
+
+        monotonic, now = time.monotonic(), time.time()
+        with mock.patch("time.monotonic", return_value=monotonic + LOCAL_ONLY_TTL + 1), \
+                mock.patch("time.time", return_value=now + LOCAL_ONLY_TTL + 1):
+            self.assertEqual(self.resolve("511222333"), (customer.pk, None))
+
+    def test_customers_win_over_leads(self):
+        Lead.objects.create(tenant=self.tenant, first_name="Anna", prefix="+48", phone_number="600111222")
+        self.assertEqual(self.resolve("600111222"), (self.customer.pk, None))
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customer.objects.create(tenant=self.tenant, first_name="Ewa", phone_number="700800900")
+        self.assertEqual(self.resolve("700800900"), (customer.pk, None))
+
+    def test_directory_follows_saves_without_reloading(self):
+        self.resolve("600111222")
+        with self.captureOnCommitCallbacks(execute=True):
+            new_lead = Lead.objects.create(tenant=self.tenant, first_name="Jan", phone_number="511222333")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolve("+48 511 222 333"), (None, new_lead.pk))
+            self.assertEqual(self.resolve("700800900"), (None, self.lead.pk))
+
+        # A changed number is released
+        self.customer.phone_number = "600999888"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.save()
+        self.assertEqual(self.resolve("600111222"), (None, None))
+        self.assertEqual(self.resolve("600999888"), (self.customer.pk, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lead.delete()
+        self.assertEqual(self.resolve("700800900"), (None, None))
+
+    def test_rolled_back_rows_stay_out_of_the_directory(self):
+        self.resolve("600111222")
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Lead.objects.create(tenant=self.tenant, first_name="Jan", phone_number="511222333")
+                raise RuntimeError
+        self.assertEqual(self.resolve("511222333"), (None, None))
+
+    def test_incoming_call_skips_callers_that_are_gone(self):
+        self.resolve("600111222")
+        # Deleted without the signals, so the cached directory still names it
+        Customer.objects.filter(pk=self.customer.pk)._raw_delete(Customer.objects.db)
+        user = User.objects.create_user(email="cid@test.com", password="pass", username="ciduser", tenant=self.tenant)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.credentials(HTTP_X_TENANT="calleridtest")
+        resp = client.post("/api/calls/incoming/", {"phone_number": "600111222"}, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json()["customer"], None)
+        self.assertEqual(self.resolve("600111222"), (None, None))
+
+    def test_rebuild_command(self):
+        self.resolve("600111222")
+        Customer.objects.filter(pk=self.customer.pk).update(full_phone_number="+48600555444")
+        out = StringIO()
+        call_command("rebuild_caller_ids", "--tenant=calleridtest", stdout=out)
+        self.assertIn("calleridtest: 2 numbers", out.getvalue())
+        self.assertEqual(self.resolve("600555444"), (self.customer.pk, None))
+
+    def test_incoming_call_links_formatted_number(self):
+        user = User.objects.create_user(email="cid@test.com", password="pass", username="ciduser", tenant=self.tenant)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.credentials(HTTP_X_TENANT="calleridtest")
+        resp = client.post("/api/calls/incoming/", {"phone_number": "+48 600 111 222"}, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.json()["customer"], resp.json()["customer_name"]), (self.customer.pk, "Anna"))
+
+
+@override_settings(EVENTS_REDIS_URL=None, EVENTS_IN_MEMORY=True)
+class PendingCallsWaitTest(TestCase):
+    def setUp(self):
+        clear_caller_ids()
+        events.get_log().clear()
+        self.tenant = Tenant.objects.create(name="Car Mode Tenant", subdomain="carmodetest")
+        self.user = User.objects.create_user(email="car@test.com", password="pass", username="caruser", tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.client.credentials(HTTP_X_TENANT="carmodetest")
+
+    def wait(self, cursor=None, timeout=0.05):
+        params = {"timeout": timeout}
+        if cursor:
+            params["cursor"] = cursor
+        resp = self.client.get("/api/calls/pending/wait/", params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def register(self, number):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/calls/incoming/", {"phone_number": number}, format="json").json()
+
+    def test_waits_for_registered_and_handled_calls(self):
+        first = self.wait()
+        self.assertEqual((first["changed"], first["calls"]), (True, []))
+
+        # Nothing happened: the database is not asked for pending calls
+        with CaptureQueriesContext(connection) as queries:
+            unchanged = self.wait(first["cursor"])
+        self.assertEqual((unchanged["changed"], unchanged["calls"], unchanged["cursor"]), (False, None, first["cursor"]))
+        self.assertFalse([q for q in queries if "calls_call" in q["sql"]])
+
+        call = self.register("+48600111222")
+        changed = self.wait(first["cursor"])
+        self.assertEqual([c["id"] for c in changed["calls"]], [call["id"]])
+        self.assertFalse(self.wait(changed["cursor"])["changed"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/calls/{call['id']}/handled/", {}, format="json")
+        handled = self.wait(changed["cursor"])
+        self.assertEqual((handled["changed"], handled["calls"]), (True, []))
+
+        # Saving a handled call again announces nothing
+        with self.captureOnCommitCallbacks(execute=True):
+            Call.objects.get(pk=call["id"]).save()
+        self.assertFalse(self.wait(handled["cursor"])["changed"])
+
+    def test_unknown_cursor_returns_current_calls(self):
+        call = self.register("+48600111222")
+        data = self.wait("not-a-cursor")
+        self.assertEqual([c["id"] for c in data["calls"]], [call["id"]])
+        self.assertEqual(data["cursor"], events.last_id(pending.channel(self.tenant.pk)))
+
+    def test_waiters_wake_up_on_publish(self):
+        channel = pending.channel(self.tenant.pk)
+        cursor = events.last_id(channel)
+        publisher = threading.Timer(0.05, events.publish, (channel, {"event": "call", "id": 1}))
+        started = time.monotonic()
+        publisher.start()
+        changes = events.wait(channel, cursor, timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual([message for _, message in changes], [{"event": "call", "id": 1}])
+
+    @override_settings(EVENTS_IN_MEMORY=False)
+    def test_without_an_event_log_clients_poll(self):
+        # An in-memory log would miss calls registered by other processes
+        call = self.register("+48600111222")
+        started = time.monotonic()
+        data = self.wait("1", timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual((data["cursor"], [c["id"] for c in data["calls"]]), (None, [call["id"]]))
+
+    @override_settings(EVENTS_MAX_WAITERS=0)
+    def test_waiters_beyond_the_limit_are_turned_away(self):
+        cursor = self.wait()["cursor"]
+        resp = self.client.get("/api/calls/pending/wait/", {"cursor": cursor, "timeout": 5})
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp["Retry-After"], "5")
+
+
+class CallRecordImportTest(TestCase):
+    def setUp(self):
+        clear_caller_ids()
+        self.tenant = Tenant.objects.create(name="CDR Tenant", subdomain="cdrtest")
+        self.user = User.objects.create_user(email="cdr@test.com", password="pass", username="cdruser",
+                                             tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.client.credentials(HTTP_X_TENANT="cdrtest")
+        self.customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Anna", prefix="+48", phone_number="600111222",
+        )
+        self.lead = Lead.objects.create(tenant=self.tenant, first_name="Piotr", phone_number="700800900")
+
+    def records(self, count, start=0):
+        return [
+            {"external_id": f"pbx-{n}", "phone_number": f"+48 500 000 {n:03d}", "type": "incoming",
+             "started_at": "2026-03-01T10:00:00+01:00", "duration": 30}
+            for n in range(start, start + count)
+        ]
+
+    def post_jsonl(self, records):
+        body = "\n".join(json.dumps(record) for record in records)
+        return self.client.generic("POST", "/api/calls/cdr/", body, content_type="application/x-ndjson")
+
+    def test_jsonl_import_links_callers(self):
+        records = [
+            {"external_id": "a", "phone_number": "0048 600-111-222", "started_at": "2026-03-01T10:00:00Z",
+             "duration": "75", "status": "Success"},
+            {"external_id": "b", "phone_number": "700 800 900", "type": "outbound",
+             "started_at": "2026-03-01T11:00:00"},
+            {"external_id": "c", "phone_number": "12", "started_at": "2026-03-01T12:00:00Z"},
+        ]
+        resp = self.post_jsonl(records)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json(), {"created": 3, "duplicates": 0, "error_count": 0, "errors": []})
+
+        a, b, c = Call.objects.filter(tenant=self.tenant).order_by("external_id")
+        self.assertEqual((a.customer_id, a.lead_id, a.phone_number), (self.customer.pk, None, "+48600111222"))
+        self.assertEqual((a.duration, a.status, a.created_at.hour), (75, "Success", 10))
+        self.assertEqual((b.customer_id, b.lead_id, b.type), (None, self.lead.pk, "outbound"))
+        self.assertEqual((c.customer_id, c.lead_id, c.phone_number), (None, None, "12"))
+        # History, not something to call back from Car Mode
+        self.assertIsNotNone(a.handled_at)
+        self.assertFalse(pending.pending_calls(self.tenant).exists())
+
+    def test_reimport_is_idempotent(self):
+        self.post_jsonl(self.records(3))
+        resp = self.post_jsonl(self.records(5))
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.json()["created"], resp.json()["duplicates"]), (2, 3))
+        resp = self.post_jsonl(self.records(5) + self.records(1))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.json()["created"], resp.json()["duplicates"]), (0, 6))
+        self.assertEqual(Call.objects.filter(tenant=self.tenant).count(), 5)
+
+        # External ids are per tenant
+        other = Tenant.objects.create(name="Other", subdomain="othercdr")
+        self.assertEqual(cdr.import_records(other, cdr.read(
+            [json.dumps(record) for record in self.records(5)], "jsonl")).created, 5)
+
+    def test_calls_inserted_by_a_concurrent_import_count_as_duplicates(self):
+        get_directory = caller_id.get_directory
+
+        def racing_import(tenant_id):
+            # Another import commits pbx-1 after this one checked for existing calls
+            Call.objects.create(tenant=self.tenant, external_id="pbx-1", phone_number="500000001")
+            return get_directory(tenant_id)
+
+        with mock.patch("calls.caller_id.get_directory", side_effect=racing_import):
+            result = cdr.import_records(self.tenant, cdr.read(
+                [json.dumps(record) for record in self.records(3)], "jsonl"))
+        self.assertEqual((result.created, result.duplicates), (2, 1))
+        self.assertEqual(Call.objects.filter(tenant=self.tenant).count(), 3)
+
+    def test_callers_deleted_behind_the_directory_are_not_linked(self):
+        caller_id.resolve(self.tenant, "600111222")
+        Customer.objects.filter(pk=self.customer.pk)._raw_delete(Customer.objects.db)
+        resp = self.post_jsonl([
+            {"external_id": "gone", "phone_number": "600111222", "started_at": "2026-03-01T10:00:00Z"},
+            {"external_id": "lead", "phone_number": "700800900", "started_at": "2026-03-01T10:00:00Z"},
+        ])
+        self.assertEqual(resp.json()["created"], 2)
+        self.assertIsNone(Call.objects.get(external_id="gone").customer_id)
+        self.assertEqual(Call.objects.get(external_id="lead").lead_id, self.lead.pk)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        self.post_jsonl(self.records(1))
+        with CaptureQueriesContext(connection) as small:
+            self.post_jsonl(self.records(5, start=10))
+        with CaptureQueriesContext(connection) as large:
+            self.post_jsonl(self.records(90, start=100))
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(Call.objects.filter(tenant=self.tenant).count(), 96)
+
+    def test_csv_and_invalid_records(self):
+        body = (
+            "external_id,phone_number,type,started_at,duration,status\r\n"
+            "x1,600111222,incoming,2026-03-01 09:30:00,12,\r\n"
+            "x2,,incoming,2026-03-01 09:31:00,,\r\n"
+            "x3,600111222,fax,2026-03-01 09:32:00,,\r\n"
+            "x4,600111222,outbound,yesterday,,\r\n"
+            "x5,600111222,outbound,2026-03-01 09:33:00,-4,\r\n"
+        )
+        resp = self.client.generic("POST", "/api/calls/cdr/", body, content_type="text/csv")
+        self.assertEqual(resp.status_code, 201)
+        data = resp.json()
+        self.assertEqual((data["created"], data["error_count"]), (1, 4))
+        self.assertEqual([error["line"] for error in data["errors"]], [3, 4, 5, 6])
+        self.assertEqual(data["errors"][0]["error"], "phone_number required.")
+        self.assertEqual(Call.objects.get(external_id="x1").customer_id, self.customer.pk)
+
+        resp = self.client.generic("POST", "/api/calls/cdr/", "not json\n", content_type="application/x-ndjson")
+        self.assertEqual(resp.json()["errors"][0]["line"], 1)
+        resp = self.client.generic("POST", "/api/calls/cdr/", "a,b", content_type="text/plain")
+        self.assertEqual(resp.status_code, 415)
+
+    def test_json_array(self):
+        resp = self.client.post("/api/calls/cdr/", self.records(2), format="json")
+        self.assertEqual(resp.json()["created"], 2)
+
+    def test_import_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.csv")
+            with open(path, "w", newline="") as f:
+                f.write("external_id,phone_number,started_at\n")
+                for n in range(7):
+                    f.write(f"cmd-{n},70080090{n},2026-03-02T08:00:00Z\n")
+            out = StringIO()
+            call_command("import_call_records", path, "--tenant=cdrtest", "--batch-size=3", stdout=out)
+            self.assertIn("Imported 7 call(s), 0 duplicate(s), 0 error(s)", out.getvalue())
+            call_command("import_call_records", path, "--tenant=cdrtest", stdout=out)
+            self.assertIn("Imported 0 call(s), 7 duplicate(s)", out.getvalue())
+        self.assertEqual(Call.objects.get(external_id="cmd-0").lead_id, self.lead.pk)
+
+
 class UpdateCallViewTest(TestCase):
     def setUp(self):
         self.tenant = Tenant.objects.create(name="Patch Tenant", subdomain="patchtest")
@@ -4,7 +4,9 @@ from . import views
 urlpatterns = [
     path('incoming/', views.incoming_call),
     path('debug/', views.debug_incoming_call),
+    path('cdr/', views.import_call_records),
     path('pending/', views.pending_calls),
+    path('pending/wait/', views.wait_pending_calls),
     path('<int:pk>/complete/', views.complete_after_call),
     path('<int:pk>/handled/', views.mark_handled),
     path('<int:pk>/', views.update_call),
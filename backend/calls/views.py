@@ -1,20 +1,24 @@
+import io
+
 import phonenumbers
 from phonenumbers import NumberParseException
 
 from django.db import transaction
 from django.utils import timezone
-from datetime import timedelta
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import SessionAuthentication
-from drf_spectacular.utils import extend_schema, inline_serializer
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from rest_framework import serializers as drf_serializers
 
+from core import events
 from core.authentication import APIKeyAuthentication
+from . import caller_id, cdr, pending
 from .models import Call
 from .serializers import CallSerializer, CallUpdateSerializer, CompleteAfterCallSerializer
-from customers.models import Customer, Lead
+from customers.models import Lead
 from tasks.models import Task
 from service.models import Employee
 
@@ -62,36 +66,124 @@ def incoming_call(request):
         return Response({'detail': 'phone_number required.'}, status=400)
     tenant = request.tenant
 
-    customer = Customer.objects.filter(tenant=tenant, full_phone_number=phone).first()
-    lead = None
-    if not customer:
-        lead = Lead.objects.filter(tenant=tenant, full_phone_number=phone).first()
+    customer_id, lead_id = caller_id.resolve_existing(tenant, phone)
 
     call = Call.objects.create(
         tenant=tenant,
         phone_number=phone,
         type=call_type,
-        customer=customer,
-        lead=lead,
+        customer_id=customer_id,
+        lead_id=lead_id,
     )
     return Response(CallSerializer(call).data, status=201)
 
 
+CDR_CONTENT_TYPES = {
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/json': 'json',
+    'text/csv': 'csv',
+}
+
+
+@extend_schema(
+    request={content_type: None for content_type in CDR_CONTENT_TYPES},
+    responses=inline_serializer(
+        name='CallRecordImportResponse',
+        fields={
+            'created': drf_serializers.IntegerField(),
+            'duplicates': drf_serializers.IntegerField(),
+            'error_count': drf_serializers.IntegerField(),
+            'errors': drf_serializers.ListField(child=drf_serializers.DictField()),
+        }
+    ),
+)
+@api_view(['POST'])
+@authentication_classes([SessionAuthentication, APIKeyAuthentication])
+@permission_classes([IsAuthenticated])
+def import_call_records(request):
+    """
+    PBX - imports call detail records in bulk (see calls.cdr for the fields).
+
+    The body is JSON lines (``application/x-ndjson``), CSV with a header row
+    (``text/csv``) or a JSON array (``application/json``). Records already imported
+    (same ``external_id``) are counted as duplicates, invalid ones are reported by
+    line and skipped. Exports larger than the request body limit go through
+    ``manage.py import_call_records``.
+    """
+    fmt = CDR_CONTENT_TYPES.get(request.content_type.split(';')[0].strip())
+    if fmt is None:
+        return Response(
+            {'detail': f"Content type must be one of: {', '.join(CDR_CONTENT_TYPES)}."}, status=415
+        )
+    try:
+        text = request.body.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return Response({'detail': 'Body must be UTF-8.'}, status=400)
+
+    result = cdr.import_records(request.tenant, cdr.read(io.StringIO(text, newline=''), fmt))
+    return Response(result.as_dict(), status=201 if result.created else 200)
+
+
 @api_view(['GET'])
 @authentication_classes([SessionAuthentication, APIKeyAuthentication])
 @permission_classes([IsAuthenticated])
 def pending_calls(request):
     """Car Mode polling - returns unhandled calls from the last 5 minutes."""
-    tenant = request.tenant
-    cutoff = timezone.now() - timedelta(minutes=5)
-    calls = Call.objects.filter(
-        tenant=tenant,
-        handled_at__isnull=True,
-        created_at__gte=cutoff
-    ).select_related('customer', 'lead')
+    calls = pending.pending_calls(request.tenant)
     return Response(CallSerializer(calls, many=True).data)
 
 
+WAIT_TIMEOUT = 20
+MAX_WAIT_TIMEOUT = 25
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter('cursor', str, description='Cursor returned by the previous response'),
+        OpenApiParameter('timeout', float, description=f'Seconds to wait for a change (max {MAX_WAIT_TIMEOUT})'),
+    ],
+    responses=inline_serializer(
+        name='PendingCallsWaitResponse',
+        fields={
+            'cursor': drf_serializers.CharField(),
+            'changed': drf_serializers.BooleanField(),
+            'calls': CallSerializer(many=True, allow_null=True),
+        }
+    ),
+)
+@api_view(['GET'])
+@authentication_classes([SessionAuthentication, APIKeyAuthentication])
+@permission_classes([IsAuthenticated])
+def wait_pending_calls(request):
+    """
+    Car Mode long-poll - returns the pending calls as soon as they change.
+
+    Without a cursor (or with an unknown one) the current pending calls come back
+    straight away. With the cursor of the previous response the request waits until
+    a call is registered or handled, or for ``timeout`` seconds; ``changed`` is
+    false and ``calls`` null when nothing happened. Calls still drop out of the
+    list after 5 minutes without an event: clients expire them by ``created_at``.
+    A null cursor means the event channel is unavailable (no Redis); clients then
+    fall back to polling ``pending/``, as they do until ``Retry-After`` when the
+    server already has too many requests waiting (429).
+    """
+    channel = pending.channel(request.tenant.pk)
+    cursor = request.query_params.get('cursor')
+    timeout = events.timeout_param(request.query_params.get('timeout'), WAIT_TIMEOUT, MAX_WAIT_TIMEOUT)
+
+    try:
+        changes = events.wait(channel, cursor, timeout)
+    except events.Busy:
+        raise Throttled(wait=timeout, detail='Too many requests waiting for calls; poll pending/ instead.')
+    if changes == []:
+        return Response({'cursor': cursor, 'changed': False, 'calls': None})
+    # Read the cursor before the calls: a change in between is only delivered twice
+    cursor = changes[-1][0] if changes else events.last_id(channel)
+    calls = pending.pending_calls(request.tenant)
+    return Response({'cursor': cursor, 'changed': True, 'calls': CallSerializer(calls, many=True).data})
+
+
 @api_view(['POST'])
 @authentication_classes([SessionAuthentication, APIKeyAuthentication])
 @permission_classes([IsAuthenticated])
@@ -3,6 +3,7 @@ from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
 from django.contrib.auth.models import Permission
 from django.utils.translation import gettext_lazy as _
 
+from core.authentication import forget_verified_keys
 from core.admin_mixins import TenantAwareImportExportAdmin, TenantAwareImportExportMixin
 from core.models import Address, Note, Role, RolePermission, User, UserRole, APIKey, Setting
 from django.contrib import messages
@@ -116,8 +117,8 @@ class APIKeyAdmin(TenantAwareImportExportAdmin):
         'tenant',
         'role',
         'is_active_display',
-        'usage_count',
-        'last_used_at',
+        'usage_count_display',
+        'last_used_display',
         'expires_at',
         'created_on',
     )
@@ -138,9 +139,9 @@ class APIKeyAdmin(TenantAwareImportExportAdmin):
     readonly_fields = (
         'prefix',
         'key_hash',
-        'usage_count',
-        'last_used_at',
-        'last_used_ip',
+        'usage_count_display',
+        'last_used_display',
+        'last_used_ip_display',
         'created_on',
         'modified_on',
         'created_by',
@@ -173,7 +174,7 @@ class APIKeyAdmin(TenantAwareImportExportAdmin):
             'description': 'The actual API key is hashed and cannot be retrieved'
         }),
         (_('Usage Audit (Read-only)'), {
-            'fields': ('usage_count', 'last_used_at', 'last_used_ip'),
+            'fields': ('usage_count_display', 'last_used_display', 'last_used_ip_display'),
             'classes': ('collapse',),
         }),
         (_('Metadata (Read-only)'), {
@@ -197,6 +198,29 @@ class APIKeyAdmin(TenantAwareImportExportAdmin):
             return format_html('<span style="color: red;">✗ Inactive</span>')
     is_active_display.short_description = 'Status'
 
+    # Usage is written behind (core.usage); these include not-yet-flushed values.
+    def _usage(self, obj):
+        return APIKey(
+            pk=obj.pk,
+            usage_count=obj.usage_count,
+            last_used_at=obj.last_used_at,
+            last_used_ip=obj.last_used_ip,
+        ).with_pending_usage()
+
+    def usage_count_display(self, obj):
+        return self._usage(obj).usage_count
+    usage_count_display.short_description = 'Usage count'
+    usage_count_display.admin_order_field = 'usage_count'
+
+    def last_used_display(self, obj):
+        return self._usage(obj).last_used_at
+    last_used_display.short_description = 'Last used at'
+    last_used_display.admin_order_field = 'last_used_at'
+
+    def last_used_ip_display(self, obj):
+        return self._usage(obj).last_used_ip
+    last_used_ip_display.short_description = 'Last used IP'
+
     def save_model(self, request, obj, form, change):
         """
         Override save to:
@@ -257,7 +281,10 @@ class APIKeyAdmin(TenantAwareImportExportAdmin):
     @admin.action(description='Revoke selected API keys (set inactive)')
     def revoke_api_keys(self, request, queryset):
         """Revoke API keys by setting them inactive"""
+        key_ids = list(queryset.values_list('pk', flat=True))
         count = queryset.update(is_active=False)
+        for key_id in key_ids:
+            forget_verified_keys(key_id)
         self.message_user(
             request,
             f'Successfully revoked {count} API key(s). They can no longer authenticate.',
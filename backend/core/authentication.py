@@ -5,16 +5,48 @@ Allows external systems to authenticate using Bearer tokens in the format:
     Authorization: Bearer sk_live_abc123...
 
 API keys are tenant-scoped and have role-based permissions.
+
+Verifying a key against its PBKDF2 hash is deliberately slow, so successful
+verifications are remembered in ``verified_keys`` under an HMAC digest of the
+presented key (the plaintext is never stored). A cache hit still re-reads the
+APIKey row, so deactivation, expiry, rotation and deletion apply immediately.
 """
+from django.conf import settings
+from django.utils.crypto import salted_hmac
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
+from core.cache import TieredCache
 from core.models import APIKey
 
 User = get_user_model()
 
+API_KEY_CACHE_TTL = getattr(settings, 'API_KEY_CACHE_TTL', 5 * 60)
+
+verified_keys = TieredCache('core:apikey:verified', maxsize=1024, local_ttl=60, shared_ttl=API_KEY_CACHE_TTL)
+# api_key.pk -> digests verified for it, so model signals can drop them
+verified_key_owners = TieredCache('core:apikey:owner', maxsize=1024, local_ttl=60, shared_ttl=API_KEY_CACHE_TTL)
+
+
+def api_key_digest(key_value):
+    """Keyed digest of a presented key, safe to use as a cache key."""
+    return salted_hmac('core.authentication.api_key', key_value, algorithm='sha256').hexdigest()
+
+
+def remember_verified_key(digest, api_key):
+    verified_keys.set(digest, (api_key.pk, api_key.key_hash))
+    digests = verified_key_owners.get(api_key.pk, None) or ()
+    if digest not in digests:
+        verified_key_owners.set(api_key.pk, tuple(digests) + (digest,))
+
+
+def forget_verified_keys(api_key_id):
+    for digest in verified_key_owners.get(api_key_id, None) or ():
+        verified_keys.delete(digest)
+    verified_key_owners.delete(api_key_id)
+
 
 class APIKeyAuthentication(BaseAuthentication):
     """
@@ -84,19 +116,22 @@ class APIKeyAuthentication(BaseAuthentication):
             raise AuthenticationFailed(_('Invalid API key format'))
 
         prefix = key_value[:12]
-
-        # Look up API key by prefix first (indexed)
-        api_keys = APIKey.objects.filter(
-            prefix=prefix,
-            is_active=True
-        ).select_related('tenant', 'role', 'user')
-
-        # Check each matching key (should only be one in practice)
-        api_key = None
-        for candidate in api_keys:
-            if candidate.check_key(key_value):
-                api_key = candidate
-                break
+        digest = api_key_digest(key_value)
+
+        api_key = self.get_cached_key(digest, prefix)
+        if api_key is None:
+            # Look up API key by prefix first (indexed)
+            api_keys = APIKey.objects.filter(
+                prefix=prefix,
+                is_active=True
+            ).select_related('tenant', 'role', 'user')
+
+            # Check each matching key (should only be one in practice)
+            for candidate in api_keys:
+                if candidate.check_key(key_value):
+                    api_key = candidate
+                    remember_verified_key(digest, api_key)
+                    break
 
         if not api_key:
             raise AuthenticationFailed(_('Invalid or inactive API key'))
@@ -121,6 +156,29 @@ class APIKeyAuthentication(BaseAuthentication):
         # Return user and api_key (DRF will set request.user and request.auth)
         return (user, api_key)
 
+    def get_cached_key(self, digest, prefix):
+        """
+        Return the active APIKey previously verified for this digest, or None.
+
+        The row is always re-read so the cache can only skip the hash check,
+        never resurrect a key that was deactivated, rotated or deleted.
+        """
+        cached = verified_keys.get(digest, None)
+        if cached is None:
+            return None
+
+        api_key_id, key_hash = cached
+        api_key = APIKey.objects.filter(
+            pk=api_key_id,
+            prefix=prefix,
+            is_active=True
+        ).select_related('tenant', 'role', 'user').first()
+
+        if api_key is None or api_key.key_hash != key_hash:
+            verified_keys.delete(digest)
+            return None
+        return api_key
+
     def create_virtual_user(self, api_key):
         """
         Return a user for the API key request.
@@ -0,0 +1,207 @@
+"""
+Two-tier caching helpers: a small in-process LRU in front of Django's shared cache.
+
+The local tier absorbs the hot path (no network round trip at all), the shared tier
+(Redis in production, see ``CACHES``) lets every worker reuse a value loaded once.
+Local entries carry a short TTL so that invalidations issued by another process are
+picked up quickly even though they cannot reach this process' memory directly.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+# TTL of entries that must not stay stale for long when the shared tier is process-local
+LOCAL_ONLY_TTL = 5  # seconds
+
+
+def is_process_local(alias="default"):
+    """True when the cache ``alias`` lives in this process' memory (no Redis configured)."""
+    return isinstance(caches[alias], LocMemCache)
+
+
+class LocalLRUCache:
+    """Thread-safe, size-bounded LRU with per-entry expiry."""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            item = self._data.get(key, MISSING)
+            if item is MISSING:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    Local LRU backed by a Django cache alias.
+
+    ``None`` is a valid cached value (negative lookups are cached too). Errors from the
+    shared tier are logged and treated as a miss so that a Redis outage degrades to
+    plain database lookups instead of failing requests.
+
+    When the shared tier is process-local too (``LocMemCache``), version bumps made by
+    other processes never reach this one, so entries only expire; ``local_only_ttl``
+    caps both tiers' TTL in that case for data that must not stay stale for long.
+    """
+
+    def __init__(self, namespace, maxsize=1024, local_ttl=30, shared_ttl=300, alias="default",
+                 local_only_ttl=None):
+        self.namespace = namespace
+        self.local = LocalLRUCache(maxsize=maxsize, ttl=local_ttl)
+        self.shared_ttl = shared_ttl
+        self.alias = alias
+        self.local_only_ttl = local_only_ttl
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _ttls(self):
+        """(local, shared) TTLs of new entries."""
+        if self.local_only_ttl is not None and is_process_local(self.alias):
+            return min(self.local.ttl, self.local_only_ttl), min(self.shared_ttl, self.local_only_ttl)
+        return self.local.ttl, self.shared_ttl
+
+    def make_key(self, key):
+        if isinstance(key, (tuple, list)):
+            key = ":".join(str(part) for part in key)
+        return f"{self.namespace}:{key}"
+
+    def get(self, key, default=MISSING):
+        full_key = self.make_key(key)
+        value = self.local.get(full_key)
+        if value is not MISSING:
+            return value
+        try:
+            value = self.shared.get(full_key, MISSING)
+        except Exception:
+            logger.exception("Shared cache read failed for %s", full_key)
+            return default
+        if value is MISSING:
+            return default
+        self.local.set(full_key, value, self._ttls()[0])
+        return value
+
+    def set(self, key, value):
+        full_key = self.make_key(key)
+        local_ttl, shared_ttl = self._ttls()
+        self.local.set(full_key, value, local_ttl)
+        try:
+            self.shared.set(full_key, value, shared_ttl)
+        except Exception:
+            logger.exception("Shared cache write failed for %s", full_key)
+
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def delete(self, key):
+        full_key = self.make_key(key)
+        self.local.delete(full_key)
+        try:
+            self.shared.delete(full_key)
+        except Exception:
+            logger.exception("Shared cache delete failed for %s", full_key)
+
+    def clear_local(self):
+        self.local.clear()
+
+
+class VersionCounter:
+    """
+    Shared version numbers used to make cached data unreachable on change.
+
+    Readers embed ``get(scope)`` in their cache keys; writers call ``bump(scope)``.
+    Versions are re-read from the shared cache every ``local_ttl`` seconds, bumps made
+    in this process apply locally straight away.
+    """
+
+    def __init__(self, namespace, local_ttl=5, alias="default"):
+        self.namespace = namespace
+        self.local = LocalLRUCache(maxsize=1024, ttl=local_ttl)
+        self.alias = alias
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def make_key(self, scope):
+        return f"{self.namespace}:version:{scope}"
+
+    def get(self, scope):
+        key = self.make_key(scope)
+        version = self.local.get(key, None)
+        if version is not None:
+            return version
+        try:
+            version = self.shared.get(key)
+            if version is None:
+                # Seed with a timestamp so an evicted counter can never fall back to a
+                # number some stale entry was stored under.
+                self.shared.add(key, time.time_ns(), None)
+                version = self.shared.get(key)
+        except Exception:
+            logger.exception("Could not read cache version %s", key)
+            version = None
+        if version is None:
+            # Shared tier unavailable: use a throwaway version so nothing is reused.
+            return time.time_ns()
+        self.local.set(key, version)
+        return version
+
+    def bump(self, scope):
+        key = self.make_key(scope)
+        try:
+            try:
+                version = self.shared.incr(key)
+            except ValueError:
+                self.shared.add(key, time.time_ns(), None)
+                version = self.shared.incr(key)
+        except Exception:
+            logger.exception("Could not bump cache version %s", key)
+            version = time.time_ns()
+        self.local.set(key, version)
+        return version
+
+    def clear_local(self):
+        self.local.clear()
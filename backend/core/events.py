@@ -0,0 +1,210 @@
+"""
+Event channels that push changes to waiting clients (long-poll).
+
+A channel (e.g. ``calls:pending:<tenant id>``) is an append-only log of small JSON
+messages with increasing, opaque ids. Writers ``publish()``; readers remember the
+last id they saw and ``wait()`` for anything newer, so events published between
+two requests of a client are not lost:
+
+* ``RedisEventLog`` when ``EVENTS_REDIS_URL`` is configured: one capped Redis
+  stream per channel (``XADD``), read with a blocking ``XREAD``, so every web
+  process sees every publish within milliseconds;
+* ``MemoryEventLog`` when ``EVENTS_IN_MEMORY`` is set, only for single-process
+  setups (runserver, tests): publishes from other processes (gunicorn workers,
+  Celery) never reach it.
+
+Without either there is no log: publishing does nothing, ``last_id()`` is None and
+``wait()`` returns None straight away, so clients fall back to polling the
+database. Publishing never fails the caller: errors are logged. A reader whose log
+is unavailable gets ``None`` back after its timeout and should fall back to
+reading the current state from the database.
+
+Every waiting request holds a web server thread, so at most ``EVENTS_MAX_WAITERS``
+wait at once per process; ``wait()`` raises ``Busy`` for the next ones, which
+endpoints answer with 429 so clients poll instead.
+"""
+import contextlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Messages kept per channel for readers that were away
+BACKLOG = 1000
+# Idle channels disappear after a day
+CHANNEL_TTL = 24 * 60 * 60
+
+
+class MemoryEventLog:
+    """Per-process channels: a bounded deque of ``(seq, message)`` each, one condition for all."""
+
+    def __init__(self):
+        self._changed = threading.Condition()
+        self._channels = {}
+
+    @staticmethod
+    def valid_id(event_id):
+        return event_id.isdigit()
+
+    def publish(self, channel, message):
+        with self._changed:
+            log = self._channels.setdefault(channel, deque(maxlen=BACKLOG))
+            seq = log[-1][0] + 1 if log else 1
+            log.append((seq, message))
+            self._changed.notify_all()
+        return str(seq)
+
+    def last_id(self, channel):
+        with self._changed:
+            log = self._channels.get(channel)
+            return str(log[-1][0]) if log else '0'
+
+    def _after(self, channel, after):
+        return [(str(seq), message) for seq, message in self._channels.get(channel, ()) if seq > after]
+
+    def read(self, channel, after, timeout):
+        after = int(after)
+        with self._changed:
+            if after > int(self.last_id(channel)):
+                # Cursor of a previous process: sequence numbers started over
+                return None
+            self._changed.wait_for(lambda: self._after(channel, after), timeout)
+            return self._after(channel, after)
+
+    def clear(self):
+        with self._changed:
+            self._channels.clear()
+
+
+class RedisEventLog:
+    """One Redis stream per channel, trimmed to about ``BACKLOG`` entries."""
+
+    def __init__(self, url, prefix='events'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, channel):
+        return f'{self.prefix}:{channel}'
+
+    @staticmethod
+    def valid_id(event_id):
+        return re.fullmatch(r'\d+-\d+', event_id) is not None
+
+    def publish(self, channel, message):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.xadd(self._key(channel), {'m': json.dumps(message)}, maxlen=BACKLOG, approximate=True)
+        pipe.expire(self._key(channel), CHANNEL_TTL)
+        return pipe.execute()[0].decode()
+
+    def last_id(self, channel):
+        entries = self.client.xrevrange(self._key(channel), count=1)
+        return entries[0][0].decode() if entries else '0-0'
+
+    def read(self, channel, after, timeout):
+        streams = self.client.xread({self._key(channel): after}, count=BACKLOG, block=max(int(timeout * 1000), 1))
+        return [
+            (event_id.decode(), json.loads(fields[b'm']))
+            for _, entries in streams
+            for event_id, fields in entries
+        ]
+
+
+class Busy(Exception):
+    """Raised by ``wait()`` when ``EVENTS_MAX_WAITERS`` requests of this process are already waiting."""
+
+
+_log = None
+_log_config = None
+_log_lock = threading.Lock()
+_waiting = 0
+_waiting_lock = threading.Lock()
+
+
+def get_log():
+    """The configured event log, or None when there is none (see above)."""
+    global _log, _log_config
+    config = (getattr(settings, 'EVENTS_REDIS_URL', None), getattr(settings, 'EVENTS_IN_MEMORY', False))
+    if _log_config != config:
+        with _log_lock:
+            if _log_config != config:
+                url, in_memory = config
+                _log = RedisEventLog(url) if url else MemoryEventLog() if in_memory else None
+                _log_config = config
+    return _log
+
+
+def publish(channel, message):
+    """Append ``message`` (JSON-serializable) to ``channel``; returns its id, None on failure."""
+    log = get_log()
+    if log is None:
+        return None
+    try:
+        return log.publish(channel, message)
+    except Exception:
+        logger.exception("Could not publish to event channel %s", channel)
+        return None
+
+
+def last_id(channel):
+    """Id of the newest message of ``channel``: the cursor to wait for newer ones from."""
+    log = get_log()
+    if log is None:
+        return None
+    try:
+        return log.last_id(channel)
+    except Exception:
+        logger.exception("Could not read event channel %s", channel)
+        return None
+
+
+def timeout_param(value, default, maximum):
+    """Seconds to wait from a request parameter: ``default`` if unset or invalid, at most ``maximum``."""
+    try:
+        timeout = float(default if value is None else value)
+    except ValueError:
+        return default
+    return min(max(timeout, 0), maximum) if math.isfinite(timeout) else default
+
+
+def wait(channel, after, timeout):
+    """
+    Messages of ``channel`` newer than the id ``after`` as ``[(id, message)]``,
+    waiting up to ``timeout`` seconds for the first one ([] if none came).
+    Returns None when there is no log, when ``after`` is not a valid id of the log
+    or when the log is unavailable (then only after the timeout, so clients
+    retrying straight away don't spin). Raises ``Busy`` when too many requests are
+    waiting already.
+    """
+    log = get_log()
+    if log is None or not after or not log.valid_id(after):
+        return None
+    with _waiter():
+        try:
+            return log.read(channel, after, timeout)
+        except Exception:
+            logger.exception("Could not wait on event channel %s", channel)
+            time.sleep(timeout)
+            return None
+
+
+@contextlib.contextmanager
+def _waiter():
+    global _waiting
+    with _waiting_lock:
+        if _waiting >= getattr(settings, 'EVENTS_MAX_WAITERS', 4):
+            raise Busy()
+        _waiting += 1
+    try:
+        yield
+    finally:
+        with _waiting_lock:
+            _waiting -= 1
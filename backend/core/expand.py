@@ -0,0 +1,157 @@
+"""
+Declarative ``?include=`` expansions for DRF viewsets.
+
+A viewset declares what clients may ask for with ``?include=a,b`` instead of parsing
+the parameter and serializing related objects by hand::
+
+    class TaskViewSet(ExpandableMixin, viewsets.ModelViewSet):
+        expandable = {
+            'assignedEmployee': Expansion(
+                EmployeeSerializer, source='assigned_employee', select_related=['assigned_employee__user']
+            ),
+            'deviceName': Expansion(
+                task_device_name, key='device_name', select_related=['work_item__customer_asset__device']
+            ),
+        }
+
+Requested expansions add their ``select_related``/``prefetch_related`` to the
+queryset (in ``filter_queryset``, so list pages and detail lookups both get them)
+and their values to each serialized row. A page therefore costs the same number of
+queries with or without includes, however many rows it has. Serializer expansions
+render a whole page with one ``many=True`` serializer rather than one per row.
+Unknown names are ignored.
+"""
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+
+def resolve(instance, path):
+    """Follow the dotted attribute ``path`` from ``instance``; None if a link is missing."""
+    obj = instance
+    for attr in path.split('.'):
+        obj = getattr(obj, attr, None)
+        if obj is None:
+            return None
+    return obj
+
+
+class Expansion:
+    """
+    One name a viewset accepts in ``?include=``.
+
+    Args:
+        render: A serializer class, called with the related object and the view's
+            serializer context, or a function ``(obj, view)`` returning the value
+        source: Dotted path from the row to the related object passed to ``render``
+            (default: the row itself). When it resolves to None the key is left out.
+        key: Response key (default: the include name)
+        select_related, prefetch_related: Lookups needed to render without queries
+        when: Optional ``(obj, view)`` check; objects failing it render as None
+        expand: {name: Expansion} always added to the rendered value, relative to
+            the related object; their lookups are added to this expansion's
+    """
+
+    def __init__(self, render, *, source=None, key=None, select_related=(), prefetch_related=(),
+                 when=None, expand=None):
+        self.render = render
+        self.source = source
+        self.key = key
+        self.when = when
+        self.expand = expand or {}
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        for expansion in self.expand.values():
+            if source:
+                nested_select, nested_prefetch = expansion.nested(source.replace('.', '__'))
+            else:
+                nested_select, nested_prefetch = expansion.select_related, expansion.prefetch_related
+            self.select_related += nested_select
+            self.prefetch_related += nested_prefetch
+
+    def nested(self, prefix):
+        """The lookups of this expansion, as seen from a model linking to its rows via ``prefix``."""
+        return (
+            tuple(f'{prefix}__{lookup}' for lookup in self.select_related),
+            tuple(f'{prefix}__{lookup}' for lookup in self.prefetch_related),
+        )
+
+    def add_to(self, rows, instances, view, name):
+        """Add this expansion to each serialized row in ``rows`` (paired with ``instances``)."""
+        targets = []
+        for row, instance in zip(rows, instances):
+            obj = resolve(instance, self.source) if self.source else instance
+            if obj is not None:
+                targets.append((row, obj))
+
+        key = self.key or name
+        visible = []
+        for row, obj in targets:
+            if self.when is None or self.when(obj, view):
+                visible.append((row, obj))
+            else:
+                row[key] = None
+        objs = [obj for _, obj in visible]
+        if not objs:
+            return
+        if isinstance(self.render, type) and issubclass(self.render, BaseSerializer):
+            # One serializer for all rows: building its fields is the expensive part
+            values = self.render(objs, many=True, context=view.get_serializer_context()).data
+        else:
+            values = [self.render(obj, view) for obj in objs]
+        for (row, _), value in zip(visible, values):
+            row[key] = value
+
+        for nested_name, expansion in self.expand.items():
+            expansion.add_to(values, objs, view, nested_name)
+
+
+class ExpandableMixin:
+    """Viewset mixin applying the ``expandable`` expansions requested in ``?include=``."""
+    expandable = {}
+    include_param = 'include'
+
+    def get_expansions(self):
+        """[(name, Expansion)] requested by the current request, in request order."""
+        raw = self.request.query_params.get(self.include_param, '') if self.request else ''
+        names = dict.fromkeys(part.strip() for part in raw.split(',') if part.strip())
+        return [(name, self.expandable[name]) for name in names if name in self.expandable]
+
+    def expand_queryset(self, queryset):
+        expansions = [expansion for _, expansion in self.get_expansions()]
+        select_related = [lookup for expansion in expansions for lookup in expansion.select_related]
+        prefetch_related = [lookup for expansion in expansions for lookup in expansion.prefetch_related]
+        if select_related:
+            queryset = queryset.select_related(*dict.fromkeys(select_related))
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*dict.fromkeys(prefetch_related))
+        return queryset
+
+    def filter_queryset(self, queryset):
+        return self.expand_queryset(super().filter_queryset(queryset))
+
+    def expand(self, data, instances):
+        """Add the requested expansions to serialized ``data`` (a row, or a list of rows)."""
+        expansions = self.get_expansions()
+        if not expansions:
+            return data
+        rows, instances = ([data], [instances]) if isinstance(data, dict) else (data, list(instances))
+        for name, expansion in expansions:
+            expansion.add_to(rows, instances, self, name)
+        return data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(self.expand(serializer.data, page))
+
+        instances = list(queryset)
+        serializer = self.get_serializer(instances, many=True)
+        return Response(self.expand(serializer.data, instances))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(self.expand(serializer.data, instance))
@@ -0,0 +1,81 @@
+"""
+Django management command measuring per-request API key authentication cost.
+
+Creates a throwaway tenant, role and API key inside a transaction that is rolled
+back at the end, then authenticates the same Bearer request repeatedly with the
+verified-key cache disabled (every request pays the password hash) and enabled.
+
+Usage:
+    python manage.py benchmark_api_key_auth
+    python manage.py benchmark_api_key_auth --iterations=200
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from core.authentication import APIKeyAuthentication, forget_verified_keys
+from core.models import APIKey, Role
+from tenants.models import Tenant
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark API key authentication with and without the verified-key cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Authenticated requests per scenario (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        try:
+            with transaction.atomic():
+                self.run(iterations)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def run(self, iterations):
+        tenant = Tenant.objects.create(name='Benchmark', subdomain='apikey-benchmark')
+        role = Role.objects.create(tenant=tenant, name='Benchmark')
+        plaintext_key, prefix, key_hash = APIKey.generate_key(environment='test')
+        api_key = APIKey.objects.create(
+            tenant=tenant, role=role, name='Benchmark', prefix=prefix, key_hash=key_hash
+        )
+
+        auth = APIKeyAuthentication()
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {plaintext_key}')
+
+        def measure(use_cache):
+            timings = []
+            forget_verified_keys(api_key.pk)
+            auth.authenticate(request)  # warm-up
+            for _ in range(iterations):
+                if not use_cache:
+                    forget_verified_keys(api_key.pk)
+                started = time.perf_counter()
+                auth.authenticate(request)
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings
+
+        uncached = measure(use_cache=False)
+        cached = measure(use_cache=True)
+
+        self.stdout.write(self.style.WARNING(f'\n=== API key auth, {iterations} requests ===\n'))
+        for label, timings in (('hash every request', uncached), ('verified-key cache', cached)):
+            self.stdout.write(
+                f'{label:<20} mean={statistics.mean(timings):8.3f} ms  '
+                f'p50={statistics.median(timings):8.3f} ms  max={max(timings):8.3f} ms'
+            )
+        speedup = statistics.mean(uncached) / max(statistics.mean(cached), 1e-9)
+        self.stdout.write(self.style.SUCCESS(f'\nSpeedup: {speedup:.1f}x'))
@@ -0,0 +1,241 @@
+"""
+Django management command timing the hot API endpoints against a (synthetic) tenant.
+
+Every endpoint is requested through the full middleware stack as a member of the
+tenant's "Synthetic Manager" role (see ``generate_synthetic_data``). Wall time, SQL
+query count and SQL time, and response size are recorded per iteration. Everything
+runs inside a transaction that is rolled back, so POST endpoints leave no trace.
+
+The JSON report is stable and sorted, to be diffed between commits. ``--compare``
+prints the change against an earlier report.
+
+Usage:
+    python manage.py benchmark_endpoints
+    python manage.py benchmark_endpoints --tenant=synthetic-1 --iterations=50 --output=bench.json
+    python manage.py benchmark_endpoints --only=dashboard,tasks_list --compare=bench-main.json
+"""
+import json
+import statistics
+import subprocess
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from core.metrics import QueryCounter
+from core.models import User
+from core.synthetic_data import MANAGER_ROLE
+from customers.models import Customer
+from inventory.models import InventoryBalance
+from tasks.models import Task, WorkItem
+from tenants.models import Tenant
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot API endpoints and write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str,
+                            help='Tenant subdomain (default: first "synthetic-*" tenant)')
+        parser.add_argument('--iterations', type=int, default=20,
+                            help='Timed requests per endpoint (default: 20)')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Untimed requests per endpoint before measuring (default: 2)')
+        parser.add_argument('--only', type=str,
+                            help='Comma-separated endpoint names to run')
+        parser.add_argument('--output', type=str,
+                            help='Write the JSON report to this file')
+        parser.add_argument('--compare', type=str,
+                            help='Earlier JSON report to compare against')
+
+    def handle(self, *args, **options):
+        tenant = self.get_tenant(options['tenant'])
+        user = User.objects.filter(
+            user_roles__role__tenant=tenant, user_roles__role__name=MANAGER_ROLE, is_active=True
+        ).order_by('pk').first()
+        if user is None:
+            raise CommandError(f"No '{MANAGER_ROLE}' user in tenant '{tenant.subdomain}'")
+
+        scenarios = self.get_scenarios(tenant)
+        if options['only']:
+            wanted = {name.strip() for name in options['only'].split(',')}
+            unknown = wanted - {name for name, *_ in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario[0] in wanted]
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'git_commit': _git_commit(),
+            'database': connection.vendor,
+            'tenant': tenant.subdomain,
+            'iterations': options['iterations'],
+            'row_counts': {
+                'customers': Customer.objects.filter(tenant=tenant).count(),
+                'work_items': WorkItem.objects.filter(tenant=tenant).count(),
+                'tasks': Task.objects.filter(tenant=tenant).count(),
+            },
+            'endpoints': {},
+        }
+
+        client = Client(HTTP_X_TENANT=tenant.subdomain)
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+                client.force_login(user)
+                for name, method, path, payload in scenarios:
+                    report['endpoints'][name] = self.measure(
+                        client, method, path, payload, options['iterations'], options['warmup']
+                    )
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.print_report(report)
+        if options['compare']:
+            self.print_comparison(report, options['compare'])
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+                fh.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"\nReport written to {options['output']}"))
+
+    def get_tenant(self, subdomain):
+        if subdomain:
+            tenant = Tenant.objects.filter(subdomain=subdomain).first()
+        else:
+            tenant = Tenant.objects.filter(subdomain__startswith='synthetic-').order_by('pk').first()
+        if tenant is None:
+            raise CommandError('Tenant not found; run generate_synthetic_data first or pass --tenant')
+        return tenant
+
+    def get_scenarios(self, tenant):
+        """(name, method, path, payload) per endpoint."""
+        work_item = WorkItem.objects.filter(tenant=tenant).order_by('-created_date', '-id').first()
+        customer = Customer.objects.filter(tenant=tenant).order_by('pk').first()
+        balance = InventoryBalance.objects.filter(tenant=tenant).select_related('inventory_item').order_by('pk').first()
+
+        scenarios = [
+            ('dashboard', 'get', '/api/tasks/dashboard/', None),
+            ('work_items_list', 'get', '/api/tasks/work-items/', None),
+            ('work_items_list_page', 'get', '/api/tasks/work-items/?page_size=50', None),
+            ('tasks_list', 'get', '/api/tasks/tasks/', None),
+            ('tasks_list_page', 'get', '/api/tasks/tasks/?page_size=50', None),
+            ('tasks_list_page_includes', 'get',
+             '/api/tasks/tasks/?page_size=50&include=workItem,deviceName,assignedEmployee,workItemDetails', None),
+            ('timeline', 'get', '/api/core/timeline/?page_size=50', None),
+        ]
+        if work_item:
+            scenarios.append(('work_items_retrieve', 'get', f'/api/tasks/work-items/{work_item.pk}/', None))
+            scenarios.append(('work_items_retrieve_includes', 'get', f'/api/tasks/work-items/{work_item.pk}/'
+                              '?include=customerDetails,deviceDetails,owner', None))
+            scenarios.append(('work_item_timeline', 'get', f'/api/core/timeline/?work_item={work_item.pk}', None))
+        if customer:
+            query = customer.last_name or customer.first_name
+            scenarios.append(('global_search', 'get', f'/api/core/search/?{urlencode({"q": query})}', None))
+            if customer.phone_number:
+                # Typed the way it is read out on the phone, in groups of three
+                number = customer.phone_number
+                spaced = ' '.join(number[i:i + 3] for i in range(0, len(number), 3))
+                scenarios.append(('global_search_phone', 'get', f'/api/core/search/?{urlencode({"q": spaced})}', None))
+        if balance:
+            scenarios.append(('receive_delivery', 'post', '/api/inventory/api/receive/', {
+                'lines': [{
+                    'sku': balance.inventory_item.sku,
+                    'quantity': 5,
+                    'inventory_list_id': balance.inventory_list_id,
+                    'unit_cost': '1.50',
+                }],
+            }))
+        return scenarios
+
+    def measure(self, client, method, path, payload, iterations, warmup):
+        def request():
+            if method == 'post':
+                return client.post(path, data=json.dumps(payload), content_type='application/json')
+            return client.get(path)
+
+        for _ in range(warmup):
+            request()
+
+        timings, query_counts, sql_times, sizes = [], [], [], []
+        status_code = None
+        for _ in range(iterations):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - started) * 1000)
+            status_code = response.status_code
+            query_counts.append(counter.count)
+            sql_times.append(counter.duration * 1000)
+            sizes.append(len(response.content))
+
+        return {
+            'method': method.upper(),
+            'path': path,
+            'status': status_code,
+            'mean_ms': round(statistics.mean(timings), 3),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(_percentile(timings, 0.95), 3),
+            'max_ms': round(max(timings), 3),
+            'queries': int(statistics.median(query_counts)),
+            'sql_ms': round(statistics.median(sql_times), 3),
+            'response_bytes': int(statistics.median(sizes)),
+        }
+
+    def print_report(self, report):
+        rows = report['row_counts']
+        self.stdout.write(self.style.WARNING(
+            f"\n=== {report['tenant']}: {rows['customers']:,} customers, {rows['work_items']:,} work items, "
+            f"{rows['tasks']:,} tasks ({report['database']}, {report['iterations']} iterations) ===\n"
+        ))
+        self.stdout.write(f"{'endpoint':<28} {'status':>6} {'p50 ms':>10} {'p95 ms':>10} "
+                          f"{'queries':>8} {'sql ms':>10} {'bytes':>12}")
+        for name, result in report['endpoints'].items():
+            self.stdout.write(
+                f"{name:<28} {result['status']:>6} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+                f"{result['queries']:>8} {result['sql_ms']:>10.2f} {result['response_bytes']:>12,}"
+            )
+
+    def print_comparison(self, report, path):
+        try:
+            with open(path) as fh:
+                baseline = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+
+        self.stdout.write(self.style.WARNING(f"\n=== Compared to {baseline.get('git_commit') or path} ===\n"))
+        for name, result in report['endpoints'].items():
+            before = baseline.get('endpoints', {}).get(name)
+            if not before:
+                self.stdout.write(f'{name:<28} (new)')
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / max(before['p50_ms'], 1e-9) * 100
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+            self.stdout.write(style(
+                f"{name:<28} p50 {before['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms ({change:+6.1f}%)  "
+                f"queries {before['queries']:>4} -> {result['queries']:>4}"
+            ))
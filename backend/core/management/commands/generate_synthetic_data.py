@@ -0,0 +1,76 @@
+"""
+Management command generating synthetic tenants at production-like volumes.
+
+Each tenant gets shops, employees (all in a "Synthetic Manager" role), inventory,
+customers with assets, and per customer a random number of work items with tasks,
+notes, payments and part usage. Rows are written with bulk inserts in chunks of
+``--batch-size`` customers, one transaction per chunk. The same ``--seed`` always
+produces the same data, so benchmark reports stay comparable between commits.
+
+Rough volume per tenant with the defaults: customers x 2 work items x (2 tasks +
+3 notes), e.g. ``--customers=200000`` gives ~400k work items and ~2M child rows.
+
+Usage:
+    python manage.py generate_synthetic_data
+    python manage.py generate_synthetic_data --tenants=3 --customers=200000
+    python manage.py generate_synthetic_data --customers=500 --work-items-per-customer=4 --seed=7
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic_data import SyntheticDataGenerator, SyntheticOptions
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic tenants with realistic data volumes for benchmarking'
+
+    def add_arguments(self, parser):
+        defaults = SyntheticOptions()
+        parser.add_argument('--tenants', type=int, default=defaults.tenants,
+                            help=f'Number of tenants to create (default: {defaults.tenants})')
+        parser.add_argument('--customers', type=int, default=defaults.customers,
+                            help=f'Customers per tenant (default: {defaults.customers})')
+        parser.add_argument('--work-items-per-customer', type=float, default=defaults.work_items_per_customer,
+                            help=f'Average work items per customer (default: {defaults.work_items_per_customer})')
+        parser.add_argument('--tasks-per-work-item', type=float, default=defaults.tasks_per_work_item,
+                            help=f'Average tasks per work item (default: {defaults.tasks_per_work_item})')
+        parser.add_argument('--notes-per-work-item', type=float, default=defaults.notes_per_work_item,
+                            help=f'Average notes per work item (default: {defaults.notes_per_work_item})')
+        parser.add_argument('--shops', type=int, default=defaults.shops,
+                            help=f'Shops (with a stock list and cash register) per tenant (default: {defaults.shops})')
+        parser.add_argument('--employees', type=int, default=defaults.employees,
+                            help=f'Employees per tenant (default: {defaults.employees})')
+        parser.add_argument('--inventory-items', type=int, default=defaults.inventory_items,
+                            help=f'Inventory items per tenant (default: {defaults.inventory_items})')
+        parser.add_argument('--history-days', type=int, default=defaults.history_days,
+                            help=f'Spread timestamps over this many days (default: {defaults.history_days})')
+        parser.add_argument('--batch-size', type=int, default=defaults.batch_size,
+                            help=f'Customers per chunk/transaction (default: {defaults.batch_size})')
+        parser.add_argument('--prefix', type=str, default=defaults.prefix,
+                            help=f'Tenant subdomain prefix (default: "{defaults.prefix}")')
+        parser.add_argument('--seed', type=int, default=defaults.seed,
+                            help=f'Random seed (default: {defaults.seed})')
+
+    def handle(self, *args, **options):
+        if options['tenants'] < 1 or options['customers'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--tenants and --batch-size must be positive, --customers non-negative')
+        if options['shops'] < 1 or options['employees'] < 1:
+            raise CommandError('Every tenant needs at least one shop and one employee')
+
+        generator_options = SyntheticOptions(**{
+            name: options[name] for name in SyntheticOptions.__dataclass_fields__
+        })
+        generator = SyntheticDataGenerator(generator_options, log=self.stdout.write)
+
+        started = time.monotonic()
+        counts = generator.run()
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.WARNING('\n=== Rows created ==='))
+        for label, count in sorted(counts.items()):
+            self.stdout.write(f'{label:<32} {count:>12,}')
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
@@ -0,0 +1,51 @@
+"""
+Management command to (re)build the search documents behind the global search.
+
+Documents are written by signals as indexed rows (customers, work items, tasks,
+leads, assets, inventory items) change; rows written by bulk inserts,
+``QuerySet.update()`` or raw SQL are missed. Run once after the migration
+creating the index or a new entity type (to backfill it), and after such bulk
+writes.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --tenant=acme
+    python manage.py rebuild_search_index --entity=customer
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import search
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search documents behind the global search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Only rebuild documents for this tenant subdomain'
+        )
+        parser.add_argument(
+            '--entity',
+            action='append',
+            choices=sorted(search._registry),
+            help='Only rebuild documents of this entity type (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all().order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(subdomain=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        for tenant in tenants:
+            written = search.rebuild(tenant, options['entity'])
+            summary = ', '.join(f'{count} {entity_type}' for entity_type, count in written.items())
+            self.stdout.write(f'  {tenant.subdomain}: {summary}')
+
+        if not search.enabled():
+            self.stdout.write(self.style.WARNING('Not on PostgreSQL: documents written without search vectors'))
+        self.stdout.write(self.style.SUCCESS(f'\nRebuilt {tenants.count()} tenant(s)'))
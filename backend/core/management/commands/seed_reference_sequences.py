@@ -0,0 +1,72 @@
+"""
+Management command to seed reference number counters from existing data.
+
+Counters are created lazily on first use, but seeding them ahead of time avoids
+the one-off MAX() scan on the first insert per tenant and repairs counters that
+fell behind (e.g. after importing rows with explicit reference numbers).
+Counters are only ever moved forward.
+
+Usage:
+    python manage.py seed_reference_sequences
+    python manage.py seed_reference_sequences --tenant=acme
+    python manage.py seed_reference_sequences --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import ReferenceSequence
+from core.sequences import REFERENCE_SEQUENCES, current_max
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Seed per-tenant reference number counters (RMA-, T-, PO-) from existing rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Only seed counters for this tenant subdomain'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would change without writing'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all().order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(subdomain=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        dry_run = options['dry_run']
+        changed = 0
+
+        for tenant in tenants:
+            for prefix in REFERENCE_SEQUENCES:
+                with transaction.atomic():
+                    highest = current_max(tenant.pk, prefix)
+                    sequence = ReferenceSequence.objects.select_for_update().filter(
+                        tenant=tenant, prefix=prefix
+                    ).first()
+                    current = sequence.last_value if sequence else None
+
+                    if current is not None and current >= highest:
+                        continue
+
+                    self.stdout.write(f'  {tenant.subdomain} {prefix}: {current} -> {highest}')
+                    changed += 1
+                    if dry_run:
+                        continue
+                    if sequence:
+                        sequence.last_value = highest
+                        sequence.save(update_fields=['last_value'])
+                    else:
+                        ReferenceSequence.objects.create(tenant=tenant, prefix=prefix, last_value=highest)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'\n[DRY RUN] Would update {changed} counter(s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\nUpdated {changed} counter(s)'))
@@ -0,0 +1,302 @@
+"""
+Request, SQL and Celery task instrumentation exposed in Prometheus text format.
+
+``RequestMetricsMiddleware`` wraps every request in a DB execute-wrapper and records,
+per resolved URL name: latency, number of queries, time spent in SQL and response
+size. ``core.signals`` times every Celery task through ``task_prerun``/``task_postrun``.
+
+Observations are aggregated into histograms in process memory. When
+``METRICS_REDIS_URL`` is configured each process adds its buckets to shared Redis
+hashes every ``METRICS_FLUSH_INTERVAL`` seconds, so ``/metrics`` reports the totals of
+all gunicorn workers and Celery workers; without it ``/metrics`` shows the serving
+process only.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+
+    def empty(self):
+        # per-bucket (non-cumulative) counts, then +Inf, sum and count
+        return [0] * (len(self.buckets) + 1) + [0.0, 0]
+
+    def add(self, series, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+REQUEST_DURATION = Histogram(
+    'repairshop_http_request_duration_seconds', 'Total request latency.',
+    ('view', 'method', 'status'), LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    'repairshop_http_request_db_queries', 'SQL queries executed per request.',
+    ('view', 'method'), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'repairshop_http_request_db_duration_seconds', 'Time spent executing SQL per request.',
+    ('view', 'method'), LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'repairshop_http_response_size_bytes', 'Response body size.',
+    ('view', 'method'), SIZE_BUCKETS,
+)
+TASK_DURATION = Histogram(
+    'repairshop_celery_task_duration_seconds', 'Celery task run time.',
+    ('task', 'state'), TASK_BUCKETS,
+)
+
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_QUERIES, REQUEST_DB_DURATION, RESPONSE_SIZE, TASK_DURATION)
+
+
+class MetricsRegistry:
+    """Process-local histogram values; ``drain`` hands them to the shared store."""
+
+    def __init__(self, histograms=HISTOGRAMS):
+        self.histograms = {histogram.name: histogram for histogram in histograms}
+        self._lock = threading.Lock()
+        self._values = {name: {} for name in self.histograms}
+        self._last_flush = time.monotonic()
+
+    def observe(self, histogram, labels, value):
+        with self._lock:
+            series = self._values[histogram.name].get(labels)
+            if series is None:
+                series = self._values[histogram.name][labels] = histogram.empty()
+            histogram.add(series, value)
+
+    def collect(self):
+        with self._lock:
+            return {name: {labels: list(s) for labels, s in series.items()}
+                    for name, series in self._values.items()}
+
+    def drain(self):
+        with self._lock:
+            values, self._values = self._values, {name: {} for name in self.histograms}
+            self._last_flush = time.monotonic()
+            return values
+
+    def flush_due(self):
+        return time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+
+
+class RedisMetricsStore:
+    """One hash per histogram; fields are ``<labels json>|<slot>`` counters."""
+
+    def __init__(self, url, prefix='metrics'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, name):
+        return f'{self.prefix}:{name}'
+
+    def add(self, values):
+        pipe = self.client.pipeline(transaction=False)
+        for name, series in values.items():
+            for labels, slots in series.items():
+                field = json.dumps(labels)
+                for slot, amount in enumerate(slots):
+                    if not amount:
+                        continue
+                    if isinstance(amount, float):
+                        pipe.hincrbyfloat(self._key(name), f'{field}|{slot}', amount)
+                    else:
+                        pipe.hincrby(self._key(name), f'{field}|{slot}', amount)
+        pipe.execute()
+
+    def collect(self, histograms):
+        pipe = self.client.pipeline(transaction=False)
+        for name in histograms:
+            pipe.hgetall(self._key(name))
+        values = {}
+        for (name, histogram), raw in zip(histograms.items(), pipe.execute()):
+            series = values[name] = {}
+            for field, amount in raw.items():
+                labels, slot = field.decode().rsplit('|', 1)
+                slots = series.setdefault(tuple(json.loads(labels)), histogram.empty())
+                slot = int(slot)
+                slots[slot] = float(amount) if slot == len(slots) - 2 else int(amount)
+        return values
+
+
+registry = MetricsRegistry()
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    url = getattr(settings, 'METRICS_REDIS_URL', None)
+    if _store is None and url:
+        with _store_lock:
+            if _store is None:
+                _store = RedisMetricsStore(url)
+    return _store
+
+
+def flush():
+    """Push this process's observations to the shared store (no-op without one)."""
+    store = get_store()
+    if store is None:
+        return
+    values = registry.drain()
+    try:
+        store.add(values)
+    except Exception:
+        # Metrics must never fail a request; the drained values are dropped.
+        logger.exception('Could not flush metrics')
+
+
+def observe(histogram, labels, value):
+    registry.observe(histogram, labels, value)
+    if registry.flush_due():
+        flush()
+
+
+def collect():
+    """Current values of all histograms, from the shared store when configured."""
+    store = get_store()
+    if store is None:
+        return registry.collect()
+    flush()
+    return store.collect(registry.histograms)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render(values):
+    lines = []
+    for name, histogram in registry.histograms.items():
+        lines.append(f'# HELP {name} {histogram.documentation}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, slots in sorted(values.get(name, {}).items()):
+            cumulative = 0
+            for bound, amount in zip((*histogram.buckets, '+Inf'), slots):
+                cumulative += amount
+                label_text = _format_labels(histogram.labelnames, labels, [('le', bound)])
+                lines.append(f'{name}_bucket{label_text} {cumulative}')
+            label_text = _format_labels(histogram.labelnames, labels)
+            lines.append(f'{name}_sum{label_text} {slots[-2]}')
+            lines.append(f'{name}_count{label_text} {slots[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+class QueryCounter:
+    """DB execute-wrapper counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+def _response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """Record latency, SQL and response size per resolved URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        try:
+            view = _view_name(request)
+            method = request.method
+            observe(REQUEST_DURATION, (view, method, f'{response.status_code // 100}xx'), elapsed)
+            observe(REQUEST_QUERIES, (view, method), counter.count)
+            observe(REQUEST_DB_DURATION, (view, method), counter.duration)
+            size = _response_size(response)
+            if size is not None:
+                observe(RESPONSE_SIZE, (view, method), size)
+        except Exception:
+            logger.exception('Could not record request metrics')
+        return response
+
+
+_task_starts = {}
+
+
+def task_started(task_id):
+    _task_starts[task_id] = time.perf_counter()
+
+
+def task_finished(task_id, task_name, state):
+    start = _task_starts.pop(task_id, None)
+    if start is not None:
+        observe(TASK_DURATION, (task_name, state or 'UNKNOWN'), time.perf_counter() - start)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint. Requires ``Authorization: Bearer <METRICS_TOKEN>`` when set."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not constant_time_compare(header, f'Bearer {token}'):
+            return HttpResponseForbidden()
+    return HttpResponse(render(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,10 +1,13 @@
 from datetime import timedelta
 from django.utils.timezone import now
 
+from core.usage import record_user_activity
+
 
 class UpdateLastActivityMiddleware:
     """Update User.last_activity_at on every authenticated request.
-    Throttled to once per 5 minutes to avoid a DB write on every request."""
+    Throttled to once per 5 minutes, and written behind: the timestamp is buffered
+    and flushed in batches by core.tasks.flush_usage_counters."""
 
     def __init__(self, get_response):
         self.get_response = get_response
@@ -14,7 +17,6 @@ class UpdateLastActivityMiddleware:
         if request.user.is_authenticated:
             last = request.user.last_activity_at
             if not last or now() - last > timedelta(minutes=5):
-                request.user.__class__.objects.filter(
-                    pk=request.user.pk
-                ).update(last_activity_at=now())
+                request.user.last_activity_at = now()
+                record_user_activity(request.user.pk, request.user.last_activity_at)
         return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_add_last_activity_at'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=20)),
+                ('last_value', models.BigIntegerField(default=0)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reference_sequences', to='tenants.tenant')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='referencesequence',
+            constraint=models.UniqueConstraint(fields=('tenant', 'prefix'), name='unique_reference_sequence_per_tenant'),
+        ),
+    ]
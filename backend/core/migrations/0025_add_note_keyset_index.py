@@ -0,0 +1,18 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0024_add_reference_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['content_type', 'object_id', 'created_at', 'id'], name='core_note_content_e710c3_idx'),
+        ),
+    ]
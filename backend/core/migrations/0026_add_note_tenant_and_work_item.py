@@ -0,0 +1,35 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0025_add_note_keyset_index'),
+        ('tasks', '0043_add_dashboard_counter'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notes', to='tenants.tenant'),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='work_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='timeline_notes', to='tasks.workitem'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['tenant', 'created_at', 'id'], name='core_note_tenant__8d2f97_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['work_item', 'created_at', 'id'], name='core_note_work_it_c5176b_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def backfill_note_scope(apps, _schema_editor):
+    Note = apps.get_model('core', 'Note')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    for content_type in ContentType.objects.filter(pk__in=Note.objects.values('content_type_id')):
+        try:
+            model = apps.get_model(content_type.app_label, content_type.model)
+        except LookupError:
+            continue
+        field_names = {field.name for field in model._meta.get_fields()}
+        target = model.objects.filter(pk=OuterRef('object_id'))
+
+        updates = {}
+        if 'tenant' in field_names:
+            updates['tenant_id'] = Subquery(target.values('tenant_id')[:1])
+        if model._meta.label_lower == 'tasks.workitem':
+            updates['work_item_id'] = Subquery(target.values('pk')[:1])
+        elif 'work_item' in field_names:
+            updates['work_item_id'] = Subquery(target.values('work_item_id')[:1])
+        if not updates:
+            continue
+
+        # Id ranges keep each UPDATE (and its locks) short on large tables
+        notes = Note.objects.filter(content_type=content_type, tenant__isnull=True)
+        bounds = notes.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            continue
+        for start in range(bounds['first'] - 1, bounds['last'], BATCH_SIZE):
+            notes.filter(pk__gt=start, pk__lte=start + BATCH_SIZE).update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_add_note_tenant_and_work_item'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_note_scope, migrations.RunPython.noop),
+    ]
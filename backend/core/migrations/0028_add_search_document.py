@@ -0,0 +1,56 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:22
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_backfill_note_tenant_and_work_item'),
+        ('tenants', '0001_initial'),
+    ]
+
+    # Backfill with `manage.py rebuild_search_index` after migrating
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.TextField(blank=True, default='')),
+                ('keywords', models.TextField(blank=True, default='')),
+                ('body', models.TextField(blank=True, default='')),
+                ('vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='tenants.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', 'entity_type'], name='core_search_tenant__fd3fdd_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('entity_type', 'object_id'), name='unique_search_document'),
+        ),
+        # Trigram indexes serve the LIKE '%...%' and word similarity matches, the
+        # tsvector index the prefix matches of core.search.search()
+        migrations.RunSQL(
+            sql=[
+                "CREATE INDEX core_searchdocument_vector_idx ON core_searchdocument USING GIN (vector);",
+                "CREATE INDEX core_searchdocument_title_trgm_idx ON core_searchdocument "
+                "USING GIN (title gin_trgm_ops);",
+                "CREATE INDEX core_searchdocument_keywords_trgm_idx ON core_searchdocument "
+                "USING GIN (keywords gin_trgm_ops);",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS core_searchdocument_vector_idx;",
+                "DROP INDEX IF EXISTS core_searchdocument_title_trgm_idx;",
+                "DROP INDEX IF EXISTS core_searchdocument_keywords_trgm_idx;",
+            ],
+        ),
+    ]
@@ -11,10 +11,14 @@ from django.contrib.auth.models import (
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import Permission
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 import secrets
 
 
+from core.permission_cache import get_role_permissions, get_user_permissions
+from core.settings_snapshot import get_snapshot as get_settings_snapshot
+from core.usage import latest, pending_api_key_usage, record_api_key_usage
 from tenants.models import Tenant
 
 
@@ -63,21 +67,8 @@ class User(AbstractUser, PermissionsMixin):
         if self.is_superuser:
             return True
 
-        # Handle both 'app_label.codename' and 'codename' formats
-        if '.' in permission_codename:
-            app_label, codename = permission_codename.split('.', 1)
-            return UserRole.objects.filter(
-                user=self,
-                role__tenant=tenant,
-                role__role_permissions__permission__codename=codename,
-                role__role_permissions__permission__content_type__app_label=app_label
-            ).exists()
-
-        return UserRole.objects.filter(
-            user=self,
-            role__tenant=tenant,
-            role__role_permissions__permission__codename=permission_codename
-        ).exists()
+        # Both 'app_label.codename' and 'codename' formats are handled by the set
+        return get_user_permissions(self, tenant).has(permission_codename)
         #if not request.user.has_permission('manage_users', request.tenant):
         #raise PermissionDenied()
 
@@ -111,8 +102,31 @@ class Note(models.Model):
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey("content_type", "object_id")
 
+    # Denormalized from the target for timelines: its tenant, and the work item it
+    # belongs to (the work item itself or a task's parent). Filled in on creation.
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, null=True, blank=True, related_name='notes')
+    work_item = models.ForeignKey(
+        'tasks.WorkItem', on_delete=models.CASCADE, null=True, blank=True, related_name='timeline_notes'
+    )
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'created_at', 'id']),
+            models.Index(fields=['tenant', 'created_at', 'id']),
+            models.Index(fields=['work_item', 'created_at', 'id']),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.tenant_id is None:
+            target = self.content_object
+            if target is not None:
+                self.tenant_id = getattr(target, 'tenant_id', None)
+                if target._meta.label_lower == 'tasks.workitem':
+                    self.work_item_id = target.pk
+                else:
+                    self.work_item_id = getattr(target, 'work_item_id', None)
+        super().save(*args, **kwargs)
 
 
 class PicklistValue(models.Model):
@@ -160,6 +174,53 @@ class PicklistValue(models.Model):
         return f"{self.category}: {self.name} ({self.tenant})"
 
 
+class ReferenceSequence(models.Model):
+    """
+    Per-tenant counter behind human-readable reference numbers (RMA-n, T-n, PO-n).
+    Incremented with a single locked UPDATE by core.sequences.next_reference.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='reference_sequences')
+    prefix = models.CharField(max_length=20)
+    last_value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'prefix'], name='unique_reference_sequence_per_tenant'),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix}{self.last_value} ({self.tenant_id})"
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one customer, work item, ... (see ``core.search``).
+
+    The text is stored lowercased and split by weight: ``title`` (A) names the row,
+    ``keywords`` (B) holds identifiers such as phone digits and serial numbers,
+    ``body`` (C) free text. ``vector`` is their weighted ``tsvector`` on PostgreSQL.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='search_documents')
+    entity_type = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    title = models.TextField(blank=True, default='')
+    keywords = models.TextField(blank=True, default='')
+    body = models.TextField(blank=True, default='')
+    vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entity_type', 'object_id'], name='unique_search_document'),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'entity_type']),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}:{self.object_id} {self.title}"
+
+
 class Role(models.Model):
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='roles')
     name = models.CharField(max_length=100)
@@ -375,12 +436,16 @@ class APIKey(TimeStampedModel):
         if ip_address:
             self.last_used_ip = ip_address
 
-        # Use update to avoid triggering modified_on
-        APIKey.objects.filter(pk=self.pk).update(
-            last_used_at=self.last_used_at,
-            last_used_ip=self.last_used_ip,
-            usage_count=self.usage_count
-        )
+        # Buffered and flushed in batches by core.tasks.flush_usage_counters
+        record_api_key_usage(self.pk, self.last_used_at, ip_address)
+
+    def with_pending_usage(self):
+        """Overlay usage that is buffered but not flushed yet (for display)."""
+        pending = pending_api_key_usage(self.pk)
+        self.usage_count += pending.get('count', 0)
+        self.last_used_at = latest(self.last_used_at, pending.get('last_used_at'))
+        self.last_used_ip = pending.get('ip') or self.last_used_ip
+        return self
 
     def has_permission(self, permission_codename, tenant=None):
         """
@@ -395,26 +460,14 @@ class APIKey(TimeStampedModel):
             bool: True if permission granted, False otherwise
         """
         # API keys are never superusers
-        if tenant is None:
-            tenant = self.tenant
+        tenant_id = self.tenant_id if tenant is None else getattr(tenant, 'pk', tenant)
 
         # Check if this API key's tenant matches the requested tenant
-        if self.tenant != tenant:
+        if self.tenant_id != tenant_id:
             return False
 
-        # Handle both 'app_label.codename' and 'codename' formats
-        if '.' in permission_codename:
-            app_label, codename = permission_codename.split('.', 1)
-            return RolePermission.objects.filter(
-                role=self.role,
-                permission__codename=codename,
-                permission__content_type__app_label=app_label
-            ).exists()
-
-        return RolePermission.objects.filter(
-            role=self.role,
-            permission__codename=permission_codename
-        ).exists()
+        # Both 'app_label.codename' and 'codename' formats are handled by the set
+        return get_role_permissions(self.role_id, self.tenant_id, holder=self).has(permission_codename)
 
 
 class Setting(models.Model):
@@ -555,20 +608,8 @@ class Setting(models.Model):
         Returns:
             The setting value (properly typed) or default
         """
-        # Try tenant-specific first
-        if tenant:
-            try:
-                setting = cls.objects.get(key=key, tenant=tenant)
-                return setting.value
-            except cls.DoesNotExist:
-                pass
-
-        # Fall back to global
-        try:
-            setting = cls.objects.get(key=key, tenant__isnull=True)
-            return setting.value
-        except cls.DoesNotExist:
-            return default
+        entry = get_settings_snapshot(tenant).get(key)
+        return entry['value'] if entry else default
 
     @classmethod
     def get_all_merged(cls, tenant):
@@ -579,27 +620,6 @@ class Setting(models.Model):
         Returns:
             dict: {key: {value, value_type, is_override, description}}
         """
-        result = {}
-
-        # First, get all global settings
-        global_settings = cls.objects.filter(tenant__isnull=True)
-        for setting in global_settings:
-            result[setting.key] = {
-                'value': setting.value,
-                'value_type': setting.value_type,
-                'is_override': False,
-                'description': setting.description,
-            }
-
-        # Then, overlay tenant-specific settings
-        if tenant:
-            tenant_settings = cls.objects.filter(tenant=tenant)
-            for setting in tenant_settings:
-                result[setting.key] = {
-                    'value': setting.value,
-                    'value_type': setting.value_type,
-                    'is_override': True,
-                    'description': setting.description,
-                }
-
-        return result
\ No newline at end of file
+        # Served from a cached snapshot (see core.settings_snapshot); copy so
+        # callers may modify the result.
+        return {key: dict(entry) for key, entry in get_settings_snapshot(tenant).items()}
\ No newline at end of file
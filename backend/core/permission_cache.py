@@ -0,0 +1,101 @@
+"""
+Permission set cache shared by ``User.has_permission`` and ``APIKey.has_permission``.
+
+Instead of one EXISTS query per check, the full set of (app_label, codename) pairs granted
+to a user (or an API key's role) in a tenant is loaded once and kept:
+
+* on the checking instance itself, so repeated checks within a request are dict lookups;
+* in the two-tier cache, so other requests and workers skip the query entirely.
+
+Every cached set is keyed by a per-tenant version number which ``core.signals`` bumps on
+any ``UserRole`` / ``RolePermission`` change, making stale sets unreachable immediately.
+Without a shared cache (``DJANGO_CACHE_URL`` unset) the bump only reaches the process
+that made the change, so sets are then kept for ``LOCAL_ONLY_TTL`` seconds at most: a
+revoked permission keeps working in other workers for that long, not for an hour.
+"""
+from core.cache import LOCAL_ONLY_TTL, TieredCache, VersionCounter
+
+permission_versions = VersionCounter("core:perms")
+
+permission_sets = TieredCache(
+    "core:perms:set", maxsize=4096, local_ttl=60, shared_ttl=60 * 60, local_only_ttl=LOCAL_ONLY_TTL
+)
+
+
+class PermissionSet:
+    """Immutable set of granted permissions answering both lookup forms in O(1)."""
+
+    __slots__ = ("pairs", "codenames")
+
+    def __init__(self, pairs=()):
+        self.pairs = frozenset(pairs)
+        self.codenames = frozenset(codename for _, codename in self.pairs)
+
+    def __getstate__(self):
+        return self.pairs
+
+    def __setstate__(self, state):
+        self.pairs = state
+        self.codenames = frozenset(codename for _, codename in state)
+
+    def has(self, permission_codename):
+        if '.' in permission_codename:
+            return tuple(permission_codename.split('.', 1)) in self.pairs
+        return permission_codename in self.codenames
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+def get_version(tenant_id):
+    return permission_versions.get(tenant_id)
+
+
+def bump_version(tenant_id):
+    return permission_versions.bump(tenant_id)
+
+
+def _memoized(instance, key, loader):
+    memo = instance.__dict__.setdefault("_permission_sets", {})
+    entry = memo.get(key)
+    if entry is None:
+        entry = memo[key] = permission_sets.get_or_load(key, loader)
+    return entry
+
+
+def get_user_permissions(user, tenant):
+    """PermissionSet for ``user`` in ``tenant`` across all of the user's roles."""
+    tenant_id = getattr(tenant, "pk", tenant)
+    if tenant_id is None:
+        return PermissionSet()
+
+    def load():
+        from core.models import RolePermission
+        return PermissionSet(
+            RolePermission.objects.filter(
+                role__tenant_id=tenant_id,
+                role__user_roles__user_id=user.pk,
+            ).values_list("permission__content_type__app_label", "permission__codename")
+        )
+
+    key = ("user", tenant_id, user.pk, get_version(tenant_id))
+    return _memoized(user, key, load)
+
+
+def get_role_permissions(role_id, tenant_id, holder=None):
+    """PermissionSet for a single role; ``holder`` memoizes it (e.g. the APIKey)."""
+    if role_id is None:
+        return PermissionSet()
+
+    def load():
+        from core.models import RolePermission
+        return PermissionSet(
+            RolePermission.objects.filter(role_id=role_id).values_list(
+                "permission__content_type__app_label", "permission__codename"
+            )
+        )
+
+    key = ("role", tenant_id, role_id, get_version(tenant_id))
+    if holder is None:
+        return permission_sets.get_or_load(key, load)
+    return _memoized(holder, key, load)
@@ -1,7 +1,7 @@
 from rest_framework.permissions import BasePermission
 from rest_framework.exceptions import PermissionDenied
 
-from core.models import UserRole
+from tenants.cache import is_tenant_member
 
 
 class TenantUserMatchesRequestTenant(BasePermission):
@@ -21,7 +21,7 @@ class TenantUserMatchesRequestTenant(BasePermission):
         if request.tenant is None:
             raise PermissionDenied("Tenant must be specified.")
 
-        if not UserRole.objects.filter(user=request.user, role__tenant=request.tenant).exists():
+        if not is_tenant_member(request.user, request.tenant):
             raise PermissionDenied("You don't belong to this tenant.")
 
         return True
@@ -0,0 +1,89 @@
+"""
+Per-tenant picklist registry.
+
+All active ``PicklistValue`` rows of a tenant are loaded in one query and grouped by
+category into ``Picklist`` objects offering O(1) membership, ordered choices and
+name/color metadata. The registry is kept in the two-tier cache under a per-tenant
+version that ``core.signals`` (and bulk admin actions) bump on every edit. Without a
+shared cache other processes never see the bumps, so registries are then kept for
+``LOCAL_ONLY_TTL`` seconds at most.
+"""
+from collections import namedtuple
+
+from core.cache import LOCAL_ONLY_TTL, TieredCache, VersionCounter
+
+PicklistEntry = namedtuple('PicklistEntry', ['value', 'name', 'color', 'sort_order'])
+
+picklist_versions = VersionCounter("core:picklists")
+
+registries = TieredCache(
+    "core:picklists:registry", maxsize=512, local_ttl=60, shared_ttl=60 * 60, local_only_ttl=LOCAL_ONLY_TTL
+)
+
+
+class Picklist:
+    """Active values of one category, ordered by (sort_order, name)."""
+
+    def __init__(self, entries=()):
+        self.entries = tuple(entries)
+        self.by_value = {entry.value: entry for entry in self.entries}
+
+    def __contains__(self, value):
+        return value in self.by_value
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, value):
+        return self.by_value.get(value)
+
+    def values(self):
+        return [entry.value for entry in self.entries]
+
+    def choices(self):
+        """[(value, name), ...] as used by model schemas and dropdowns."""
+        return [(entry.value, entry.name) for entry in self.entries]
+
+    def value_for_name(self, name):
+        """Stored value for a display name (case-insensitive), or None."""
+        name = name.lower()
+        for entry in self.entries:
+            if entry.name.lower() == name:
+                return entry.value
+        return None
+
+
+EMPTY_PICKLIST = Picklist()
+
+
+def invalidate_picklists(*tenant_ids):
+    for tenant_id in set(tenant_ids):
+        picklist_versions.bump(tenant_id)
+
+
+def _load(tenant_id):
+    from core.models import PicklistValue
+
+    grouped = {}
+    rows = PicklistValue.objects.filter(tenant_id=tenant_id, is_active=True).order_by(
+        'category', 'sort_order', 'name'
+    ).values_list('category', 'value', 'name', 'color', 'sort_order')
+    for category, *fields in rows:
+        grouped.setdefault(category, []).append(PicklistEntry(*fields))
+    return {category: Picklist(entries) for category, entries in grouped.items()}
+
+
+def get_registry(tenant):
+    """{category: Picklist} of active values for ``tenant``."""
+    tenant_id = getattr(tenant, 'pk', tenant)
+    if tenant_id is None:
+        return {}
+    key = (tenant_id, picklist_versions.get(tenant_id))
+    return registries.get_or_load(key, lambda: _load(tenant_id))
+
+
+def get_picklist(tenant, category):
+    return get_registry(tenant).get(category, EMPTY_PICKLIST)
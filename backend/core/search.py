@@ -0,0 +1,320 @@
+"""
+Tenant-scoped search index behind the global search box.
+
+Every searchable row has one ``SearchDocument`` with its text lowercased and split
+by weight:
+
+- ``title`` (A): what the row is called, e.g. a customer's name or an RMA number
+- ``keywords`` (B): identifiers people type, e.g. phone digits, emails, tax codes,
+  serial numbers, device names, the customer of a work item
+- ``body`` (C): free text such as descriptions
+
+On PostgreSQL the document also keeps a weighted ``vector`` (``tsvector``), and
+``core/migrations/0028`` adds GIN indexes on it and ``pg_trgm`` GIN indexes on
+``title`` and ``keywords``. ``search()`` then answers prefix (``jan kow``), fuzzy
+(``kowalsky``) and phone digit (``500 100 200``) queries from those indexes,
+instead of OR-ing ``icontains`` over the joined entity tables. Other databases
+(sqlite in tests) match the same documents with ``LIKE``. ``find()`` serves the
+global search box: the top matches of every entity type and their counts
+(facets) in one statement.
+
+Apps describe their entity types with ``register()``. Documents are then written
+when a registered row is saved or deleted, and when a row it reads from changes
+(``register_dependency()``; in a Celery task for rows many documents read from).
+``manage.py rebuild_search_index`` rebuilds them after bulk writes that skip
+signals, or to backfill.
+"""
+import logging
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Q, Subquery, Value, When, Window
+from django.db.models.functions import Greatest, RowNumber
+from django.db.models.signals import post_delete, post_save
+
+CONFIG = 'simple'
+BATCH_SIZE = 500
+# Shorter digit runs match too much to be a phone number
+MIN_DIGITS = 3
+PHONE_LIKE = re.compile(r'[\d\s+()./-]+')
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class Indexer:
+    def __init__(self, entity_type, model, document, fields=None, select_related=(), tenant='tenant',
+                 section=None, visible=None, results=None):
+        self.entity_type = entity_type
+        self.model = model
+        self.document = document
+        self.fields = fields
+        self.select_related = select_related
+        self.tenant = tenant
+        self.section = section or f'{entity_type}s'
+        self.visible = visible
+        self.results = results
+
+    def tenant_id(self, obj):
+        *path, last = self.tenant.split('__')
+        for attr in path:
+            obj = getattr(obj, attr)
+        return getattr(obj, f'{last}_id')
+
+
+def register(entity_type, model, document, *, fields=None, select_related=(), tenant='tenant',
+             section=None, visible=None, results=None):
+    """
+    Index ``model`` rows as ``entity_type`` documents.
+
+    Args:
+        document: ``(obj) -> (title, keywords, body)``; parts may be lists of strings
+        fields: Attnames whose change re-indexes a saved row (default: every save)
+        select_related: Lookups ``document`` reads, loaded with the rows
+        tenant: Lookup from the model to its tenant, e.g. ``customer__tenant``
+        section: Key of the entity type in global search responses (default: plural)
+        visible: Optional ``(tenant, user) -> queryset`` of the rows a user may find
+        results: ``(tenant, ids) -> [dict]`` rendering found rows for global search
+    """
+    indexer = Indexer(entity_type, model, document, fields, select_related, tenant, section, visible, results)
+    _registry[entity_type] = indexer
+
+    def saved(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        if created or fields is None or instance.changed_fields() & fields:
+            index(entity_type, [instance.pk])
+
+    def deleted(sender, instance, origin=None, **kwargs):
+        # Deleting a tenant takes its documents with it
+        if not _deleting_tenant(origin):
+            unindex(entity_type, [instance.pk])
+
+    post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'search_index_{entity_type}')
+    post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'search_unindex_{entity_type}')
+    return indexer
+
+
+def register_dependency(model, entity_type, lookup, *, fields=None, deferred=False):
+    """
+    Re-index the ``entity_type`` rows linked through ``lookup`` when a ``model`` row
+    they read from is updated, e.g. a customer's work items when it is renamed.
+    ``fields`` limits this to changes of those attnames (``model`` must track changes).
+    ``deferred`` re-indexes them in a Celery task once the transaction commits instead
+    of in the saving request, for rows that many documents (of every tenant) read from.
+    """
+    def saved(sender, instance, created, raw=False, **kwargs):
+        if raw or created:
+            return
+        if fields is not None and not instance.changed_fields() & fields:
+            return
+        if deferred:
+            pk = instance.pk
+            transaction.on_commit(lambda: _queue_dependents(entity_type, lookup, pk))
+        else:
+            index_dependents(entity_type, lookup, instance.pk)
+
+    post_save.connect(
+        saved, sender=model, weak=False,
+        dispatch_uid=f'search_dependency_{entity_type}_{model._meta.label_lower}_{lookup}',
+    )
+
+
+def index_dependents(entity_type, lookup, pk):
+    """Re-index the ``entity_type`` rows whose ``lookup`` is ``pk``; returns the number written."""
+    return index(entity_type, _registry[entity_type].model.objects.filter(**{lookup: pk}))
+
+
+def _queue_dependents(entity_type, lookup, pk):
+    from core.tasks import index_search_dependents
+
+    try:
+        index_search_dependents.delay(entity_type, lookup, pk)
+    except Exception:
+        logger.exception("Could not queue re-indexing %s rows of %s=%s, indexing them now", entity_type, lookup, pk)
+        index_dependents(entity_type, lookup, pk)
+
+
+def _deleting_tenant(origin):
+    from django.db.models import QuerySet
+    from tenants.models import Tenant
+
+    return isinstance(origin, Tenant) or (isinstance(origin, QuerySet) and origin.model is Tenant)
+
+
+def enabled():
+    """True when the database has the tsvector/trigram support (PostgreSQL)."""
+    return connection.vendor == 'postgresql'
+
+
+def digits(text):
+    return re.sub(r'\D', '', text or '')
+
+
+def normalize(parts):
+    """Lowercased text of a string or a list of strings (empty parts dropped)."""
+    if isinstance(parts, str) or parts is None:
+        parts = [parts]
+    return ' '.join(str(part) for part in parts if part).lower()
+
+
+def prefix_query(text):
+    """SearchQuery matching every word of ``text`` as a prefix; None if it has no words."""
+    words = re.findall(r'[^\W_]+', text.lower())
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=CONFIG)
+
+
+def document_vector():
+    return (
+        SearchVector('title', weight='A', config=CONFIG)
+        + SearchVector('keywords', weight='B', config=CONFIG)
+        + SearchVector('body', weight='C', config=CONFIG)
+    )
+
+
+def index(entity_type, objects):
+    """
+    Write the documents of ``objects`` (ids or a queryset of the registered model).
+    Ids whose row no longer exists lose their document. Returns the number written.
+    """
+    from core.models import SearchDocument
+
+    indexer = _registry[entity_type]
+    ids = list(objects.values_list('pk', flat=True)) if hasattr(objects, 'values_list') else list(objects)
+    written = 0
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        rows = indexer.model._base_manager.filter(pk__in=batch).select_related(*indexer.select_related)
+        documents = []
+        for obj in rows:
+            title, keywords, body = indexer.document(obj)
+            documents.append(SearchDocument(
+                tenant_id=indexer.tenant_id(obj), entity_type=entity_type, object_id=obj.pk,
+                title=normalize(title), keywords=normalize(keywords), body=normalize(body),
+            ))
+        SearchDocument.objects.bulk_create(
+            documents, update_conflicts=True, unique_fields=['entity_type', 'object_id'],
+            update_fields=['tenant', 'title', 'keywords', 'body', 'updated_at'],
+        )
+        found = {document.object_id for document in documents}
+        unindex(entity_type, [pk for pk in batch if pk not in found])
+        if enabled() and documents:
+            SearchDocument.objects.filter(entity_type=entity_type, object_id__in=found).update(
+                vector=document_vector()
+            )
+        written += len(documents)
+    return written
+
+
+def unindex(entity_type, ids):
+    from core.models import SearchDocument
+
+    if ids:
+        SearchDocument.objects.filter(entity_type=entity_type, object_id__in=ids).delete()
+
+
+def rebuild(tenant=None, entity_types=None):
+    """Re-index every registered row (of ``tenant``); returns {entity type: documents written}."""
+    from core.models import SearchDocument
+
+    written = {}
+    for entity_type, indexer in _registry.items():
+        if entity_types and entity_type not in entity_types:
+            continue
+        rows = indexer.model._base_manager.all()
+        stale = SearchDocument.objects.filter(entity_type=entity_type).exclude(
+            object_id__in=indexer.model._base_manager.values('pk')
+        )
+        if tenant is not None:
+            rows = rows.filter(**{indexer.tenant: tenant})
+            stale = stale.filter(tenant=tenant)
+        stale.delete()
+        written[entity_type] = index(entity_type, rows.order_by('pk'))
+    return written
+
+
+def search(tenant, text, entity_types=None):
+    """
+    ``SearchDocument`` queryset of ``tenant`` matching ``text``, annotated with
+    ``rank`` (higher is better) and ordered best first.
+    """
+    from core.models import SearchDocument
+
+    text = text.strip().lower()
+    # Phone numbers are typed with spaces, dashes and country prefixes; stored as digits
+    number = digits(text) if PHONE_LIKE.fullmatch(text) else ''
+    documents = SearchDocument.objects.filter(tenant=tenant)
+    if entity_types:
+        documents = documents.filter(entity_type__in=entity_types)
+
+    # Exact and prefix hits on the title or a phone number rank above text relevance
+    boosts = [When(title=text, then=Value(1.0)), When(title__startswith=text, then=Value(0.9))]
+    match = Q(title__contains=text) | Q(keywords__contains=text)
+    if len(number) >= MIN_DIGITS:
+        boosts.append(When(keywords__contains=number, then=Value(0.8)))
+        match |= Q(keywords__contains=number)
+
+    if enabled():
+        scores = [Case(*boosts, default=Value(0.0), output_field=FloatField()),
+                  TrigramWordSimilarity(text, 'title')]
+        match |= Q(title__trigram_word_similar=text)
+        query = prefix_query(text)
+        if query is not None:
+            match |= Q(vector=query)
+            scores.append(SearchRank(F('vector'), query))
+        rank = Greatest(*scores)
+    else:
+        match |= Q(body__contains=text)
+        rank = Case(
+            *boosts,
+            When(title__contains=text, then=Value(0.6)),
+            When(keywords__contains=text, then=Value(0.4)),
+            When(body__contains=text, then=Value(0.2)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+    return documents.filter(match).annotate(rank=rank).order_by('-rank', '-object_id')
+
+
+def top(queryset, documents, limit):
+    """
+    Rows of ``queryset`` behind the best ``limit`` of ``documents`` (from ``search()``),
+    annotated with their ``rank``; one statement, with the search as subqueries.
+    """
+    return queryset.filter(pk__in=documents.values('object_id')[:limit]).annotate(
+        rank=Subquery(documents.filter(object_id=OuterRef('pk')).values('rank')[:1])
+    )
+
+
+def visible_documents(documents, tenant, user):
+    """Drop the documents of rows ``user`` may not see (entity types registered with ``visible``)."""
+    for entity_type, indexer in _registry.items():
+        if indexer.visible is not None:
+            allowed = indexer.visible(tenant, user).values('pk')
+            documents = documents.filter(~Q(entity_type=entity_type) | Q(object_id__in=allowed))
+    return documents
+
+
+def find(tenant, text, user, entity_types=None, limit=5):
+    """
+    The best ``limit`` matches of each entity type ``user`` may see, and how many
+    match in all, from one ranked statement over the documents.
+
+    Returns:
+        {entity type: (ids best first, total matches)}; types without matches are left out
+    """
+    by_type = {'partition_by': F('entity_type')}
+    hits = visible_documents(search(tenant, text, entity_types), tenant, user).annotate(
+        position=Window(RowNumber(), order_by=[F('rank').desc(), F('object_id').desc()], **by_type),
+        matches=Window(Count('pk'), **by_type),
+    ).filter(position__lte=limit).order_by('entity_type', 'position')
+
+    found = {}
+    for entity_type, object_id, matches in hits.values_list('entity_type', 'object_id', 'matches'):
+        found.setdefault(entity_type, ([], matches))[0].append(object_id)
+    return found
@@ -0,0 +1,98 @@
+"""
+Concurrency-safe reference number allocation.
+
+``next_reference`` increments a per-(tenant, prefix) row of ``ReferenceSequence`` with a
+single ``UPDATE ... RETURNING``. The row lock is held until the surrounding transaction
+ends, so concurrent creators for the same tenant are serialised on that one row instead
+of racing on the unique constraint, and a rolled back insert also rolls back its number.
+
+A missing counter is seeded once from the highest existing number (the same scan the
+models used to run on every insert); ``manage.py seed_reference_sequences`` does this
+ahead of time for all tenants. References entered by hand in the sequence's format go
+through ``claim_reference`` so the counter never hands them out again.
+"""
+import re
+
+from django.apps import apps
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+from django.db.models.functions import Cast, Substr
+from django.db.models import BigIntegerField, F
+
+# prefix -> (model label, field holding the reference)
+REFERENCE_SEQUENCES = {
+    'RMA-': ('tasks.WorkItem', 'reference_id'),
+    'T-': ('tasks.Task', 'reference_id'),
+    'PO-': ('inventory.PurchaseOrder', 'order_number'),
+}
+
+
+def current_max(tenant_id, prefix):
+    """Highest number already used for ``prefix`` in the tenant's rows (0 if none)."""
+    label, field = REFERENCE_SEQUENCES[prefix]
+    model = apps.get_model(label)
+    return model.objects.filter(
+        tenant_id=tenant_id,
+        **{f'{field}__regex': rf'^{prefix}[0-9]+$'}
+    ).annotate(
+        num=Cast(Substr(F(field), len(prefix) + 1), BigIntegerField())
+    ).aggregate(max_num=Max('num'))['max_num'] or 0
+
+
+def _increment(tenant_id, prefix):
+    from core.models import ReferenceSequence
+
+    table = connection.ops.quote_name(ReferenceSequence._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET last_value = last_value + 1 '
+            f'WHERE tenant_id = %s AND prefix = %s RETURNING last_value',
+            [tenant_id, prefix],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def seed_sequence(tenant_id, prefix):
+    """Create the counter from existing data if it does not exist yet."""
+    from core.models import ReferenceSequence
+
+    try:
+        with transaction.atomic():
+            ReferenceSequence.objects.create(
+                tenant_id=tenant_id, prefix=prefix, last_value=current_max(tenant_id, prefix)
+            )
+    except IntegrityError:
+        pass  # created concurrently
+
+
+def next_value(tenant_id, prefix):
+    with transaction.atomic():
+        value = _increment(tenant_id, prefix)
+        if value is None:
+            seed_sequence(tenant_id, prefix)
+            value = _increment(tenant_id, prefix)
+    return value
+
+
+def next_reference(tenant_id, prefix):
+    """Allocate the next reference, e.g. ``next_reference(tenant.pk, 'RMA-') -> 'RMA-42'``."""
+    return f'{prefix}{next_value(tenant_id, prefix)}'
+
+
+def claim_reference(tenant_id, prefix, reference):
+    """
+    Move the counter of ``prefix`` past ``reference`` set by hand (e.g. ``'PO-50'``);
+    references in another format don't affect it.
+    """
+    from core.models import ReferenceSequence
+
+    match = re.fullmatch(rf'{re.escape(prefix)}([0-9]+)', reference or '')
+    if not match:
+        return
+    value = int(match.group(1))
+    counter = ReferenceSequence.objects.filter(tenant_id=tenant_id, prefix=prefix)
+    with transaction.atomic():
+        if not counter.filter(last_value__lt=value).update(last_value=value) and not counter.exists():
+            seed_sequence(tenant_id, prefix)
+            counter.filter(last_value__lt=value).update(last_value=value)
@@ -34,6 +34,14 @@ class NoteSerializer(serializers.ModelSerializer):
         """Return the ID of the object this note is attached to"""
         return obj.object_id
 
+class TimelineNoteSerializer(NoteSerializer):
+    """Note with the work item it belongs to, for the activity timeline."""
+    work_item_id = serializers.IntegerField(read_only=True)
+    work_item_reference_id = serializers.CharField(source='work_item.reference_id', read_only=True, default=None)
+
+    class Meta(NoteSerializer.Meta):
+        fields = NoteSerializer.Meta.fields + ["work_item_id", "work_item_reference_id"]
+
 class AddressSerializer(serializers.ModelSerializer):
     class Meta:
         model = Address
@@ -0,0 +1,61 @@
+"""
+Per-tenant snapshot of merged ``Setting`` rows.
+
+Global defaults and the tenant's overrides are loaded together in one query, merged
+into ``{key: {value, value_type, is_override, description}}`` and kept in the two-tier
+cache. Snapshot keys embed both the global and the tenant version, which
+``core.signals`` bumps whenever a setting row of that scope is saved or deleted.
+Without a shared cache other processes never see the bumps, so snapshots are then
+kept for ``LOCAL_ONLY_TTL`` seconds at most.
+"""
+from django.db.models import Q
+
+from core.cache import LOCAL_ONLY_TTL, TieredCache, VersionCounter
+
+GLOBAL_SCOPE = "global"
+
+setting_versions = VersionCounter("core:settings")
+
+snapshots = TieredCache(
+    "core:settings:snapshot", maxsize=512, local_ttl=60, shared_ttl=60 * 60, local_only_ttl=LOCAL_ONLY_TTL
+)
+
+
+def _scope(tenant_id):
+    return GLOBAL_SCOPE if tenant_id is None else tenant_id
+
+
+def bump_settings_version(tenant_id):
+    """Invalidate snapshots after a change to ``tenant_id``'s rows (None = global rows)."""
+    setting_versions.bump(_scope(tenant_id))
+
+
+def _load(tenant_id):
+    from core.models import Setting
+
+    rows = Setting.objects.filter(Q(tenant__isnull=True) | Q(tenant_id=tenant_id))
+    merged = {}
+    # Globals first so tenant rows overwrite them
+    for setting in sorted(rows, key=lambda s: s.tenant_id is not None):
+        merged[setting.key] = {
+            'value': setting.value,
+            'value_type': setting.value_type,
+            'is_override': setting.tenant_id is not None,
+            'description': setting.description,
+        }
+    return merged
+
+
+def get_snapshot(tenant):
+    """
+    Merged settings for ``tenant`` (or only globals when None).
+
+    The returned dict is shared with the cache; treat it as read-only.
+    """
+    tenant_id = getattr(tenant, 'pk', tenant)
+    key = (
+        _scope(tenant_id),
+        setting_versions.get(GLOBAL_SCOPE),
+        setting_versions.get(_scope(tenant_id)) if tenant_id is not None else 0,
+    )
+    return snapshots.get_or_load(key, lambda: _load(tenant_id))
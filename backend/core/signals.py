@@ -0,0 +1,53 @@
+from celery.signals import task_postrun, task_prerun
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import metrics
+
+from core.authentication import forget_verified_keys
+from core.models import APIKey, PicklistValue, RolePermission, Setting, UserRole
+from core.permission_cache import bump_version
+from core.picklists import invalidate_picklists
+from core.settings_snapshot import bump_settings_version
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+def invalidate_permission_sets(sender, instance, **kwargs):
+    """Any grant/revoke makes every cached permission set of that tenant stale."""
+    bump_version(instance.role.tenant_id)
+
+
+@receiver(post_save, sender=APIKey)
+def invalidate_verified_api_key(sender, instance, **kwargs):
+    if not instance.is_valid():
+        forget_verified_keys(instance.pk)
+
+
+@receiver(post_delete, sender=APIKey)
+def forget_deleted_api_key(sender, instance, **kwargs):
+    forget_verified_keys(instance.pk)
+
+
+@receiver(post_save, sender=Setting)
+@receiver(post_delete, sender=Setting)
+def invalidate_settings_snapshot(sender, instance, **kwargs):
+    bump_settings_version(instance.tenant_id)
+
+
+@receiver(post_save, sender=PicklistValue)
+@receiver(post_delete, sender=PicklistValue)
+def invalidate_picklist_registry(sender, instance, **kwargs):
+    invalidate_picklists(instance.tenant_id)
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    metrics.task_started(task_id)
+
+
+@task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    metrics.task_finished(task_id, task.name, state)
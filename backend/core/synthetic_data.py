@@ -0,0 +1,388 @@
+"""
+Synthetic tenant data at production-like volumes, for benchmarking.
+
+``SyntheticDataGenerator`` builds complete tenants (shops, employees with a manager
+role, devices, inventory, customers with assets, work items with tasks, notes, cash
+and inventory transactions) using ``bulk_create`` in chunks of customers, so memory
+stays flat and each chunk is committed on its own even for millions of rows.
+Timestamps are spread over a configurable history and every random choice comes
+from a seeded ``random.Random`` so two runs with the same options produce the same
+data set.
+
+bulk_create skips ``save()`` and signals, so reference numbers are assigned here and
+the ``ReferenceSequence`` counters, dashboard counters and cash register totals are
+brought up to date at the end.
+"""
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+FIRST_NAMES = [
+    'Anna', 'Piotr', 'Katarzyna', 'Krzysztof', 'Maria', 'Tomasz', 'Agnieszka', 'Paweł',
+    'Magdalena', 'Michał', 'Joanna', 'Marcin', 'Ewa', 'Jakub', 'Aleksandra', 'Adam',
+    'Monika', 'Łukasz', 'Natalia', 'Kamil', 'Zofia', 'Mateusz', 'Julia', 'Bartosz',
+]
+LAST_NAMES = [
+    'Nowak', 'Kowalski', 'Wiśniewski', 'Wójcik', 'Kowalczyk', 'Kamiński', 'Lewandowski',
+    'Zieliński', 'Szymański', 'Woźniak', 'Dąbrowski', 'Kozłowski', 'Jankowski', 'Mazur',
+    'Kwiatkowski', 'Krawczyk', 'Piotrowski', 'Grabowski', 'Pawłowski', 'Michalski',
+]
+CITIES = ['Warszawa', 'Kraków', 'Wrocław', 'Poznań', 'Gdańsk', 'Łódź', 'Katowice', 'Lublin']
+STREETS = ['Marszałkowska', 'Długa', 'Polna', 'Leśna', 'Słoneczna', 'Krótka', 'Szkolna', 'Ogrodowa']
+DEVICES = {
+    'Apple': ['iPhone 12', 'iPhone 13', 'iPhone 14 Pro', 'iPhone 15', 'MacBook Air M1', 'iPad 9'],
+    'Samsung': ['Galaxy S21', 'Galaxy S23', 'Galaxy A54', 'Galaxy Tab S8', 'Galaxy Z Flip 5'],
+    'Xiaomi': ['Redmi Note 12', 'Mi 11', 'Poco X5'],
+    'Lenovo': ['ThinkPad T14', 'IdeaPad 5', 'Legion 5'],
+    'Dell': ['XPS 13', 'Latitude 5420', 'Inspiron 15'],
+    'Sony': ['PlayStation 5', 'Xperia 10 IV'],
+}
+PROBLEMS = [
+    'Cracked screen', 'Battery drains quickly', 'Does not charge', 'Water damage',
+    'No sound from speaker', 'Camera out of focus', 'Keyboard keys not working',
+    'Overheats and shuts down', 'Broken charging port', 'Boot loop after update',
+]
+NOTES = [
+    'Customer called asking for status.', 'Diagnosis finished, waiting for approval.',
+    'Part ordered from supplier.', 'Repair completed, device tested.',
+    'Customer approved the quote by phone.', 'Device cleaned and reassembled.',
+]
+PARTS = ['Display assembly', 'Battery', 'Charging port flex', 'Back cover', 'Speaker', 'Camera module',
+         'Keyboard', 'Thermal paste', 'SSD 512GB', 'Fan']
+TASK_TYPES = ['Diagnosis', 'Repair', 'Testing', 'Customer Contact', 'Parts Order']
+EMPLOYEE_ROLES = ['Manager', 'Technician', 'Technician', 'Technician', 'Customer Service']
+MANAGER_ROLE = 'Synthetic Manager'
+MANAGER_APPS = ['tasks', 'customers', 'inventory', 'service', 'core', 'documents']
+
+
+@dataclass
+class SyntheticOptions:
+    tenants: int = 1
+    customers: int = 1000  # per tenant
+    work_items_per_customer: float = 2.0
+    tasks_per_work_item: float = 2.0
+    notes_per_work_item: float = 3.0
+    shops: int = 3
+    employees: int = 10
+    inventory_items: int = 200
+    history_days: int = 730
+    batch_size: int = 2000
+    prefix: str = 'synthetic'
+    seed: int = 42
+
+
+@dataclass
+class TenantContext:
+    tenant: object
+    shop_locations: list = field(default_factory=list)
+    inventory_lists: list = field(default_factory=list)
+    registers: list = field(default_factory=list)
+    employees: list = field(default_factory=list)
+    task_types: list = field(default_factory=list)
+    inventory_items: list = field(default_factory=list)
+    statuses: list = field(default_factory=list)
+    resolved_status: str = None
+    stock: dict = field(default_factory=dict)
+    counters: dict = field(default_factory=lambda: {'RMA-': 0, 'T-': 0, 'PO-': 0})
+
+
+@contextmanager
+def historical_timestamps(*model_fields):
+    """Let bulk_create write explicit values into ``auto_now_add`` fields."""
+    fields = [model._meta.get_field(name) for model, name in model_fields]
+    previous = [f.auto_now_add for f in fields]
+    for f in fields:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, value in zip(fields, previous):
+            f.auto_now_add = value
+
+
+class SyntheticDataGenerator:
+    def __init__(self, options=None, log=None):
+        self.options = options or SyntheticOptions()
+        self.rng = random.Random(self.options.seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.counts = {}
+
+    # -- helpers -----------------------------------------------------------------
+
+    def _count(self, label, amount):
+        self.counts[label] = self.counts.get(label, 0) + amount
+
+    def _bulk(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.options.batch_size)
+        self._count(model._meta.label, len(created))
+        return created
+
+    def _amount(self, mean):
+        """Non-negative integer averaging ``mean`` (uniform over 0..2*mean)."""
+        return int(self.rng.random() * (2 * mean + 1))
+
+    def _moment(self, after=None):
+        start = after or self.now - timedelta(days=self.options.history_days)
+        span = max((self.now - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.random() * span)
+
+    def _address(self):
+        from core.models import Address
+
+        return Address(
+            street=self.rng.choice(STREETS),
+            building_number=str(self.rng.randint(1, 200)),
+            city=self.rng.choice(CITIES),
+            postal_code=f'{self.rng.randint(0, 99):02d}-{self.rng.randint(0, 999):03d}',
+        )
+
+    # -- entry point -------------------------------------------------------------
+
+    def run(self):
+        from core.models import Note
+        from inventory.models import InventoryTransaction
+        from service.models import CashTransaction
+        from tasks.models import Task, WorkItem
+        from tenants.models import Tenant
+
+        existing = Tenant.objects.filter(subdomain__startswith=f'{self.options.prefix}-').count()
+        devices = self.create_devices()
+
+        with historical_timestamps(
+            (WorkItem, 'created_date'), (Task, 'created_date'), (Note, 'created_at'),
+            (CashTransaction, 'created_at'), (InventoryTransaction, 'transaction_date'),
+        ):
+            for index in range(existing, existing + self.options.tenants):
+                context = self.create_tenant(index + 1)
+                done = 0
+                while done < self.options.customers:
+                    size = min(self.options.batch_size, self.options.customers - done)
+                    with transaction.atomic():
+                        self.create_customer_chunk(context, devices, done, size)
+                    done += size
+                    self.log(f'  {context.tenant.subdomain}: {done}/{self.options.customers} customers')
+                self.finish_tenant(context)
+        return self.counts
+
+    # -- reference data ------------------------------------------------------------
+
+    def create_devices(self):
+        from inventory.models import Device
+
+        wanted = [(manufacturer, model) for manufacturer, models in DEVICES.items() for model in models]
+        existing = {
+            (d.manufacturer, d.model): d
+            for d in Device.objects.filter(manufacturer__in=list(DEVICES))
+        }
+        missing = [Device(manufacturer=m, model=model) for m, model in wanted if (m, model) not in existing]
+        self._bulk(Device, missing)
+        return list(Device.objects.filter(manufacturer__in=list(DEVICES)))
+
+    @transaction.atomic
+    def create_tenant(self, number):
+        from core.models import Role, RolePermission, User, UserRole
+        from core.picklists import get_picklist
+        from inventory.models import InventoryItem, InventoryList
+        from service.models import CashRegister, Employee, Location, RepairShop
+        from tasks.models import TaskType
+        from tenants.models import Tenant
+
+        subdomain = f'{self.options.prefix}-{number}'
+        tenant = Tenant.objects.create(name=f'Synthetic Repairs {number}', subdomain=subdomain)
+        context = TenantContext(tenant=tenant)
+        self.log(f'Creating tenant {subdomain}')
+
+        for n in range(self.options.shops):
+            address = self._address()
+            address.save()
+            shop = RepairShop.objects.create(tenant=tenant, name=f'{address.city} {n + 1}', address=address)
+            location = Location.objects.create(tenant=tenant, name=shop.name, type='shop', shop=shop)
+            context.shop_locations.append(location)
+            context.inventory_lists.append(
+                InventoryList.objects.create(tenant=tenant, name=f'{shop.name} stock', location=location)
+            )
+            context.registers.append(CashRegister.objects.create(tenant=tenant, shop=shop, name='Main'))
+
+        password = make_password(None)
+        users = self._bulk(User, [
+            User(
+                email=f'{subdomain}-{n}@example.com', username=f'{subdomain}-{n}', password=password,
+                first_name=self.rng.choice(FIRST_NAMES), last_name=self.rng.choice(LAST_NAMES),
+                tenant=tenant,
+            )
+            for n in range(self.options.employees)
+        ])
+        context.employees = self._bulk(Employee, [
+            Employee(
+                tenant=tenant, user=user, role=EMPLOYEE_ROLES[n % len(EMPLOYEE_ROLES)],
+                location=context.shop_locations[n % len(context.shop_locations)],
+            )
+            for n, user in enumerate(users)
+        ])
+
+        role = Role.objects.create(tenant=tenant, name=MANAGER_ROLE, description='Generated by generate_synthetic_data')
+        permissions = Permission.objects.filter(content_type__app_label__in=MANAGER_APPS)
+        self._bulk(RolePermission, [RolePermission(role=role, permission=p) for p in permissions])
+        self._bulk(UserRole, [UserRole(user=user, role=role) for user in users])
+
+        context.task_types = self._bulk(TaskType, [TaskType(tenant=tenant, name=name) for name in TASK_TYPES])
+        context.inventory_items = self._bulk(InventoryItem, [
+            InventoryItem(
+                tenant=tenant, name=f'{self.rng.choice(PARTS)} #{n}', sku=f'SKU-{n:06d}',
+                type='PART',
+            )
+            for n in range(self.options.inventory_items)
+        ])
+
+        statuses = get_picklist(tenant, 'workitem_status')
+        context.statuses = statuses.values() or ['New', 'In Progress', 'Resolved']
+        context.resolved_status = statuses.value_for_name('resolved') or context.statuses[-1]
+        self._count('tenants.Tenant', 1)
+        return context
+
+    # -- transactional data ------------------------------------------------------------
+
+    def create_customer_chunk(self, context, devices, offset, size):
+        from core.models import Note
+        from customers.models import Asset, Customer
+        from inventory.models import InventoryTransaction
+        from service.models import CashTransaction
+        from tasks.models import Task, WorkItem
+
+        rng = self.rng
+        tenant = context.tenant
+        subdomain = tenant.subdomain
+
+        customers = []
+        for n in range(offset, offset + size):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            phone = f'{500000000 + n}'
+            customers.append(Customer(
+                tenant=tenant, first_name=first, last_name=last, phone_number=phone,
+                prefix='+48', full_phone_number=f'+48{phone}',
+                email=f'{first.lower()}.{last.lower()}.{n}@{subdomain}.example.com',
+            ))
+        customers = self._bulk(Customer, customers)
+
+        assets = self._bulk(Asset, [
+            Asset(customer=customer, device=rng.choice(devices), serial_number=f'SN{rng.getrandbits(40):012X}')
+            for customer in customers
+        ])
+
+        work_items = []
+        for customer, asset in zip(customers, assets):
+            for _ in range(self._amount(self.options.work_items_per_customer)):
+                context.counters['RMA-'] += 1
+                created = self._moment()
+                status = rng.choice(context.statuses)
+                closed = status == context.resolved_status
+                price = Decimal(rng.randint(50, 2500))
+                employee = rng.choice(context.employees)
+                work_items.append(WorkItem(
+                    tenant=tenant, reference_id=f"RMA-{context.counters['RMA-']}",
+                    description=rng.choice(PROBLEMS), status=status, customer=customer,
+                    customer_asset=asset, created_date=created,
+                    closed_date=self._moment(after=created) if closed else None,
+                    due_date=(created + timedelta(days=rng.randint(3, 21))).date(),
+                    owner=employee, technician=rng.choice(context.employees + [None]),
+                    dropoff_point=rng.choice(context.shop_locations),
+                    estimated_price=price, final_price=price if closed else None,
+                    priority=rng.choice(['Standard', 'Standard', 'Express']),
+                ))
+        work_items = self._bulk(WorkItem, work_items)
+
+        tasks, notes, payments, movements = [], [], [], []
+        work_item_type = ContentType.objects.get_for_model(WorkItem)
+        for work_item in work_items:
+            for _ in range(self._amount(self.options.tasks_per_work_item)):
+                context.counters['T-'] += 1
+                done = work_item.closed_date is not None or rng.random() < 0.5
+                created = self._moment(after=work_item.created_date)
+                tasks.append(Task(
+                    tenant=tenant, reference_id=f"T-{context.counters['T-']}", work_item=work_item,
+                    summary=rng.choice(TASK_TYPES), task_type=rng.choice(context.task_types),
+                    status='Done' if done else 'To do', assigned_employee=rng.choice(context.employees),
+                    created_date=created,
+                    completed_date=created + timedelta(hours=rng.randint(1, 72)) if done else None,
+                ))
+            for _ in range(self._amount(self.options.notes_per_work_item)):
+                notes.append(Note(
+                    content=rng.choice(NOTES), author=rng.choice(context.employees).user,
+                    content_type=work_item_type, object_id=work_item.pk, tenant=tenant, work_item=work_item,
+                    created_at=self._moment(after=work_item.created_date),
+                ))
+            if work_item.final_price:
+                payments.append(CashTransaction(
+                    tenant=tenant, register=rng.choice(context.registers), transaction_type='deposit',
+                    amount=work_item.final_price, work_item=work_item,
+                    description=f'Payment for {work_item.reference_id}',
+                    performed_by=work_item.owner, created_at=work_item.closed_date,
+                ))
+            if rng.random() < 0.3:
+                item = rng.choice(context.inventory_items)
+                inventory_list = rng.choice(context.inventory_lists)
+                key = (item.pk, inventory_list.pk)
+                context.stock[key] = context.stock.get(key, 0) - 1
+                movements.append(InventoryTransaction(
+                    tenant=tenant, inventory_item=item, inventory_list=inventory_list,
+                    transaction_type=InventoryTransaction.USAGE, quantity=-1, work_item=work_item,
+                    unit_cost=Decimal(rng.randint(5, 400)),
+                    transaction_date=self._moment(after=work_item.created_date),
+                ))
+        self._bulk(Task, tasks)
+        self._bulk(Note, notes)
+        self._bulk(CashTransaction, payments)
+        self._bulk(InventoryTransaction, movements)
+
+    @transaction.atomic
+    def finish_tenant(self, context):
+        """Restock every list, write balances, move reference counters forward, rebuild derived totals."""
+        from calls import caller_id
+        from core import search
+        from core.models import ReferenceSequence
+        from inventory.models import InventoryBalance, InventoryTransaction
+        from service.models import CashRegister, summed_transactions_total
+        from tasks import dashboard
+
+        tenant = context.tenant
+        purchases, balances = [], []
+        for item in context.inventory_items:
+            for inventory_list in context.inventory_lists:
+                key = (item.pk, inventory_list.pk)
+                used = -context.stock.get(key, 0)
+                restock = used + self.rng.randint(0, 20)
+                cost = Decimal(self.rng.randint(5, 400))
+                if restock:
+                    purchases.append(InventoryTransaction(
+                        tenant=tenant, inventory_item=item, inventory_list=inventory_list,
+                        transaction_type=InventoryTransaction.PURCHASE, quantity=restock, unit_cost=cost,
+                        transaction_date=self._moment(),
+                    ))
+                balances.append(InventoryBalance(
+                    tenant=tenant, inventory_item=item, inventory_list=inventory_list,
+                    current_quantity=restock - used, average_cost=cost,
+                    rack=self.rng.choice('ABCDEF'), shelf_slot=str(self.rng.randint(1, 12)),
+                ))
+        self._bulk(InventoryTransaction, purchases)
+        self._bulk(InventoryBalance, balances)
+
+        for prefix, value in context.counters.items():
+            ReferenceSequence.objects.update_or_create(
+                tenant=tenant, prefix=prefix, defaults={'last_value': value}
+            )
+
+        # Bulk inserts bypass the signals maintaining the dashboard counters, register totals,
+        # search index and caller-ID directory
+        dashboard.rebuild(tenant)
+        CashRegister.objects.filter(tenant=tenant).update(transactions_total=summed_transactions_total())
+        search.rebuild(tenant)
+        caller_id.invalidate(tenant.pk)
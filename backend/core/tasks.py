@@ -0,0 +1,30 @@
+"""
+Celery tasks for the core app.
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def flush_usage_counters():
+    """
+    Periodic task writing buffered API key usage and user activity to the database.
+    Scheduled with Celery Beat (see CELERY_BEAT_SCHEDULE).
+    """
+    from core.usage import flush_usage_counters as flush
+
+    flushed = flush()
+    if any(flushed.values()):
+        logger.info(f"Flushed usage counters: {flushed['apikey']} API keys, {flushed['user']} users")
+    return flushed
+
+
+@shared_task(ignore_result=True)
+def index_search_dependents(entity_type, lookup, pk):
+    """Re-index the search documents reading from a changed row (see ``core.search.register_dependency``)."""
+    from core import search
+
+    return search.index_dependents(entity_type, lookup, pk)
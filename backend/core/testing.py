@@ -0,0 +1,30 @@
+"""
+Test helpers shared across apps.
+"""
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for ``TestCase`` asserting an upper bound on the queries a block runs.
+
+    Unlike ``assertNumQueries`` the budget is a ceiling, so harmless query removals
+    don't break the test while N+1 regressions still fail it::
+
+        with self.assertQueryBudget(8):
+            self.client.get("/api/tasks/dashboard/")
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{index}. {query["sql"]}' for index, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} queries executed, budget is {budget}:\n{queries}')
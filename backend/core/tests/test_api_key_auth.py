@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.authentication import APIKeyAuthentication, verified_key_owners, verified_keys
+from core.models import APIKey, Role
+from tenants.models import Tenant
+
+
+class APIKeyVerificationCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        verified_keys.clear_local()
+        verified_key_owners.clear_local()
+        self.tenant = Tenant.objects.create(name="Keys", subdomain="keys")
+        self.role = Role.objects.create(tenant=self.tenant, name="Integration")
+        self.plaintext, prefix, key_hash = APIKey.generate_key()
+        self.api_key = APIKey.objects.create(
+            tenant=self.tenant, role=self.role, name="n8n", prefix=prefix, key_hash=key_hash
+        )
+        self.auth = APIKeyAuthentication()
+
+    def authenticate(self, key=None):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {key or self.plaintext}")
+        return self.auth.authenticate(request)
+
+    def test_hash_checked_only_on_first_request(self):
+        with mock.patch.object(APIKey, "check_key", autospec=True, side_effect=APIKey.check_key) as check:
+            for _ in range(3):
+                user, api_key = self.authenticate()
+                self.assertEqual(api_key.pk, self.api_key.pk)
+        self.assertEqual(check.call_count, 1)
+
+    def test_wrong_key_is_not_cached(self):
+        wrong = self.plaintext[:-1] + ("0" if self.plaintext[-1] != "0" else "1")
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(wrong)
+        self.assertEqual(self.authenticate()[1].pk, self.api_key.pk)
+
+    def test_deactivation_applies_immediately(self):
+        self.authenticate()
+        self.api_key.is_active = False
+        self.api_key.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_queryset_revoke_applies_immediately(self):
+        self.authenticate()
+        APIKey.objects.filter(pk=self.api_key.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_expiry_applies_immediately(self):
+        self.authenticate()
+        self.api_key.expires_at = timezone.now() - timedelta(minutes=1)
+        self.api_key.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deletion_applies_immediately(self):
+        self.authenticate()
+        self.api_key.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_rotated_hash_is_not_trusted(self):
+        self.authenticate()
+        _, _, new_hash = APIKey.generate_key()
+        APIKey.objects.filter(pk=self.api_key.pk).update(key_hash=new_hash)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
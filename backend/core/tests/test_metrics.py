@@ -0,0 +1,102 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import User
+from core.testing import QueryBudgetMixin
+from customers.models import Customer
+from integrations.tasks import send_integration_webhook
+from service.models import Employee, Location
+from tasks.models import WorkItem
+from tenants.models import Tenant
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        metrics.registry.drain()
+        self.tenant = Tenant.objects.create(name="Metrics", subdomain="metrics")
+        self.user = User.objects.create_superuser(email="m@test.com", password="x", username="m")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.client.credentials(HTTP_X_TENANT="metrics")
+
+    def series(self, histogram, labels):
+        return metrics.registry.collect()[histogram.name].get(labels)
+
+    def test_requests_are_recorded_per_url_name(self):
+        self.client.get("/api/tasks/work-items/")
+        self.client.get("/api/tasks/work-items/")
+
+        duration = self.series(metrics.REQUEST_DURATION, ("tasks:workitem-list", "GET", "2xx"))
+        self.assertEqual(duration[-1], 2)
+        queries = self.series(metrics.REQUEST_QUERIES, ("tasks:workitem-list", "GET"))
+        self.assertGreater(queries[-2], 0)
+        self.assertEqual(self.series(metrics.RESPONSE_SIZE, ("tasks:workitem-list", "GET"))[-1], 2)
+
+    def test_task_durations(self):
+        metrics.task_started("abc")
+        metrics.task_finished("abc", send_integration_webhook.name, "SUCCESS")
+        metrics.task_finished("never-started", send_integration_webhook.name, "SUCCESS")
+
+        series = self.series(metrics.TASK_DURATION, (send_integration_webhook.name, "SUCCESS"))
+        self.assertEqual(series[-1], 1)
+
+    def test_prometheus_endpoint(self):
+        self.client.get("/api/tasks/work-items/")
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn("# TYPE repairshop_http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'repairshop_http_request_duration_seconds_bucket{view="tasks:workitem-list",method="GET",status="2xx",le="+Inf"} 1',
+            body,
+        )
+        self.assertIn('repairshop_http_request_db_queries_count{view="tasks:workitem-list",method="GET"} 1', body)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_endpoint_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        resp = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(resp.status_code, 200)
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Query counts of hot endpoints must not grow with the number of rows."""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Budget", subdomain="budget")
+        self.user = User.objects.create_superuser(email="b@test.com", password="x", username="b")
+        self.location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.employee = Employee.objects.create(
+            tenant=self.tenant, user=self.user, role="technician", location=self.location
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.client.credentials(HTTP_X_TENANT="budget")
+
+    def add_work_items(self, count):
+        for n in range(count):
+            customer = Customer.objects.create(
+                tenant=self.tenant, first_name="Anna", last_name=f"Nowak{n}", phone_number=f"5001002{n:02d}"
+            )
+            WorkItem.objects.create(
+                tenant=self.tenant, customer=customer, description="Cracked screen",
+                owner=self.employee, technician=self.employee, dropoff_point=self.location,
+            )
+
+    def assertEndpointBudget(self, budget, url, params=None):
+        self.add_work_items(20)
+        # Warm the tenant/permission/picklist caches so only the view's own queries count
+        self.client.get(url, params)
+        with self.assertQueryBudget(budget):
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+
+    def test_dashboard(self):
+        self.assertEndpointBudget(7, "/api/tasks/dashboard/")
+
+    def test_work_item_list(self):
+        self.assertEndpointBudget(1, "/api/tasks/work-items/")
+
+    def test_global_search(self):
+        # One ranked statement over the search index, then the customers (and their
+        # recent work items) and the work items it found
+        self.assertEndpointBudget(4, "/api/core/search/", {"q": "Nowak"})
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import User
+from service.models import Employee, Location
+from tasks.models import Task
+from tenants.models import Tenant
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Pages", subdomain="pages")
+        user = User.objects.create_superuser(email="p@test.com", password="x", username="p")
+        location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        employee = Employee.objects.create(tenant=self.tenant, user=user, role="technician", location=location)
+
+        now = timezone.now()
+        self.tasks = [
+            Task.objects.create(tenant=self.tenant, assigned_employee=employee, summary=f"Task {name}")
+            for name in "abcdefg"
+        ]
+        # The last four tasks share a timestamp, so paging has to break ties on id
+        for index, task in enumerate(self.tasks):
+            age = 10 - min(index, 3)
+            Task.objects.filter(pk=task.pk).update(created_date=now - timedelta(minutes=age))
+        self.expected = [
+            task.pk for task in sorted(
+                Task.objects.filter(tenant=self.tenant), key=lambda t: (t.created_date, t.pk), reverse=True
+            )
+        ]
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+        self.client.credentials(HTTP_X_TENANT="pages")
+
+    def collect(self, url):
+        ids, pages = [], 0
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            body = resp.json()
+            ids.extend(row["id"] for row in body["results"])
+            url = body["next"]
+            pages += 1
+        return ids, pages
+
+    def test_plain_list_by_default(self):
+        resp = self.client.get("/api/tasks/tasks/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsInstance(resp.json(), list)
+        self.assertEqual(len(resp.json()), 7)
+
+    def test_pages_follow_created_date_and_id(self):
+        ids, pages = self.collect("/api/tasks/tasks/?page_size=2")
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 4)
+
+    def test_rows_created_while_paging_do_not_shift_pages(self):
+        first = self.client.get("/api/tasks/tasks/?page_size=3").json()
+        Task.objects.create(tenant=self.tenant, assigned_employee=self.tasks[0].assigned_employee)
+        rest, _ = self.collect(first["next"])
+        self.assertEqual([row["id"] for row in first["results"]] + rest, self.expected)
+
+    def test_filters_and_search_are_kept_in_next_link(self):
+        ids, _ = self.collect("/api/tasks/tasks/?page_size=1&search=Task+b&include=deviceName")
+        self.assertEqual(ids, [self.tasks[1].pk])
+
+        first = self.client.get("/api/tasks/tasks/?page_size=1&search=Task").json()
+        self.assertIn("search=Task", first["next"])
+
+    @override_settings(CURSOR_PAGINATION_ENDPOINTS=["tasks"])
+    def test_endpoint_switch(self):
+        body = self.client.get("/api/tasks/tasks/").json()
+        self.assertEqual(len(body["results"]), 7)
+        self.assertIsNone(body["next"])
+        # Endpoints that are not switched on still return plain lists
+        self.assertIsInstance(self.client.get("/api/tasks/work-items/").json(), list)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/tasks/tasks/?cursor=bogus").status_code, 404)
@@ -0,0 +1,84 @@
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import APIKey, Role, RolePermission, User, UserRole
+from core.permission_cache import LOCAL_ONLY_TTL, permission_sets, permission_versions
+from tenants.models import Tenant
+
+
+class PermissionCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        permission_versions.clear_local()
+        permission_sets.clear_local()
+        self.tenant = Tenant.objects.create(name="Perms", subdomain="perms")
+        self.other_tenant = Tenant.objects.create(name="Other", subdomain="other")
+        self.role = Role.objects.create(tenant=self.tenant, name="Technician")
+        self.user = User.objects.create_user(email="tech@test.com", password="x", username="tech")
+        UserRole.objects.create(user=self.user, role=self.role)
+        self.view_workitem = Permission.objects.get(
+            content_type__app_label="tasks", codename="view_workitem"
+        )
+        RolePermission.objects.create(role=self.role, permission=self.view_workitem)
+
+    def fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_both_codename_formats(self):
+        user = self.fresh_user()
+        self.assertTrue(user.has_permission("view_workitem", self.tenant))
+        self.assertTrue(user.has_permission("tasks.view_workitem", self.tenant))
+        self.assertFalse(user.has_permission("customers.view_workitem", self.tenant))
+        self.assertFalse(user.has_permission("change_workitem", self.tenant))
+        self.assertFalse(user.has_permission("view_workitem", self.other_tenant))
+
+    def test_repeated_checks_use_single_query(self):
+        user = self.fresh_user()
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(5):
+                user.has_permission("tasks.view_workitem", self.tenant)
+                user.has_permission("change_workitem", self.tenant)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        # A new request (new user instance) is served from the shared cache.
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(self.fresh_user().has_permission("view_workitem", self.tenant))
+        self.assertEqual(len(ctx.captured_queries), 1)  # only the user fetch
+
+    def test_grant_and_revoke_are_visible_immediately(self):
+        user = self.fresh_user()
+        self.assertFalse(user.has_permission("change_workitem", self.tenant))
+
+        change = Permission.objects.get(content_type__app_label="tasks", codename="change_workitem")
+        grant = RolePermission.objects.create(role=self.role, permission=change)
+        self.assertTrue(user.has_permission("change_workitem", self.tenant))
+
+        grant.delete()
+        self.assertFalse(user.has_permission("change_workitem", self.tenant))
+
+        UserRole.objects.filter(user=self.user).delete()
+        self.assertFalse(user.has_permission("view_workitem", self.tenant))
+
+    def test_api_key_uses_role_permission_set(self):
+        _, prefix, key_hash = APIKey.generate_key()
+        created = APIKey.objects.create(
+            tenant=self.tenant, name="n8n", role=self.role, prefix=prefix, key_hash=key_hash
+        )
+        api_key = APIKey.objects.get(pk=created.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(api_key.has_permission("tasks.view_workitem"))
+            self.assertTrue(api_key.has_permission("view_workitem", self.tenant))
+            self.assertFalse(api_key.has_permission("add_workitem"))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertFalse(api_key.has_permission("view_workitem", self.other_tenant))
+
+    def test_sets_expire_quickly_without_a_shared_cache(self):
+        # Another worker's revoke can't reach a process-local cache, only expiry can
+        self.assertEqual(permission_sets._ttls(), (LOCAL_ONLY_TTL, LOCAL_ONLY_TTL))
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                             "LOCATION": "redis://localhost:6379/0"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(permission_sets._ttls(), (60, 60 * 60))
@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from core.cache import LOCAL_ONLY_TTL
+from core.models import PicklistValue
+from core.picklists import get_picklist, invalidate_picklists, picklist_versions, registries
+from core.utils import get_model_schema
+from tasks.models import WorkItem
+from tasks.serializers import validate_picklist_value
+from tenants.models import Tenant
+
+
+class PicklistRegistryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        picklist_versions.clear_local()
+        registries.clear_local()
+        # Default picklists are created by tasks.signals for every new tenant
+        self.tenant = Tenant.objects.create(name="Picklists", subdomain="picklists")
+
+    def test_ordered_choices_and_metadata(self):
+        statuses = get_picklist(self.tenant, "workitem_status")
+        self.assertEqual(statuses.values(), ["New", "In Progress", "Resolved"])
+        self.assertIn("Resolved", statuses)
+        self.assertNotIn("Bogus", statuses)
+        self.assertEqual(statuses.get("New").color, "gray")
+        self.assertEqual(statuses.value_for_name("resolved"), "Resolved")
+        self.assertEqual(len(get_picklist(self.tenant, "unknown")), 0)
+
+    def test_validation_uses_cached_registry(self):
+        validate_picklist_value(self.tenant, "task_status", "Done")
+        with CaptureQueriesContext(connection) as ctx:
+            validate_picklist_value(self.tenant, "task_status", "Done")
+            validate_picklist_value(self.tenant, "currency", "PLN")
+            with self.assertRaisesMessage(serializers.ValidationError, "Available options: PLN, USD, EUR, GBP"):
+                validate_picklist_value(self.tenant, "currency", "JPY")
+            get_model_schema(WorkItem, self.tenant)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_edits_invalidate_registry(self):
+        self.assertNotIn("On hold", get_picklist(self.tenant, "workitem_status"))
+        value = PicklistValue.objects.create(
+            tenant=self.tenant, category="workitem_status", name="On hold", value="On hold", sort_order=1
+        )
+        statuses = get_picklist(self.tenant, "workitem_status")
+        self.assertEqual(statuses.values(), ["New", "In Progress", "On hold", "Resolved"])
+
+        value.is_active = False
+        value.save()
+        self.assertNotIn("On hold", get_picklist(self.tenant, "workitem_status"))
+
+    def test_bulk_update_needs_explicit_invalidation(self):
+        get_picklist(self.tenant, "currency")
+        PicklistValue.objects.filter(tenant=self.tenant, value="GBP").update(is_active=False)
+        invalidate_picklists(self.tenant.pk)
+        self.assertNotIn("GBP", get_picklist(self.tenant, "currency"))
+
+    def test_registries_expire_quickly_without_a_shared_cache(self):
+        # Other processes never see the version bumps of a process-local cache
+        self.assertEqual(registries._ttls(), (LOCAL_ONLY_TTL, LOCAL_ONLY_TTL))
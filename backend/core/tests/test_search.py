@@ -0,0 +1,185 @@
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import search
+from core.models import SearchDocument, User
+from core.tasks import index_search_dependents
+from customers.models import Asset, Customer, Lead
+from inventory.models import Device, InventoryItem
+from service.models import Employee, Location
+from tasks.models import Task, WorkItem
+from tenants.models import Tenant
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Search", subdomain="search")
+        self.user = User.objects.create_superuser(email="s@test.com", password="x", username="s")
+        self.location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.employee = Employee.objects.create(
+            tenant=self.tenant, user=self.user, role="technician", location=self.location
+        )
+        self.customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Jan", last_name="Kowalski", email="Jan.K@example.com",
+            prefix="+48", phone_number="500100200",
+        )
+        self.device = Device.objects.create(manufacturer="Apple", model="iPhone 12")
+        self.asset = Asset.objects.create(customer=self.customer, device=self.device, serial_number="SN-ABC123")
+        self.work_item = WorkItem.objects.create(
+            tenant=self.tenant, customer=self.customer, customer_asset=self.asset, owner=self.employee,
+            dropoff_point=self.location, description="Cracked screen", accessories="Charger",
+        )
+
+    def document(self, entity_type, pk):
+        return SearchDocument.objects.get(entity_type=entity_type, object_id=pk)
+
+    def found(self, text, entity_type):
+        return list(search.search(self.tenant, text, [entity_type]).values_list("object_id", flat=True))
+
+    def test_documents_follow_changes(self):
+        customer = self.document("customer", self.customer.pk)
+        self.assertEqual((customer.title, customer.tenant_id), ("jan kowalski", self.tenant.pk))
+        self.assertIn("48500100200", customer.keywords)
+        work_item = self.document("work_item", self.work_item.pk)
+        self.assertEqual(work_item.title, self.work_item.reference_id.lower())
+        self.assertIn("sn-abc123", work_item.keywords)
+        self.assertEqual(work_item.body, "cracked screen charger")
+
+        # Renaming the customer, changing the asset or the device rewrites the work item document
+        self.customer.last_name = "Nowak"
+        self.customer.save()
+        self.asset.serial_number = "SN-XYZ"
+        self.asset.save()
+        self.device.model = "iPhone 13"
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch("core.tasks.index_search_dependents.delay", side_effect=index_search_dependents):
+            self.device.save()
+        keywords = self.document("work_item", self.work_item.pk).keywords
+        self.assertIn("nowak", keywords)
+        self.assertIn("sn-xyz", keywords)
+        self.assertIn("iphone 13", keywords)
+        self.assertIn("iphone 13", self.document("asset", self.asset.pk).keywords)
+
+        self.work_item.delete()
+        self.assertFalse(SearchDocument.objects.filter(entity_type="work_item").exists())
+
+    def test_unrelated_changes_do_not_reindex(self):
+        self.work_item.status = "In Progress"
+        with CaptureQueriesContext(connection) as queries:
+            self.work_item.save(update_fields=["status"])
+        self.assertFalse([q for q in queries if "core_searchdocument" in q["sql"]])
+
+    def test_device_changes_are_reindexed_in_the_background(self):
+        # Devices are shared by every tenant: nothing is re-indexed inside the saving request
+        self.device.category = None
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, \
+                CaptureQueriesContext(connection) as queries:
+            self.device.save()
+        self.assertEqual(callbacks, [])
+        self.assertFalse([q for q in queries if "core_searchdocument" in q["sql"]])
+
+        self.device.manufacturer = "Samsung"
+        with mock.patch("core.tasks.index_search_dependents.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                self.device.save()
+            self.assertEqual(self.document("work_item", self.work_item.pk).keywords.count("samsung"), 0)
+            for callback in callbacks:
+                callback()
+        delay.assert_any_call("work_item", "customer_asset__device", self.device.pk)
+        delay.assert_any_call("asset", "device", self.device.pk)
+
+    def test_matching(self):
+        self.assertEqual(self.found("kowal", "customer"), [self.customer.pk])
+        self.assertEqual(self.found("jan.k@example", "customer"), [self.customer.pk])
+        # Phone numbers match on their digits, however they are typed
+        for typed in ("500 100 200", "+48 500-100-200", "100 200"):
+            self.assertEqual(self.found(typed, "customer"), [self.customer.pk], typed)
+        self.assertEqual(self.found("abc123", "work_item"), [self.work_item.pk])
+        self.assertEqual(self.found(self.work_item.reference_id, "work_item"), [self.work_item.pk])
+        self.assertEqual(self.found("Cracked", "work_item"), [self.work_item.pk])
+        self.assertEqual(self.found("nowak", "customer"), [])
+
+        other = Tenant.objects.create(name="Other", subdomain="other")
+        self.assertEqual(list(search.search(other, "kowal")), [])
+
+    def test_rebuild(self):
+        # Rows written behind the signals' back are picked up by the command
+        Customer.objects.filter(pk=self.customer.pk).update(first_name="Janina")
+        SearchDocument.objects.filter(entity_type="work_item").delete()
+        SearchDocument.objects.create(tenant=self.tenant, entity_type="customer", object_id=999999)
+
+        out = StringIO()
+        call_command("rebuild_search_index", "--tenant=search", stdout=out)
+        self.assertIn("search: 1 customer, 0 lead, 1 asset, 1 work_item, 0 task, 0 inventory_item", out.getvalue())
+        self.assertEqual(self.document("customer", self.customer.pk).title, "janina kowalski")
+        self.assertTrue(SearchDocument.objects.filter(entity_type="work_item").exists())
+        self.assertFalse(SearchDocument.objects.filter(object_id=999999).exists())
+
+    def test_global_search(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.credentials(HTTP_X_TENANT="search")
+        data = client.get("/api/core/search/", {"q": "500 100 200"}).json()
+
+        self.assertEqual([c["id"] for c in data["customers"]], [self.customer.pk])
+        self.assertEqual(data["customers"][0]["active_work_item_count"], 1)
+        self.assertEqual([w["id"] for w in data["work_items"]], [self.work_item.pk])
+        self.assertEqual(data["work_items"][0]["device_name"], "Apple iPhone 12")
+        self.assertEqual(data["total_count"], 2)
+
+    def test_global_search_across_entity_types(self):
+        lead = Lead.objects.create(tenant=self.tenant, first_name="Ewa", last_name="Kowalska", phone_number="600700800")
+        task = Task.objects.create(
+            tenant=self.tenant, work_item=self.work_item, assigned_employee=self.employee, summary="Call Kowalski back"
+        )
+        item = InventoryItem.objects.create(tenant=self.tenant, name="Kowalski display", sku="DSP-1")
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.credentials(HTTP_X_TENANT="search")
+
+        with CaptureQueriesContext(connection) as queries:
+            data = client.get("/api/core/search/", {"q": "kowal"}).json()
+        self.assertEqual([row["id"] for row in data["leads"]], [lead.pk])
+        self.assertEqual([row["id"] for row in data["tasks"]], [task.pk])
+        self.assertEqual(data["tasks"][0]["work_item"]["reference_id"], self.work_item.reference_id)
+        self.assertEqual([row["id"] for row in data["assets"]], [self.asset.pk])
+        self.assertEqual(data["assets"][0]["serial_number"], "SN-ABC123")
+        self.assertEqual([row["id"] for row in data["inventory_items"]], [item.pk])
+        self.assertEqual(data["facets"], {
+            "customers": 1, "leads": 1, "assets": 1, "work_items": 1, "tasks": 1, "inventory_items": 1,
+        })
+        self.assertEqual(data["total_count"], 6)
+        # Matches and facets of every entity type come from one statement
+        self.assertEqual(len([q for q in queries if "core_searchdocument" in q["sql"]]), 1)
+
+        data = client.get("/api/core/search/", {"q": "kowal", "entity_types": "leads,tasks"}).json()
+        self.assertEqual((len(data["leads"]), len(data["tasks"]), data["customers"]), (1, 1, []))
+        self.assertEqual(data["facets"]["customers"], 0)
+
+    def test_facets_count_beyond_the_limit(self):
+        for n in range(7):
+            Customer.objects.create(
+                tenant=self.tenant, first_name="Adam", last_name=f"Kowalczyk{n}", phone_number=f"70000000{n}"
+            )
+        found = search.find(self.tenant, "kowal", self.user, ["customer"], limit=5)
+        ids, matches = found["customer"]
+        self.assertEqual((len(ids), matches), (5, 8))
+
+    def test_rows_the_user_may_not_see_are_not_found(self):
+        Task.objects.create(tenant=self.tenant, work_item=self.work_item, assigned_employee=self.employee,
+                            summary="Call Kowalski back")
+        clerk = User.objects.create_user(email="c@test.com", password="x", username="c")
+        found = search.find(self.tenant, "kowal", clerk)
+        self.assertEqual(sorted(found), ["asset", "customer"])
+
+    @skipUnless(connection.vendor == "postgresql", "needs pg_trgm and tsvector")
+    def test_prefix_and_fuzzy_matching(self):
+        self.assertEqual(self.found("jan kow", "customer"), [self.customer.pk])
+        self.assertEqual(self.found("kowalsky", "customer"), [self.customer.pk])
+        self.assertIsNotNone(self.document("customer", self.customer.pk).vector)
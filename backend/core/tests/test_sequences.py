@@ -0,0 +1,109 @@
+import threading
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+
+from core.models import ReferenceSequence, User
+from core.sequences import next_reference
+from inventory.models import PurchaseOrder
+from service.models import Employee, Location
+from tasks.models import Task
+from tenants.models import Tenant
+
+
+def make_employee(tenant, email):
+    user = User.objects.create_user(email=email, password="x", username=email, tenant=tenant)
+    location = Location.objects.create(tenant=tenant, name="Front desk")
+    return Employee.objects.create(tenant=tenant, user=user, role="technician", location=location)
+
+
+class ReferenceSequenceTest(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Seq", subdomain="seq")
+        self.other = Tenant.objects.create(name="Other", subdomain="seq-other")
+        self.employee = make_employee(self.tenant, "seq@test.com")
+
+    def test_numbers_are_sequential_per_tenant_and_prefix(self):
+        self.assertEqual(next_reference(self.tenant.pk, "T-"), "T-1")
+        self.assertEqual(next_reference(self.tenant.pk, "T-"), "T-2")
+        self.assertEqual(next_reference(self.other.pk, "T-"), "T-1")
+        self.assertEqual(next_reference(self.tenant.pk, "PO-"), "PO-1")
+
+    def test_counter_is_seeded_from_existing_rows(self):
+        Task.objects.create(tenant=self.tenant, assigned_employee=self.employee, reference_id="T-41")
+        Task.objects.create(tenant=self.tenant, assigned_employee=self.employee, reference_id="T-legacy")
+        task = Task.objects.create(tenant=self.tenant, assigned_employee=self.employee)
+        self.assertEqual(task.reference_id, "T-42")
+
+    def test_purchase_order_numbers(self):
+        first = PurchaseOrder.objects.create(tenant=self.tenant)
+        manual = PurchaseOrder.objects.create(tenant=self.tenant, order_number="SUP-7781")
+        second = PurchaseOrder.objects.create(tenant=self.tenant)
+        other = PurchaseOrder.objects.create(tenant=self.other)
+        self.assertEqual((first.order_number, second.order_number), ("PO-1", "PO-2"))
+        self.assertEqual(manual.order_number, "SUP-7781")
+        self.assertEqual(other.order_number, "PO-1")
+
+    def test_manual_purchase_order_numbers_move_the_counter_past_them(self):
+        PurchaseOrder.objects.create(tenant=self.tenant, order_number="PO-3")
+        self.assertEqual(PurchaseOrder.objects.create(tenant=self.tenant).order_number, "PO-4")
+        PurchaseOrder.objects.create(tenant=self.tenant, order_number="PO-7")
+        # Numbers behind the counter leave it alone
+        PurchaseOrder.objects.create(tenant=self.tenant, order_number="PO-2")
+        self.assertEqual(PurchaseOrder.objects.create(tenant=self.tenant).order_number, "PO-8")
+
+    def test_seed_command_only_moves_counters_forward(self):
+        Task.objects.create(tenant=self.tenant, assigned_employee=self.employee, reference_id="T-10")
+        ReferenceSequence.objects.create(tenant=self.tenant, prefix="RMA-", last_value=5)
+
+        out = StringIO()
+        call_command("seed_reference_sequences", "--tenant=seq", stdout=out)
+
+        counters = dict(
+            ReferenceSequence.objects.filter(tenant=self.tenant).values_list("prefix", "last_value")
+        )
+        self.assertEqual(counters, {"T-": 10, "RMA-": 5, "PO-": 0})
+
+        ReferenceSequence.objects.filter(tenant=self.tenant, prefix="T-").update(last_value=50)
+        call_command("seed_reference_sequences", "--tenant=seq", stdout=StringIO())
+        self.assertEqual(
+            ReferenceSequence.objects.get(tenant=self.tenant, prefix="T-").last_value, 50
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "needs row-level locking across connections")
+class ReferenceSequenceConcurrencyTest(TransactionTestCase):
+    """Stress test: parallel creators must never collide on reference numbers."""
+
+    THREADS = 8
+    PER_THREAD = 25
+
+    def test_parallel_task_creation(self):
+        tenant = Tenant.objects.create(name="Stress", subdomain="stress")
+        employee = make_employee(tenant, "stress@test.com")
+        errors = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(self.PER_THREAD):
+                    Task.objects.create(tenant=tenant, assigned_employee=employee)
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        total = self.THREADS * self.PER_THREAD
+        references = set(Task.objects.filter(tenant=tenant).values_list("reference_id", flat=True))
+        self.assertEqual(references, {f"T-{n}" for n in range(1, total + 1)})
@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.cache import LOCAL_ONLY_TTL
+from core.models import Setting, User
+from core.settings_snapshot import setting_versions, snapshots
+from tenants.models import Tenant
+
+
+class SettingSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        setting_versions.clear_local()
+        snapshots.clear_local()
+        self.tenant = Tenant.objects.create(name="Settings", subdomain="settings")
+        self.other = Tenant.objects.create(name="Other", subdomain="other-settings")
+        Setting.objects.create(key="tax_rate", value_type="numeric", value_numeric=Decimal("23"))
+        Setting.objects.create(key="company_name", value_type="string", value_string="Global Co")
+        Setting.objects.create(
+            tenant=self.tenant, key="company_name", value_type="string", value_string="Tenant Co"
+        )
+
+    def test_override_and_fallback(self):
+        self.assertEqual(Setting.get_value("company_name", self.tenant), "Tenant Co")
+        self.assertEqual(Setting.get_value("company_name", self.other), "Global Co")
+        self.assertEqual(Setting.get_value("company_name"), "Global Co")
+        self.assertEqual(Setting.get_value("tax_rate", self.tenant), Decimal("23"))
+        self.assertEqual(Setting.get_value("missing", self.tenant, default=5), 5)
+
+        merged = Setting.get_all_merged(self.tenant)
+        self.assertTrue(merged["company_name"]["is_override"])
+        self.assertFalse(merged["tax_rate"]["is_override"])
+
+    def test_lookups_after_first_are_free(self):
+        Setting.get_value("company_name", self.tenant)
+        with CaptureQueriesContext(connection) as ctx:
+            for key in ("company_name", "tax_rate", "missing"):
+                Setting.get_value(key, self.tenant)
+            Setting.get_all_merged(self.tenant)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_tenant_change_invalidates_only_that_tenant(self):
+        Setting.get_value("company_name", self.tenant)
+        Setting.get_value("company_name", self.other)
+
+        Setting.objects.create(
+            tenant=self.other, key="company_name", value_type="string", value_string="Other Co"
+        )
+        self.assertEqual(Setting.get_value("company_name", self.other), "Other Co")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(Setting.get_value("company_name", self.tenant), "Tenant Co")
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_global_change_invalidates_every_tenant(self):
+        Setting.get_value("tax_rate", self.tenant)
+        tax = Setting.objects.get(key="tax_rate", tenant__isnull=True)
+        tax.value_numeric = Decimal("8")
+        tax.save()
+        self.assertEqual(Setting.get_value("tax_rate", self.tenant), Decimal("8"))
+
+        tax.delete()
+        self.assertIsNone(Setting.get_value("tax_rate", self.tenant))
+
+    def test_merged_result_is_a_copy(self):
+        Setting.get_all_merged(self.tenant)["company_name"]["value"] = "Changed"
+        self.assertEqual(Setting.get_value("company_name", self.tenant), "Tenant Co")
+
+    def test_by_key_endpoint(self):
+        user = User.objects.create_user(email="s@test.com", password="x", username="s", tenant=self.tenant)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.credentials(HTTP_X_TENANT="settings")
+
+        resp = client.get("/api/core/settings/by-key/company_name/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["value"], "Tenant Co")
+        self.assertTrue(resp.json()["is_override"])
+        self.assertTrue(resp.json()["found"])
+
+        resp = client.get("/api/core/settings/by-key/nope/")
+        self.assertFalse(resp.json()["found"])
+
+    def test_snapshots_expire_quickly_without_a_shared_cache(self):
+        # Other processes never see the version bumps of a process-local cache
+        self.assertEqual(snapshots._ttls(), (LOCAL_ONLY_TTL, LOCAL_ONLY_TTL))
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Min
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Note
+from core.permission_cache import permission_sets, permission_versions
+from core.picklists import picklist_versions, registries
+from core.synthetic_data import SyntheticDataGenerator, SyntheticOptions
+from customers.models import Customer
+from inventory.models import InventoryBalance
+from service.models import Employee
+from tasks.models import Task, WorkItem
+from tenants.cache import membership_cache, tenant_cache
+from tenants.models import Tenant
+
+
+class SyntheticDataTest(TestCase):
+    options = SyntheticOptions(customers=15, batch_size=4, shops=2, employees=3, inventory_items=5)
+
+    def setUp(self):
+        # Row ids are reused between tests, so drop anything cached for them
+        cache.clear()
+        for local in (permission_versions, permission_sets, picklist_versions, registries,
+                      tenant_cache, membership_cache):
+            local.clear_local()
+
+    def test_generates_consistent_tenant(self):
+        counts = SyntheticDataGenerator(self.options).run()
+        tenant = Tenant.objects.get(subdomain="synthetic-1")
+
+        self.assertEqual(Customer.objects.filter(tenant=tenant).count(), 15)
+        self.assertEqual(counts["tasks.WorkItem"], WorkItem.objects.filter(tenant=tenant).count())
+        self.assertEqual(counts["tasks.Task"], Task.objects.filter(tenant=tenant).count())
+        self.assertEqual(counts["core.Note"], Note.objects.count())
+        self.assertEqual(InventoryBalance.objects.filter(tenant=tenant).count(), 10)
+        self.assertFalse(InventoryBalance.objects.filter(tenant=tenant, current_quantity__lt=0).exists())
+
+        # Timestamps are historical, not "now"
+        oldest = WorkItem.objects.filter(tenant=tenant).aggregate(oldest=Min("created_date"))["oldest"]
+        self.assertLess(oldest, timezone.now() - timedelta(days=7))
+
+        # Reference counters continue after the bulk-inserted numbers
+        employee = Employee.objects.filter(tenant=tenant).first()
+        task = Task.objects.create(tenant=tenant, assigned_employee=employee)
+        self.assertEqual(task.reference_id, f"T-{counts['tasks.Task'] + 1}")
+
+    def test_same_seed_same_data(self):
+        SyntheticDataGenerator(self.options).run()
+        SyntheticDataGenerator(self.options).run()
+        first, second = (
+            list(Customer.objects.filter(tenant__subdomain=subdomain).values_list("first_name", "last_name"))
+            for subdomain in ("synthetic-1", "synthetic-2")
+        )
+        self.assertEqual(first, second)
+
+    def test_benchmark_report(self):
+        call_command(
+            "generate_synthetic_data", "--customers=10", "--employees=2", "--inventory-items=3",
+            stdout=StringIO(),
+        )
+        stock = sorted(InventoryBalance.objects.values_list("pk", "current_quantity"))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.json")
+            call_command("benchmark_endpoints", "--iterations=1", "--warmup=0", f"--output={path}", stdout=StringIO())
+            with open(path) as fh:
+                report = json.load(fh)
+
+        self.assertEqual(report["tenant"], "synthetic-1")
+        self.assertEqual(report["row_counts"]["customers"], 10)
+        statuses = {name: result["status"] for name, result in report["endpoints"].items()}
+        self.assertEqual(statuses, {
+            "dashboard": 200, "work_items_list": 200, "work_items_list_page": 200, "tasks_list": 200,
+            "tasks_list_page": 200, "tasks_list_page_includes": 200, "timeline": 200, "work_items_retrieve": 200,
+            "work_items_retrieve_includes": 200, "work_item_timeline": 200,
+            "global_search": 200, "global_search_phone": 200, "receive_delivery": 201,
+        })
+        # The POST ran inside a rolled back transaction
+        self.assertEqual(sorted(InventoryBalance.objects.values_list("pk", "current_quantity")), stock)
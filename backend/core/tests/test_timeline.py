@@ -0,0 +1,141 @@
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Note, Role, RolePermission, User, UserRole
+from core.permission_cache import permission_sets, permission_versions
+from core.picklists import picklist_versions, registries
+from core.testing import QueryBudgetMixin
+from customers.models import Customer
+from service.models import Employee, Location
+from tasks.models import Task, WorkItem
+from tenants.cache import membership_cache, tenant_cache
+from tenants.models import Tenant
+
+
+class NoteTimelineTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        # Row ids are reused between tests, so drop anything cached for them
+        cache.clear()
+        for local in (permission_versions, permission_sets, picklist_versions, registries,
+                      tenant_cache, membership_cache):
+            local.clear_local()
+
+        self.tenant = Tenant.objects.create(name="Timeline", subdomain="timeline")
+        self.user = User.objects.create_superuser(email="t@test.com", password="x", username="t")
+        location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.employee = Employee.objects.create(
+            tenant=self.tenant, user=self.user, role="technician", location=location
+        )
+        customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Jan", last_name="Kowalski", phone_number="500100200"
+        )
+        self.work_item, self.other_item = (
+            WorkItem.objects.create(
+                tenant=self.tenant, customer=customer, owner=self.employee, dropoff_point=location
+            )
+            for _ in range(2)
+        )
+        self.task = Task.objects.create(
+            tenant=self.tenant, work_item=self.work_item, assigned_employee=self.employee
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.client.credentials(HTTP_X_TENANT="timeline")
+
+    def add_note(self, target, content):
+        return Note.objects.create(author=self.user, content=content, content_object=target)
+
+    def collect(self, url):
+        ids = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            ids.extend(row["id"] for row in resp.json()["results"])
+            url = resp.json()["next"]
+        return ids
+
+    def test_notes_carry_tenant_and_work_item(self):
+        on_item = self.add_note(self.work_item, "Received")
+        on_task = self.add_note(self.task, "Screen ordered")
+        self.assertEqual((on_item.tenant_id, on_item.work_item_id), (self.tenant.pk, self.work_item.pk))
+        self.assertEqual((on_task.tenant_id, on_task.work_item_id), (self.tenant.pk, self.work_item.pk))
+
+        # Moving the task takes its notes along
+        self.task.work_item = self.other_item
+        self.task.save()
+        on_task.refresh_from_db()
+        self.assertEqual(on_task.work_item_id, self.other_item.pk)
+
+    def test_work_item_timeline_pages(self):
+        notes = [self.add_note(self.task if n % 2 else self.work_item, f"Note {n}") for n in range(5)]
+        self.add_note(self.other_item, "Elsewhere")
+
+        ids = self.collect(f"/api/core/timeline/?work_item={self.work_item.pk}&page_size=2")
+        self.assertEqual(ids, [note.pk for note in reversed(notes)])
+
+        resp = self.client.get(f"/api/core/timeline/?work_item={self.work_item.pk}")
+        newest, from_task = resp.json()["results"][:2]
+        self.assertEqual((newest["source_model"], from_task["source_model"]), ("workitem", "task"))
+        self.assertEqual(from_task["work_item_reference_id"], self.work_item.reference_id)
+
+    def test_tenant_timeline_is_scoped_and_single_query(self):
+        other = Tenant.objects.create(name="Other", subdomain="other")
+        Note.objects.create(content="Foreign", content_type=ContentType.objects.get_for_model(WorkItem),
+                            object_id=self.work_item.pk, tenant=other)
+        mine = [self.add_note(self.work_item, f"Note {n}") for n in range(3)]
+
+        self.client.get("/api/core/timeline/")
+        with self.assertQueryBudget(1):
+            resp = self.client.get("/api/core/timeline/")
+        self.assertEqual([row["id"] for row in resp.json()["results"]], [note.pk for note in reversed(mine)])
+
+    def test_note_list_includes_task_notes(self):
+        self.add_note(self.work_item, "Received")
+        self.add_note(self.task, "Screen ordered")
+        resp = self.client.get(f"/api/core/notes/workitem/{self.work_item.pk}/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual({row["source_model"] for row in resp.json()}, {"workitem", "task"})
+
+    def member(self, username, *codenames):
+        user = User.objects.create_user(email=f"{username}@test.com", password="x", username=username)
+        role = Role.objects.create(tenant=self.tenant, name=username)
+        UserRole.objects.create(user=user, role=role)
+        for codename in codenames:
+            RolePermission.objects.create(
+                role=role, permission=Permission.objects.get(content_type__app_label="tasks", codename=codename)
+            )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.credentials(HTTP_X_TENANT="timeline")
+        return user, client
+
+    def test_users_of_other_tenants_are_refused(self):
+        self.add_note(self.work_item, "Received")
+        outsider = User.objects.create_user(email="o@test.com", password="x", username="o")
+        other = Tenant.objects.create(name="Other", subdomain="other")
+        UserRole.objects.create(user=outsider, role=Role.objects.create(tenant=other, name="Staff"))
+        client = APIClient()
+        client.force_authenticate(user=outsider)
+        client.credentials(HTTP_X_TENANT="timeline")
+        self.assertEqual(client.get("/api/core/timeline/").status_code, 403)
+
+    def test_view_own_sees_only_notes_of_own_work_items(self):
+        tech, client = self.member("tech", "view_own_workitems")
+        location = self.employee.location
+        self.other_item.technician = Employee.objects.create(
+            tenant=self.tenant, user=tech, role="technician", location=location
+        )
+        self.other_item.save()
+        self.add_note(self.work_item, "Not mine")
+        mine = self.add_note(self.other_item, "Mine")
+
+        resp = client.get("/api/core/timeline/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([row["id"] for row in resp.json()["results"]], [mine.pk])
+
+        _, client = self.member("clerk")
+        self.assertEqual(client.get("/api/core/timeline/").json()["results"], [])
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Note, User
+from core.picklists import picklist_versions, registries
+from integrations.models import TenantIntegration
+from service.models import Employee, Location
+from tasks import dashboard
+from tasks.models import Task
+from tenants.models import Tenant
+
+
+class ChangeTrackingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for local in (picklist_versions, registries, dashboard.dashboard_versions, dashboard.counter_cache):
+            local.clear_local()
+        self.tenant = Tenant.objects.create(name="Tracking", subdomain="tracking")
+        user = User.objects.create_user(email="t@test.com", password="x", username="t")
+        location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.employee = Employee.objects.create(tenant=self.tenant, user=user, role="technician", location=location)
+        self.task_id = Task.objects.create(tenant=self.tenant, assigned_employee=self.employee).pk
+
+    def test_changed_fields_and_old_values(self):
+        task = Task.objects.get(pk=self.task_id)
+        self.assertEqual(task.changed_fields(), set())
+
+        task.status = "In progress"
+        task.summary = "Replace screen"
+        self.assertEqual(task.changed_fields(), {"status", "summary"})
+        self.assertEqual(task.old_value("status"), "To do")
+
+        task.save()
+        self.assertEqual(task.changed_fields(), set())
+        self.assertEqual(task.old_value("status"), "In progress")
+
+    def test_update_reads_nothing_back(self):
+        task = Task.objects.get(pk=self.task_id)
+        task.status = "Done"
+        with CaptureQueriesContext(connection) as queries:
+            task.save()
+
+        selects = [q["sql"] for q in queries if q["sql"].startswith("SELECT") and '"tasks_task"' in q["sql"]]
+        self.assertEqual(selects, [])
+        self.assertIsNotNone(task.completed_date)
+        self.assertTrue(Note.objects.filter(object_id=task.pk, content__contains="'To do' to 'Done'").exists())
+
+        # Reopening clears the completion date, based on the tracked old status
+        task.status = "Reopened"
+        task.save()
+        self.assertIsNone(task.completed_date)
+
+    def test_untracked_instance_loads_old_values_once(self):
+        task = Task(pk=self.task_id, tenant=self.tenant, assigned_employee=self.employee, status="Done")
+        task._state.adding = False
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(task.old_value("status"), "To do")
+            self.assertEqual(task.changed_fields() & {"status"}, {"status"})
+        self.assertEqual(len(queries), 1)
+
+    def test_refresh_from_db_retakes_snapshot(self):
+        task = Task.objects.get(pk=self.task_id)
+        Task.objects.filter(pk=self.task_id).update(status="In progress")
+        task.refresh_from_db()
+        self.assertEqual(task.old_value("status"), "In progress")
+        self.assertEqual(task.changed_fields(), set())
+
+    def test_integration_payload_has_old_status(self):
+        TenantIntegration.objects.create(
+            tenant=self.tenant, name="n8n", integration_type="n8n",
+            event_type="task_status_changed", webhook_url="https://example.com/hook",
+        )
+        task = Task.objects.get(pk=self.task_id)
+        task.status = "In progress"
+        with mock.patch("integrations.signals.task.send_integration_webhook") as webhook:
+            with self.captureOnCommitCallbacks(execute=True):
+                task.save()
+
+        payload = webhook.delay.call_args.kwargs["payload"]
+        self.assertEqual(payload["changes"], {"status": {"old": "To do", "new": "In progress"}})
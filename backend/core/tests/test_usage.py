@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from core import usage
+from core.middleware import UpdateLastActivityMiddleware
+from core.models import APIKey, Role, User
+from core.tasks import flush_usage_counters
+from tenants.models import Tenant
+
+
+class WriteBehindUsageTest(TestCase):
+    def setUp(self):
+        usage._buffer = usage.MemoryUsageBuffer()
+        self.tenant = Tenant.objects.create(name="Usage", subdomain="usage")
+        role = Role.objects.create(tenant=self.tenant, name="Integration")
+        _, prefix, key_hash = APIKey.generate_key()
+        self.api_key = APIKey.objects.create(
+            tenant=self.tenant, role=role, name="n8n", prefix=prefix, key_hash=key_hash
+        )
+        self.user = User.objects.create_user(email="active@test.com", password="x", username="active")
+
+    def test_api_key_usage_is_buffered_then_flushed(self):
+        self.api_key.update_usage(ip_address="10.0.0.1")
+        self.api_key.update_usage(ip_address="10.0.0.2")
+
+        stored = APIKey.objects.get(pk=self.api_key.pk)
+        self.assertEqual(stored.usage_count, 0)
+        self.assertIsNone(stored.last_used_at)
+
+        live = stored.with_pending_usage()
+        self.assertEqual(live.usage_count, 2)
+        self.assertEqual(live.last_used_ip, "10.0.0.2")
+
+        result = flush_usage_counters()
+        self.assertEqual(result, {"apikey": 1, "user": 0})
+
+        stored.refresh_from_db()
+        self.assertEqual(stored.usage_count, 2)
+        self.assertEqual(stored.last_used_ip, "10.0.0.2")
+        self.assertIsNotNone(stored.last_used_at)
+        self.assertEqual(usage.pending_api_key_usage(self.api_key.pk), {})
+
+    def test_flush_increments_instead_of_overwriting(self):
+        APIKey.objects.filter(pk=self.api_key.pk).update(usage_count=10, last_used_ip="10.0.0.9")
+        self.api_key.update_usage()
+        flush_usage_counters()
+        stored = APIKey.objects.get(pk=self.api_key.pk)
+        self.assertEqual(stored.usage_count, 11)
+        self.assertEqual(stored.last_used_ip, "10.0.0.9")
+
+    def test_flush_batches_many_keys(self):
+        keys = [self.api_key]
+        role = self.api_key.role
+        for i in range(4):
+            _, prefix, key_hash = APIKey.generate_key()
+            keys.append(APIKey.objects.create(
+                tenant=self.tenant, role=role, name=f"k{i}", prefix=prefix, key_hash=key_hash
+            ))
+        for key in keys:
+            key.update_usage()
+        result = usage.flush_usage_counters(batch_size=2)
+        self.assertEqual(result["apikey"], 5)
+        self.assertEqual(
+            set(APIKey.objects.filter(pk__in=[k.pk for k in keys]).values_list("usage_count", flat=True)),
+            {1},
+        )
+
+    def test_last_activity_is_written_behind(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        middleware = UpdateLastActivityMiddleware(lambda r: None)
+        middleware(request)
+
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_activity_at)
+        self.assertIn("last_activity_at", usage.pending_user_activity(self.user.pk))
+
+        flush_usage_counters()
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_activity_at)
+
+    def test_last_activity_is_throttled(self):
+        self.user.last_activity_at = timezone.now() - timedelta(minutes=1)
+        request = RequestFactory().get("/")
+        request.user = self.user
+        UpdateLastActivityMiddleware(lambda r: None)(request)
+        self.assertEqual(usage.pending_user_activity(self.user.pk), {})
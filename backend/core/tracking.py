@@ -0,0 +1,87 @@
+"""
+Field change tracking for models.
+
+``ChangeTrackingMixin`` snapshots the field values an instance was loaded with (in
+``from_db``), so signal handlers and ``save()`` overrides can ask what changed
+without re-reading the row::
+
+    class Task(ChangeTrackingMixin, models.Model):
+        ...
+
+    @receiver(post_save, sender=Task)
+    def on_save(sender, instance, created, **kwargs):
+        if not created and 'status' in instance.changed_fields():
+            old = instance.old_value('status')
+
+The snapshot is per instance (no module-level state shared between threads) and is
+retaken after each successful save and ``refresh_from_db()``, so ``post_save``
+handlers still see the pre-save values. Instances that were not loaded from the
+database but are saved as updates (e.g. ``Model(pk=1, ...).save()``), or that
+deferred fields with ``only()``, fall back to one SELECT of the missing values before
+the write.
+"""
+import copy
+
+_MUTABLE = (dict, list, set)
+
+
+class ChangeTrackingMixin:
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: copy.deepcopy(value) if isinstance(value, _MUTABLE) else value
+            for name, value in zip(field_names, values)
+        }
+        return instance
+
+    @classmethod
+    def _tracked_attnames(cls):
+        return [field.attname for field in cls._meta.concrete_fields]
+
+    def _attname(self, name):
+        return self._meta.get_field(name).attname
+
+    def _take_snapshot(self, attnames=None):
+        deferred = self.get_deferred_fields()
+        snapshot = self.__dict__.setdefault('_loaded_values', {})
+        for attname in attnames or self._tracked_attnames():
+            if attname not in deferred:
+                value = getattr(self, attname)
+                snapshot[attname] = copy.deepcopy(value) if isinstance(value, _MUTABLE) else value
+
+    def _ensure_snapshot(self):
+        """Load the stored values this instance has no snapshot of (before writing)."""
+        if self._state.adding or self.pk is None:
+            return
+        snapshot = self.__dict__.setdefault('_loaded_values', {})
+        missing = [name for name in self._tracked_attnames() if name not in snapshot]
+        if missing:
+            row = type(self)._base_manager.using(self._state.db).filter(pk=self.pk).values(*missing).first()
+            snapshot.update(row or {})
+
+    def old_value(self, name):
+        """Value of field ``name`` as last loaded from or saved to the database (None if new)."""
+        self._ensure_snapshot()
+        return self.__dict__.get('_loaded_values', {}).get(self._attname(name))
+
+    def changed_fields(self):
+        """Names (attnames for foreign keys) of fields whose value differs from the stored row."""
+        if self._state.adding:
+            return set()
+        self._ensure_snapshot()
+        deferred = self.get_deferred_fields()
+        return {
+            attname for attname, value in self._loaded_values.items()
+            if attname not in deferred and getattr(self, attname) != value
+        }
+
+    def save(self, *args, **kwargs):
+        self._ensure_snapshot()
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._take_snapshot(update_fields and [self._attname(name) for name in update_fields])
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._take_snapshot(fields and [self._attname(name) for name in fields])
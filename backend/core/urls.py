@@ -17,6 +17,7 @@ router.register(r'settings', SettingViewSet, basename='setting')
 urlpatterns = [
     path('', home_view, name="home"),
     path("notes/<str:model>/<int:obj_id>/", note_list, name="note-list"),
+    path("timeline/", TimelineView.as_view(), name="timeline"),
     path('me/permissions/', MyPermissionsView.as_view(), name='my-permissions'),
     path("login/", login_view, name="login"),
     path("logout/", logout_view, name="logout"),
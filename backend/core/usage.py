@@ -0,0 +1,254 @@
+"""
+Write-behind usage counters for API keys and user activity.
+
+``APIKey.update_usage`` and ``UpdateLastActivityMiddleware`` used to UPDATE a hot row
+on the request path. They now record into a buffer instead:
+
+* ``RedisUsageBuffer`` when ``USAGE_COUNTERS_REDIS_URL`` is configured; the
+  ``core.tasks.flush_usage_counters`` beat job drains it into Postgres in batches.
+* ``MemoryUsageBuffer`` otherwise; each process drains its own buffer once the
+  flush interval has passed, so single-process setups still persist usage.
+
+``pending_api_key_usage`` / ``pending_user_activity`` expose not-yet-flushed values
+so the admin and the quick-login inactivity check stay near real time.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Case, F, Value, When
+from django.db.models import DateTimeField, GenericIPAddressField, IntegerField
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, 'USAGE_COUNTERS_FLUSH_INTERVAL', 30)
+FLUSH_BATCH_SIZE = getattr(settings, 'USAGE_COUNTERS_FLUSH_BATCH_SIZE', 500)
+
+API_KEY = 'apikey'
+USER = 'user'
+
+
+class MemoryUsageBuffer:
+    """Process-local buffer; flushes itself once ``FLUSH_INTERVAL`` has elapsed."""
+
+    self_flushing = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {API_KEY: {}, USER: {}}
+        self._last_flush = time.monotonic()
+
+    def record_api_key(self, pk, seen_at, ip_address=None):
+        with self._lock:
+            entry = self._entries[API_KEY].setdefault(pk, {'count': 0})
+            entry['count'] += 1
+            entry['last_used_at'] = seen_at
+            if ip_address:
+                entry['ip'] = ip_address
+
+    def record_user(self, pk, seen_at):
+        with self._lock:
+            self._entries[USER][pk] = {'last_activity_at': seen_at}
+
+    def pending(self, kind, pk):
+        with self._lock:
+            return dict(self._entries[kind].get(pk) or {})
+
+    def drain(self, kind, limit):
+        with self._lock:
+            entries = self._entries[kind]
+            pks = list(entries)[:limit]
+            return {pk: entries.pop(pk) for pk in pks}
+
+    def flush_due(self):
+        if time.monotonic() - self._last_flush < FLUSH_INTERVAL:
+            return False
+        self._last_flush = time.monotonic()
+        return True
+
+
+class RedisUsageBuffer:
+    """
+    Shared buffer: one hash per object plus a set of dirty ids per kind.
+
+    Draining pops ids from the dirty set and reads+deletes their hashes in one
+    MULTI block, so increments landing mid-flush simply start a new hash.
+    """
+
+    self_flushing = False
+
+    def __init__(self, url, prefix='usage'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, kind, pk):
+        return f'{self.prefix}:{kind}:{pk}'
+
+    def _dirty(self, kind):
+        return f'{self.prefix}:{kind}:dirty'
+
+    def record_api_key(self, pk, seen_at, ip_address=None):
+        key = self._key(API_KEY, pk)
+        fields = {'last_used_at': seen_at.isoformat()}
+        if ip_address:
+            fields['ip'] = ip_address
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(key, 'count', 1)
+        pipe.hset(key, mapping=fields)
+        pipe.sadd(self._dirty(API_KEY), pk)
+        pipe.execute()
+
+    def record_user(self, pk, seen_at):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(self._key(USER, pk), 'last_activity_at', seen_at.isoformat())
+        pipe.sadd(self._dirty(USER), pk)
+        pipe.execute()
+
+    @staticmethod
+    def _decode(raw):
+        entry = {}
+        for field, value in raw.items():
+            field, value = field.decode(), value.decode()
+            if field == 'count':
+                entry[field] = int(value)
+            elif field in ('last_used_at', 'last_activity_at'):
+                entry[field] = parse_datetime(value)
+            else:
+                entry[field] = value
+        return entry
+
+    def pending(self, kind, pk):
+        return self._decode(self.client.hgetall(self._key(kind, pk)))
+
+    def drain(self, kind, limit):
+        pks = [int(pk) for pk in self.client.spop(self._dirty(kind), limit) or []]
+        if not pks:
+            return {}
+        pipe = self.client.pipeline(transaction=True)
+        for pk in pks:
+            pipe.hgetall(self._key(kind, pk))
+            pipe.delete(self._key(kind, pk))
+        results = pipe.execute()
+        return {
+            pk: self._decode(raw)
+            for pk, raw in zip(pks, results[::2])
+            if raw
+        }
+
+    def flush_due(self):
+        return False
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                url = getattr(settings, 'USAGE_COUNTERS_REDIS_URL', None)
+                _buffer = RedisUsageBuffer(url) if url else MemoryUsageBuffer()
+    return _buffer
+
+
+def _record(method, *args):
+    buffer = get_buffer()
+    try:
+        getattr(buffer, method)(*args)
+    except Exception:
+        # Usage tracking must never fail a request.
+        logger.exception('Could not buffer usage counter (%s)', method)
+        return
+    if buffer.self_flushing and buffer.flush_due():
+        flush_usage_counters()
+
+
+def record_api_key_usage(api_key_id, seen_at, ip_address=None):
+    _record('record_api_key', api_key_id, seen_at, ip_address)
+
+
+def record_user_activity(user_id, seen_at):
+    _record('record_user', user_id, seen_at)
+
+
+def _pending(kind, pk):
+    try:
+        return get_buffer().pending(kind, pk)
+    except Exception:
+        logger.exception('Could not read pending usage for %s %s', kind, pk)
+        return {}
+
+
+def pending_api_key_usage(api_key_id):
+    """Not-yet-flushed usage for an API key: {'count', 'last_used_at', 'ip'} (any may be absent)."""
+    return _pending(API_KEY, api_key_id)
+
+
+def pending_user_activity(user_id):
+    """Not-yet-flushed activity for a user: {'last_activity_at'} or {}."""
+    return _pending(USER, user_id)
+
+
+def _latest_value(entries, key, column, output_field):
+    """CASE expression setting ``column`` to the buffered value, keeping it where none was buffered."""
+    return Case(
+        *[When(pk=pk, then=Value(entry[key])) for pk, entry in entries.items() if entry.get(key)],
+        default=F(column),
+        output_field=output_field,
+    )
+
+
+def _flush_api_keys(entries):
+    from core.models import APIKey
+
+    APIKey.objects.filter(pk__in=list(entries)).update(
+        usage_count=F('usage_count') + Case(
+            *[When(pk=pk, then=Value(entry.get('count', 0))) for pk, entry in entries.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        last_used_at=_latest_value(entries, 'last_used_at', 'last_used_at', DateTimeField()),
+        last_used_ip=_latest_value(entries, 'ip', 'last_used_ip', GenericIPAddressField()),
+    )
+
+
+def _flush_users(entries):
+    from core.models import User
+
+    User.objects.filter(pk__in=list(entries)).update(
+        last_activity_at=_latest_value(entries, 'last_activity_at', 'last_activity_at', DateTimeField()),
+    )
+
+
+def flush_usage_counters(batch_size=FLUSH_BATCH_SIZE):
+    """
+    Drain buffered counters into the database, one UPDATE per batch and kind.
+
+    Returns:
+        dict: number of API keys and users written
+    """
+    buffer = get_buffer()
+    flushed = {API_KEY: 0, USER: 0}
+    for kind, writer in ((API_KEY, _flush_api_keys), (USER, _flush_users)):
+        while True:
+            entries = buffer.drain(kind, batch_size)
+            if not entries:
+                break
+            writer(entries)
+            flushed[kind] += len(entries)
+            if len(entries) < batch_size:
+                break
+    return flushed
+
+
+def latest(*values):
+    """Most recent of the given datetimes, ignoring None."""
+    values = [value for value in values if isinstance(value, datetime)]
+    return max(values) if values else None
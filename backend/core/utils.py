@@ -102,15 +102,8 @@ def get_model_schema(model_class, tenant=None):
 
             # Fetch active picklist values for this tenant and category
             if tenant:
-                # Import here to avoid circular dependency
-                from .models import PicklistValue
-                choices = PicklistValue.objects.filter(
-                    tenant=tenant,
-                    category=category,
-                    is_active=True
-                ).order_by('sort_order', 'name').values_list('value', 'name')
-
-                field_info["choices"] = list(choices)
+                from .picklists import get_picklist
+                field_info["choices"] = get_picklist(tenant, category).choices()
             else:
                 field_info["choices"] = []
 
@@ -7,7 +7,7 @@ from django.utils import timezone
 from django.shortcuts import render
 from django.views.generic import ListView
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.generics import ListAPIView
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser
@@ -16,13 +16,20 @@ from django.contrib.contenttypes.models import ContentType
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.views.decorators.csrf import ensure_csrf_cookie
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.decorators import action
 
-from .models import Note, User, Permission, RolePermission, UserRole, Role, PicklistValue, Setting
-from .serializers import (NoteSerializer, UserSerializer, PermissionSerializer,
+from .models import Note, User, Permission, RolePermission, UserRole, Role, Setting
+from .serializers import (NoteSerializer, TimelineNoteSerializer, UserSerializer, PermissionSerializer,
                           RolePermissionSerializer, RoleSerializer, UserRoleSerializer,
                           UserRoleCreateSerializer, MyPermissionsResponseSerializer,
                           SettingSerializer, SettingWriteSerializer)
+from . import search
+from .pagination import KeysetPagination
+from .picklists import get_picklist
+from .settings_snapshot import get_snapshot as get_settings_snapshot
+from .usage import latest, pending_user_activity
 from .utils import create_system_note
 from tenants.managers import TenantAwareManager
 from .permissions import TenantUserMatchesRequestTenant
@@ -110,33 +117,21 @@ class GenericSearchView(ListAPIView):
 
 class NoteViewSet(viewsets.ModelViewSet):
     serializer_class = NoteSerializer
+    pagination_class = KeysetPagination
+    cursor_pagination_key = "notes"
+    cursor_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         model = self.kwargs["model"]
         obj_id = self.kwargs["obj_id"]
-        content_type = ContentType.objects.get(model=model)
-
-        # Get notes for the current object
-        notes = Note.objects.filter(content_type=content_type, object_id=obj_id)
+        notes = Note.objects.select_related('author', 'content_type')
 
-        # If this is a work item, also include notes from related tasks
+        # A work item's notes include those of its tasks via the denormalized column
         if model == "workitem":
-            from tasks.models import Task
-            task_content_type = ContentType.objects.get_for_model(Task)
-
-            # Get all tasks related to this work item
-            task_ids = Task.objects.filter(work_item_id=obj_id).values_list('id', flat=True)
-
-            # Get notes from those tasks
-            task_notes = Note.objects.filter(
-                content_type=task_content_type,
-                object_id__in=task_ids
-            )
-
-            # Combine both querysets
-            notes = notes | task_notes
+            return notes.filter(work_item_id=obj_id)
 
-        return notes.distinct()
+        content_type = ContentType.objects.get(model=model)
+        return notes.filter(content_type=content_type, object_id=obj_id)
 
     def perform_create(self, serializer):
         model = self.kwargs["model"]
@@ -157,6 +152,52 @@ class NoteViewSet(viewsets.ModelViewSet):
             )
 
 
+class TimelineView(ListAPIView):
+    """
+    Activity (notes) of the tenant, or of one work item and its tasks with
+    ``?work_item=<id>``, newest first in keyset pages.
+
+    Served from the denormalized ``Note.tenant``/``Note.work_item`` columns, so each
+    page is a single range scan on their ``(…, created_at, id)`` indexes.
+
+    Visibility follows the work item list: ``view_all_workitems`` sees every note,
+    ``view_own_workitems`` only the notes of work items the user owns or works on.
+    """
+    serializer_class = TimelineNoteSerializer
+    permission_classes = [IsAuthenticated, TenantUserMatchesRequestTenant]
+    pagination_class = KeysetPagination
+    cursor_pagination_required = True
+    cursor_ordering = ("-created_at", "-id")
+
+    @extend_schema(parameters=[
+        OpenApiParameter('work_item', OpenApiTypes.INT, description='Only this work item and its tasks'),
+    ])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        tenant = getattr(self.request, 'tenant', None)
+        if not tenant:
+            raise PermissionDenied("Tenant not specified.")
+        notes = Note.objects.filter(tenant=tenant).select_related('author', 'content_type', 'work_item')
+
+        user = self.request.user
+        if not user.has_permission('view_all_workitems', tenant):
+            if not user.has_permission('view_own_workitems', tenant):
+                return Note.objects.none()
+            notes = notes.filter(
+                db_models.Q(work_item__technician__user=user) | db_models.Q(work_item__owner__user=user)
+            )
+
+        work_item = self.request.query_params.get('work_item')
+        if work_item:
+            try:
+                notes = notes.filter(work_item_id=int(work_item))
+            except ValueError:
+                raise ValidationError({'work_item': 'A valid integer is required.'})
+        return notes
+
+
 class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, TenantUserMatchesRequestTenant]
@@ -298,7 +339,11 @@ def quick_login_view(request):
     if not already_authed:
         # No active session — require recent activity within the inactivity window.
         inactivity_limit = timedelta(hours=8)
-        last_activity = user.last_activity_at
+        # Include activity that is still buffered (see core.usage)
+        last_activity = latest(
+            user.last_activity_at,
+            pending_user_activity(user.pk).get('last_activity_at'),
+        )
 
         if not last_activity or timezone.now() - last_activity > inactivity_limit:
             return JsonResponse({"error": "full_login_required"}, status=status.HTTP_403_FORBIDDEN)
@@ -388,23 +433,32 @@ def list_pinned_users_view(request):
 
 class GlobalSearchView(APIView):
     """
-    Global search endpoint that searches across multiple models
-    (Customers and Work Items) using PostgreSQL Full-Text Search.
+    Global search endpoint that searches across every entity type in the search
+    index (customers, work items, tasks, leads, assets and inventory items).
+
+    One ranked statement over ``SearchDocument`` returns the best matches of each
+    type and how many match in all (``facets``); the matched rows are then loaded
+    per type. ``entity_types`` limits the search to some sections, e.g.
+    ``?entity_types=customers,work_items``.
     """
     permission_classes = [IsAuthenticated]
+    limit = 5
 
     def get(self, request):
         query = request.query_params.get('q', '').strip()
         entity_types = request.query_params.get('entity_types', '').strip()
+        sections = {indexer.section: indexer for indexer in search._registry.values()}
+
+        results = {section: [] for section in sections}
+        results.update({
+            'facets': {section: 0 for section in sections},
+            'total_count': 0,
+            'query': query
+        })
 
         # Minimum query length
         if len(query) < 2:
-            return Response({
-                'customers': [],
-                'work_items': [],
-                'total_count': 0,
-                'query': query
-            })
+            return Response(results)
 
         # Get tenant from request
         tenant = getattr(request, 'tenant', None)
@@ -414,43 +468,27 @@ class GlobalSearchView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Parse entity types filter (comma-separated)
-        enabled_types = set()
+        # Parse entity types filter (comma-separated); default: search all entity types
         if entity_types:
-            enabled_types = set(entity_types.lower().split(','))
-        else:
-            # Default: search all entity types
-            enabled_types = {'customers', 'work_items'}
-
-        results = {
-            'customers': [],
-            'work_items': [],
-            'total_count': 0,
-            'query': query
-        }
-
-        # Search customers
-        if 'customers' in enabled_types:
-            from customers.services import search_customers, serialize_customer_search_result
-
-            customers = search_customers(query, tenant, limit=5)
-            results['customers'] = [
-                serialize_customer_search_result(customer)
-                for customer in customers
-            ]
-
-        # Search work items
-        if 'work_items' in enabled_types:
-            from tasks.services import search_work_items, serialize_work_item_search_result
+            sections = {
+                section: indexer for section, indexer in sections.items()
+                if section in entity_types.lower().split(',')
+            }
 
-            work_items = search_work_items(query, tenant, request.user, limit=5)
-            results['work_items'] = [
-                serialize_work_item_search_result(wi)
-                for wi in work_items
-            ]
+        found = search.find(
+            tenant, query, request.user, [indexer.entity_type for indexer in sections.values()], self.limit
+        )
+        for section, indexer in sections.items():
+            if indexer.entity_type not in found:
+                continue
+            ids, matches = found[indexer.entity_type]
+            # Loaded rows come back unordered; keep the ranking
+            rows = {row['id']: row for row in indexer.results(tenant, ids)}
+            results[section] = [rows[pk] for pk in ids if pk in rows]
+            results['facets'][section] = matches
 
         # Calculate total count
-        results['total_count'] = len(results['customers']) + len(results['work_items'])
+        results['total_count'] = sum(len(results[section]) for section in sections)
 
         return Response(results)
 
@@ -569,38 +607,21 @@ class SettingViewSet(viewsets.ModelViewSet):
         }
         """
         tenant = getattr(request, 'tenant', None)
+        entry = get_settings_snapshot(tenant).get(key)
 
-        # Try tenant-specific first
-        setting = None
-        is_override = False
-
-        if tenant:
-            try:
-                setting = Setting.objects.get(key=key, tenant=tenant)
-                is_override = True
-            except Setting.DoesNotExist:
-                pass
-
-        # Fall back to global
-        if not setting:
-            try:
-                setting = Setting.objects.get(key=key, tenant__isnull=True)
-            except Setting.DoesNotExist:
-                return Response({
-                    'key': key,
-                    'value': None,
-                    'value_type': None,
-                    'is_override': False,
-                    'description': None,
-                    'found': False
-                })
+        if entry is None:
+            return Response({
+                'key': key,
+                'value': None,
+                'value_type': None,
+                'is_override': False,
+                'description': None,
+                'found': False
+            })
 
         return Response({
-            'key': setting.key,
-            'value': setting.value,
-            'value_type': setting.value_type,
-            'is_override': is_override,
-            'description': setting.description,
+            'key': key,
+            **entry,
             'found': True
         })
 class PicklistValuesView(APIView):
@@ -618,13 +639,7 @@ class PicklistValuesView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        values = PicklistValue.objects.filter(
-            tenant=tenant,
-            category=category,
-            is_active=True
-        ).order_by('sort_order', 'name')
-
         return Response([
             {'value': v.value, 'name': v.name, 'color': v.color}
-            for v in values
+            for v in get_picklist(tenant, category)
         ])
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0013_add_callback_lead_status'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['tenant', 'id'], name='customers_c_tenant__8c7918_idx'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.db import models
 from django.core.validators import RegexValidator
 from inventory.models import Device
 from core.models import Address
+from core.tracking import ChangeTrackingMixin
 from tenants.models import Tenant
 
 referral_sources = [
@@ -16,7 +17,7 @@ referral_sources = [
     ('Other', 'Other')
 ]
 
-class Customer(models.Model):
+class Customer(ChangeTrackingMixin, models.Model):
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255, blank=True, null=True)
@@ -89,9 +90,12 @@ class Customer(models.Model):
                 name='customer_requires_contact_method',
             ),
         ]
+        indexes = [
+            models.Index(fields=['tenant', 'id']),
+        ]
 
 
-class Lead(models.Model):
+class Lead(ChangeTrackingMixin, models.Model):
     STATUS_CHOICES = [
         ('new', 'New'),
         ('contacted', 'Contacted'),
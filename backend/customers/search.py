@@ -0,0 +1,59 @@
+"""Customers, leads and assets in the search index (see ``core.search``)."""
+from core import search
+from inventory.models import Device
+from .models import Asset, Customer, Lead
+from .services import asset_search_results, customer_search_results, lead_search_results
+
+# Customer fields in the document (and in the documents of its work items)
+CUSTOMER_SEARCH_FIELDS = {'first_name', 'last_name', 'email', 'phone_number', 'full_phone_number', 'tax_code'}
+# Device fields in the documents of assets and work items
+DEVICE_SEARCH_FIELDS = {'manufacturer', 'model'}
+
+
+def customer_document(customer):
+    return (
+        [customer.first_name, customer.last_name],
+        [
+            customer.email,
+            search.digits(customer.phone_number),
+            search.digits(customer.full_phone_number),
+            customer.tax_code,
+        ],
+        '',
+    )
+
+
+def lead_document(lead):
+    return (
+        [lead.first_name, lead.last_name],
+        [lead.email, search.digits(lead.phone_number), search.digits(lead.full_phone_number)],
+        [lead.device_description, lead.notes],
+    )
+
+
+def asset_document(asset):
+    device = asset.device
+    return (
+        asset.serial_number,
+        [
+            device.manufacturer if device else None,
+            device.model if device else None,
+            asset.customer.first_name,
+            asset.customer.last_name,
+        ],
+        '',
+    )
+
+
+search.register(
+    'customer', Customer, customer_document,
+    fields=CUSTOMER_SEARCH_FIELDS, results=customer_search_results,
+)
+search.register('lead', Lead, lead_document, results=lead_search_results)
+search.register(
+    'asset', Asset, asset_document,
+    select_related=['customer', 'device'], tenant='customer__tenant', results=asset_search_results,
+)
+search.register_dependency(Customer, 'asset', 'customer', fields={'first_name', 'last_name'})
+# Devices are a catalog shared by every tenant: re-index their assets in the background
+search.register_dependency(Device, 'asset', 'device', fields=DEVICE_SEARCH_FIELDS, deferred=True)
@@ -1,16 +1,17 @@
 """
-Customer search service using hybrid search approach
+Customer, lead and asset search services backed by the search index (``core.search``)
 """
-from django.db.models import Q, Count, Prefetch, Case, When, IntegerField, Value
-from .models import Customer
+from django.db.models import Q, Count, Prefetch
+from core import search
+from .models import Asset, Customer, Lead
 from tasks.models import WorkItem
 
 
 def search_customers(query_string, tenant, limit=5):
     """
-    Search customers using a hybrid approach:
-    - icontains for phone numbers, emails, and IDs (for partial matches)
-    - Full-Text Search for names (for word matching)
+    Search customers through their search documents: prefix matches on names,
+    phone numbers by their digits, emails and tax codes, and (on PostgreSQL)
+    fuzzy name matches, all served by the index.
 
     Args:
         query_string: The search query string
@@ -23,8 +24,17 @@ def search_customers(query_string, tenant, limit=5):
     if not query_string or len(query_string.strip()) < 2:
         return Customer.objects.none()
 
-    query_string = query_string.strip()
+    customers = search.top(
+        customer_search_queryset(tenant),
+        search.search(tenant, query_string, ['customer']),
+        limit
+    ).order_by('-rank', 'first_name', 'last_name')
 
+    return customers
+
+
+def customer_search_queryset(tenant):
+    """Customers of ``tenant`` with what ``serialize_customer_search_result`` reads."""
     # Prefetch active work items for each customer (max 3 most recent)
     active_work_items = WorkItem.objects.filter(
         tenant=tenant,
@@ -35,58 +45,22 @@ def search_customers(query_string, tenant, limit=5):
         'technician__user'
     ).order_by('-created_date')[:3]
 
-    # Build a combined query using Q objects for partial matching
-    # This works better for phone numbers, emails, and partial text
-    search_filters = Q(
-        Q(phone_number__icontains=query_string) |
-        Q(email__icontains=query_string) |
-        Q(first_name__icontains=query_string) |
-        Q(last_name__icontains=query_string) |
-        Q(tax_code__icontains=query_string)
-    )
-
-    # For better ranking, we can use CASE WHEN to prioritize exact/prefix matches
-    customers = Customer.objects.filter(
-        tenant=tenant
-    ).filter(
-        search_filters
-    ).annotate(
-        # Custom ranking: exact matches score highest, then startswith, then contains
-        rank=Case(
-            # Exact phone number match
-            When(phone_number__iexact=query_string, then=Value(100)),
-            # Phone starts with query
-            When(phone_number__istartswith=query_string, then=Value(90)),
-            # Phone contains query
-            When(phone_number__icontains=query_string, then=Value(80)),
-            # Exact email match
-            When(email__iexact=query_string, then=Value(100)),
-            # Email starts with query
-            When(email__istartswith=query_string, then=Value(85)),
-            # Email contains query
-            When(email__icontains=query_string, then=Value(75)),
-            # First name starts with query
-            When(first_name__istartswith=query_string, then=Value(70)),
-            # Last name starts with query
-            When(last_name__istartswith=query_string, then=Value(70)),
-            # First name contains query
-            When(first_name__icontains=query_string, then=Value(60)),
-            # Last name contains query
-            When(last_name__icontains=query_string, then=Value(60)),
-            # Tax code match
-            When(tax_code__icontains=query_string, then=Value(50)),
-            default=Value(1),
-            output_field=IntegerField()
-        ),
+    return Customer.objects.filter(tenant=tenant).annotate(
         active_work_item_count=Count(
             'workitem',
             filter=Q(workitem__status__in=['New', 'In Progress'])
         )
     ).prefetch_related(
         Prefetch('workitem_set', queryset=active_work_items, to_attr='recent_work_items')
-    ).order_by('-rank', 'first_name', 'last_name')[:limit]
+    )
 
-    return customers
+
+def customer_search_results(tenant, ids):
+    """Serialized global search results of the customers with ``ids``."""
+    return [
+        serialize_customer_search_result(customer)
+        for customer in customer_search_queryset(tenant).filter(pk__in=ids)
+    ]
 
 
 def serialize_customer_search_result(customer):
@@ -123,3 +97,37 @@ def serialize_customer_search_result(customer):
     ]
 
     return customer_data
+
+
+def lead_search_results(tenant, ids):
+    """Serialized global search results of the leads with ``ids``."""
+    return [
+        {
+            'id': lead.id,
+            'first_name': lead.first_name,
+            'last_name': lead.last_name,
+            'email': lead.email,
+            'phone_number': lead.full_phone_number,
+            'status': lead.status,
+            'device_description': lead.device_description[:100] if lead.device_description else '',
+        }
+        for lead in Lead.objects.filter(tenant=tenant, pk__in=ids)
+    ]
+
+
+def asset_search_results(tenant, ids):
+    """Serialized global search results of the assets (serial numbers) with ``ids``."""
+    assets = Asset.objects.filter(customer__tenant=tenant, pk__in=ids).select_related('customer', 'device')
+    return [
+        {
+            'id': asset.id,
+            'serial_number': asset.serial_number,
+            'device_name': f"{asset.device.manufacturer} {asset.device.model}".strip() if asset.device else None,
+            'customer': {
+                'id': asset.customer.id,
+                'first_name': asset.customer.first_name,
+                'last_name': asset.customer.last_name,
+            },
+        }
+        for asset in assets
+    ]
@@ -9,6 +9,7 @@ import phonenumbers
 from phonenumbers import NumberParseException
 
 from core.mixins import TenantScopedMixin
+from core.pagination import KeysetPagination
 from .serializers import CustomerSerializer, LeadSerializer, AssetSerializer
 from .models import Customer, Asset, Lead
 from tasks.models import WorkItem
@@ -296,6 +297,10 @@ class CustomerAPISearchView(generics.ListAPIView):
 
 class CustomerViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
+    pagination_class = KeysetPagination
+    cursor_pagination_key = "customers"
+    # Customers have no creation timestamp; ids are allocated in insertion order
+    cursor_ordering = ("-id",)
 
     def get_queryset(self):
         user = self.request.user
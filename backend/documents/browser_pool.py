@@ -0,0 +1,169 @@
+"""
+Headless Chromium kept running between PDF renders.
+
+Starting Playwright and launching Chromium takes about a second and a burst of
+memory, so each process launches the browser once and renders every document in a
+fresh browser context (isolated cookies, storage and scripts; cheap to create):
+
+- Playwright runs on an asyncio loop in a background thread owned by the pool,
+  so renders can be requested from any thread and overlap in one browser.
+- At most ``PDF_RENDER_CONCURRENCY`` renders run at once; others wait for a slot.
+- After ``PDF_BROWSER_MAX_RENDERS`` renders the browser is replaced (the old one
+  closes once its renders finish), so leaks in a long-lived Chromium stay bounded.
+- When Chromium crashes the next render launches a new one; a render that was
+  cut off by the crash is retried once.
+
+Celery workers warm the pool up in each worker process (``documents.signals``),
+so the first document doesn't pay for the launch. Elsewhere (web processes,
+management commands) the browser is launched by the first render.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    def __init__(self, concurrency=None, max_renders=None, timeout=None):
+        def conf(name, value, default):
+            return value if value is not None else getattr(settings, name, default)
+
+        self.concurrency = conf('PDF_RENDER_CONCURRENCY', concurrency, 2)
+        self.max_renders = conf('PDF_BROWSER_MAX_RENDERS', max_renders, 200)
+        self.timeout = conf('PDF_RENDER_TIMEOUT', timeout, 30)
+        self.launches = 0
+        self.renders = 0
+        self._pid = os.getpid()
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_renders = 0
+        self._active = {}
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._launch_lock = asyncio.Lock()
+
+    def warm_up(self):
+        """Launch the browser in the background; returns straight away."""
+        future = self._submit(self._get_browser())
+        future.add_done_callback(self._log_warm_up)
+
+    def render(self, html, output_path, **pdf_options):
+        """Render ``html`` to a PDF at ``output_path`` (options as for Playwright's ``page.pdf()``)."""
+        self._submit(self._render(html, output_path, pdf_options)).result()
+
+    def close(self):
+        """Close the browser and stop the pool's thread."""
+        if self._loop is None or not self._thread.is_alive():
+            return
+        self._submit(self._close()).result(self.timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(self.timeout)
+
+    @staticmethod
+    def _log_warm_up(future):
+        if future.exception() is not None:
+            logger.error(f"Could not launch Chromium for PDF rendering: {future.exception()}")
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def _ensure_loop(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self._loop
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='pdf-browser-pool', daemon=True)
+                self._thread.start()
+        return self._loop
+
+    async def _get_browser(self):
+        async with self._launch_lock:
+            browser = self._browser
+            if browser is not None and browser.is_connected() and self._browser_renders < self.max_renders:
+                return browser
+            if browser is not None:
+                self._browser = None
+                if not self._active.get(browser):
+                    await self._close_browser(browser)
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+            browser = await self._playwright.chromium.launch(headless=True, timeout=self.timeout * 1000)
+            self._browser = browser
+            self._browser_renders = 0
+            self.launches += 1
+            logger.info(f"Launched Chromium {browser.version} for PDF rendering (pid {self._pid})")
+            return browser
+
+    async def _render(self, html, output_path, pdf_options):
+        async with self._slots:
+            for attempt in (1, 2):
+                browser = await self._get_browser()
+                self._browser_renders += 1
+                self._active[browser] = self._active.get(browser, 0) + 1
+                try:
+                    context = await browser.new_context()
+                    try:
+                        page = await context.new_page()
+                        page.set_default_timeout(self.timeout * 1000)
+                        await page.set_content(html, wait_until='networkidle')
+                        await page.pdf(path=output_path, **pdf_options)
+                    finally:
+                        with contextlib.suppress(Exception):
+                            await context.close()
+                    self.renders += 1
+                    return
+                except Exception:
+                    if browser.is_connected() or attempt == 2:
+                        raise
+                    logger.warning("Chromium went away during a PDF render, relaunching it")
+                finally:
+                    self._active[browser] -= 1
+                    if browser is not self._browser and not self._active[browser]:
+                        await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        self._active.pop(browser, None)
+        with contextlib.suppress(Exception):
+            await browser.close()
+
+    async def _close(self):
+        async with self._launch_lock:
+            if self._browser is not None:
+                await self._close_browser(self._browser)
+                self._browser = None
+            if self._playwright is not None:
+                with contextlib.suppress(Exception):
+                    await self._playwright.stop()
+                self._playwright = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The pool of this process (a forked child gets its own, not its parent's browser)."""
+    global _pool
+    if _pool is None or _pool._pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool._pid != os.getpid():
+                _pool = BrowserPool()
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool._pid == os.getpid():
+            _pool.close()
+        _pool = None
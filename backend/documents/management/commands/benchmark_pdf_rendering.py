@@ -0,0 +1,127 @@
+"""
+Management command measuring PDF rendering throughput at sustained load.
+
+Renders the default intake template (``documents/fixtures``) with the sample
+variables, ``--documents`` times from ``--concurrency`` threads, through a
+``BrowserPool`` like the Celery workers use. The browser is launched and one
+document rendered before the clock starts, so the numbers are the steady state.
+``--cold`` instead starts Playwright and Chromium for every document, as
+rendering did before the pool, for comparison.
+
+Usage:
+    python manage.py benchmark_pdf_rendering
+    python manage.py benchmark_pdf_rendering --documents=200 --concurrency=4
+    python manage.py benchmark_pdf_rendering --cold --documents=20 --output=pdf-cold.json
+"""
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.browser_pool import BrowserPool
+from documents.pdf_generator import get_sample_variables
+from documents.variables import replace_variables_in_html
+
+PDF_OPTIONS = {'format': 'A4', 'prefer_css_page_size': True, 'print_background': True}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _render_cold(html, output_path):
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_content(html, wait_until='networkidle')
+        page.pdf(path=output_path, **PDF_OPTIONS)
+        browser.close()
+
+
+class Command(BaseCommand):
+    help = 'Measure PDF rendering throughput (documents per second)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=50, help='Documents to render (default: 50)')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'PDF_RENDER_CONCURRENCY', 2),
+            help='Renders in flight at once (default: PDF_RENDER_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--max-renders',
+            type=int,
+            help='Renders per browser before it is relaunched (default: PDF_BROWSER_MAX_RENDERS)'
+        )
+        parser.add_argument('--cold', action='store_true', help='Launch a browser per document (no pool)')
+        parser.add_argument('--output', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['documents'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--documents and --concurrency must be at least 1')
+        template = os.path.join(settings.BASE_DIR, 'documents', 'fixtures', 'default_intake_template.html')
+        with open(template, encoding='utf-8') as f:
+            html = replace_variables_in_html(f.read(), get_sample_variables())
+
+        pool = None
+        startup = 0.0
+        with tempfile.TemporaryDirectory() as directory:
+            if options['cold']:
+                render = _render_cold
+            else:
+                pool = BrowserPool(concurrency=options['concurrency'], max_renders=options['max_renders'])
+
+                def render(html, output_path):
+                    pool.render(html, output_path, **PDF_OPTIONS)
+
+            def timed(n):
+                started = time.perf_counter()
+                render(html, os.path.join(directory, f'{n}.pdf'))
+                return time.perf_counter() - started
+
+            try:
+                if pool is not None:
+                    startup = timed('warm-up')
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                    latencies = list(executor.map(timed, range(options['documents'])))
+                elapsed = time.perf_counter() - started
+            except Exception as e:
+                raise CommandError(f'Rendering failed: {e}') from e
+            finally:
+                if pool is not None:
+                    pool.close()
+
+        result = {
+            'mode': 'cold' if options['cold'] else 'pool',
+            'documents': options['documents'],
+            'concurrency': options['concurrency'],
+            'seconds': round(elapsed, 3),
+            'documents_per_second': round(options['documents'] / elapsed, 2),
+            'latency_ms': {
+                'p50': round(statistics.median(latencies) * 1000, 1),
+                'p95': round(_percentile(latencies, 0.95) * 1000, 1),
+                'max': round(max(latencies) * 1000, 1),
+            },
+            'first_render_ms': round(startup * 1000, 1),
+            'browser_launches': pool.launches if pool else options['documents'],
+        }
+
+        self.stdout.write(
+            f"  {result['mode']}: {result['documents']} documents in {result['seconds']}s "
+            f"({result['documents_per_second']} docs/s), latency p50 {result['latency_ms']['p50']} ms, "
+            f"p95 {result['latency_ms']['p95']} ms, {result['browser_launches']} browser launch(es)"
+        )
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(result, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"\nWrote {options['output']}"))
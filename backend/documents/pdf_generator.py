@@ -1,14 +1,16 @@
 """
 PDF generation service using Playwright headless browser.
 Converts HTML templates to PDF files.
+
+The browser is shared by all renders of a process (see browser_pool).
 """
 import os
 import logging
 from pathlib import Path
 from datetime import datetime
 from django.conf import settings
-from playwright.sync_api import sync_playwright
 
+from .browser_pool import get_pool
 from .variables import get_template_variables, replace_variables_in_html
 
 logger = logging.getLogger(__name__)
@@ -102,7 +104,7 @@ def _build_file_path(tenant_id, form_type, work_item_ref, filename):
 
 def _generate_pdf_with_playwright(html_content, output_path):
     """
-    Generate PDF from HTML using Playwright's headless browser.
+    Generate PDF from HTML using the process's headless browser (see browser_pool).
 
     Args:
         html_content: HTML string to convert
@@ -112,31 +114,22 @@ def _generate_pdf_with_playwright(html_content, output_path):
         PDFGenerationError: If Playwright fails to generate PDF
     """
     try:
-        with sync_playwright() as p:
-            # Launch headless Chromium browser
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-
-            # Set HTML content
-            page.set_content(html_content, wait_until='networkidle')
-
-            # Generate PDF. Respect the template's own @page size when it declares
-            # one (e.g. A5); fall back to A4 for templates without @page rules.
-            # Templates control their own inner padding, so no extra page margin.
-            page.pdf(
-                path=output_path,
-                format='A4',  # fallback when template has no @page size
-                prefer_css_page_size=True,
-                print_background=True,  # Include background colors/images
-                margin={
-                    'top': '0',
-                    'bottom': '0',
-                    'left': '0',
-                    'right': '0'
-                }
-            )
-
-            browser.close()
+        # Respect the template's own @page size when it declares one (e.g. A5);
+        # fall back to A4 for templates without @page rules. Templates control
+        # their own inner padding, so no extra page margin.
+        get_pool().render(
+            html_content,
+            output_path,
+            format='A4',  # fallback when template has no @page size
+            prefer_css_page_size=True,
+            print_background=True,  # Include background colors/images
+            margin={
+                'top': '0',
+                'bottom': '0',
+                'left': '0',
+                'right': '0'
+            }
+        )
 
         logger.debug(f"PDF generated successfully at {output_path}")
 
@@ -1,7 +1,12 @@
 """
 Django signals for automatic form document generation.
+
+Celery worker processes also launch their PDF browser at boot and close it on
+shutdown (see browser_pool).
 """
 import logging
+from celery.signals import worker_process_init, worker_process_shutdown
+from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from tasks.models import WorkItem
@@ -70,3 +75,22 @@ def auto_generate_intake_form(sender, instance, created, **kwargs):
             f"Failed to queue intake form generation for work item {instance.reference_id}: {str(e)}",
             exc_info=True
         )
+
+
+@worker_process_init.connect
+def warm_up_pdf_browser(**kwargs):
+    """Launch Chromium in the background, so the first document doesn't wait for it."""
+    if getattr(settings, 'PDF_BROWSER_WARM_UP', True):
+        from .browser_pool import get_pool
+
+        get_pool().warm_up()
+
+
+@worker_process_shutdown.connect
+def close_pdf_browser(**kwargs):
+    from .browser_pool import close_pool
+
+    try:
+        close_pool()
+    except Exception as e:
+        logger.warning(f"Could not close the PDF browser: {str(e)}")
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import tempfile
+import types
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from documents.browser_pool import BrowserPool
+
+
+class FakeChromium:
+    """Stand-in for Playwright's Chromium launcher, recording what the pool does with its browsers."""
+
+    def __init__(self):
+        self.browsers = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser(self, crashable=not self.browsers)
+        self.browsers.append(browser)
+        return browser
+
+
+class FakeBrowser:
+    version = 'stand-in'
+
+    def __init__(self, chromium, crashable):
+        self.chromium = chromium
+        self.crashable = crashable
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        return FakeContext(self)
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakePage(self.browser)
+
+    async def close(self):
+        pass
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    async def set_content(self, html, wait_until=None):
+        chromium = self.browser.chromium
+        chromium.in_flight += 1
+        chromium.peak = max(chromium.peak, chromium.in_flight)
+        try:
+            await asyncio.sleep(0.005)
+        finally:
+            chromium.in_flight -= 1
+        if html == 'crash' and self.browser.crashable:
+            self.browser.connected = False
+            raise RuntimeError('Target closed')
+
+    async def pdf(self, path=None, **options):
+        with open(path, 'w') as f:
+            f.write('%PDF')
+
+
+class BrowserPoolTest(SimpleTestCase):
+    """The pool's browser bookkeeping, run against a stand-in for Playwright (no Chromium needed)."""
+
+    def setUp(self):
+        self.chromium = FakeChromium()
+        playwright = types.SimpleNamespace(chromium=self.chromium, stop=mock.AsyncMock())
+        starter = types.SimpleNamespace(start=mock.AsyncMock(return_value=playwright))
+        module = types.ModuleType('playwright.async_api')
+        module.async_playwright = lambda: starter
+        patcher = mock.patch.dict('sys.modules', {'playwright.async_api': module})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.pool = BrowserPool(concurrency=3, max_renders=10, timeout=5)
+        self.addCleanup(self.pool.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def render(self, n, html='<p>ok</p>'):
+        path = os.path.join(self.directory, f'{n}.pdf')
+        self.pool.render(html, path)
+        return path
+
+    def test_browser_is_reused_and_relaunched_after_max_renders(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            paths = list(executor.map(self.render, range(45)))
+
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+        self.assertEqual(self.pool.renders, 45)
+        self.assertEqual(self.pool.launches, 5)
+        self.assertLessEqual(self.chromium.peak, 3)
+        # Replaced browsers are closed once their renders are done
+        self.assertEqual([browser.closed for browser in self.chromium.browsers], [True] * 4 + [False])
+
+    def test_render_cut_off_by_a_crash_is_retried_on_a_new_browser(self):
+        with self.assertLogs('documents.browser_pool', 'WARNING'):
+            path = self.render('crashed', html='crash')
+
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(self.pool.launches, 2)
+        first, second = self.chromium.browsers
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+
+    def test_close_closes_the_browser_and_stops_the_thread(self):
+        self.render(1)
+        self.pool.close()
+
+        self.assertTrue(all(browser.closed for browser in self.chromium.browsers))
+        self.assertFalse(self.pool._thread.is_alive())
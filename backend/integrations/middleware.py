@@ -55,15 +55,24 @@ class APIKeyRequestLoggingMiddleware(MiddlewareMixin):
             request._api_log_body = None
 
     def process_response(self, request, response):
-        """Log the request if it was API key authenticated."""
+        """
+        Queue a log record if the request was API key authenticated.
+
+        Only raw data is captured here; parsing and the insert happen in
+        integrations.request_log's background writer.
+        """
         from core.models import APIKey
-        from integrations.models import IntegrationRequestLog
+        from integrations.request_log import PendingRequestLog, get_request_log_writer
 
         # Only log API key authenticated requests
         api_key = getattr(request, 'auth', None)
         if not isinstance(api_key, APIKey):
             return response
 
+        writer = get_request_log_writer()
+        if not writer.should_log(200 <= response.status_code < 400):
+            return response
+
         # Calculate response time
         start_time = getattr(request, '_api_log_start_time', None)
         response_time_ms = None
@@ -71,31 +80,6 @@ class APIKeyRequestLoggingMiddleware(MiddlewareMixin):
             response_time_ms = int((time.time() - start_time) * 1000)
 
         try:
-            # Get request body
-            raw_body = getattr(request, '_api_log_body', None)
-            try:
-                request_body = json.loads(raw_body) if raw_body else None
-            except (json.JSONDecodeError, UnicodeDecodeError, TypeError):
-                if raw_body:
-                    request_body = {'_raw': raw_body.decode('utf-8', errors='replace')[:1000]}
-                else:
-                    request_body = None
-
-            # Get response body
-            try:
-                if hasattr(response, 'data'):
-                    response_body = response.data
-                elif response.content:
-                    response_body = json.loads(response.content)
-                else:
-                    response_body = None
-            except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
-                response_body = None
-
-            # Truncate if needed
-            request_body, req_truncated = truncate_payload(request_body)
-            response_body, resp_truncated = truncate_payload(response_body)
-
             # Get headers
             request_headers = {}
             for key, value in request.META.items():
@@ -103,26 +87,19 @@ class APIKeyRequestLoggingMiddleware(MiddlewareMixin):
                     header_name = key[5:].replace('_', '-').title()
                     request_headers[header_name] = value
 
-            # Determine success
-            success = 200 <= response.status_code < 400
-
-            IntegrationRequestLog.objects.create(
-                tenant=api_key.tenant,
-                direction='inbound',
+            writer.submit(PendingRequestLog(
+                tenant_id=api_key.tenant_id,
+                api_key_id=api_key.pk,
                 method=request.method,
                 url=request.get_full_path(),
-                request_headers=sanitize_headers(request_headers),
-                request_body=request_body,
-                request_body_truncated=req_truncated,
-                response_status_code=response.status_code,
-                response_body=response_body,
-                response_body_truncated=resp_truncated,
-                success=success,
+                headers=request_headers,
+                raw_request_body=getattr(request, '_api_log_body', None),
+                status_code=response.status_code,
+                raw_response_body=None if response.streaming else response.content,
                 response_time_ms=response_time_ms,
-                api_key=api_key,
                 client_ip=self._get_client_ip(request),
                 user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            )
+            ))
 
         except Exception as e:
             logger.exception(f"Failed to log API request: {e}")
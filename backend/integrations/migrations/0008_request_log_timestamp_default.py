@@ -0,0 +1,19 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0007_customaction_include_record_details_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='integrationrequestlog',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0008_request_log_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tenantintegration',
+            name='event_type',
+            field=models.CharField(choices=[('workitem_created', 'WorkItem Created'), ('workitem_updated', 'WorkItem Updated'), ('workitem_status_changed', 'WorkItem Status Changed'), ('workitem_summary_requested', 'WorkItem Summary Requested'), ('workitem_bulk_updated', 'WorkItems Bulk Updated'), ('task_created', 'Task Created'), ('task_updated', 'Task Updated'), ('task_status_changed', 'Task Status Changed')], help_text='Which event triggers this integration', max_length=50),
+        ),
+    ]
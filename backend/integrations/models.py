@@ -2,6 +2,7 @@
 Integration models for tracking external system syncs (n8n, Notion, Slack, etc.)
 """
 from django.db import models
+from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from tenants.models import Tenant
@@ -24,6 +25,7 @@ class TenantIntegration(models.Model):
         ('workitem_updated', 'WorkItem Updated'),
         ('workitem_status_changed', 'WorkItem Status Changed'),
         ('workitem_summary_requested', 'WorkItem Summary Requested'),
+        ('workitem_bulk_updated', 'WorkItems Bulk Updated'),
         ('task_created', 'Task Created'),
         ('task_updated', 'Task Updated'),
         ('task_status_changed', 'Task Status Changed'),
@@ -189,7 +191,8 @@ class IntegrationRequestLog(models.Model):
     )
 
     # Timing
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Not auto_now_add: batched inbound logs carry the time the request was handled
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     response_time_ms = models.IntegerField(
         null=True,
         blank=True,
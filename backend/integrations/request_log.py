@@ -0,0 +1,200 @@
+"""
+Batched, asynchronous writer for inbound API request logs.
+
+``APIKeyRequestLoggingMiddleware`` only captures raw request/response data and hands
+it to ``RequestLogWriter.submit``. Decoding bodies, truncation and the database insert
+happen on a background thread that writes queued records with ``bulk_create``.
+
+Settings:
+    INTEGRATION_REQUEST_LOG_SUCCESS_SAMPLE_RATE: fraction of successful requests to
+        keep (failures are always kept). Default 1.0.
+    INTEGRATION_REQUEST_LOG_QUEUE_SIZE: maximum records waiting to be written. When
+        full, successful requests are dropped and failures are written synchronously.
+    INTEGRATION_REQUEST_LOG_BATCH_SIZE / INTEGRATION_REQUEST_LOG_FLUSH_INTERVAL:
+        flush when this many records are queued, or after this many seconds.
+    INTEGRATION_REQUEST_LOG_ASYNC: set to False to write from the calling thread on
+        ``flush()`` only (used by tests and management commands).
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingRequestLog:
+    """Raw data captured on the request thread; parsed only when written."""
+    tenant_id: int
+    api_key_id: int
+    method: str
+    url: str
+    headers: dict
+    raw_request_body: Optional[bytes]
+    status_code: int
+    raw_response_body: Optional[bytes] = None
+    response_time_ms: Optional[int] = None
+    client_ip: Optional[str] = None
+    user_agent: str = ''
+    timestamp: object = field(default_factory=timezone.now)
+
+    @property
+    def success(self):
+        return 200 <= self.status_code < 400
+
+
+def _decode_request_body(raw_body):
+    if not raw_body:
+        return None
+    try:
+        return json.loads(raw_body)
+    except (json.JSONDecodeError, UnicodeDecodeError, TypeError):
+        return {'_raw': raw_body.decode('utf-8', errors='replace')[:1000]}
+
+
+def _decode_response_body(raw_body):
+    if not raw_body:
+        return None
+    try:
+        return json.loads(raw_body)
+    except (json.JSONDecodeError, UnicodeDecodeError, TypeError):
+        return None
+
+
+def build_log(record):
+    """Turn a PendingRequestLog into an unsaved IntegrationRequestLog."""
+    from integrations.middleware import sanitize_headers, truncate_payload
+    from integrations.models import IntegrationRequestLog
+
+    request_body, req_truncated = truncate_payload(_decode_request_body(record.raw_request_body))
+    response_body, resp_truncated = truncate_payload(_decode_response_body(record.raw_response_body))
+    return IntegrationRequestLog(
+        tenant_id=record.tenant_id,
+        direction='inbound',
+        timestamp=record.timestamp,
+        method=record.method,
+        url=record.url,
+        request_headers=sanitize_headers(record.headers),
+        request_body=request_body,
+        request_body_truncated=req_truncated,
+        response_status_code=record.status_code,
+        response_body=response_body,
+        response_body_truncated=resp_truncated,
+        success=record.success,
+        response_time_ms=record.response_time_ms,
+        api_key_id=record.api_key_id,
+        client_ip=record.client_ip,
+        user_agent=record.user_agent,
+    )
+
+
+class RequestLogWriter:
+    def __init__(self, sample_rate=None, max_queue=None, batch_size=None,
+                 flush_interval=None, async_flush=None):
+        def conf(name, value, default):
+            return value if value is not None else getattr(settings, name, default)
+
+        self.sample_rate = conf('INTEGRATION_REQUEST_LOG_SUCCESS_SAMPLE_RATE', sample_rate, 1.0)
+        self.batch_size = conf('INTEGRATION_REQUEST_LOG_BATCH_SIZE', batch_size, 100)
+        self.flush_interval = conf('INTEGRATION_REQUEST_LOG_FLUSH_INTERVAL', flush_interval, 2.0)
+        self.async_flush = conf('INTEGRATION_REQUEST_LOG_ASYNC', async_flush, True)
+        self.queue = queue.Queue(maxsize=conf('INTEGRATION_REQUEST_LOG_QUEUE_SIZE', max_queue, 10000))
+        self.dropped = 0
+        self.sampled_out = 0
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def should_log(self, success):
+        """Sampling decision, made before any body is parsed."""
+        if not success or self.sample_rate >= 1:
+            return True
+        if random.random() < self.sample_rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def submit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.success:
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warning(f"Request log queue full, dropped {self.dropped} successful request logs so far")
+                return
+            # Never lose failures: write them directly, bypassing the queue.
+            self._write([record])
+            return
+
+        if self.async_flush:
+            self._ensure_thread()
+            if self.queue.qsize() >= self.batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of rows inserted."""
+        written = 0
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def _write(self, records):
+        from integrations.models import IntegrationRequestLog
+
+        try:
+            logs = [build_log(record) for record in records]
+            IntegrationRequestLog.objects.bulk_create(logs, batch_size=self.batch_size)
+            return len(logs)
+        except Exception as e:
+            logger.exception(f"Failed to write {len(records)} API request logs: {e}")
+            return 0
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='integration-request-log-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_request_log_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = RequestLogWriter()
+                atexit.register(_writer.flush)
+    return _writer
@@ -9,7 +9,7 @@ Events triggered:
 """
 import logging
 from django.db import transaction
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
 
@@ -18,26 +18,6 @@ from integrations.tasks import send_integration_webhook
 
 logger = logging.getLogger(__name__)
 
-# Store old values before save for comparison
-_task_old_values = {}
-
-
-@receiver(pre_save, sender=Task)
-def task_pre_save(sender, instance, **kwargs):
-    """
-    Store the old field values before save so we can detect changes.
-    This is similar to Trigger.old in Salesforce.
-    """
-    if instance.pk:  # Only for existing records
-        try:
-            old_instance = Task.objects.get(pk=instance.pk)
-            _task_old_values[instance.pk] = {
-                'status': old_instance.status,
-            }
-        except Task.DoesNotExist:
-            pass
-
-
 @receiver(post_save, sender=Task)
 def task_post_save(sender, instance, created, **kwargs):
     """
@@ -48,34 +28,30 @@ def task_post_save(sender, instance, created, **kwargs):
 
     # Determine the event type(s) to trigger
     events_to_trigger = []
+    changes = None
 
     if created:
         # New Task created
         events_to_trigger.append('task_created')
         logger.debug(f"Task {instance.pk} created, will trigger integration")
     else:
-        # Task updated - check for specific changes
-        old_values = _task_old_values.get(instance.pk, {})
-        old_status = old_values.get('status')
+        # Task updated - check for specific changes (values as loaded, see core.tracking)
+        old_status = instance.old_value('status')
 
         if old_status and old_status != instance.status:
             # Status changed - trigger specific status change event
             events_to_trigger.append('task_status_changed')
+            changes = {'status': {'old': old_status, 'new': instance.status}}
             logger.debug(
                 f"Task {instance.pk} status changed "
                 f"from {old_status} to {instance.status}, will trigger integration"
             )
 
         # Also trigger generic "task_updated" for ANY update
-        if old_values:  # Only if we have old values (meaning it's an actual update)
-            events_to_trigger.append('task_updated')
-            logger.debug(
-                f"Task {instance.pk} updated, will trigger integration"
-            )
-
-        # Clean up stored old values
-        if instance.pk in _task_old_values:
-            del _task_old_values[instance.pk]
+        events_to_trigger.append('task_updated')
+        logger.debug(
+            f"Task {instance.pk} updated, will trigger integration"
+        )
 
     # If no events to trigger, exit early
     if not events_to_trigger:
@@ -85,10 +61,10 @@ def task_post_save(sender, instance, created, **kwargs):
     # Schedule webhook calls on transaction commit
     # This ensures the database changes are persisted before calling external systems
     for event_type in events_to_trigger:
-        transaction.on_commit(lambda et=event_type: trigger_task_integrations(instance, et))
+        transaction.on_commit(lambda et=event_type: trigger_task_integrations(instance, et, changes))
 
 
-def trigger_task_integrations(task, event_type):
+def trigger_task_integrations(task, event_type, changes=None):
     """
     Find all active integrations for this tenant and event type,
     then enqueue Celery tasks to call them.
@@ -118,7 +94,7 @@ def trigger_task_integrations(task, event_type):
     )
 
     # Build the payload to send to the webhook
-    payload = build_task_payload(task, event_type)
+    payload = build_task_payload(task, event_type, changes)
 
     # Get ContentType for Task
     content_type = ContentType.objects.get_for_model(Task)
@@ -143,13 +119,14 @@ def trigger_task_integrations(task, event_type):
             )
 
 
-def build_task_payload(task, event_type):
+def build_task_payload(task, event_type, changes=None):
     """
     Build the JSON payload to send to the integration webhook.
 
     Args:
         task: Task instance
         event_type: Event type (task_created, task_status_changed, etc.)
+        changes: Old/new field values captured at save time, e.g. {'status': {'old': ..., 'new': ...}}
 
     Returns:
         Dict containing the payload data
@@ -197,13 +174,7 @@ def build_task_payload(task, event_type):
     }
 
     # Add event-specific data
-    if event_type == 'task_status_changed':
-        old_values = _task_old_values.get(task.pk, {})
-        payload['changes'] = {
-            'status': {
-                'old': old_values.get('status'),
-                'new': task.status,
-            }
-        }
+    if event_type == 'task_status_changed' and changes:
+        payload['changes'] = changes
 
     return payload
@@ -5,10 +5,11 @@ Follows Salesforce TriggerHandler pattern - all WorkItem integration logic in on
 Events triggered:
 - workitem_created: When a new WorkItem is created
 - workitem_status_changed: When WorkItem.status field changes
+- workitem_bulk_updated: Once per bulk change (see tasks.bulk), listing every changed item
 """
 import logging
 from django.db import transaction
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
 
@@ -17,26 +18,6 @@ from integrations.tasks import send_integration_webhook
 
 logger = logging.getLogger(__name__)
 
-# Store old values before save for comparison
-_workitem_old_values = {}
-
-
-@receiver(pre_save, sender=WorkItem)
-def workitem_pre_save(sender, instance, **kwargs):
-    """
-    Store the old field values before save so we can detect changes.
-    This is similar to Trigger.old in Salesforce.
-    """
-    if instance.pk:  # Only for existing records
-        try:
-            old_instance = WorkItem.objects.get(pk=instance.pk)
-            _workitem_old_values[instance.pk] = {
-                'status': old_instance.status,
-            }
-        except WorkItem.DoesNotExist:
-            pass
-
-
 @receiver(post_save, sender=WorkItem)
 def workitem_post_save(sender, instance, created, **kwargs):
     """
@@ -47,35 +28,30 @@ def workitem_post_save(sender, instance, created, **kwargs):
 
     # Determine the event type(s) to trigger
     events_to_trigger = []
+    changes = None
 
     if created:
         # New WorkItem created
         events_to_trigger.append('workitem_created')
         logger.debug(f"WorkItem {instance.reference_id} created, will trigger integration")
     else:
-        # WorkItem updated - check for specific changes
-        old_values = _workitem_old_values.get(instance.pk, {})
-        old_status = old_values.get('status')
+        # WorkItem updated - check for specific changes (values as loaded, see core.tracking)
+        old_status = instance.old_value('status')
 
         if old_status and old_status != instance.status:
             # Status changed - trigger specific status change event
             events_to_trigger.append('workitem_status_changed')
+            changes = {'status': {'old': old_status, 'new': instance.status}}
             logger.debug(
                 f"WorkItem {instance.reference_id} status changed "
                 f"from {old_status} to {instance.status}, will trigger integration"
             )
 
-        # Also trigger generic "workitem_updated" for ANY update (if not already created)
-        # This allows users to subscribe to all updates regardless of which field changed
-        if old_values:  # Only if we have old values (meaning it's an actual update)
-            events_to_trigger.append('workitem_updated')
-            logger.debug(
-                f"WorkItem {instance.reference_id} updated, will trigger integration"
-            )
-
-        # Clean up stored old values
-        if instance.pk in _workitem_old_values:
-            del _workitem_old_values[instance.pk]
+        # Also trigger generic "workitem_updated" for ANY update
+        events_to_trigger.append('workitem_updated')
+        logger.debug(
+            f"WorkItem {instance.reference_id} updated, will trigger integration"
+        )
 
     # If no events to trigger, exit early
     if not events_to_trigger:
@@ -85,10 +61,10 @@ def workitem_post_save(sender, instance, created, **kwargs):
     # Schedule webhook calls on transaction commit
     # This ensures the database changes are persisted before calling external systems
     for event_type in events_to_trigger:
-        transaction.on_commit(lambda et=event_type: trigger_workitem_integrations(instance, et))
+        transaction.on_commit(lambda et=event_type: trigger_workitem_integrations(instance, et, changes))
 
 
-def trigger_workitem_integrations(workitem, event_type):
+def trigger_workitem_integrations(workitem, event_type, changes=None):
     """
     Find all active integrations for this tenant and event type,
     then enqueue Celery tasks to call them.
@@ -118,7 +94,7 @@ def trigger_workitem_integrations(workitem, event_type):
     )
 
     # Build the payload to send to the webhook
-    payload = build_workitem_payload(workitem, event_type)
+    payload = build_workitem_payload(workitem, event_type, changes)
 
     # Get ContentType for WorkItem
     content_type = ContentType.objects.get_for_model(WorkItem)
@@ -143,7 +119,68 @@ def trigger_workitem_integrations(workitem, event_type):
             )
 
 
-def build_workitem_payload(workitem, event_type):
+def trigger_workitem_bulk_integrations(tenant_id, entries, changed_by=None):
+    """
+    Enqueue one ``workitem_bulk_updated`` webhook per active integration for a bulk change.
+
+    Called inside transaction.on_commit() by ``tasks.bulk.bulk_update_work_items``.
+
+    Args:
+        tenant_id: Tenant of the changed work items
+        entries: [{'id', 'reference_id', 'changes'}] for every changed work item
+        changed_by: Id of the user who made the change, if any
+    """
+    from django.utils.timezone import now
+    from integrations.models import TenantIntegration
+
+    event_type = 'workitem_bulk_updated'
+    integrations = list(TenantIntegration.objects.select_related('tenant').filter(
+        tenant_id=tenant_id,
+        event_type=event_type,
+        is_active=True
+    ))
+
+    if not integrations or not entries:
+        logger.debug(f"No active integrations found for tenant {tenant_id} and event {event_type}")
+        return
+
+    tenant = integrations[0].tenant
+    payload = {
+        'event_type': event_type,
+        'timestamp': now().isoformat(),
+        'tenant': {
+            'id': tenant.id,
+            'name': tenant.name,
+        },
+        'changed_by': changed_by,
+        'count': len(entries),
+        'workitems': entries,
+    }
+
+    logger.info(
+        f"Triggering {len(integrations)} integration(s) for a bulk change of "
+        f"{len(entries)} WorkItem(s)"
+    )
+
+    content_type = ContentType.objects.get_for_model(WorkItem)
+
+    # The sync record needs an object; the batch is filed under its first work item
+    for integration in integrations:
+        try:
+            send_integration_webhook.delay(
+                integration_id=integration.id,
+                content_type_id=content_type.id,
+                object_id=entries[0]['id'],
+                event_type=event_type,
+                payload=payload
+            )
+        except Exception as exc:
+            logger.exception(
+                f"Failed to enqueue webhook task for integration {integration.name}: {exc}"
+            )
+
+
+def build_workitem_payload(workitem, event_type, changes=None):
     """
     Build the JSON payload to send to the integration webhook.
     Customize this based on what data your integrations need.
@@ -151,6 +188,7 @@ def build_workitem_payload(workitem, event_type):
     Args:
         workitem: WorkItem instance
         event_type: Event type (workitem_created, workitem_status_changed, etc.)
+        changes: Old/new field values captured at save time, e.g. {'status': {'old': ..., 'new': ...}}
 
     Returns:
         Dict containing the payload data
@@ -238,14 +276,8 @@ def build_workitem_payload(workitem, event_type):
     }
 
     # Add event-specific data
-    if event_type == 'workitem_status_changed':
-        old_values = _workitem_old_values.get(workitem.pk, {})
-        payload['changes'] = {
-            'status': {
-                'old': old_values.get('status'),
-                'new': workitem.status,
-            }
-        }
+    if event_type == 'workitem_status_changed' and changes:
+        payload['changes'] = changes
 
     return payload
 
@@ -0,0 +1,68 @@
+from django.test import TestCase
+
+from core.models import APIKey, Role
+from integrations.models import IntegrationRequestLog
+from integrations.request_log import PendingRequestLog, RequestLogWriter
+from tenants.models import Tenant
+
+
+class RequestLogWriterTest(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Logs", subdomain="logs")
+        role = Role.objects.create(tenant=self.tenant, name="Integration")
+        _, prefix, key_hash = APIKey.generate_key()
+        self.api_key = APIKey.objects.create(
+            tenant=self.tenant, role=role, name="n8n", prefix=prefix, key_hash=key_hash
+        )
+
+    def record(self, status_code=200, body=b'{"ok": true}'):
+        return PendingRequestLog(
+            tenant_id=self.tenant.pk,
+            api_key_id=self.api_key.pk,
+            method="POST",
+            url="/api/tasks/work-items/",
+            headers={"Authorization": "Bearer sk_live_secret", "User-Agent": "n8n"},
+            raw_request_body=b'{"summary": "Screen"}',
+            status_code=status_code,
+            raw_response_body=body,
+        )
+
+    def test_queued_records_are_bulk_written_on_flush(self):
+        writer = RequestLogWriter(async_flush=False, batch_size=2)
+        for status_code in (200, 201, 500):
+            writer.submit(self.record(status_code))
+        self.assertEqual(IntegrationRequestLog.objects.count(), 0)
+
+        self.assertEqual(writer.flush(), 3)
+        logs = IntegrationRequestLog.objects.order_by("response_status_code")
+        self.assertEqual([log.success for log in logs], [True, True, False])
+        self.assertEqual(logs[0].request_body, {"summary": "Screen"})
+        self.assertEqual(logs[0].response_body, {"ok": True})
+        self.assertEqual(logs[0].request_headers["Authorization"], "[REDACTED]")
+        self.assertEqual(logs[0].direction, "inbound")
+
+    def test_sampling_keeps_all_failures(self):
+        writer = RequestLogWriter(async_flush=False, sample_rate=0)
+        self.assertFalse(writer.should_log(success=True))
+        self.assertTrue(writer.should_log(success=False))
+        self.assertEqual(writer.sampled_out, 1)
+
+    def test_full_queue_drops_successes_but_writes_failures(self):
+        writer = RequestLogWriter(async_flush=False, max_queue=1)
+        writer.submit(self.record(200))
+        writer.submit(self.record(200))
+        writer.submit(self.record(502))
+        self.assertEqual(writer.dropped, 1)
+        # The failure bypassed the full queue and was written immediately.
+        self.assertEqual(IntegrationRequestLog.objects.filter(success=False).count(), 1)
+
+        writer.flush()
+        self.assertEqual(IntegrationRequestLog.objects.count(), 2)
+
+    def test_non_json_request_body_is_kept_raw(self):
+        writer = RequestLogWriter(async_flush=False)
+        record = self.record()
+        record.raw_request_body = b"name=value"
+        writer.submit(record)
+        writer.flush()
+        self.assertEqual(IntegrationRequestLog.objects.get().request_body, {"_raw": "name=value"})
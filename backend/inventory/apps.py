@@ -6,4 +6,5 @@ class InventoryConfig(AppConfig):
     name = 'inventory'
 
     def ready(self):
+        import inventory.search  # noqa: F401
         import inventory.signals  # noqa: F401
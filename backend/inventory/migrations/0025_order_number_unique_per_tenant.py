@@ -0,0 +1,24 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0024_alter_category_managers'),
+        ('tasks', '0041_task_reference_id'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='order_number',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='purchaseorder',
+            constraint=models.UniqueConstraint(fields=('tenant', 'order_number'), name='unique_order_number_per_tenant'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0025_order_number_unique_per_tenant'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['tenant', 'transaction_date', 'id'], name='inventory_i_tenant__9704d7_idx'),
+        ),
+    ]
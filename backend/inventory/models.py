@@ -1,6 +1,8 @@
 from django.db import models
 from mptt.models import MPTTModel, TreeForeignKey
 from service.models import Location
+from core.sequences import claim_reference, next_reference
+from core.tracking import ChangeTrackingMixin
 from tenants.models import TenantModelMixin
 
 UNIT_CHOICES = [
@@ -40,7 +42,7 @@ class Category(TenantModelMixin, MPTTModel):
         return self.name
 
 
-class Device(models.Model):
+class Device(ChangeTrackingMixin, models.Model):
     model = models.CharField(max_length=255, blank=True, null=True)
     manufacturer = models.CharField(max_length=255, blank=True, null=True)
     category = models.ForeignKey(Category, blank=True, null=True, on_delete=models.SET_NULL)
@@ -98,7 +100,7 @@ class PurchaseOrder(TenantModelMixin):
         (COMPLETED, 'Completed'),
     ]
 
-    order_number = models.CharField(max_length=50, unique=True, null=True, blank=True)
+    order_number = models.CharField(max_length=50, null=True, blank=True)
     order_date = models.DateField(auto_now_add=True)
     order_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     tracking_number = models.CharField(max_length=50, null=True, blank=True)
@@ -106,9 +108,22 @@ class PurchaseOrder(TenantModelMixin):
     supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True, related_name='purchase_orders')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=DRAFT)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'order_number'], name='unique_order_number_per_tenant'),
+        ]
+
     def __str__(self):
         return self.order_number or f"PO-{self.pk}"
 
+    def save(self, *args, **kwargs):
+        if not self.order_number:
+            self.order_number = next_reference(self.tenant_id, "PO-")
+        else:
+            # A number typed in ahead of the counter must not be handed out again
+            claim_reference(self.tenant_id, "PO-", self.order_number)
+        super().save(*args, **kwargs)
+
 
 class PurchaseOrderItem(TenantModelMixin):
     purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='line_items')
@@ -152,6 +167,11 @@ class InventoryTransaction(TenantModelMixin):
     purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.SET_NULL, blank=True, null=True, related_name='inventory_transactions')
     work_item = models.ForeignKey('tasks.WorkItem', on_delete=models.SET_NULL, blank=True, null=True, related_name='inventory_transactions')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'transaction_date', 'id']),
+        ]
+
 
 class InventoryBalance(TenantModelMixin):
     inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='inventory_balances')
@@ -0,0 +1,26 @@
+"""Inventory items in the search index (see ``core.search``)."""
+from core import search
+from .models import InventoryItem
+
+
+def inventory_item_document(item):
+    return item.name, item.sku, item.description
+
+
+def inventory_item_search_results(tenant, ids):
+    """Serialized global search results of the inventory items with ``ids``."""
+    items = InventoryItem.objects.filter(tenant=tenant, pk__in=ids).select_related('category')
+    return [
+        {
+            'id': item.id,
+            'name': item.name,
+            'sku': item.sku,
+            'type': item.type,
+            'quantity_unit': item.quantity_unit,
+            'category': item.category.name if item.category else None,
+        }
+        for item in items
+    ]
+
+
+search.register('inventory_item', InventoryItem, inventory_item_document, results=inventory_item_search_results)
@@ -12,6 +12,7 @@ import django_filters
 from django_filters.rest_framework import DjangoFilterBackend
 
 from core.mixins import TenantScopedMixin
+from core.pagination import KeysetPagination
 from core.views import BaseListView
 from core.utils import build_table_data
 from tasks.models import WorkItem
@@ -75,6 +76,9 @@ class InventoryTransactionViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     filterset_fields = ['inventory_item', 'inventory_list', 'transaction_type', 'work_item']
     ordering_fields = ['transaction_date']
     ordering = ['-transaction_date']
+    pagination_class = KeysetPagination
+    cursor_pagination_key = 'inventory-transactions'
+    cursor_ordering = ('-transaction_date', '-id')
 
 
 class WorkItemPartsView(APIView):
@@ -2,7 +2,7 @@ from django.contrib import admin
 
 from core.admin_mixins import TenantAwareImportExportAdmin
 
-from .models import CashRegister, CashTransaction, Employee, Location, RepairShop
+from .models import CashRegister, CashRegisterClosing, CashTransaction, Employee, Location, RepairShop
 
 
 @admin.register(RepairShop)
@@ -44,3 +44,11 @@ class CashTransactionAdmin(TenantAwareImportExportAdmin):
     search_fields = ('description', 'register__name')
     autocomplete_fields = ['tenant', 'register', 'work_item', 'performed_by']
     readonly_fields = ('created_at',)
+
+
+@admin.register(CashRegisterClosing)
+class CashRegisterClosingAdmin(TenantAwareImportExportAdmin):
+    list_display = ('register', 'closed_at', 'transaction_count', 'transactions_total', 'closed_by', 'tenant')
+    list_filter = ('tenant',)
+    search_fields = ('register__name',)
+    autocomplete_fields = ['tenant', 'register', 'closed_by']
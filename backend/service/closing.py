@@ -0,0 +1,199 @@
+"""
+Cash register closings and historical balances.
+
+``close_register`` writes a ``CashRegisterClosing`` checkpoint with the totals per
+transaction type since the previous one; ``close_registers`` does it for every active
+register of a tenant (the nightly ``service.tasks.close_cash_registers`` run, or
+``manage.py close_cash_registers``). Registers can also be closed per shift through
+``POST /api/service/cash-registers/<id>/close/``.
+
+With checkpoints in place, "balance of register X at time t" is the latest
+checkpoint at or before t plus the transactions between the two, instead of a SUM
+over the register's whole history. ``balances_at`` answers it for many registers
+in one query. ``period_report`` returns per-register, per-period totals by type
+from one grouped query over the requested range.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+from .models import CashRegister, CashRegisterClosing, CashTransaction, CashTransactionType
+
+ZERO = Decimal('0.00')
+
+# CashTransactionType -> CashRegisterClosing / report field
+TYPE_FIELDS = {
+    CashTransactionType.DEPOSIT: 'deposits',
+    CashTransactionType.WITHDRAWAL: 'withdrawals',
+    CashTransactionType.TRANSFER_IN: 'transfers_in',
+    CashTransactionType.TRANSFER_OUT: 'transfers_out',
+    CashTransactionType.ADJUSTMENT: 'adjustments',
+}
+
+PERIODS = ('day', 'week', 'month')
+
+# Lower bound for registers that were never closed
+EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _amount_field():
+    return DecimalField(max_digits=14, decimal_places=2)
+
+
+def start_of_day(day):
+    """Aware start of ``day`` in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def close_register(register, until=None, closed_by=None):
+    """
+    Write the checkpoint of ``register`` at ``until`` (default now) and return it.
+
+    Covers the transactions created after the previous closing up to and including
+    ``until``. Raises ValueError when ``until`` is in the future or not after the
+    previous closing.
+    """
+    now = timezone.now()
+    until = until or now
+    if until > now:
+        raise ValueError("Cannot close a register in the future.")
+
+    with transaction.atomic():
+        # Serializes closings of the register with each other and with postings
+        CashRegister.lock(register.pk)
+        previous = register.closings.order_by('-closed_at').first()
+        if previous and until <= previous.closed_at:
+            raise ValueError(f"Register is already closed up to {previous.closed_at.isoformat()}.")
+
+        period = CashTransaction.objects.filter(register=register, created_at__lte=until)
+        if previous:
+            period = period.filter(created_at__gt=previous.closed_at)
+        totals = {field: ZERO for field in TYPE_FIELDS.values()}
+        count = 0
+        for row in period.order_by().values('transaction_type').annotate(total=Sum('amount'), n=Count('id')):
+            field = TYPE_FIELDS.get(row['transaction_type'])
+            if field:
+                totals[field] = row['total'] or ZERO
+            count += row['n']
+
+        return CashRegisterClosing.objects.create(
+            tenant_id=register.tenant_id,
+            register=register,
+            period_start=previous.closed_at if previous else None,
+            closed_at=until,
+            transaction_count=count,
+            transactions_total=(previous.transactions_total if previous else ZERO) + sum(totals.values()),
+            closed_by=closed_by,
+            **totals,
+        )
+
+
+def close_registers(tenant, until=None, closed_by=None):
+    """
+    Close every active register of ``tenant`` at ``until`` (default: start of today).
+
+    Registers already closed up to ``until`` are skipped, so running it twice (or
+    after a per-shift close) is harmless. Returns the new closings.
+    """
+    until = until or start_of_day(timezone.localdate())
+    registers = CashRegister.objects.filter(tenant=tenant, is_active=True).annotate(
+        last_closed_at=Subquery(
+            CashRegisterClosing.objects.filter(register=OuterRef('pk'))
+            .order_by('-closed_at').values('closed_at')[:1]
+        )
+    ).order_by('pk')
+    return [
+        close_register(register, until, closed_by)
+        for register in registers
+        if register.last_closed_at is None or register.last_closed_at < until
+    ]
+
+
+def balances_at(registers, when):
+    """
+    {register id: balance at ``when``} for a queryset of registers, in one query.
+
+    Each balance is the opening balance, plus the running total of the latest
+    closing at or before ``when``, plus the transactions after that closing.
+    """
+    checkpoints = CashRegisterClosing.objects.filter(
+        register=OuterRef('pk'), closed_at__lte=when
+    ).order_by('-closed_at')
+    since = CashTransaction.objects.filter(
+        register=OuterRef('pk'),
+        created_at__gt=Coalesce(OuterRef('checkpoint_at'), Value(EPOCH)),
+        created_at__lte=when,
+    ).order_by().values('register').annotate(total=Sum('amount')).values('total')
+
+    rows = registers.annotate(
+        checkpoint_at=Subquery(checkpoints.values('closed_at')[:1]),
+        checkpoint_total=Coalesce(
+            Subquery(checkpoints.values('transactions_total')[:1]), Value(ZERO), output_field=_amount_field()
+        ),
+        since_checkpoint=Coalesce(Subquery(since), Value(ZERO), output_field=_amount_field()),
+    ).values_list('pk', 'opening_balance', 'checkpoint_total', 'since_checkpoint')
+    return {
+        pk: opening + checkpoint_total + since_checkpoint
+        for pk, opening, checkpoint_total, since_checkpoint in rows
+    }
+
+
+def period_report(tenant, start, end, period='day', shop=None):
+    """
+    Totals per register and ``period`` ('day', 'week' or 'month') for [start, end).
+
+    The totals of all registers come from one grouped query; the opening and
+    closing balances of each register from two more (see ``balances_at``).
+    """
+    registers = CashRegister.objects.filter(tenant=tenant).select_related('shop').order_by('shop__name', 'name')
+    if shop is not None:
+        registers = registers.filter(shop=shop)
+
+    grouped = (
+        CashTransaction.objects.filter(
+            tenant=tenant, register__in=registers.values('pk'), created_at__gte=start, created_at__lt=end
+        )
+        .annotate(period=Trunc('created_at', period, tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values('register_id', 'period', 'transaction_type')
+        .annotate(total=Sum('amount'), n=Count('id'))
+    )
+    periods = {}
+    for row in grouped:
+        key = (row['register_id'], _period_key(row['period']))
+        entry = periods.setdefault(key, {
+            'period': key[1], 'transaction_count': 0, 'net': ZERO,
+            **{field: ZERO for field in TYPE_FIELDS.values()},
+        })
+        field = TYPE_FIELDS.get(row['transaction_type'])
+        if field:
+            entry[field] += row['total'] or ZERO
+        entry['net'] += row['total'] or ZERO
+        entry['transaction_count'] += row['n']
+
+    opening = balances_at(registers, start - timedelta(microseconds=1))
+    closing = balances_at(registers, end - timedelta(microseconds=1))
+    return [
+        {
+            'register': register.pk,
+            'register_name': register.name,
+            'shop': register.shop_id,
+            'shop_name': register.shop.name,
+            'opening_balance': opening.get(register.pk, ZERO),
+            'closing_balance': closing.get(register.pk, ZERO),
+            'periods': sorted(
+                (entry for (register_id, _), entry in periods.items() if register_id == register.pk),
+                key=lambda entry: entry['period'],
+            ),
+        }
+        for register in registers
+    ]
+
+
+def _period_key(value):
+    """ISO date of the first day of a truncated period."""
+    return timezone.localtime(value).date().isoformat()
@@ -0,0 +1,64 @@
+"""
+Management command to write cash register closing checkpoints.
+
+The nightly ``service.tasks.close_cash_registers`` task closes every active register
+at the start of the day. Use this command to close registers by hand, or to create
+the first checkpoints of a register with a long history, one day at a time.
+
+Usage:
+    python manage.py close_cash_registers
+    python manage.py close_cash_registers --tenant=acme
+    python manage.py close_cash_registers --date=2026-01-31 --days=31
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from service.closing import close_registers, start_of_day
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Close active cash registers at the start of a day (default: today)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Only close registers of this tenant subdomain'
+        )
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            help='Close at the start of this day (YYYY-MM-DD, default: today)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=1,
+            help='Also close at the start of each of the preceding days, oldest first'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all().order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(subdomain=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        last_day = options['date'] or timezone.localdate()
+        days = [last_day - timedelta(days=n) for n in reversed(range(max(options['days'], 1)))]
+
+        total = 0
+        for tenant in tenants:
+            closed = 0
+            for day in days:
+                try:
+                    closed += len(close_registers(tenant, until=start_of_day(day)))
+                except ValueError as exc:
+                    raise CommandError(str(exc))
+            total += closed
+            self.stdout.write(f'  {tenant.subdomain}: {closed} closing(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'\nWrote {total} closing(s)'))
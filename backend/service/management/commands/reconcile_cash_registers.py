@@ -0,0 +1,66 @@
+"""
+Management command to verify the cash register running totals against their transactions.
+
+``CashRegister.transactions_total`` is moved by signals as each transaction is
+posted; changes that bypass them (``QuerySet.update()``, bulk inserts, raw SQL,
+restores) leave it out of step with ``SUM(amount)``. Without ``--fix`` the command
+only reports drift (and exits with an error if any is found, for use in cron or CI).
+
+Usage:
+    python manage.py reconcile_cash_registers
+    python manage.py reconcile_cash_registers --tenant=acme
+    python manage.py reconcile_cash_registers --fix
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from service.models import CashRegister, summed_transactions_total
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Verify (and with --fix repair) cash register running totals against their transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Only reconcile registers of this tenant subdomain'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Reset drifted running totals to the sum of their transactions'
+        )
+
+    def handle(self, *args, **options):
+        registers = CashRegister.objects.select_related('tenant').order_by('pk')
+        if options['tenant']:
+            if not Tenant.objects.filter(subdomain=options['tenant']).exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+            registers = registers.filter(tenant__subdomain=options['tenant'])
+
+        drifted = [
+            register for register in registers.annotate(summed=summed_transactions_total())
+            if register.transactions_total != register.summed
+        ]
+        for register in drifted:
+            self.stdout.write(
+                f'  {register.tenant.subdomain}: register {register.pk} ({register.name}) '
+                f'total {register.transactions_total} != sum {register.summed}'
+            )
+            if options['fix']:
+                self.repair(register.pk)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All register totals match their transactions'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'\nRepaired {len(drifted)} register(s)'))
+        else:
+            raise CommandError(f'{len(drifted)} register(s) out of step; run with --fix to repair')
+
+    def repair(self, register_id):
+        with transaction.atomic():
+            # Locked first so no transaction can be posted between the SUM and the write
+            CashRegister.lock(register_id)
+            CashRegister.objects.filter(pk=register_id).update(transactions_total=summed_transactions_total())
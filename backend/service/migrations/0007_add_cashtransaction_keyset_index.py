@@ -0,0 +1,19 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0006_cashregister_cashtransaction'),
+        ('tasks', '0041_task_reference_id'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cashtransaction',
+            index=models.Index(fields=['tenant', 'created_at', 'id'], name='service_cas_tenant__f47bcc_idx'),
+        ),
+    ]
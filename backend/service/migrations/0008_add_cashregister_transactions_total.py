@@ -0,0 +1,36 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:02
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_transactions_total(apps, _schema_editor):
+    CashRegister = apps.get_model('service', 'CashRegister')
+    CashTransaction = apps.get_model('service', 'CashTransaction')
+    totals = (
+        CashTransaction.objects.filter(register=OuterRef('pk'))
+        .order_by().values('register').annotate(total=Sum('amount')).values('total')
+    )
+    CashRegister.objects.update(
+        transactions_total=Coalesce(
+            Subquery(totals), Value(Decimal('0.00')), output_field=models.DecimalField(max_digits=14, decimal_places=2)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0007_add_cashtransaction_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashregister',
+            name='transactions_total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.RunPython(backfill_transactions_total, migrations.RunPython.noop),
+    ]
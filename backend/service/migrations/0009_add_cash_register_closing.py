@@ -0,0 +1,43 @@
+# Generated by Django 5.0.10 on 2026-10-17 02:06
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0008_add_cashregister_transactions_total'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CashRegisterClosing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField(blank=True, null=True)),
+                ('closed_at', models.DateTimeField()),
+                ('deposits', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('withdrawals', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('transfers_in', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('transfers_out', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('adjustments', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('transactions_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cash_register_closings', to='service.employee')),
+                ('register', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='closings', to='service.cashregister')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+            ],
+            options={
+                'ordering': ['register', '-closed_at'],
+                'indexes': [models.Index(fields=['tenant', 'closed_at'], name='service_cas_tenant__d37638_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='cashregisterclosing',
+            constraint=models.UniqueConstraint(fields=('register', 'closed_at'), name='unique_register_closing'),
+        ),
+    ]
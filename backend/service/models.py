@@ -1,10 +1,12 @@
 from decimal import Decimal
 
 from django.core.validators import MinValueValidator
-from django.db import models
-from django.db.models import Sum, TextChoices
+from django.db import models, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, TextChoices, Value
+from django.db.models.functions import Coalesce
 
 from core.models import User, Address
+from core.tracking import ChangeTrackingMixin
 from tenants.models import Tenant
 
 class RepairShopType(models.TextChoices):
@@ -95,6 +97,14 @@ class CashRegister(models.Model):
     )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Running sum of the register's transaction amounts, moved by service.signals
+    # as each CashTransaction is posted; see reconcile_cash_registers.
+    transactions_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+    )
 
     class Meta:
         unique_together = [("tenant", "shop", "name")]
@@ -103,10 +113,39 @@ class CashRegister(models.Model):
     def __str__(self):
         return f"{self.shop.name} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        # The running total is only moved by post(); writing back the value this
+        # instance was loaded with would undo transactions posted since.
+        if not self._state.adding and self.pk:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields if not field.primary_key
+                ]
+            kwargs['update_fields'] = [name for name in update_fields if name != 'transactions_total']
+        super().save(*args, **kwargs)
+
     @property
     def current_balance(self):
-        result = self.transactions.aggregate(total=Sum('amount'))
-        return (result['total'] or Decimal('0.00')) + self.opening_balance
+        return self.opening_balance + self.transactions_total
+
+    @classmethod
+    def lock(cls, *pks):
+        """
+        Lock register rows until the end of the current transaction and return them by id.
+
+        Balances read from the returned instances cannot change before commit, so an
+        overdraft check followed by a withdrawal is race-free. Rows are locked in id
+        order so two transactions locking the same registers cannot deadlock.
+        """
+        registers = cls.objects.select_for_update().filter(pk__in=pks).order_by('pk')
+        return {register.pk: register for register in registers}
+
+    @classmethod
+    def post(cls, register_id, amount):
+        """Move the running total of ``register_id`` by ``amount`` (locks the row until commit)."""
+        if register_id and amount:
+            cls.objects.filter(pk=register_id).update(transactions_total=F('transactions_total') + amount)
 
 
 class CashTransactionType(models.TextChoices):
@@ -117,7 +156,7 @@ class CashTransactionType(models.TextChoices):
     ADJUSTMENT = "adjustment", "Adjustment"
 
 
-class CashTransaction(models.Model):
+class CashTransaction(ChangeTrackingMixin, models.Model):
     tenant = models.ForeignKey("tenants.Tenant", on_delete=models.CASCADE)
     register = models.ForeignKey(
         CashRegister,
@@ -159,6 +198,7 @@ class CashTransaction(models.Model):
         indexes = [
             models.Index(fields=['tenant', 'register', 'created_at']),
             models.Index(fields=['work_item']),
+            models.Index(fields=['tenant', 'created_at', 'id']),
         ]
 
     def __str__(self):
@@ -169,4 +209,72 @@ class CashTransaction(models.Model):
             self.amount = -abs(self.amount)
         elif self.transaction_type in (CashTransactionType.DEPOSIT, CashTransactionType.TRANSFER_IN):
             self.amount = abs(self.amount)
-        super().save(*args, **kwargs)
+        # The row and the register running total (service.signals) commit together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+
+class CashRegisterClosing(models.Model):
+    """
+    Checkpoint of a register at ``closed_at`` (end of a day or a shift).
+
+    Holds the per-type totals of the transactions posted since the previous closing
+    (``period_start``) and the cumulative ``transactions_total`` at ``closed_at``, so
+    the balance at any moment is the latest checkpoint plus the transactions after
+    it (see ``service.closing``).
+    """
+    tenant = models.ForeignKey("tenants.Tenant", on_delete=models.CASCADE)
+    register = models.ForeignKey(CashRegister, on_delete=models.CASCADE, related_name="closings")
+    period_start = models.DateTimeField(null=True, blank=True)
+    closed_at = models.DateTimeField()
+    deposits = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    withdrawals = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    transfers_in = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    transfers_out = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    adjustments = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.PositiveIntegerField(default=0)
+    transactions_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    closed_by = models.ForeignKey(
+        Employee,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="cash_register_closings",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["register", "-closed_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["register", "closed_at"], name="unique_register_closing"),
+        ]
+        indexes = [
+            models.Index(fields=["tenant", "closed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.register.name} closed at {self.closed_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def closing_balance(self):
+        return self.register.opening_balance + self.transactions_total
+
+def summed_transactions_total():
+    """
+    Expression recomputing ``CashRegister.transactions_total`` from the transactions table.
+
+    Usable in ``annotate()`` to verify the running totals and in ``update()`` to reset
+    them after writes that bypassed the signals.
+    """
+    totals = (
+        CashTransaction.objects.filter(register=OuterRef('pk'))
+        .order_by().values('register').annotate(total=Sum('amount')).values('total')
+    )
+    return Coalesce(
+        Subquery(totals), Value(Decimal('0.00')), output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 
 from core.serializers import AddressSerializer
-from .models import CashRegister, CashTransaction, Employee, Location, LocationType, RepairShop
+from .closing import PERIODS
+from .models import CashRegister, CashRegisterClosing, CashTransaction, Employee, Location, LocationType, RepairShop
 from core.models import User, Address
 
 
@@ -204,6 +205,51 @@ class CashTransactionSerializer(serializers.ModelSerializer):
         return None
 
 
+class CashRegisterClosingSerializer(serializers.ModelSerializer):
+    register_name = serializers.CharField(source='register.name', read_only=True)
+    closing_balance = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    closed_by_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CashRegisterClosing
+        fields = [
+            'id', 'register', 'register_name', 'period_start', 'closed_at',
+            'deposits', 'withdrawals', 'transfers_in', 'transfers_out', 'adjustments',
+            'transaction_count', 'transactions_total', 'closing_balance',
+            'closed_by', 'closed_by_name', 'created_at',
+        ]
+        read_only_fields = fields
+
+    def get_closed_by_name(self, obj):
+        if obj.closed_by:
+            return str(obj.closed_by)
+        return None
+
+
+class CashRegisterCloseSerializer(serializers.Serializer):
+    until = serializers.DateTimeField(required=False)
+
+
+class CashRegisterBalanceQuerySerializer(serializers.Serializer):
+    at = serializers.DateTimeField(required=False)
+
+
+class CashRegisterReportQuerySerializer(serializers.Serializer):
+    MAX_DAYS = 366
+
+    start = serializers.DateField()
+    end = serializers.DateField(help_text="Last day included in the report")
+    period = serializers.ChoiceField(choices=PERIODS, default='day')
+    shop = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if data['end'] < data['start']:
+            raise serializers.ValidationError("end must not be before start.")
+        if (data['end'] - data['start']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"Reports cover at most {self.MAX_DAYS} days.")
+        return data
+
+
 class CashTransferSerializer(serializers.Serializer):
     source_register = serializers.PrimaryKeyRelatedField(
         queryset=CashRegister.objects.all()
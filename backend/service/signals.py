@@ -0,0 +1,36 @@
+"""
+Keeps ``CashRegister.transactions_total`` in step with the register's transactions.
+
+Each receiver moves the running total by the difference the saved or deleted row
+makes, with a single ``UPDATE ... SET transactions_total = transactions_total + x``
+that runs in the same transaction as the row itself (see ``CashTransaction.save``).
+Saves post before the row is written: the register row is then locked before the
+transaction's ``created_at`` is taken, so a closing (``service.closing``), which
+locks the register too, never misses a transaction dated before it.
+Raw SQL and ``QuerySet.update()`` bypass this; ``reconcile_cash_registers`` finds and
+repairs the drift they cause.
+"""
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from .models import CashRegister, CashTransaction
+
+
+@receiver(pre_save, sender=CashTransaction)
+def post_cash_transaction(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance._state.adding:
+        old_register_id, old_amount = None, 0
+    else:
+        old_register_id, old_amount = instance.old_value('register'), instance.old_value('amount') or 0
+    if old_register_id == instance.register_id:
+        CashRegister.post(instance.register_id, instance.amount - old_amount)
+    else:
+        CashRegister.post(old_register_id, -old_amount)
+        CashRegister.post(instance.register_id, instance.amount)
+
+
+@receiver(post_delete, sender=CashTransaction)
+def unpost_cash_transaction(sender, instance, **kwargs):
+    CashRegister.post(instance.register_id, -instance.amount)
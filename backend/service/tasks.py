@@ -0,0 +1,25 @@
+"""
+Celery tasks for the service app.
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def close_cash_registers():
+    """
+    Nightly task writing the end-of-day checkpoint of every active cash register.
+    Scheduled with Celery Beat (see CELERY_BEAT_SCHEDULE).
+    """
+    from service.closing import close_registers
+    from tenants.models import Tenant
+
+    closed = 0
+    for tenant in Tenant.objects.order_by('pk'):
+        closed += len(close_registers(tenant))
+    if closed:
+        logger.info(f"Closed {closed} cash register(s)")
+    return closed
@@ -1,3 +1,200 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Address, User
+from core.permission_cache import permission_sets, permission_versions
+from core.picklists import picklist_versions, registries
+from service.closing import balances_at, close_register, start_of_day
+from service.models import CashRegister, CashRegisterClosing, CashTransaction, RepairShop
+from service.serializers import CashRegisterSerializer
+from tenants.cache import membership_cache, tenant_cache
+from tenants.models import Tenant
+
+
+class CashRegisterTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        for local in (permission_versions, permission_sets, picklist_versions, registries,
+                      tenant_cache, membership_cache):
+            local.clear_local()
+
+        self.tenant = Tenant.objects.create(name="Cash", subdomain="cash")
+        shop = RepairShop.objects.create(
+            tenant=self.tenant, name="Main",
+            address=Address.objects.create(street="Long", city="Gdansk", building_number="1", postal_code="80-001"),
+        )
+        self.till, self.safe = (
+            CashRegister.objects.create(tenant=self.tenant, shop=shop, name=name, opening_balance=Decimal("100.00"))
+            for name in ("Till", "Safe")
+        )
+        self.user = User.objects.create_superuser(email="a@test.com", password="x", username="a")
+
+    def post(self, register, transaction_type, amount):
+        return CashTransaction.objects.create(
+            tenant=self.tenant, register=register, transaction_type=transaction_type, amount=Decimal(amount)
+        )
+
+    def balance(self, register):
+        return CashRegister.objects.get(pk=register.pk).current_balance
+
+    def transfer(self, amount):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.credentials(HTTP_X_TENANT="cash")
+        return client.post("/api/service/api/cash-registers/transfer/", {
+            "source_register": self.till.pk, "destination_register": self.safe.pk, "amount": amount,
+        }, format="json")
+
+
+class CashRegisterBalanceTest(CashRegisterTestCase):
+    def test_running_total_follows_transactions(self):
+        deposit = self.post(self.till, "deposit", "50.00")
+        self.post(self.till, "withdrawal", "20.00")
+        self.assertEqual(self.balance(self.till), Decimal("130.00"))
+
+        deposit.amount = Decimal("70.00")
+        deposit.save()
+        self.assertEqual(self.balance(self.till), Decimal("150.00"))
+
+        deposit.register = self.safe
+        deposit.save()
+        self.assertEqual((self.balance(self.till), self.balance(self.safe)), (Decimal("80.00"), Decimal("170.00")))
+
+        deposit.delete()
+        CashTransaction.objects.filter(register=self.till).delete()
+        self.assertEqual((self.balance(self.till), self.balance(self.safe)), (Decimal("100.00"), Decimal("100.00")))
+
+    def test_saving_a_loaded_register_keeps_later_postings(self):
+        self.post(self.till, "deposit", "50.00")
+        till = CashRegister.objects.get(pk=self.till.pk)
+        self.post(self.till, "deposit", "50.00")
+        till.name = "Front till"
+        till.save()
+        self.assertEqual(self.balance(self.till), Decimal("200.00"))
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.credentials(HTTP_X_TENANT="cash")
+        resp = client.patch(f"/api/service/cash-registers/{self.till.pk}/", {"name": "Till"}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.balance(self.till), Decimal("200.00"))
+
+    def test_serializing_registers_reads_no_transactions(self):
+        self.post(self.till, "deposit", "50.00")
+        registers = list(CashRegister.objects.select_related("shop"))
+        with CaptureQueriesContext(connection) as queries:
+            data = CashRegisterSerializer(registers, many=True).data
+        self.assertEqual(len(queries), 0)
+        self.assertEqual({row["name"]: row["current_balance"] for row in data}, {"Till": "150.00", "Safe": "100.00"})
+
+    def test_transfer_checks_balance(self):
+        resp = self.transfer("60.00")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.json()["source_balance"], resp.json()["destination_balance"]), ("40.00", "160.00"))
+
+        self.assertEqual(self.transfer("60.00").status_code, 400)
+        self.assertEqual(self.balance(self.till), Decimal("40.00"))
+
+    def test_reconcile_command(self):
+        self.post(self.till, "deposit", "50.00")
+        call_command("reconcile_cash_registers", stdout=StringIO())
+
+        CashTransaction.objects.filter(register=self.till).update(amount=Decimal("80.00"))
+        with self.assertRaises(CommandError):
+            call_command("reconcile_cash_registers", "--tenant=cash", stdout=StringIO())
+
+        out = StringIO()
+        call_command("reconcile_cash_registers", "--fix", stdout=out)
+        self.assertIn(f"register {self.till.pk} (Till) total 50.00", out.getvalue())
+        self.assertEqual(self.balance(self.till), Decimal("180.00"))
+
+
+class CashRegisterClosingTest(CashRegisterTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first_day = timezone.localdate() - timedelta(days=5)
+        self.days = [self.first_day + timedelta(days=n) for n in range(3)]
+        # Two transactions a day on the till, one on the safe
+        for n, day in enumerate(self.days):
+            noon = start_of_day(day) + timedelta(hours=12)
+            for register, kind, amount in ((self.till, "deposit", 50 + n), (self.till, "withdrawal", 10),
+                                           (self.safe, "adjustment", -n)):
+                txn = self.post(register, kind, f"{amount}.00")
+                CashTransaction.objects.filter(pk=txn.pk).update(created_at=noon)
+
+    def summed(self, register, when):
+        transactions = CashTransaction.objects.filter(register=register, created_at__lte=when)
+        return register.opening_balance + sum((t.amount for t in transactions), Decimal("0.00"))
+
+    def api(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.credentials(HTTP_X_TENANT="cash")
+        return client
+
+    def test_closings_and_balances_at(self):
+        call_command("close_cash_registers", f"--date={self.days[2].isoformat()}", "--days=2", stdout=StringIO())
+        closings = list(CashRegisterClosing.objects.filter(register=self.till).order_by("closed_at"))
+        self.assertEqual([c.closed_at for c in closings], [start_of_day(day) for day in self.days[1:]])
+        self.assertEqual((closings[1].deposits, closings[1].withdrawals, closings[1].transaction_count),
+                         (Decimal("51.00"), Decimal("-10.00"), 2))
+        self.assertEqual(closings[1].period_start, closings[0].closed_at)
+        self.assertEqual(closings[1].closing_balance, self.summed(self.till, closings[1].closed_at))
+
+        # Checkpoints and transactions after them add up to the full history at any moment
+        moments = [start_of_day(self.first_day) + timedelta(hours=6 * n) for n in range(14)]
+        for when in moments:
+            with self.assertNumQueries(1):
+                balances = balances_at(CashRegister.objects.filter(tenant=self.tenant), when)
+            self.assertEqual(balances, {r.pk: self.summed(r, when) for r in (self.till, self.safe)})
+
+        # Closing again up to the same moment is refused
+        with self.assertRaises(ValueError):
+            close_register(self.till, start_of_day(self.days[2]))
+
+    def test_close_and_balance_endpoints(self):
+        resp = self.api().post(f"/api/service/cash-registers/{self.till.pk}/close/", {}, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.json()["transaction_count"], resp.json()["closing_balance"]), (6, "223.00"))
+        self.assertEqual(
+            self.api().post(f"/api/service/cash-registers/{self.till.pk}/close/", {
+                "until": (timezone.now() - timedelta(days=1)).isoformat(),
+            }, format="json").status_code,
+            400,
+        )
+
+        at = start_of_day(self.days[1]) + timedelta(hours=13)
+        resp = self.api().get(f"/api/service/cash-registers/{self.till.pk}/balance/", {"at": at.isoformat()})
+        self.assertEqual(resp.json()["balance"], str(self.summed(self.till, at)))
+
+    def test_period_report(self):
+        close_register(self.till, start_of_day(self.days[1]))
+        resp = self.api().get("/api/service/cash-registers/report/", {
+            "start": self.days[1].isoformat(), "end": self.days[2].isoformat(),
+        })
+        self.assertEqual(resp.status_code, 200)
+        till = next(row for row in resp.json()["registers"] if row["register"] == self.till.pk)
+        self.assertEqual(
+            [(p["period"], p["deposits"], p["withdrawals"], p["transaction_count"]) for p in till["periods"]],
+            [(self.days[1].isoformat(), "51.00", "-10.00", 2), (self.days[2].isoformat(), "52.00", "-10.00", 2)],
+        )
+        self.assertEqual(till["opening_balance"], "140.00")
+        self.assertEqual(till["closing_balance"], "223.00")
 
-# Create your tests here.
+        monthly = self.api().get("/api/service/cash-registers/report/", {
+            "start": self.days[0].isoformat(), "end": self.days[2].isoformat(), "period": "month",
+        }).json()
+        safe = next(row for row in monthly["registers"] if row["register"] == self.safe.pk)
+        self.assertEqual(sum(Decimal(p["adjustments"]) for p in safe["periods"]), Decimal("-3.00"))
+        self.assertEqual(self.api().get("/api/service/cash-registers/report/", {
+            "start": self.days[2].isoformat(), "end": self.days[0].isoformat(),
+        }).status_code, 400)
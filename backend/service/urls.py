@@ -8,6 +8,7 @@ router = DefaultRouter()
 router.register(r"shops", views.ShopViewSet, basename="shop")
 router.register(r"cash-registers", views.CashRegisterViewSet, basename="cash-register")
 router.register(r"cash-transactions", views.CashTransactionViewSet, basename="cash-transaction")
+router.register(r"cash-register-closings", views.CashRegisterClosingViewSet, basename="cash-register-closing")
 
 urlpatterns = [
     path('api/employee/search/', views.EmployeeSearchView.as_view(), name="employee-api-search"),
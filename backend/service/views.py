@@ -1,28 +1,37 @@
 # employees/views.py
+from datetime import timedelta
+from decimal import Decimal
+
 from django.contrib.auth.models import Permission
 from django.db import transaction
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from collections import OrderedDict
 
 from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
 from core.mixins import TenantScopedMixin
+from core.pagination import KeysetPagination
 from core.models import UserRole
 from core.serializers import UserSerializer
 from core.views import GenericSearchView
-from .models import CashRegister, CashTransaction, CashTransactionType, Employee, Location, RepairShop
+from .closing import balances_at, close_register, period_report, start_of_day
+from .models import (
+    CashRegister, CashRegisterClosing, CashTransaction, CashTransactionType, Employee, Location, RepairShop,
+)
 from customers.models import Customer
 from .serializers import (
-    CashRegisterSerializer, CashTransactionSerializer, CashTransferSerializer,
+    CashRegisterBalanceQuerySerializer, CashRegisterCloseSerializer, CashRegisterClosingSerializer,
+    CashRegisterReportQuerySerializer, CashRegisterSerializer, CashTransactionSerializer, CashTransferSerializer,
     EmployeeSerializer, CurrentEmployeeSerializer, LocationSerializer, ShopSerializer,
 )
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import filters, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from core.models import Address
 
 
@@ -571,6 +580,85 @@ class CashRegisterViewSet(TenantScopedMixin, ModelViewSet):
         return (super().get_queryset()
                 .select_related('shop', 'default_owner__user'))
 
+    @action(detail=True, methods=['post'])
+    def close(self, request, pk=None):
+        """
+        Close the register (end of a shift or day) and return the new checkpoint.
+
+        POST /api/service/cash-registers/{id}/close/
+        {"until": "2026-01-31T18:00:00Z"}   (optional, defaults to now)
+        """
+        register = self.get_object()
+        params = CashRegisterCloseSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        employee = Employee.objects.filter(user=request.user, tenant=register.tenant_id).first()
+        try:
+            closing = close_register(register, params.validated_data.get('until'), closed_by=employee)
+        except ValueError as exc:
+            raise ValidationError({"until": str(exc)})
+        return Response(CashRegisterClosingSerializer(closing).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def balance(self, request, pk=None):
+        """
+        Balance of the register at a moment in time.
+
+        GET /api/service/cash-registers/{id}/balance/?at=2026-01-31T23:59:59Z
+        """
+        register = self.get_object()
+        params = CashRegisterBalanceQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        at = params.validated_data.get('at') or timezone.now()
+        balance = balances_at(CashRegister.objects.filter(pk=register.pk), at)[register.pk]
+        return Response({'register': register.pk, 'at': at, 'balance': str(balance)})
+
+    @action(detail=False, methods=['get'])
+    def report(self, request):
+        """
+        Totals per register and day, week or month, with opening and closing balances.
+
+        GET /api/service/cash-registers/report/?start=2026-01-01&end=2026-01-31&period=day&shop=1
+        """
+        tenant = self._require_tenant()
+        params = CashRegisterReportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        rows = period_report(
+            tenant,
+            start_of_day(data['start']),
+            start_of_day(data['end'] + timedelta(days=1)),
+            period=data['period'],
+            shop=data.get('shop'),
+        )
+        # Amounts as strings, like the serializers' DecimalFields
+        for row in rows:
+            row['opening_balance'] = str(row['opening_balance'])
+            row['closing_balance'] = str(row['closing_balance'])
+            row['periods'] = [
+                {key: str(value) if isinstance(value, Decimal) else value for key, value in entry.items()}
+                for entry in row['periods']
+            ]
+        return Response({
+            'start': data['start'],
+            'end': data['end'],
+            'period': data['period'],
+            'registers': rows,
+        })
+
+
+class CashRegisterClosingViewSet(TenantScopedMixin, ReadOnlyModelViewSet):
+    permission_classes = [IsAuthenticated]
+    serializer_class = CashRegisterClosingSerializer
+    queryset = CashRegisterClosing.objects.all()
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['register']
+    ordering_fields = ['closed_at']
+    ordering = ['-closed_at']
+
+    def get_queryset(self):
+        return (super().get_queryset()
+                .select_related('register', 'closed_by__user'))
+
 
 class CashTransactionViewSet(TenantScopedMixin, ModelViewSet):
     permission_classes = [IsAuthenticated]
@@ -581,6 +669,9 @@ class CashTransactionViewSet(TenantScopedMixin, ModelViewSet):
     ordering_fields = ['created_at', 'amount']
     ordering = ['-created_at']
     http_method_names = ['get', 'post', 'head']
+    pagination_class = KeysetPagination
+    cursor_pagination_key = 'cash-transactions'
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return (super().get_queryset()
@@ -616,6 +707,15 @@ def transfer_between_registers(request):
     ).first()
 
     with transaction.atomic():
+        # The serializer checked the balance without a lock; re-check it under one
+        registers = CashRegister.lock(source.pk, destination.pk)
+        source, destination = registers[source.pk], registers[destination.pk]
+        if source.current_balance < amount:
+            return Response(
+                {"detail": f"Insufficient balance. Available: {source.current_balance}"},
+                status=400,
+            )
+
         out_txn = CashTransaction.objects.create(
             tenant=request.tenant,
             register=source,
@@ -638,6 +738,8 @@ def transfer_between_registers(request):
         out_txn.related_transaction = in_txn
         out_txn.save(update_fields=['related_transaction'])
 
+    source.refresh_from_db(fields=['transactions_total'])
+    destination.refresh_from_db(fields=['transactions_total'])
     return Response({
         "message": "Transfer completed",
         "source_balance": str(source.current_balance),
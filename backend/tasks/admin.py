@@ -3,7 +3,9 @@ from django.contrib import messages
 
 from core.admin_mixins import TenantAwareImportExportAdmin
 from core.models import PicklistValue
+from core.picklists import invalidate_picklists
 
+from . import dashboard
 from .models import Task, TaskType, TaskTypeValidationRule, WorkItem
 
 
@@ -120,7 +122,12 @@ class PicklistValueAdmin(TenantAwareImportExportAdmin):
     @admin.action(description="Activate selected values")
     def activate_values(self, request, queryset):
         """Bulk activate selected picklist values"""
+        tenant_ids = list(queryset.values_list('tenant_id', flat=True))
+        status_tenant_ids = set(queryset.filter(category='workitem_status').values_list('tenant_id', flat=True))
         updated = queryset.update(is_active=True)
+        invalidate_picklists(*tenant_ids)
+        # The resolved status may have changed (see tasks.signals.workitem_status_picklist_changed)
+        dashboard.rebuild_on_commit(*status_tenant_ids)
         self.message_user(request, f"{updated} value(s) activated.", messages.SUCCESS)
 
     @admin.action(description="Deactivate selected values")
@@ -140,7 +147,12 @@ class PicklistValueAdmin(TenantAwareImportExportAdmin):
             )
             return
 
+        tenant_ids = list(queryset.values_list('tenant_id', flat=True))
+        status_tenant_ids = set(queryset.filter(category='workitem_status').values_list('tenant_id', flat=True))
         updated = queryset.update(is_active=False)
+        invalidate_picklists(*tenant_ids)
+        # The resolved status may have changed (see tasks.signals.workitem_status_picklist_changed)
+        dashboard.rebuild_on_commit(*status_tenant_ids)
         self.message_user(request, f"{updated} value(s) deactivated.", messages.SUCCESS)
 
     def delete_model(self, request, obj):
@@ -10,4 +10,5 @@ class TasksConfig(AppConfig):
         Import signal handlers when the app is ready.
         This ensures signals are registered when Django starts.
         """
+        import tasks.search  # noqa: F401
         import tasks.signals  # noqa: F401
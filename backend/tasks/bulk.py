@@ -0,0 +1,146 @@
+"""
+Bulk work item changes behind ``POST /api/tasks/work-items/bulk/``.
+
+Saving work items one by one fires the post_save receivers for every row: a
+status note, dashboard counter updates and integration webhooks. A bulk change
+instead locks the rows once, writes them with ``bulk_update()`` and applies the
+same side effects per batch:
+
+- status notes are written with one ``bulk_create()``
+- dashboard counters are moved with one ``dashboard.apply_changes()``
+- integrations subscribed to ``workitem_bulk_updated`` get one event listing
+  every changed item (the per-item ``workitem_updated`` and
+  ``workitem_status_changed`` events are not sent)
+- each changed item is published to the change feed (``tasks.changes``)
+
+Only ``status``, ``technician`` and ``due_date`` can be changed, none of which
+affect the cash register logic in ``WorkItemViewSet.perform_update``.
+"""
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from core.models import Note
+from tasks import changes, dashboard
+from tasks.models import WorkItem
+
+MAX_ITEMS = 500
+BATCH_SIZE = 100
+
+# Changeable field -> attname tracked by ``ChangeTrackingMixin``
+BULK_FIELDS = {'status': 'status', 'technician': 'technician_id', 'due_date': 'due_date'}
+
+
+def _jsonable(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _apply(item, changes):
+    if 'status' in changes:
+        item.status = changes['status']
+    if 'technician' in changes:
+        item.technician = changes['technician']
+    if 'due_date' in changes:
+        item.due_date = changes['due_date']
+    elif changes.get('due_date_shift_days') and item.due_date:
+        item.due_date += timedelta(days=changes['due_date_shift_days'])
+
+
+def bulk_update_work_items(queryset, ids, changes, user=None):
+    """
+    Apply ``changes`` to the work items of ``queryset`` with the given ``ids``.
+
+    Args:
+        queryset: Work items the user may change (tenant and visibility scoping)
+        ids: Work item ids, in the order results are reported
+        changes: Validated ``WorkItemBulkUpdateSerializer`` data without ``ids``
+        user: Author of the status notes
+
+    Returns:
+        List of {'id', 'reference_id', 'result', 'changes'} per requested id, where
+        result is 'updated', 'unchanged' or 'not_found'
+    """
+    ids = list(dict.fromkeys(ids))
+    updated = []
+    results = {}
+
+    with transaction.atomic():
+        # Locked in id order so overlapping bulk requests cannot deadlock
+        items = list(
+            WorkItem.objects.select_for_update()
+            .filter(pk__in=queryset.filter(pk__in=ids).values('pk'))
+            .order_by('pk')
+        )
+        for item in items:
+            _apply(item, changes)
+            changed = item.changed_fields()
+            diff = {
+                name: {'old': _jsonable(item.old_value(name)), 'new': _jsonable(getattr(item, attname))}
+                for name, attname in BULK_FIELDS.items() if attname in changed
+            }
+            results[item.pk] = {
+                'id': item.pk,
+                'reference_id': item.reference_id,
+                'result': 'updated' if diff else 'unchanged',
+                'changes': diff,
+            }
+            if diff:
+                updated.append((item, diff))
+
+        if updated:
+            _write(updated, user)
+
+    return [
+        results.get(pk) or {'id': pk, 'reference_id': None, 'result': 'not_found', 'changes': {}}
+        for pk in ids
+    ]
+
+
+def _write(updated, user):
+    items = [item for item, _ in updated]
+    tenant_id = items[0].tenant_id
+    fields = sorted({name for _, diff in updated for name in diff})
+    WorkItem.objects.bulk_update(items, fields, batch_size=BATCH_SIZE)
+
+    # bulk_create() skips Note.save(), so the denormalized tenant/work item are set here
+    content_type = ContentType.objects.get_for_model(WorkItem)
+    Note.objects.bulk_create([
+        Note(
+            author=user,
+            content=f"Status changed from '{diff['status']['old']}' to '{diff['status']['new']}'",
+            content_type=content_type,
+            object_id=item.pk,
+            tenant_id=item.tenant_id,
+            work_item=item,
+        )
+        for item, diff in updated if 'status' in diff and diff['status']['old']
+    ], batch_size=BATCH_SIZE)
+
+    dashboard.apply_changes(tenant_id, [
+        (
+            dashboard.work_item_contributions(
+                tenant_id, dashboard.previous_values(item, dashboard.WORK_ITEM_FIELDS)
+            ),
+            dashboard.work_item_contributions(
+                tenant_id, dashboard.row_values(item, dashboard.WORK_ITEM_FIELDS)
+            ),
+        )
+        for item in items
+    ])
+
+    # bulk_update() skips post_save, so the change feed is fed here
+    changes.announce(tenant_id, [
+        changes.message(changes.WORK_ITEM, item, 'updated', item.changed_fields()) for item in items
+    ])
+
+    from integrations.signals.workitem import trigger_workitem_bulk_integrations
+
+    entries = [
+        {'id': item.pk, 'reference_id': item.reference_id, 'changes': diff}
+        for item, diff in updated
+    ]
+    changed_by = getattr(user, 'pk', None)
+    transaction.on_commit(
+        lambda: trigger_workitem_bulk_integrations(tenant_id, entries, changed_by)
+    )
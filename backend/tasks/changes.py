@@ -0,0 +1,100 @@
+"""
+Change feed of a tenant's work items and tasks, pushed to waiting clients.
+
+Saving or deleting a work item or task (including the AI summary arriving through
+``SummaryCallbackView`` and bulk changes) publishes a small message to the
+tenant's channel (see ``core.events``) once the transaction commits::
+
+    {"type": "work_item", "id": 12, "event": "updated", "fields": ["summary_status"]}
+
+Clients long-poll ``GET /api/tasks/changes/`` with the cursor of their previous
+response and re-fetch only what changed, instead of polling ``summary_status`` or
+re-reading whole lists. That needs the Redis event log: without it the feed hands
+out a null cursor and clients keep polling.
+
+Messages also carry the employees a row was (and is) assigned to, so ``visible()``
+can apply the list permissions of ``WorkItemViewSet`` and ``TaskViewSet`` to a
+batch of messages without reading the rows again, deleted ones included. Those are
+stripped before messages reach clients.
+"""
+from django.db import transaction
+
+from core import events
+from service.models import Employee
+
+WORK_ITEM = 'work_item'
+TASK = 'task'
+
+# Employee fields that decide who sees a row with the "own" permissions
+ASSIGNEES = {
+    WORK_ITEM: ('owner_id', 'technician_id'),
+    TASK: ('assigned_employee_id',),
+}
+# Permissions to see all rows of a type, or only the ones assigned to the user
+PERMISSIONS = {
+    WORK_ITEM: ('view_all_workitems', 'view_own_workitems'),
+    TASK: ('view_all_tasks', 'view_own_tasks'),
+}
+
+
+def channel(tenant_id):
+    return f'tasks:changes:{tenant_id}'
+
+
+def message(entity_type, obj, event, fields=()):
+    """Change message of ``obj``; ``fields`` are the changed attnames of an update."""
+    employees = set()
+    for attname in ASSIGNEES[entity_type]:
+        employees.add(getattr(obj, attname))
+        if event == 'updated' and attname in fields:
+            employees.add(obj.old_value(attname))
+    employees.discard(None)
+    return {
+        'type': entity_type,
+        'id': obj.pk,
+        'event': event,
+        'fields': sorted(fields),
+        'employees': sorted(employees),
+    }
+
+
+def announce(tenant_id, messages):
+    """Publish ``messages`` to the tenant's channel once the transaction commits."""
+    def publish():
+        for message in messages:
+            events.publish(channel(tenant_id), message)
+
+    if messages:
+        transaction.on_commit(publish)
+
+
+def audience(tenant, user):
+    """
+    What ``user`` may see of each entity type, for ``visible()``:
+    ``{entity type: None (everything) or a set of employee ids}``; types the user
+    can't list are left out.
+    """
+    employees = None
+    scopes = {}
+    for entity_type, (view_all, view_own) in PERMISSIONS.items():
+        if user.has_permission(view_all, tenant):
+            scopes[entity_type] = None
+        elif user.has_permission(view_own, tenant):
+            if employees is None:
+                employees = set(
+                    Employee.objects.filter(user=user, tenant=tenant).values_list('pk', flat=True)
+                ) if user.pk else set()
+            scopes[entity_type] = employees
+    return scopes
+
+
+def visible(messages, scopes):
+    """The ``messages`` a user with ``scopes`` (from ``audience()``) may see, as sent to clients."""
+    shown = []
+    for message in messages:
+        if message.get('type') not in scopes:
+            continue
+        employees = scopes[message['type']]
+        if employees is None or employees.intersection(message.get('employees', ())):
+            shown.append({key: value for key, value in message.items() if key != 'employees'})
+    return shown
@@ -0,0 +1,294 @@
+"""
+Incrementally maintained read model behind ``DashboardView``.
+
+Every ``DashboardCounter`` row holds a count and an amount for one
+(tenant, scope, metric, bucket) cell:
+
+- ``status``      scope=technician, bucket=status: all work items (pipeline)
+- ``open``        scope=technician, bucket="<due date>|<status>": open work items
+- ``revenue``     scope=technician, bucket=local closing date: closed work items, final price
+- ``open_tasks``  scope=assignee, bucket=due date: tasks that are not Done
+
+Scope 0 means unassigned. Dates are stored as ISO strings and figures relative to
+today (overdue, revenue this week...) are derived at read time by comparing bucket
+keys, so the counters never go stale at midnight. Register balances are not counted
+here; registers keep their own ``transactions_total`` (``service.models``).
+
+The tasks signals apply the difference between what a row contributed before and
+after each save or delete (``tasks.bulk`` applies the same differences for its
+batched updates). ``QuerySet.update()``, bulk inserts and raw SQL bypass them;
+run ``rebuild_dashboard_counters`` (or ``rebuild``) after such changes.
+
+"Before" is the row as it was loaded (``core.tracking``), not as it is stored when
+the save runs, so two requests saving the same row concurrently both move it out
+of the bucket it was loaded in and the counters drift. Rather than locking the row
+on every save, the ``rebuild_dashboard_counters`` Celery task compares the counters
+with the source tables every night and rebuilds the tenants that drifted.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.cache import TieredCache, VersionCounter
+from core.picklists import get_picklist
+
+NO_DATE = '-'
+ZERO = Decimal('0.00')
+
+WORK_ITEM_FIELDS = ('status', 'technician_id', 'closed_date', 'due_date', 'final_price')
+TASK_FIELDS = ('status', 'assigned_employee_id', 'due_date')
+
+dashboard_versions = VersionCounter("tasks:dashboard")
+
+counter_cache = TieredCache("tasks:dashboard:counters", maxsize=512, local_ttl=30, shared_ttl=60 * 60)
+
+
+def _date_key(value):
+    return value.isoformat() if value else NO_DATE
+
+
+def _open_key(due_date, status):
+    return f"{_date_key(due_date)}|{status}"
+
+
+def resolved_status(tenant_id):
+    """Status value that closes a work item, or None to fall back to ``closed_date``."""
+    return get_picklist(tenant_id, 'workitem_status').value_for_name('resolved')
+
+
+def is_open(values, resolved):
+    if resolved:
+        return values['status'] != resolved
+    return values['closed_date'] is None
+
+
+def row_values(instance, fields):
+    return {field: getattr(instance, field) for field in fields}
+
+
+def previous_values(instance, fields):
+    """``fields`` as stored before the save in progress (see ``core.tracking``)."""
+    return {field: instance.old_value(field) for field in fields}
+
+
+def work_item_contributions(tenant_id, values):
+    """{(scope, metric, bucket): (count, amount)} for one work item's ``WORK_ITEM_FIELDS``."""
+    if not values:
+        return {}
+    scope = values['technician_id'] or 0
+    cells = {(scope, 'status', values['status']): (1, ZERO)}
+    if is_open(values, resolved_status(tenant_id)):
+        cells[(scope, 'open', _open_key(values['due_date'], values['status']))] = (1, ZERO)
+    if values['closed_date']:
+        closed_on = timezone.localdate(values['closed_date'])
+        cells[(scope, 'revenue', closed_on.isoformat())] = (1, values['final_price'] or ZERO)
+    return cells
+
+
+def task_contributions(values):
+    if not values or values['status'] == 'Done' or not values['assigned_employee_id']:
+        return {}
+    return {(values['assigned_employee_id'], 'open_tasks', _date_key(values['due_date'])): (1, ZERO)}
+
+
+def _bump(tenant_id):
+    dashboard_versions.bump(tenant_id)
+    if connection.in_atomic_block:
+        # Readers may cache the pre-commit rows under the new version; bump again once visible
+        transaction.on_commit(lambda: dashboard_versions.bump(tenant_id))
+
+
+def _increment(tenant_id, scope, metric, bucket, count, amount):
+    from tasks.models import DashboardCounter
+
+    cell = DashboardCounter.objects.filter(tenant_id=tenant_id, scope=scope, metric=metric, bucket=bucket)
+    if cell.update(count=F('count') + count, amount=F('amount') + amount):
+        return
+    try:
+        with transaction.atomic():
+            DashboardCounter.objects.create(
+                tenant_id=tenant_id, scope=scope, metric=metric, bucket=bucket, count=count, amount=amount
+            )
+    except IntegrityError:
+        # Created concurrently between our UPDATE and INSERT
+        cell.update(count=F('count') + count, amount=F('amount') + amount)
+
+
+def apply_change(tenant_id, before, after):
+    """Move the counters from the ``before`` to the ``after`` contributions of one row."""
+    apply_changes(tenant_id, [(before, after)])
+
+
+def apply_changes(tenant_id, changes):
+    """``apply_change`` for many rows at once, writing each affected cell only once."""
+    deltas = defaultdict(lambda: [0, ZERO])
+    for before, after in changes:
+        for sign, cells in ((-1, before), (1, after)):
+            for key, (count, amount) in cells.items():
+                deltas[key][0] += sign * count
+                deltas[key][1] += sign * amount
+    changed = False
+    # Sorted so concurrent writers lock cells in the same order
+    for (scope, metric, bucket), (count, amount) in sorted(deltas.items()):
+        if count or amount:
+            _increment(tenant_id, scope, metric, bucket, count, amount)
+            changed = True
+    if changed:
+        _bump(tenant_id)
+
+
+def compute(tenant):
+    """{(scope, metric, bucket): [count, amount]} of ``tenant`` computed from the source tables."""
+    from tasks.models import Task, WorkItem
+
+    cells = defaultdict(lambda: [0, ZERO])
+
+    def add(scope, metric, bucket, count, amount=None):
+        cells[(scope or 0, metric, bucket)][0] += count
+        cells[(scope or 0, metric, bucket)][1] += amount or ZERO
+
+    work_items = WorkItem.objects.filter(tenant=tenant).order_by()
+    for row in work_items.values('technician_id', 'status').annotate(n=Count('id')):
+        add(row['technician_id'], 'status', row['status'], row['n'])
+
+    resolved = resolved_status(tenant.pk)
+    open_items = work_items.exclude(status=resolved) if resolved else work_items.filter(closed_date__isnull=True)
+    for row in open_items.values('technician_id', 'due_date', 'status').annotate(n=Count('id')):
+        add(row['technician_id'], 'open', _open_key(row['due_date'], row['status']), row['n'])
+
+    closed = work_items.filter(closed_date__isnull=False).annotate(closed_on=TruncDate('closed_date'))
+    for row in closed.values('technician_id', 'closed_on').annotate(n=Count('id'), total=Sum('final_price')):
+        add(row['technician_id'], 'revenue', row['closed_on'].isoformat(), row['n'], row['total'])
+
+    open_tasks = Task.objects.filter(tenant=tenant).exclude(status='Done').order_by()
+    for row in open_tasks.values('assigned_employee_id', 'due_date').annotate(n=Count('id')):
+        add(row['assigned_employee_id'], 'open_tasks', _date_key(row['due_date']), row['n'])
+
+    return cells
+
+
+def rebuild(tenant):
+    """Recompute all counters of ``tenant`` from the source tables. Returns the row count."""
+    from tasks.models import DashboardCounter
+
+    with transaction.atomic():
+        rows = [
+            DashboardCounter(tenant=tenant, scope=scope, metric=metric, bucket=bucket, count=count, amount=amount)
+            for (scope, metric, bucket), (count, amount) in compute(tenant).items()
+            if count or amount
+        ]
+        DashboardCounter.objects.filter(tenant=tenant).delete()
+        DashboardCounter.objects.bulk_create(rows, batch_size=1000)
+    _bump(tenant.pk)
+    return len(rows)
+
+
+def rebuild_on_commit(*tenant_ids):
+    """``rebuild`` the counters of ``tenant_ids`` once the transaction commits."""
+    from tenants.models import Tenant
+
+    def run():
+        for tenant in Tenant.objects.filter(pk__in=tenant_ids).order_by('pk'):
+            rebuild(tenant)
+
+    if tenant_ids:
+        transaction.on_commit(run)
+
+
+def differences(tenant):
+    """``(key, stored, expected)`` of each counter of ``tenant`` out of step with the source tables."""
+    from tasks.models import DashboardCounter
+
+    expected = {key: (count, amount) for key, (count, amount) in compute(tenant).items() if count or amount}
+    stored = {
+        (scope, metric, bucket): (count, amount)
+        for scope, metric, bucket, count, amount in DashboardCounter.objects.filter(tenant=tenant)
+        .exclude(count=0, amount=0)
+        .values_list('scope', 'metric', 'bucket', 'count', 'amount')
+    }
+    return [
+        (key, stored.get(key), expected.get(key))
+        for key in sorted(stored.keys() | expected.keys())
+        if stored.get(key) != expected.get(key)
+    ]
+
+
+def get_counters(tenant, revenue_since):
+    """
+    Non-empty counter rows of ``tenant`` as (scope, metric, bucket, count, amount) tuples.
+
+    Revenue days before ``revenue_since`` (an ISO date) are left out; the dashboard
+    never looks further back than the start of the month or week.
+    """
+    from tasks.models import DashboardCounter
+
+    tenant_id = getattr(tenant, 'pk', tenant)
+
+    def load():
+        return list(
+            DashboardCounter.objects.filter(tenant_id=tenant_id)
+            .exclude(count=0, amount=0)
+            .exclude(metric='revenue', bucket__lt=revenue_since)
+            .values_list('scope', 'metric', 'bucket', 'count', 'amount')
+        )
+
+    key = (tenant_id, revenue_since, dashboard_versions.get(tenant_id))
+    return counter_cache.get_or_load(key, load)
+
+
+def summarize(tenant, technician_id=None, today=None):
+    """
+    Dashboard figures of ``tenant`` derived from the counters.
+
+    Work item figures are limited to ``technician_id`` when given; task workload is
+    always tenant-wide.
+    """
+    today = today or timezone.localdate()
+    today_key = today.isoformat()
+    week_key = (today - timedelta(days=today.weekday())).isoformat()
+    month_key = today.replace(day=1).isoformat()
+    picklist = get_picklist(tenant, 'workitem_status')
+    ready_status = picklist.value_for_name('naprawione')
+
+    kpis = {'total_open': 0, 'overdue': 0, 'unassigned': 0, 'ready_for_pickup': 0}
+    status_counts = defaultdict(int)
+    revenue = {'today': ZERO, 'week': ZERO, 'month': ZERO}
+    workload = defaultdict(int)
+    tasks_overdue = defaultdict(int)
+
+    for scope, metric, bucket, count, amount in get_counters(tenant, min(week_key, month_key)):
+        if metric == 'open_tasks':
+            workload[scope] += count
+            if bucket != NO_DATE and bucket < today_key:
+                tasks_overdue[scope] += count
+            continue
+        if technician_id is not None and scope != technician_id:
+            continue
+        if metric == 'status':
+            status_counts[bucket] += count
+        elif metric == 'open':
+            due, status = bucket.split('|', 1)
+            kpis['total_open'] += count
+            if due != NO_DATE and due < today_key:
+                kpis['overdue'] += count
+            if not scope:
+                kpis['unassigned'] += count
+            if ready_status and status == ready_status:
+                kpis['ready_for_pickup'] += count
+        elif metric == 'revenue':
+            for period, start in (('today', today_key), ('week', week_key), ('month', month_key)):
+                if bucket >= start:
+                    revenue[period] += amount
+
+    return {
+        'kpis': kpis,
+        'status_counts': {status: count for status, count in status_counts.items() if count},
+        'revenue': revenue,
+        'workload': {scope: count for scope, count in workload.items() if count},
+        'tasks_overdue': {scope: count for scope, count in tasks_overdue.items() if count},
+    }
@@ -0,0 +1,60 @@
+"""
+Management command to rebuild the dashboard read model from the source tables.
+
+The counters behind ``/api/tasks/dashboard/`` are updated incrementally by signals;
+changes that bypass them (``QuerySet.update()``, bulk inserts, raw SQL, restores)
+leave them out of step. Run once after the migration creating them, and whenever
+``--check`` reports drift (the ``rebuild_dashboard_counters`` Celery task does
+the same for drifted tenants every night).
+
+Usage:
+    python manage.py rebuild_dashboard_counters
+    python manage.py rebuild_dashboard_counters --tenant=acme
+    python manage.py rebuild_dashboard_counters --check
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import dashboard
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-tenant dashboard counters from work items, tasks and cash transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Only rebuild counters for this tenant subdomain'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report tenants whose counters differ from the source tables'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all().order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(subdomain=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        drifted = 0
+        for tenant in tenants:
+            if options['check']:
+                differences = dashboard.differences(tenant)
+                if differences:
+                    drifted += 1
+                    self.stdout.write(f'  {tenant.subdomain}: {len(differences)} counter(s) differ')
+                    for key, stored, expected in differences[:10]:
+                        self.stdout.write(f'    {key}: {stored} != {expected}')
+                continue
+            cells = dashboard.rebuild(tenant)
+            self.stdout.write(f'  {tenant.subdomain}: {cells} counter(s)')
+
+        if options['check']:
+            style = self.style.WARNING if drifted else self.style.SUCCESS
+            self.stdout.write(style(f'\n{drifted} tenant(s) out of step'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\nRebuilt {tenants.count()} tenant(s)'))
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0041_task_reference_id'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tenant', 'created_date', 'id'], name='tasks_task_tenant__8252c9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workitem',
+            index=models.Index(fields=['tenant', 'created_date', 'id'], name='tasks_worki_tenant__16ebf9_idx'),
+        ),
+    ]
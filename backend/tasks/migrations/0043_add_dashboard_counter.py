@@ -0,0 +1,32 @@
+# Generated by Django 5.0.10 on 2026-10-17 01:42
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0042_add_keyset_indexes'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.IntegerField(default=0)),
+                ('metric', models.CharField(max_length=20)),
+                ('bucket', models.CharField(max_length=128)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_counters', to='tenants.tenant')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardcounter',
+            constraint=models.UniqueConstraint(fields=('tenant', 'scope', 'metric', 'bucket'), name='unique_dashboard_counter'),
+        ),
+    ]
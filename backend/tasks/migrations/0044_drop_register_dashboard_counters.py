@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def drop_register_counters(apps, schema_editor):
+    """Register balances are read from CashRegister.transactions_total now."""
+    DashboardCounter = apps.get_model('tasks', 'DashboardCounter')
+    DashboardCounter.objects.filter(metric='register').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0043_add_dashboard_counter'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_register_counters, migrations.RunPython.noop),
+    ]
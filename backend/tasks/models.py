@@ -7,7 +7,8 @@ from core.models import Address
 from django.core.validators import MinValueValidator
 from django.contrib.contenttypes.fields import GenericRelation
 from core.models import Note
-from django.db.models import Max
+from core.sequences import next_reference
+from core.tracking import ChangeTrackingMixin
 
 from tenants.models import Tenant
 
@@ -80,7 +81,7 @@ class TaskTypeValidationRule(models.Model):
         return f"{self.task_type.name} - {self.field_name} ({'required' if self.is_required else 'optional'})"
 
 
-class WorkItem(models.Model):
+class WorkItem(ChangeTrackingMixin, models.Model):
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     reference_id = models.CharField(max_length=50, blank=True, null=True)
     description = models.TextField()
@@ -145,20 +146,7 @@ class WorkItem(models.Model):
             if not self.tenant:
                 raise ValueError("Cannot generate reference_id without tenant.")
 
-            max_id = WorkItem.objects.filter(
-                tenant=self.tenant,
-                reference_id__startswith="RMA-"
-            ).annotate(
-                # Extract numeric suffix from reference_id and cast to int for max computation
-                num=models.functions.Cast(
-                    models.functions.Substr(models.F('reference_id'), 5),
-                    models.IntegerField(),
-                )
-            ).aggregate(
-                max_num=Max('num')
-            )['max_num'] or 0
-
-            self.reference_id = f"RMA-{max_id + 1}"
+            self.reference_id = next_reference(self.tenant_id, "RMA-")
 
         super().save(*args, **kwargs)
 
@@ -166,6 +154,9 @@ class WorkItem(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['tenant', 'reference_id'], name='unique_reference_per_tenant')
         ]
+        indexes = [
+            models.Index(fields=['tenant', 'created_date', 'id']),
+        ]
 
         permissions = [
             ("view_all_workitems", "Can view all work items in tenant"),
@@ -173,7 +164,7 @@ class WorkItem(models.Model):
         ]
 
 
-class Task(models.Model):
+class Task(ChangeTrackingMixin, models.Model):
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     reference_id = models.CharField(max_length=50, blank=True, null=True)
     summary = models.TextField(blank=True, null=True)
@@ -197,16 +188,7 @@ class Task(models.Model):
         if not self.reference_id:
             if not self.tenant_id:
                 raise ValueError("Cannot generate reference_id without tenant.")
-            max_id = Task.objects.filter(
-                tenant=self.tenant_id,
-                reference_id__startswith="T-"
-            ).annotate(
-                num=models.functions.Cast(
-                    models.functions.Substr(models.F('reference_id'), 3),
-                    models.IntegerField(),
-                )
-            ).aggregate(max_num=Max('num'))['max_num'] or 0
-            self.reference_id = f"T-{max_id + 1}"
+            self.reference_id = next_reference(self.tenant_id, "T-")
 
         # If status is being changed to 'Done' and completed_date is not set
         if self.status == 'Done' and not self.completed_date:
@@ -215,14 +197,9 @@ class Task(models.Model):
             self.actual_duration = self.completed_date - self.created_date
 
         # If status is being changed from 'Done' to something else, clear completion info
-        if self.pk:  # Only for existing tasks
-            try:
-                old_task = Task.objects.get(pk=self.pk)
-                if old_task.status == 'Done' and self.status != 'Done':
-                    self.completed_date = None
-                    self.actual_duration = None
-            except Task.DoesNotExist:
-                pass
+        if not self._state.adding and self.old_value('status') == 'Done' and self.status != 'Done':
+            self.completed_date = None
+            self.actual_duration = None
 
         super().save(*args, **kwargs)
 
@@ -230,7 +207,35 @@ class Task(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['tenant', 'reference_id'], name='unique_task_reference_per_tenant')
         ]
+        indexes = [
+            models.Index(fields=['tenant', 'created_date', 'id']),
+        ]
         permissions = [
             ("view_all_tasks", "Can view all tasks in tenant"),
             ("view_own_tasks", "Can view own assigned tasks"),
         ]
+
+
+class DashboardCounter(models.Model):
+    """
+    One cell of the dashboard read model (see ``tasks.dashboard``).
+
+    ``scope`` is the technician/assignee employee id, 0 for unassigned and
+    tenant-wide rows; ``bucket`` is metric specific (status, ISO date, register id).
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='dashboard_counters')
+    scope = models.IntegerField(default=0)
+    metric = models.CharField(max_length=20)
+    bucket = models.CharField(max_length=128)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'scope', 'metric', 'bucket'], name='unique_dashboard_counter'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.metric}[{self.scope}:{self.bucket}] = {self.count}/{self.amount}"
@@ -0,0 +1,54 @@
+"""Work items and tasks in the search index (see ``core.search``)."""
+from core import search
+from customers.models import Asset, Customer
+from customers.search import CUSTOMER_SEARCH_FIELDS, DEVICE_SEARCH_FIELDS, customer_document
+from inventory.models import Device
+from .models import Task, WorkItem
+from .services import task_search_results, visible_tasks, visible_work_items, work_item_search_results
+
+WORK_ITEM_SEARCH_FIELDS = {
+    'reference_id', 'description', 'device_condition', 'accessories', 'customer_id', 'customer_asset_id',
+}
+TASK_SEARCH_FIELDS = {'reference_id', 'summary', 'description', 'work_item_id'}
+
+
+def work_item_document(work_item):
+    asset = work_item.customer_asset
+    device = asset.device if asset else None
+    name, contact, _ = customer_document(work_item.customer)
+    return (
+        work_item.reference_id,
+        [
+            *name,
+            *contact,
+            asset.serial_number if asset else None,
+            device.manufacturer if device else None,
+            device.model if device else None,
+        ],
+        [work_item.description, work_item.device_condition, work_item.accessories],
+    )
+
+
+def task_document(task):
+    return (
+        task.reference_id,
+        [task.summary, task.work_item.reference_id if task.work_item else None],
+        task.description,
+    )
+
+
+search.register(
+    'work_item', WorkItem, work_item_document,
+    fields=WORK_ITEM_SEARCH_FIELDS, select_related=['customer', 'customer_asset__device'],
+    visible=visible_work_items, results=work_item_search_results,
+)
+search.register(
+    'task', Task, task_document,
+    fields=TASK_SEARCH_FIELDS, select_related=['work_item'], visible=visible_tasks, results=task_search_results,
+)
+search.register_dependency(Customer, 'work_item', 'customer', fields=CUSTOMER_SEARCH_FIELDS)
+search.register_dependency(Asset, 'work_item', 'customer_asset')
+# Devices are a catalog shared by every tenant: re-index their work items in the background
+search.register_dependency(
+    Device, 'work_item', 'customer_asset__device', fields=DEVICE_SEARCH_FIELDS, deferred=True,
+)
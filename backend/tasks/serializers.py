@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from . import bulk
 from .models import WorkItem, Task, TaskType, TaskTypeValidationRule
-from core.models import PicklistValue
+from core.picklists import get_picklist
 from service.serializers import CashRegisterSerializer, EmployeeSerializer, LocationSerializer, ShopSerializer
 from service.models import CashRegister, Employee, RepairShop, Location
 from inventory.models import Device
@@ -22,21 +23,10 @@ def validate_picklist_value(tenant, category, value):
     if not value:
         return  # Allow empty if field is not required
 
-    exists = PicklistValue.objects.filter(
-        tenant=tenant,
-        category=category,
-        value=value,
-        is_active=True
-    ).exists()
-
-    if not exists:
-        # Fetch available options for helpful error message
-        available = PicklistValue.objects.filter(
-            tenant=tenant,
-            category=category,
-            is_active=True
-        ).order_by('sort_order').values_list('value', flat=True)
+    picklist = get_picklist(tenant, category)
 
+    if value not in picklist:
+        available = picklist.values()
         available_str = ', '.join(available) if available else 'None'
         raise serializers.ValidationError(
             f"Invalid value '{value}'. Available options: {available_str}"
@@ -260,6 +250,41 @@ class WorkItemSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class WorkItemBulkUpdateSerializer(serializers.Serializer):
+    """Input of ``POST /api/tasks/work-items/bulk/``: the work items and the changes applied to all of them."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), min_length=1, max_length=bulk.MAX_ITEMS
+    )
+    status = serializers.CharField(required=False)
+    technician = serializers.PrimaryKeyRelatedField(
+        queryset=Employee.objects.none(), required=False, allow_null=True
+    )
+    due_date = serializers.DateField(required=False, allow_null=True)
+    due_date_shift_days = serializers.IntegerField(required=False, min_value=-365, max_value=365)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        tenant = self.context.get('tenant')
+        self.fields['technician'].queryset = (
+            Employee.objects.filter(tenant=tenant) if tenant is not None else Employee.objects.none()
+        )
+
+    def validate_status(self, value):
+        tenant = self.context.get('tenant')
+        if tenant:
+            validate_picklist_value(tenant, 'workitem_status', value)
+        return value
+
+    def validate(self, attrs):
+        if 'due_date' in attrs and 'due_date_shift_days' in attrs:
+            raise serializers.ValidationError("Set either due_date or due_date_shift_days, not both.")
+        if not set(attrs) - {'ids'}:
+            raise serializers.ValidationError(
+                "Nothing to change: set status, technician, due_date or due_date_shift_days."
+            )
+        return attrs
+
+
 class TaskTypeSerializer(serializers.ModelSerializer):
     """Serializer for TaskType model"""
 
@@ -1,13 +1,16 @@
 """
-Work Item search service using hybrid search approach
+Work Item and Task search services backed by the search index (``core.search``)
 """
 from django.db.models import Q
-from .models import WorkItem
+from core import search
+from .models import Task, WorkItem
 
 
 def search_work_items(query_string, tenant, user, limit=5):
     """
-    Search work items using a hybrid approach for better partial matching.
+    Search work items through their search documents: reference numbers, the
+    customer's name and phone digits, serial numbers, device names and the
+    description/condition/accessories text.
 
     Args:
         query_string: The search query string
@@ -21,87 +24,54 @@ def search_work_items(query_string, tenant, user, limit=5):
     if not query_string or len(query_string.strip()) < 2:
         return WorkItem.objects.none()
 
-    query_string = query_string.strip()
+    visible = visible_work_items(tenant, user)
+    work_items = search.top(
+        work_item_search_queryset(visible),
+        search.search(tenant, query_string, ['work_item']).filter(object_id__in=visible.values('pk')),
+        limit
+    ).order_by('-rank', '-created_date')
 
-    # Base queryset with relationships
-    queryset = WorkItem.objects.filter(
-        tenant=tenant
-    ).select_related(
-        'customer',
-        'customer_asset__device',
-        'owner__user',
-        'technician__user',
-        'dropoff_point',
-        'pickup_point',
-        'fulfillment_shop'
-    )
+    return work_items
+
+
+def visible_work_items(tenant, user):
+    """Work items of ``tenant`` that ``user`` may find in search."""
+    visible = WorkItem.objects.filter(tenant=tenant)
 
     # Apply permission filtering
     # Check if user has permission to view all work items
     if not user.has_perm('tasks.view_all_workitems'):
         # User can only see work items they own or are assigned to
         if hasattr(user, 'employee') and user.employee:
-            queryset = queryset.filter(
+            visible = visible.filter(
                 Q(owner=user.employee) | Q(technician=user.employee)
             )
         else:
             # User has no employee record, return empty
             return WorkItem.objects.none()
 
-    # Build search filters using Q objects for partial matching
-    search_filters = Q(
-        Q(reference_id__icontains=query_string) |
-        Q(description__icontains=query_string) |
-        Q(customer__phone_number__icontains=query_string) |
-        Q(customer__email__icontains=query_string) |
-        Q(customer__first_name__icontains=query_string) |
-        Q(customer__last_name__icontains=query_string) |
-        Q(device_condition__icontains=query_string) |
-        Q(accessories__icontains=query_string) |
-        Q(customer_asset__serial_number__icontains=query_string) |
-        Q(customer_asset__device__model__icontains=query_string) |
-        Q(customer_asset__device__manufacturer__icontains=query_string)
+    return visible
+
+
+def work_item_search_queryset(work_items):
+    """``work_items`` with what ``serialize_work_item_search_result`` reads."""
+    return work_items.select_related(
+        'customer',
+        'customer_asset__device',
+        'owner__user',
+        'technician__user',
+        'dropoff_point',
+        'pickup_point',
+        'fulfillment_shop'
     )
 
-    # Custom ranking for better relevance
-    from django.db.models import Case, When, IntegerField, Value
-
-    work_items = queryset.filter(
-        search_filters
-    ).annotate(
-        rank=Case(
-            # Reference ID exact match (highest priority)
-            When(reference_id__iexact=query_string, then=Value(100)),
-            # Reference ID starts with query
-            When(reference_id__istartswith=query_string, then=Value(95)),
-            # Reference ID contains query
-            When(reference_id__icontains=query_string, then=Value(90)),
-            # Customer phone exact match
-            When(customer__phone_number__iexact=query_string, then=Value(85)),
-            # Customer phone starts with query
-            When(customer__phone_number__istartswith=query_string, then=Value(80)),
-            # Customer phone contains query
-            When(customer__phone_number__icontains=query_string, then=Value(75)),
-            # Device model starts with query
-            When(customer_asset__device__model__istartswith=query_string, then=Value(70)),
-            # Device manufacturer starts with query
-            When(customer_asset__device__manufacturer__istartswith=query_string, then=Value(70)),
-            # Serial number match
-            When(customer_asset__serial_number__icontains=query_string, then=Value(65)),
-            # Customer name matches
-            When(customer__first_name__istartswith=query_string, then=Value(60)),
-            When(customer__last_name__istartswith=query_string, then=Value(60)),
-            # Description contains query
-            When(description__icontains=query_string, then=Value(50)),
-            # Other fields
-            When(device_condition__icontains=query_string, then=Value(40)),
-            When(accessories__icontains=query_string, then=Value(30)),
-            default=Value(1),
-            output_field=IntegerField()
-        )
-    ).order_by('-rank', '-created_date')[:limit]
 
-    return work_items
+def work_item_search_results(tenant, ids):
+    """Serialized global search results of the work items with ``ids``."""
+    return [
+        serialize_work_item_search_result(work_item)
+        for work_item in work_item_search_queryset(WorkItem.objects.filter(tenant=tenant, pk__in=ids))
+    ]
 
 
 def serialize_work_item_search_result(work_item):
@@ -153,3 +123,47 @@ def serialize_work_item_search_result(work_item):
         }
 
     return result
+
+
+def visible_tasks(tenant, user):
+    """Tasks of ``tenant`` that ``user`` may find in search (as in the task list)."""
+    tasks = Task.objects.filter(tenant=tenant)
+    if user.has_permission('view_all_tasks', tenant):
+        return tasks
+    if user.has_permission('view_own_tasks', tenant):
+        return tasks.filter(assigned_employee__user=user)
+    return Task.objects.none()
+
+
+def task_search_results(tenant, ids):
+    """Serialized global search results of the tasks with ``ids``."""
+    tasks = Task.objects.filter(tenant=tenant, pk__in=ids).select_related('work_item', 'assigned_employee__user')
+    return [serialize_task_search_result(task) for task in tasks]
+
+
+def serialize_task_search_result(task):
+    """
+    Serialize a task search result.
+
+    Args:
+        task: Task object with its work item and assigned employee loaded
+
+    Returns:
+        Dictionary with task data
+    """
+    employee = task.assigned_employee
+    return {
+        'id': task.id,
+        'reference_id': task.reference_id,
+        'summary': task.summary,
+        'status': task.status,
+        'due_date': task.due_date,
+        'work_item': {
+            'id': task.work_item.id,
+            'reference_id': task.work_item.reference_id,
+        } if task.work_item else None,
+        'assigned_employee': {
+            'id': employee.id,
+            'name': f"{employee.user.first_name} {employee.user.last_name}".strip(),
+        } if employee else None,
+    }
@@ -4,21 +4,24 @@ Signals for the tasks app.
 This module handles:
 - Automatic creation of default picklist values when new tenants are created
 - Auto-creating notes on WorkItems when status changes (WorkItem or child Task)
+- Moving a task's notes along when the task is moved to another work item
+- Keeping the dashboard counters (``tasks.dashboard``) in step with WorkItem and
+  Task changes
+- Publishing WorkItem and Task changes to the tenant's change feed (``tasks.changes``)
 """
 
 import logging
-from django.db.models.signals import post_save, pre_save
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from tenants.models import Tenant
 from core.models import Note, PicklistValue
+from tasks import changes, dashboard
 from tasks.models import Task, WorkItem
 
 logger = logging.getLogger(__name__)
 
-# Store old status values before save for change detection
-_workitem_old_status = {}
-_task_old_status = {}
-
 
 @receiver(post_save, sender=Tenant)
 def create_default_picklists(sender, instance, created, **kwargs):
@@ -78,25 +81,13 @@ def create_default_picklists(sender, instance, created, **kwargs):
 # WorkItem status change → note on WorkItem
 # ---------------------------------------------------------------------------
 
-@receiver(pre_save, sender=WorkItem)
-def workitem_status_pre_save(sender, instance, **kwargs):
-    """Capture old status before save so we can detect changes."""
-    if instance.pk:
-        try:
-            _workitem_old_status[instance.pk] = WorkItem.objects.values_list(
-                'status', flat=True
-            ).get(pk=instance.pk)
-        except WorkItem.DoesNotExist:
-            pass
-
-
 @receiver(post_save, sender=WorkItem)
 def workitem_status_note(sender, instance, created, **kwargs):
     """Create a system note on the WorkItem when its status changes."""
     if created:
         return
 
-    old_status = _workitem_old_status.pop(instance.pk, None)
+    old_status = instance.old_value('status')
     if old_status and old_status != instance.status:
         author = getattr(instance, '_changed_by', None)
         Note.objects.create(
@@ -114,18 +105,6 @@ def workitem_status_note(sender, instance, created, **kwargs):
 # Task status change → note on parent WorkItem
 # ---------------------------------------------------------------------------
 
-@receiver(pre_save, sender=Task)
-def task_status_pre_save(sender, instance, **kwargs):
-    """Capture old status before save so we can detect changes."""
-    if instance.pk:
-        try:
-            _task_old_status[instance.pk] = Task.objects.values_list(
-                'status', flat=True
-            ).get(pk=instance.pk)
-        except Task.DoesNotExist:
-            pass
-
-
 @receiver(post_save, sender=Task)
 def task_status_note(sender, instance, created, **kwargs):
     """Create a note on the Task when its status changes.
@@ -137,7 +116,7 @@ def task_status_note(sender, instance, created, **kwargs):
     if created:
         return
 
-    old_status = _task_old_status.pop(instance.pk, None)
+    old_status = instance.old_value('status')
     if old_status and old_status != instance.status:
         task_label = instance.task_type.name if instance.task_type else f"Task #{instance.pk}"
         author = getattr(instance, '_changed_by', None)
@@ -150,3 +129,123 @@ def task_status_note(sender, instance, created, **kwargs):
             "Task %s: status note created (%s → %s)",
             instance.pk, old_status, instance.status,
         )
+
+
+@receiver(post_save, sender=Task)
+def task_notes_follow_work_item(sender, instance, created, **kwargs):
+    """Keep the denormalized ``Note.work_item`` of a task's notes in step when it is moved."""
+    if created:
+        return
+    if 'work_item_id' in instance.changed_fields():
+        Note.objects.filter(
+            content_type=ContentType.objects.get_for_model(Task), object_id=instance.pk
+        ).update(work_item_id=instance.work_item_id)
+
+
+# ---------------------------------------------------------------------------
+# Dashboard counters
+# ---------------------------------------------------------------------------
+
+def _deleting_tenant(origin):
+    """True when a row is deleted as part of deleting its whole tenant (counters go too)."""
+    if isinstance(origin, Tenant):
+        return True
+    return isinstance(origin, QuerySet) and origin.model is Tenant
+
+@receiver(post_save, sender=WorkItem)
+def workitem_dashboard_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    dashboard.apply_change(
+        instance.tenant_id,
+        {} if created else dashboard.work_item_contributions(
+            instance.tenant_id, dashboard.previous_values(instance, dashboard.WORK_ITEM_FIELDS)
+        ),
+        dashboard.work_item_contributions(
+            instance.tenant_id, dashboard.row_values(instance, dashboard.WORK_ITEM_FIELDS)
+        ),
+    )
+
+
+@receiver(post_delete, sender=WorkItem)
+def workitem_dashboard_delete(sender, instance, origin=None, **kwargs):
+    if _deleting_tenant(origin):
+        return
+    dashboard.apply_change(
+        instance.tenant_id,
+        dashboard.work_item_contributions(
+            instance.tenant_id, dashboard.row_values(instance, dashboard.WORK_ITEM_FIELDS)
+        ),
+        {},
+    )
+
+
+@receiver(post_save, sender=Task)
+def task_dashboard_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    dashboard.apply_change(
+        instance.tenant_id,
+        {} if created else dashboard.task_contributions(
+            dashboard.previous_values(instance, dashboard.TASK_FIELDS)
+        ),
+        dashboard.task_contributions(dashboard.row_values(instance, dashboard.TASK_FIELDS)),
+    )
+
+
+@receiver(post_delete, sender=Task)
+def task_dashboard_delete(sender, instance, origin=None, **kwargs):
+    if _deleting_tenant(origin):
+        return
+    dashboard.apply_change(
+        instance.tenant_id,
+        dashboard.task_contributions(dashboard.row_values(instance, dashboard.TASK_FIELDS)),
+        {},
+    )
+
+
+@receiver([post_save, post_delete], sender=PicklistValue)
+def workitem_status_picklist_changed(sender, instance, raw=False, **kwargs):
+    """Which status counts as resolved may have changed; recount the tenant's open work items."""
+    if raw or instance.category != 'workitem_status' or not instance.tenant_id:
+        return
+    dashboard.rebuild_on_commit(instance.tenant_id)
+
+
+# ---------------------------------------------------------------------------
+# Change feed
+# ---------------------------------------------------------------------------
+
+def _announce_saved(entity_type, instance, created):
+    if created:
+        message = changes.message(entity_type, instance, 'created')
+    else:
+        fields = instance.changed_fields()
+        if not fields:
+            return
+        message = changes.message(entity_type, instance, 'updated', fields)
+    changes.announce(instance.tenant_id, [message])
+
+
+@receiver(post_save, sender=WorkItem)
+def workitem_change_feed_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        _announce_saved(changes.WORK_ITEM, instance, created)
+
+
+@receiver(post_save, sender=Task)
+def task_change_feed_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        _announce_saved(changes.TASK, instance, created)
+
+
+@receiver(post_delete, sender=WorkItem)
+def workitem_change_feed_delete(sender, instance, origin=None, **kwargs):
+    if not _deleting_tenant(origin):
+        changes.announce(instance.tenant_id, [changes.message(changes.WORK_ITEM, instance, 'deleted')])
+
+
+@receiver(post_delete, sender=Task)
+def task_change_feed_delete(sender, instance, origin=None, **kwargs):
+    if not _deleting_tenant(origin):
+        changes.announce(instance.tenant_id, [changes.message(changes.TASK, instance, 'deleted')])
@@ -0,0 +1,28 @@
+"""
+Celery tasks for the tasks app.
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def rebuild_dashboard_counters():
+    """
+    Nightly task rebuilding the dashboard counters of tenants whose counters drifted
+    from the source tables (see ``tasks.dashboard``).
+    Scheduled with Celery Beat (see CELERY_BEAT_SCHEDULE).
+    """
+    from tasks import dashboard
+    from tenants.models import Tenant
+
+    rebuilt = 0
+    for tenant in Tenant.objects.order_by('pk'):
+        differences = dashboard.differences(tenant)
+        if differences:
+            logger.warning(f"Dashboard counters of {tenant.subdomain} drifted ({len(differences)} cell(s)), rebuilding")
+            dashboard.rebuild(tenant)
+            rebuilt += 1
+    return rebuilt
@@ -1,3 +1,578 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+import time
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import events
+from core.models import Address, Note, PicklistValue, Role, RolePermission, User, UserRole
+from core.permission_cache import permission_sets, permission_versions
+from core.picklists import invalidate_picklists, picklist_versions, registries
+from customers.models import Asset, Customer
+from integrations.models import TenantIntegration
+from inventory.models import Device
+from service.models import CashRegister, CashTransaction, Employee, Location, RepairShop
+from tasks import changes, dashboard
+from tasks.models import DashboardCounter, Task, WorkItem
+from tasks.tasks import rebuild_dashboard_counters
+from tenants.cache import membership_cache, tenant_cache
+from tenants.models import Tenant
+
+
+class DashboardCounterTest(TestCase):
+    def setUp(self):
+        # Row ids are reused between tests, so drop anything cached for them
+        cache.clear()
+        for local in (permission_versions, permission_sets, picklist_versions, registries,
+                      tenant_cache, membership_cache, dashboard.dashboard_versions, dashboard.counter_cache):
+            local.clear_local()
+
+        self.tenant = Tenant.objects.create(name="Dashboard", subdomain="dash")
+        self.location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.manager = self.make_employee("manager", "Manager")
+        self.tech = self.make_employee("tech", "technician")
+        self.customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Jan", last_name="Kowalski", phone_number="500100200"
+        )
+        shop = RepairShop.objects.create(
+            tenant=self.tenant, name="Main",
+            address=Address.objects.create(street="Long", city="Gdansk", building_number="1", postal_code="80-001"),
+        )
+        self.register = CashRegister.objects.create(
+            tenant=self.tenant, shop=shop, name="Till", opening_balance=Decimal("100.00")
+        )
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+
+    def make_employee(self, username, role):
+        user = User.objects.create_user(
+            email=f"{username}@test.com", password="x", username=username, first_name=username.title()
+        )
+        return Employee.objects.create(tenant=self.tenant, user=user, role=role, location=self.location)
+
+    def add_work_item(self, **kwargs):
+        return WorkItem.objects.create(
+            tenant=self.tenant, customer=self.customer, owner=self.manager, dropoff_point=self.location, **kwargs
+        )
+
+    def stored(self):
+        return {
+            (scope, metric, bucket): (count, amount)
+            for scope, metric, bucket, count, amount in DashboardCounter.objects.filter(tenant=self.tenant)
+            .exclude(count=0, amount=0).values_list('scope', 'metric', 'bucket', 'count', 'amount')
+        }
+
+    def expected(self):
+        return {key: tuple(value) for key, value in dashboard.compute(self.tenant).items()}
+
+    def get_dashboard(self, employee):
+        client = APIClient()
+        client.force_authenticate(user=employee.user)
+        client.credentials(HTTP_X_TENANT="dash")
+        response = client.get("/api/tasks/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def exercise(self):
+        overdue = self.add_work_item(technician=self.tech, due_date=self.yesterday)
+        unassigned = self.add_work_item()
+        closed = self.add_work_item(technician=self.tech)
+        closed.status = "Resolved"
+        closed.closed_date = timezone.now()
+        closed.final_price = Decimal("250.00")
+        closed.save()
+        unassigned.technician = self.tech
+        unassigned.save()
+        unassigned.technician = None
+        unassigned.save()
+
+        task = Task.objects.create(
+            tenant=self.tenant, work_item=overdue, assigned_employee=self.tech, due_date=self.yesterday
+        )
+        Task.objects.create(tenant=self.tenant, work_item=overdue, assigned_employee=self.manager)
+        done = Task.objects.create(tenant=self.tenant, work_item=closed, assigned_employee=self.tech)
+        done.status = "Done"
+        done.save()
+        task.assigned_employee = self.manager
+        task.save()
+
+        CashTransaction.objects.create(
+            tenant=self.tenant, register=self.register, transaction_type="deposit", amount=Decimal("40.00")
+        )
+        CashTransaction.objects.create(
+            tenant=self.tenant, register=self.register, transaction_type="deposit", amount=Decimal("9.99")
+        ).delete()
+        self.add_work_item(technician=self.tech).delete()
+
+    def test_incremental_counters_match_rebuild(self):
+        self.exercise()
+        self.assertEqual(self.stored(), self.expected())
+        dashboard.rebuild(self.tenant)
+        self.assertEqual(self.stored(), self.expected())
+
+    def test_dashboard_figures(self):
+        self.exercise()
+        data = self.get_dashboard(self.manager)
+
+        self.assertEqual(data["kpis"], {"total_open": 2, "overdue": 1, "unassigned": 1, "ready_for_pickup": 0})
+        self.assertEqual({p["status"]: p["count"] for p in data["pipeline"]}, {"New": 2, "Resolved": 1})
+        self.assertEqual(data["financial"]["revenue_today"], "250.00")
+        self.assertEqual(data["financial"]["revenue_month"], "250.00")
+        self.assertEqual(data["financial"]["register_balances"][0]["current_balance"], "140.00")
+        # Read from the register itself, not counted again by the dashboard
+        self.assertFalse(DashboardCounter.objects.filter(tenant=self.tenant, metric="register").exists())
+        self.assertEqual(
+            [(w["technician_id"], w["name"], w["open_count"]) for w in data["technician_workload"]],
+            [(self.manager.pk, "Manager", 2)],
+        )
+        self.assertEqual(
+            [(t["employee_id"], t["overdue_count"]) for t in data["tasks_overdue_by_assignee"]],
+            [(self.manager.pk, 1)],
+        )
+
+        # Technicians only see their own work items
+        kpis = self.get_dashboard(self.tech)["kpis"]
+        self.assertEqual(kpis, {"total_open": 1, "overdue": 1, "unassigned": 0, "ready_for_pickup": 0})
+
+    def test_served_from_cache_after_change(self):
+        self.get_dashboard(self.manager)
+        self.add_work_item(due_date=self.yesterday)
+        self.assertEqual(self.get_dashboard(self.manager)["kpis"]["overdue"], 1)
+
+    def test_query_count_does_not_grow(self):
+        def count_queries():
+            self.get_dashboard(self.manager)
+            with CaptureQueriesContext(connection) as queries:
+                self.get_dashboard(self.manager)
+            return len(queries)
+
+        self.exercise()
+        small = count_queries()
+        for n in range(15):
+            item = self.add_work_item(technician=self.tech, due_date=self.yesterday - timedelta(days=n))
+            Task.objects.create(tenant=self.tenant, work_item=item, assigned_employee=self.tech)
+        self.assertEqual(count_queries(), small)
+
+    def test_rebuild_command_repairs_drift(self):
+        self.exercise()
+        WorkItem.objects.filter(tenant=self.tenant).update(due_date=None)
+
+        out = StringIO()
+        call_command("rebuild_dashboard_counters", "--check", stdout=out)
+        self.assertIn("dash:", out.getvalue())
+
+        call_command("rebuild_dashboard_counters", "--tenant=dash", stdout=StringIO())
+        self.assertEqual(self.stored(), self.expected())
+        self.assertEqual(self.get_dashboard(self.manager)["kpis"]["overdue"], 0)
+
+    def test_nightly_task_repairs_concurrent_saves(self):
+        item = self.add_work_item(technician=self.tech)
+        first, second = WorkItem.objects.get(pk=item.pk), WorkItem.objects.get(pk=item.pk)
+        # Both requests loaded the row unassigned and move it out of that bucket
+        first.technician = None
+        first.save()
+        second.status = "In Progress"
+        second.save()
+        self.assertNotEqual(self.stored(), self.expected())
+
+        with self.assertLogs("tasks.tasks", "WARNING"):
+            self.assertEqual(rebuild_dashboard_counters(), 1)
+        self.assertEqual(self.stored(), self.expected())
+        self.assertEqual(rebuild_dashboard_counters(), 0)
+
+    def test_picklist_admin_actions_recount_open_work_items(self):
+        resolved = PicklistValue.objects.get(tenant=self.tenant, category="workitem_status", value="Resolved")
+        PicklistValue.objects.filter(pk=resolved.pk).update(is_active=False)
+        invalidate_picklists(self.tenant.pk)
+        dashboard.rebuild(self.tenant)
+        # Without a resolved status, work items are open until they have a closing date
+        self.add_work_item(status="Resolved")
+        self.assertEqual(self.get_dashboard(self.manager)["kpis"]["total_open"], 1)
+
+        admin_user = User.objects.create_superuser(email="admin@test.com", password="x", username="dashadmin")
+        self.client.force_login(admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/admin/core/picklistvalue/", {"action": "activate_values", "_selected_action": [resolved.pk]}
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.stored(), self.expected())
+        self.assertEqual(self.get_dashboard(self.manager)["kpis"]["total_open"], 0)
+
+
+class WorkItemBulkUpdateTest(TestCase):
+    url = "/api/tasks/work-items/bulk/"
+
+    def setUp(self):
+        cache.clear()
+        for local in (permission_versions, permission_sets, picklist_versions, registries,
+                      tenant_cache, membership_cache, dashboard.dashboard_versions, dashboard.counter_cache):
+            local.clear_local()
+
+        self.tenant = Tenant.objects.create(name="Bulk", subdomain="bulk")
+        location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.employees = {}
+        for username in ("manager", "tech", "viewer"):
+            user = User.objects.create_user(email=f"{username}@test.com", password="x", username=username)
+            self.employees[username] = Employee.objects.create(
+                tenant=self.tenant, user=user, role="technician", location=location
+            )
+        role = Role.objects.create(tenant=self.tenant, name="Manager")
+        UserRole.objects.create(user=self.employees["manager"].user, role=role)
+        for codename in ("change_workitem", "view_all_workitems"):
+            RolePermission.objects.create(
+                role=role, permission=Permission.objects.get(content_type__app_label="tasks", codename=codename)
+            )
+
+        customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Jan", last_name="Kowalski", phone_number="500100200"
+        )
+        self.today = timezone.localdate()
+        self.items = [
+            WorkItem.objects.create(
+                tenant=self.tenant, customer=customer, owner=self.employees["manager"], dropoff_point=location,
+                due_date=self.today if n % 2 else None,
+            )
+            for n in range(8)
+        ]
+
+    def post(self, payload, username="manager"):
+        client = APIClient()
+        client.force_authenticate(user=self.employees[username].user)
+        client.credentials(HTTP_X_TENANT="bulk")
+        return client.post(self.url, payload, format="json")
+
+    def test_per_item_results(self):
+        first, second = self.items[:2]
+        second.status = "Resolved"
+        second.save()
+
+        resp = self.post({"ids": [first.pk, second.pk, 999999], "status": "Resolved"})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["updated"], 1)
+        self.assertEqual(
+            [(row["id"], row["result"]) for row in data["results"]],
+            [(first.pk, "updated"), (second.pk, "unchanged"), (999999, "not_found")],
+        )
+        self.assertEqual(data["results"][0]["changes"], {"status": {"old": "New", "new": "Resolved"}})
+        first.refresh_from_db()
+        self.assertEqual(first.status, "Resolved")
+
+    def test_reassign_and_shift_due_dates(self):
+        tech = self.employees["tech"]
+        resp = self.post({
+            "ids": [item.pk for item in self.items], "technician": tech.pk, "due_date_shift_days": 2,
+        })
+        self.assertEqual(resp.status_code, 200)
+        # Items without a due date keep none
+        self.assertEqual(
+            list(WorkItem.objects.filter(tenant=self.tenant).order_by("pk").values_list("technician_id", "due_date")),
+            [(tech.pk, self.today + timedelta(days=2) if n % 2 else None) for n in range(8)],
+        )
+        self.assertEqual(sum(1 for row in resp.json()["results"] if "due_date" in row["changes"]), 4)
+        self.assertEqual(
+            {key: tuple(value) for key, value in dashboard.compute(self.tenant).items()},
+            {
+                (scope, metric, bucket): (count, amount)
+                for scope, metric, bucket, count, amount in DashboardCounter.objects.filter(tenant=self.tenant)
+                .exclude(count=0, amount=0).values_list('scope', 'metric', 'bucket', 'count', 'amount')
+            },
+        )
+
+    def test_side_effects_are_coalesced(self):
+        TenantIntegration.objects.create(
+            tenant=self.tenant, name="n8n", integration_type="n8n",
+            event_type="workitem_bulk_updated", webhook_url="https://example.com/hook",
+        )
+        ids = [item.pk for item in self.items]
+        with mock.patch("integrations.signals.workitem.send_integration_webhook") as webhook:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.post({"ids": ids, "status": "In Progress"})
+
+        notes = Note.objects.filter(work_item__in=ids, content__contains="'New' to 'In Progress'")
+        self.assertEqual(notes.count(), 8)
+        self.assertEqual(set(notes.values_list("tenant_id", "author_id").distinct()),
+                         {(self.tenant.pk, self.employees["manager"].user.pk)})
+        self.assertEqual(webhook.delay.call_count, 1)
+        payload = webhook.delay.call_args.kwargs["payload"]
+        self.assertEqual((payload["event_type"], payload["count"]), ("workitem_bulk_updated", 8))
+        self.assertEqual(payload["workitems"][0]["changes"], {"status": {"old": "New", "new": "In Progress"}})
+
+    def test_query_count_does_not_grow(self):
+        def count_queries(items, status):
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.post({"ids": [item.pk for item in items], "status": status})
+            self.assertEqual(resp.json()["updated"], len(items))
+            return len(queries)
+
+        count_queries(self.items[:2], "In Progress")  # warm caches and create the counter rows
+        # Counter writes scale with the distinct cells touched, not with the number of items
+        self.assertEqual(count_queries(self.items[2:4], "In Progress"), count_queries(self.items[4:], "In Progress"))
+
+    def test_permission_and_validation(self):
+        ids = [self.items[0].pk]
+        self.assertEqual(self.post({"ids": ids, "status": "Resolved"}, username="viewer").status_code, 403)
+        self.assertEqual(self.post({"ids": ids}).status_code, 400)
+        self.assertEqual(self.post({"ids": ids, "status": "Bogus"}).status_code, 400)
+        self.assertEqual(self.post({"ids": ids, "due_date": None, "due_date_shift_days": 1}).status_code, 400)
+
+        other = Tenant.objects.create(name="Other", subdomain="other")
+        stranger = Employee.objects.create(
+            tenant=other, user=User.objects.create_user(email="s@test.com", password="x", username="s"),
+            role="technician", location=Location.objects.create(tenant=other, name="Desk"),
+        )
+        self.assertEqual(self.post({"ids": ids, "technician": stranger.pk}).status_code, 400)
+        self.assertEqual(WorkItem.objects.get(pk=ids[0]).status, "New")
+
+
+class TaskIncludeTest(TestCase):
+    url = "/api/tasks/tasks/"
+    includes = "workItem,deviceName,assignedEmployee,workItemDetails"
+
+    def setUp(self):
+        cache.clear()
+        for local in (permission_versions, permission_sets, picklist_versions, registries,
+                      tenant_cache, membership_cache, dashboard.dashboard_versions, dashboard.counter_cache):
+            local.clear_local()
+
+        self.tenant = Tenant.objects.create(name="Include", subdomain="include")
+        self.location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.admin = User.objects.create_superuser(email="admin@test.com", password="x", username="admin")
+        self.tech = Employee.objects.create(
+            tenant=self.tenant, role="technician", location=self.location,
+            user=User.objects.create_user(email="tech@test.com", password="x", username="tech"),
+        )
+        role = Role.objects.create(tenant=self.tenant, name="Technician")
+        UserRole.objects.create(user=self.tech.user, role=role)
+        for codename in ("view_own_tasks", "view_own_workitems"):
+            RolePermission.objects.create(
+                role=role, permission=Permission.objects.get(content_type__app_label="tasks", codename=codename)
+            )
+        self.device = Device.objects.create(manufacturer="Apple", model="iPhone 12")
+
+    def add_task(self, technician=None):
+        customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Jan", last_name="Kowalski", phone_number="500100200",
+            address=Address.objects.create(street="Long", city="Gdansk", building_number="1", postal_code="80-001"),
+        )
+        work_item = WorkItem.objects.create(
+            tenant=self.tenant, customer=customer, owner=self.tech, dropoff_point=self.location,
+            technician=technician, customer_asset=Asset.objects.create(customer=customer, device=self.device),
+        )
+        return Task.objects.create(tenant=self.tenant, work_item=work_item, assigned_employee=self.tech)
+
+    def get(self, path, user, **params):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.credentials(HTTP_X_TENANT="include")
+        response = client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list_includes(self):
+        task = self.add_task()
+        Task.objects.create(tenant=self.tenant, assigned_employee=self.tech)
+        rows = {row["id"]: row for row in self.get(self.url, self.admin, include=self.includes)}
+
+        row = rows[task.pk]
+        self.assertEqual(row["work_item"], {"id": task.work_item.pk, "reference_id": task.work_item.reference_id})
+        self.assertEqual(row["device_name"], "Apple iPhone 12")
+        self.assertEqual(row["assignedEmployee"]["id"], self.tech.pk)
+        details = row["workItemDetails"]
+        self.assertEqual(details["id"], task.work_item.pk)
+        self.assertEqual(details["customerDetails"]["last_name"], "Kowalski")
+        self.assertEqual(details["deviceDetails"]["id"], task.work_item.customer_asset.pk)
+
+        # Tasks without a work item get no work item details
+        bare = next(row for pk, row in rows.items() if pk != task.pk)
+        self.assertIsNone(bare["work_item"])
+        self.assertNotIn("workItemDetails", bare)
+        self.assertIsNone(bare["device_name"])
+
+        # Unknown names are ignored; no include adds nothing
+        self.assertNotIn("assignedEmployee", self.get(self.url, self.admin, include="bogus")[0])
+
+    def test_work_item_details_follow_permissions(self):
+        own, other = self.add_task(technician=self.tech), self.add_task()
+        for task, visible in ((own, True), (other, False)):
+            data = self.get(f"{self.url}{task.pk}/", self.tech.user, include="workItemDetails")
+            self.assertEqual(data["workItemDetails"] is not None, visible)
+
+    def test_query_count_does_not_grow(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.get(self.url, self.admin, include=self.includes, page_size=50)
+            return len(queries)
+
+        self.add_task()
+        count_queries()
+        one = count_queries()
+        for _ in range(4):
+            self.add_task(technician=self.tech)
+        self.assertEqual(count_queries(), one)
+
+    def test_work_item_retrieve_includes(self):
+        work_item = self.add_task().work_item
+        data = self.get(f"/api/tasks/work-items/{work_item.pk}/", self.admin,
+                        include="customerDetails,deviceDetails,owner")
+        self.assertEqual(data["customerDetails"]["id"], work_item.customer_id)
+        self.assertEqual(data["deviceDetails"]["id"], work_item.customer_asset_id)
+        self.assertEqual(data["owner"]["id"], self.tech.pk)
+
+
+@override_settings(EVENTS_REDIS_URL=None, EVENTS_IN_MEMORY=True)
+class ChangeFeedTest(TestCase):
+    url = "/api/tasks/changes/"
+
+    def setUp(self):
+        cache.clear()
+        for local in (permission_versions, permission_sets, picklist_versions, registries,
+                      tenant_cache, membership_cache, dashboard.dashboard_versions, dashboard.counter_cache):
+            local.clear_local()
+        events.get_log().clear()
+
+        self.tenant = Tenant.objects.create(name="Feed", subdomain="feed")
+        self.location = Location.objects.create(tenant=self.tenant, name="Front desk")
+        self.employees = {}
+        for username, codenames in (
+            ("manager", ("view_all_workitems", "view_all_tasks", "change_workitem")),
+            ("tech", ("view_own_workitems", "view_own_tasks")),
+            ("viewer", ()),
+        ):
+            user = User.objects.create_user(email=f"{username}@test.com", password="x", username=username)
+            self.employees[username] = Employee.objects.create(
+                tenant=self.tenant, user=user, role="technician", location=self.location
+            )
+            role = Role.objects.create(tenant=self.tenant, name=username)
+            UserRole.objects.create(user=user, role=role)
+            for codename in codenames:
+                RolePermission.objects.create(
+                    role=role, permission=Permission.objects.get(content_type__app_label="tasks", codename=codename)
+                )
+        self.customer = Customer.objects.create(
+            tenant=self.tenant, first_name="Jan", last_name="Kowalski", phone_number="500100200"
+        )
+
+    def client_for(self, username):
+        client = APIClient()
+        client.force_authenticate(user=self.employees[username].user)
+        client.credentials(HTTP_X_TENANT="feed")
+        return client
+
+    def wait(self, username, cursor=None, timeout=0.05):
+        params = {"timeout": timeout}
+        if cursor:
+            params["cursor"] = cursor
+        response = self.client_for(username).get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def add_work_item(self, technician=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return WorkItem.objects.create(
+                tenant=self.tenant, customer=self.customer, owner=self.employees["manager"],
+                dropoff_point=self.location, technician=technician,
+            )
+
+    def test_changes_are_filtered_by_view_permissions(self):
+        start = self.wait("manager")
+        self.assertEqual((start["reset"], start["changes"]), (True, []))
+        cursor = start["cursor"]
+
+        own = self.add_work_item()
+        assigned = self.add_work_item(technician=self.employees["tech"])
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(tenant=self.tenant, work_item=own, assigned_employee=self.employees["manager"])
+
+        seen = self.wait("manager", cursor)
+        self.assertFalse(seen["reset"])
+        self.assertEqual(
+            [(change["type"], change["id"], change["event"]) for change in seen["changes"]],
+            [("work_item", own.pk, "created"), ("work_item", assigned.pk, "created"), ("task", task.pk, "created")],
+        )
+        self.assertNotIn("employees", seen["changes"][0])
+        self.assertEqual(
+            [change["id"] for change in self.wait("tech", cursor)["changes"]], [assigned.pk]
+        )
+        self.assertEqual(self.client_for("viewer").get(self.url).status_code, 403)
+
+    def test_reassigned_and_deleted_rows_reach_former_assignees(self):
+        item = self.add_work_item(technician=self.employees["tech"])
+        cursor = self.wait("tech")["cursor"]
+
+        item.technician = self.employees["viewer"]
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+        changed = self.wait("tech", cursor)
+        self.assertEqual(changed["changes"], [
+            {"type": "work_item", "id": item.pk, "event": "updated", "fields": ["technician_id"]},
+        ])
+
+        pk = item.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            item.delete()
+        self.assertEqual(self.wait("tech", changed["cursor"])["changes"], [])
+        deleted = self.wait("manager", changed["cursor"])["changes"]
+        self.assertEqual([(change["id"], change["event"]) for change in deleted], [(pk, "deleted")])
+
+    def test_arriving_summary_is_announced(self):
+        item = self.add_work_item()
+        item.summary_request_id = uuid.uuid4()
+        item.summary_status = "pending"
+        item.save()
+        cursor = self.wait("manager")["cursor"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_for("manager").post("/api/integrations/summary-callback/", {
+                "request_id": str(item.summary_request_id), "workitem_id": item.pk, "summary": "Screen replaced",
+            }, format="json")
+        self.assertEqual(response.status_code, 200)
+        change, = self.wait("manager", cursor)["changes"]
+        self.assertEqual((change["id"], change["event"]), (item.pk, "updated"))
+        self.assertIn("summary_status", change["fields"])
+
+    def test_bulk_updates_are_announced(self):
+        items = [self.add_work_item() for _ in range(3)]
+        cursor = self.wait("manager")["cursor"]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_for("manager").post("/api/tasks/work-items/bulk/", {
+                "ids": [item.pk for item in items], "technician": self.employees["tech"].pk,
+            }, format="json")
+        self.assertEqual(response.status_code, 200)
+        # The new technician sees the items arrive
+        self.assertEqual(
+            [(change["id"], change["fields"]) for change in self.wait("tech", cursor)["changes"]],
+            [(item.pk, ["technician_id"]) for item in items],
+        )
+
+    def test_waits_through_changes_the_user_may_not_see(self):
+        cursor = self.wait("tech")["cursor"]
+        self.add_work_item()
+        data = self.wait("tech", cursor)
+        self.assertEqual((data["reset"], data["changes"]), (False, []))
+        self.assertEqual(data["cursor"], events.last_id(changes.channel(self.tenant.pk)))
+
+    @override_settings(EVENTS_IN_MEMORY=False)
+    def test_without_an_event_log_clients_poll(self):
+        # Changes saved by other processes (web workers, Celery) would never arrive
+        started = time.monotonic()
+        data = self.wait("manager", "1", timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(data, {"cursor": None, "reset": True, "changes": []})
+
+    @override_settings(EVENTS_MAX_WAITERS=0)
+    def test_waiters_beyond_the_limit_are_turned_away(self):
+        cursor = self.wait("manager")["cursor"]
+        response = self.client_for("manager").get(self.url, {"cursor": cursor, "timeout": 5})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "5")
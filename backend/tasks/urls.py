@@ -18,6 +18,7 @@ WorkItemSchemaView,
 TaskSchemaView,
 TaskViewSet,
 TaskTypeViewSet,
+ChangeFeedView,
 DashboardView)
 
 app_name = "tasks"
@@ -41,6 +42,7 @@ urlpatterns = [
     path('api/schema/work-item/', WorkItemSchemaView.as_view(), name="work_item_schema"),
     path('api/schema/task/', TaskSchemaView.as_view(), name="task_schema"),
     path('dashboard/', DashboardView.as_view(), name="dashboard"),
+    path('changes/', ChangeFeedView.as_view(), name="change_feed"),
 ]
 
 # Router URLs come first so they take precedence
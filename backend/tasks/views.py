@@ -1,33 +1,39 @@
 from decimal import Decimal
-from datetime import timedelta
 
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, reverse, get_object_or_404
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 
-from customers.serializers import CustomerSerializer
+from core import events
+from core.expand import ExpandableMixin, Expansion, resolve
+from customers.serializers import AssetSerializer, CustomerSerializer
 from service.models import CashRegister, CashTransaction, CashTransactionType, Employee
 from service.serializers import EmployeeSerializer
+from . import changes, dashboard
 from .models import WorkItem, Task, TaskType
 from .forms import WorkItemForm, TaskForm
 from django.views.generic import TemplateView, ListView, DetailView, CreateView, UpdateView
-from django.db.models import Q, Sum, Count
-from rest_framework import viewsets, filters, status
+from django.db.models import Q, Sum
+from rest_framework import viewsets, filters, serializers, status
 from rest_framework.decorators import action
 import django_filters
+import time
 import uuid
 from django.db import transaction
-from .serializers import WorkItemSerializer, TaskSerializer, TaskTypeSerializer
+from .bulk import bulk_update_work_items
+from .serializers import WorkItemBulkUpdateSerializer, WorkItemSerializer, TaskSerializer, TaskTypeSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated  # or AllowAny for dev
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.exceptions import PermissionDenied
-from core.models import Note, PicklistValue
+from rest_framework.exceptions import PermissionDenied, Throttled
+from core.models import Note
+from core.pagination import KeysetPagination
+from core.picklists import get_picklist
 
 from core.utils import get_model_schema
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from drf_spectacular.utils import extend_schema, extend_schema_view, inline_serializer, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 
@@ -280,6 +286,28 @@ _WORK_ITEM_LOOKUP_PARAM = OpenApiParameter(
 )
 
 
+# Relations read by WorkItemSerializer
+WORK_ITEM_RELATED = (
+    'customer_asset__device__category',
+    'customer',
+    'owner__user',
+    'technician__user',
+    'pickup_point__address',
+    'dropoff_point__address',
+    'fulfillment_shop__address',
+    'payment_register__shop',
+    'payment_register__default_owner__user',
+)
+
+WORK_ITEM_EXPANSIONS = {
+    'customerDetails': Expansion(CustomerSerializer, source='customer', select_related=['customer__address']),
+    'deviceDetails': Expansion(
+        AssetSerializer, source='customer_asset', select_related=['customer_asset__device__category']
+    ),
+    'owner': Expansion(EmployeeSerializer, source='owner', select_related=['owner__user']),
+}
+
+
 @extend_schema_view(
     retrieve=extend_schema(tags=["Work Items"], parameters=[_WORK_ITEM_LOOKUP_PARAM]),
     update=extend_schema(tags=["Work Items"], parameters=[_WORK_ITEM_LOOKUP_PARAM]),
@@ -288,13 +316,17 @@ _WORK_ITEM_LOOKUP_PARAM = OpenApiParameter(
     list=extend_schema(tags=["Work Items"]),
     create=extend_schema(tags=["Work Items"]),
 )
-class WorkItemViewSet(viewsets.ModelViewSet):
+class WorkItemViewSet(ExpandableMixin, viewsets.ModelViewSet):
     serializer_class = WorkItemSerializer
+    expandable = WORK_ITEM_EXPANSIONS
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     filterset_class = WorkItemFilter
     search_fields = [
         "reference_id",  # Only allow searching by reference/RMA ID for autocomplete linking
     ]
+    pagination_class = KeysetPagination
+    cursor_pagination_key = "work-items"
+    cursor_ordering = ("-created_date", "-id")
 
     def get_object(self):
         lookup = self.kwargs.get(self.lookup_field)
@@ -310,16 +342,7 @@ class WorkItemViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         # Optimize queries by selecting related objects
-        base_qs = WorkItem.objects.select_related(
-            'customer_asset__device__category',
-            'customer_asset__device',
-            'customer',
-            'owner',
-            'technician',
-            'pickup_point',
-            'dropoff_point',
-            'fulfillment_shop'
-        )
+        base_qs = WorkItem.objects.select_related(*WORK_ITEM_RELATED)
 
         tenant = getattr(self.request, 'tenant', None)
 
@@ -332,7 +355,7 @@ class WorkItemViewSet(viewsets.ModelViewSet):
         qs = base_qs.filter(tenant=tenant)
 
         # Allow search requests (used by the task form autocomplete) to skip user-level filtering
-        if self.request.query_params.get('search'):
+        if self.action != 'bulk' and self.request.query_params.get('search'):
             return qs
 
         if user.has_permission('view_all_workitems', tenant):
@@ -356,7 +379,7 @@ class WorkItemViewSet(viewsets.ModelViewSet):
             from rest_framework.exceptions import ValidationError
             raise ValidationError({"detail": "X-Tenant header required"})
         if not self.request.user.has_permission('tasks.add_workitem', self.request.tenant):
-            from rest_framework.exceptions import PermissionDenied
+            from rest_framework.exceptions import PermissionDenied, Throttled
             raise PermissionDenied("You do not have permission to create a work item")
         serializer.save(tenant=self.request.tenant)
 
@@ -573,22 +596,42 @@ class WorkItemViewSet(viewsets.ModelViewSet):
                 raise PermissionDenied("You don't have permission to view this work item.")
 
         serializer = self.get_serializer(instance)
-        data = serializer.data
+        return Response(self.expand(serializer.data, instance))
+
+    @extend_schema(request=WorkItemBulkUpdateSerializer, responses=OpenApiTypes.OBJECT)
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Change the status, technician or due date of many work items at once.
 
-        include = request.query_params.get("include", "")
-        includes = [part.strip() for part in include.split(",") if part.strip()]
+        POST /api/tasks/work-items/bulk/
+        {"ids": [1, 2, 3], "status": "Resolved", "technician": 5, "due_date_shift_days": 2}
 
-        if "customerDetails" in includes and instance.customer_id:
-            data["customerDetails"] = CustomerSerializer(instance.customer).data
+        Permission is checked once for the whole batch and the rows are written with
+        batched queries (see tasks.bulk). Ids the user cannot see are reported as
+        not_found.
 
-        if "deviceDetails" in includes and instance.customer_asset_id:
-            from customers.serializers import AssetSerializer
-            data["deviceDetails"] = AssetSerializer(instance.customer_asset).data
+        Returns:
+            200 with {"updated": n, "results": [{"id", "reference_id", "result", "changes"}]}
+        """
+        user = request.user
+        if not request.tenant:
+            raise PermissionDenied("Tenant not specified.")
+        if not user.is_superuser and not user.has_permission('tasks.change_workitem', request.tenant):
+            raise PermissionDenied("You don't have permission to change work items.")
 
-        if "owner" in includes and instance.owner_id:
-            data["owner"] = EmployeeSerializer(instance.owner).data
+        serializer = WorkItemBulkUpdateSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        ids = changes.pop('ids')
 
-        return Response(data)
+        results = bulk_update_work_items(
+            self.get_queryset().filter(tenant=request.tenant), ids, changes, user=user
+        )
+        return Response({
+            'updated': sum(1 for row in results if row['result'] == 'updated'),
+            'results': results,
+        })
 
     @action(detail=True, methods=['post'], url_path='request-summary')
     def request_summary(self, request, pk=None):
@@ -693,7 +736,33 @@ class TaskFilter(django_filters.FilterSet):
         model = Task
         fields = ['reference_id', 'work_item', 'assigned_employee', 'status', 'task_type']
 
-class TaskViewSet(viewsets.ModelViewSet):
+def _work_item_link(work_item, view):
+    return {"id": work_item.id, "reference_id": work_item.reference_id}
+
+
+def _task_device_name(task, view):
+    """Device name of the task's work item."""
+    device = resolve(task, 'work_item.customer_asset.device')
+    if not device:
+        return None
+    manufacturer = device.manufacturer or ""
+    model = device.model or ""
+    if manufacturer and model:
+        return f"{manufacturer} {model}".strip()
+    return model or manufacturer or None
+
+
+def _can_view_work_item(work_item, view):
+    user = view.request.user
+    tenant = view.request.tenant
+    return (
+        user.is_superuser or
+        user.has_permission('view_all_workitems', tenant) or
+        (user.has_permission('view_own_workitems', tenant) and work_item.technician and work_item.technician.user == user)
+    )
+
+
+class TaskViewSet(ExpandableMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
     filterset_class = TaskFilter
@@ -705,22 +774,31 @@ class TaskViewSet(viewsets.ModelViewSet):
     ]
     ordering_fields = ['created_date', 'summary', 'status', 'assigned_employee', 'task_type__name']
     ordering = ["-created_date"]
+    pagination_class = KeysetPagination
+    cursor_pagination_key = "tasks"
+    cursor_ordering = ("-created_date", "-id")
+    expandable = {
+        'workItem': Expansion(_work_item_link, source='work_item', key='work_item', select_related=['work_item']),
+        'deviceName': Expansion(
+            _task_device_name, key='device_name', select_related=['work_item__customer_asset__device']
+        ),
+        'workItemDetails': Expansion(
+            WorkItemSerializer,
+            source='work_item',
+            when=_can_view_work_item,
+            select_related=[f'work_item__{lookup}' for lookup in WORK_ITEM_RELATED],
+            expand={name: WORK_ITEM_EXPANSIONS[name] for name in ('customerDetails', 'deviceDetails')},
+        ),
+        'assignedEmployee': Expansion(
+            EmployeeSerializer, source='assigned_employee', select_related=['assigned_employee__user']
+        ),
+    }
 
     def get_queryset(self):
         user = self.request.user
 
         # Base queryset with common select_related for performance
-        base_qs = Task.objects.select_related('assigned_employee', 'task_type')
-
-        # Check for include parameter to optimize queries
-        include = self.request.query_params.get("include", "")
-        includes = [part.strip() for part in include.split(",") if part.strip()]
-
-        if "workItem" in includes or "deviceName" in includes:
-            base_qs = base_qs.select_related('work_item')
-
-        if "deviceName" in includes:
-            base_qs = base_qs.select_related('work_item__customer_asset__device')
+        base_qs = Task.objects.select_related('assigned_employee__user', 'task_type')
 
         if user.is_superuser:
             return base_qs.all()
@@ -779,58 +857,6 @@ class TaskViewSet(viewsets.ModelViewSet):
 
         instance.delete()
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            data = self._add_includes_to_list(serializer.data, page)
-            return self.get_paginated_response(data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        data = self._add_includes_to_list(serializer.data, queryset)
-        return Response(data)
-
-    def _add_includes_to_list(self, data, instances):
-        """Add included fields to list response based on include query parameter"""
-        include = self.request.query_params.get("include", "")
-        includes = [part.strip() for part in include.split(",") if part.strip()]
-
-        if not includes:
-            return data
-
-        # Enhance each item in the list with requested includes
-        for i, instance in enumerate(instances):
-            if "workItem" in includes and instance.work_item_id:
-                data[i]["work_item"] = {
-                    "id": instance.work_item.id,
-                    "reference_id": instance.work_item.reference_id
-                }
-
-            if "deviceName" in includes:
-                device_name = self._get_device_name(instance)
-                data[i]["device_name"] = device_name
-
-        return data
-
-    def _get_device_name(self, task):
-        """Extract device name from task's work item"""
-        if not task.work_item:
-            return None
-        work_item = task.work_item
-        if not work_item.customer_asset:
-            return None
-        asset = work_item.customer_asset
-        if not asset.device:
-            return None
-        device = asset.device
-        manufacturer = device.manufacturer or ""
-        model = device.model or ""
-        if manufacturer and model:
-            return f"{manufacturer} {model}".strip()
-        return model or manufacturer or None
-
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         user = request.user
@@ -849,52 +875,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 raise PermissionDenied("You don't have permission to view this task.")
 
         serializer = self.get_serializer(instance)
-        data = serializer.data
-
-        include = request.query_params.get("include", "")
-        includes = [part.strip() for part in include.split(",") if part.strip()]
-
-        if "workItemDetails" in includes and instance.work_item_id:
-            work_item = instance.work_item
-
-            if user.is_superuser:
-                work_item_data = WorkItemSerializer(work_item).data
-
-                # Add customerDetails and deviceDetails to work item
-                if work_item.customer_id:
-                    from customers.serializers import CustomerSerializer
-                    work_item_data["customerDetails"] = CustomerSerializer(work_item.customer).data
-
-                if work_item.customer_asset_id:
-                    from customers.serializers import AssetSerializer
-                    work_item_data["deviceDetails"] = AssetSerializer(work_item.customer_asset).data
-
-                data["workItemDetails"] = work_item_data
-
-            elif (
-                    user.has_permission('view_all_workitems', request.tenant) or
-                    (user.has_permission('view_own_workitems', request.tenant) and work_item.technician and work_item.technician.user == user)
-            ):
-                work_item_data = WorkItemSerializer(work_item).data
-
-                # Add customerDetails and deviceDetails to work item
-                if work_item.customer_id:
-                    from customers.serializers import CustomerSerializer
-                    work_item_data["customerDetails"] = CustomerSerializer(work_item.customer).data
-
-                if work_item.customer_asset_id:
-                    from customers.serializers import AssetSerializer
-                    work_item_data["deviceDetails"] = AssetSerializer(work_item.customer_asset).data
-
-                data["workItemDetails"] = work_item_data
-
-            else:
-                data["workItemDetails"] = None
-
-        if "assignedEmployee" in includes and instance.assigned_employee_id:
-            data["assignedEmployee"] = EmployeeSerializer(instance.assigned_employee).data
-
-        return Response(data)
+        return Response(self.expand(serializer.data, instance))
 
 
 class TaskTypeViewSet(viewsets.ModelViewSet):
@@ -949,6 +930,73 @@ class TaskTypeViewSet(viewsets.ModelViewSet):
         instance.save()
 
 
+CHANGES_WAIT_TIMEOUT = 20
+CHANGES_MAX_WAIT_TIMEOUT = 25
+
+
+class ChangeFeedView(APIView):
+    """
+    GET /api/tasks/changes/?cursor=<cursor>&timeout=<seconds>
+
+    Long-poll for changes to the tenant's work items and tasks (see tasks.changes),
+    limited to the rows the user may list. Waits until a visible change happens or
+    for ``timeout`` seconds, then returns the changes after ``cursor`` and the
+    cursor to pass next time.
+
+    Without a cursor, with an expired one or when the event channel is unavailable
+    the response has ``reset`` set and no changes: clients then reload what they
+    show and continue from the returned cursor. The cursor is null when there is no
+    shared event log (no Redis, see core.events): changes made by other processes
+    would never arrive, so clients fall back to polling. A 429 means too many
+    requests are waiting already; clients poll until ``Retry-After``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('cursor', str, description='Cursor returned by the previous response'),
+            OpenApiParameter(
+                'timeout', float, description=f'Seconds to wait for a change (max {CHANGES_MAX_WAIT_TIMEOUT})'
+            ),
+        ],
+        responses=inline_serializer(
+            name='ChangeFeedResponse',
+            fields={
+                'cursor': serializers.CharField(allow_null=True),
+                'reset': serializers.BooleanField(),
+                'changes': serializers.ListField(child=serializers.DictField()),
+            }
+        ),
+    )
+    def get(self, request):
+        tenant = getattr(request, 'tenant', None)
+        if not tenant:
+            return Response({'detail': 'Tenant not resolved'}, status=status.HTTP_400_BAD_REQUEST)
+        scopes = changes.audience(tenant, request.user)
+        if not scopes:
+            raise PermissionDenied("You don't have permission to view work items or tasks.")
+
+        channel = changes.channel(tenant.pk)
+        cursor = request.query_params.get('cursor')
+        timeout = events.timeout_param(
+            request.query_params.get('timeout'), CHANGES_WAIT_TIMEOUT, CHANGES_MAX_WAIT_TIMEOUT
+        )
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                messages = events.wait(channel, cursor, max(deadline - time.monotonic(), 0))
+            except events.Busy:
+                raise Throttled(wait=timeout, detail='Too many requests waiting for changes; poll instead.')
+            if messages is None:
+                return Response({'cursor': events.last_id(channel), 'reset': True, 'changes': []})
+            if messages:
+                cursor = messages[-1][0]
+            shown = changes.visible([message for _, message in messages], scopes)
+            # Keep waiting through changes the user may not see
+            if shown or time.monotonic() >= deadline:
+                return Response({'cursor': cursor, 'reset': False, 'changes': shown})
+
+
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -957,9 +1005,7 @@ class DashboardView(APIView):
         if not tenant:
             return Response({'detail': 'Tenant not resolved'}, status=status.HTTP_400_BAD_REQUEST)
 
-        today = timezone.now().date()
-        week_start = today - timedelta(days=today.weekday())  # Monday
-        month_start = today.replace(day=1)
+        today = timezone.localdate()
 
         # Resolve current employee and role
         try:
@@ -968,67 +1014,40 @@ class DashboardView(APIView):
         except Employee.DoesNotExist:
             current_employee = None
             is_manager = True
+        scoped = not is_manager and current_employee
 
-        # Resolve status picklist values (single query)
-        status_pv_by_name = {
-            pv.name.lower(): pv.value
-            for pv in PicklistValue.objects.filter(
-                tenant=tenant, category='workitem_status', is_active=True
-            )
-        }
-        resolved_status = status_pv_by_name.get('resolved')
-        ready_status = status_pv_by_name.get('naprawione')
+        # Counters (KPIs, pipeline, revenue, workload) come from the cached read model
+        summary = dashboard.summarize(tenant, current_employee.pk if scoped else None, today)
+
+        # Resolve status picklist values (cached registry)
+        status_picklist = get_picklist(tenant, 'workitem_status')
+        resolved_status = status_picklist.value_for_name('resolved')
 
-        # Base querysets
-        wi_qs = WorkItem.objects.filter(tenant=tenant)
+        # Base queryset for the "needs attention" lists
+        open_qs = WorkItem.objects.filter(tenant=tenant)
         if resolved_status:
-            open_qs = wi_qs.exclude(status=resolved_status)
+            open_qs = open_qs.exclude(status=resolved_status)
         else:
-            open_qs = wi_qs.filter(closed_date__isnull=True)
-        closed_qs = wi_qs.filter(closed_date__isnull=False)
+            open_qs = open_qs.filter(closed_date__isnull=True)
 
         # Role-based scoping: non-managers see only their own work items
-        if not is_manager and current_employee:
-            wi_qs = wi_qs.filter(technician=current_employee)
+        if scoped:
             open_qs = open_qs.filter(technician=current_employee)
-            closed_qs = closed_qs.filter(technician=current_employee)
 
-        # --- KPIs (single query with conditional aggregation) ---
-        kpi_filters = {
-            'total_open': Count('id'),
-            'overdue': Count('id', filter=Q(due_date__lt=today)),
-            'unassigned': Count('id', filter=Q(technician__isnull=True)),
-        }
-        if ready_status:
-            kpi_filters['ready_for_pickup'] = Count('id', filter=Q(status=ready_status))
-        kpis = open_qs.aggregate(**kpi_filters)
-        if not ready_status:
-            kpis['ready_for_pickup'] = 0
+        kpis = summary['kpis']
 
         # --- Status Pipeline ---
-        status_counts = (
-            wi_qs.values('status')
-            .annotate(count=Count('id'))
-            .order_by('status')
-        )
-        picklist_map = {
-            pv.value: {'name': pv.name, 'color': pv.color, 'sort_order': pv.sort_order}
-            for pv in PicklistValue.objects.filter(
-                tenant=tenant, category='workitem_status', is_active=True
-            )
-        }
         pipeline = []
-        for entry in status_counts:
-            sv = entry['status']
-            pv_info = picklist_map.get(sv, {})
+        for sv, count in summary['status_counts'].items():
+            pv = status_picklist.get(sv)
             pipeline.append({
                 'status': sv,
-                'name': pv_info.get('name', sv),
-                'color': pv_info.get('color', 'gray'),
-                'sort_order': pv_info.get('sort_order', 999),
-                'count': entry['count'],
+                'name': pv.name if pv else sv,
+                'color': pv.color if pv else 'gray',
+                'sort_order': pv.sort_order if pv else 999,
+                'count': count,
             })
-        pipeline.sort(key=lambda x: x['sort_order'])
+        pipeline.sort(key=lambda x: (x['sort_order'], x['status']))
 
         # --- Needs Attention ---
         overdue_items = list(
@@ -1065,62 +1084,20 @@ class DashboardView(APIView):
             )
         )
 
-        # --- Recent Notes (batch-fetch work item references) ---
+        # --- Recent Notes (denormalized tenant/work item columns, one indexed query) ---
         workitem_ct = ContentType.objects.get_for_model(WorkItem)
         task_ct = ContentType.objects.get_for_model(Task)
-        tenant_wi_ids = set(wi_qs.values_list('id', flat=True))
-        tenant_task_ids = set(Task.objects.filter(tenant=tenant).values_list('id', flat=True))
-
-        recent_notes_qs = (
-            Note.objects
-            .filter(
-                Q(content_type=workitem_ct, object_id__in=tenant_wi_ids) |
-                Q(content_type=task_ct, object_id__in=tenant_task_ids)
+        recent_notes_qs = Note.objects.filter(tenant=tenant)
+        if scoped:
+            recent_notes_qs = recent_notes_qs.filter(
+                Q(content_type=task_ct) | Q(content_type=workitem_ct, work_item__technician=current_employee)
             )
-            .select_related('author', 'content_type')
-            .order_by('-created_at')[:30]
-        )
-
-        # Collect IDs for batch lookup
-        wi_ids_from_notes = set()
-        task_ids_from_notes = set()
-        for note in recent_notes_qs:
-            if note.content_type_id == workitem_ct.id:
-                wi_ids_from_notes.add(note.object_id)
-            elif note.content_type_id == task_ct.id:
-                task_ids_from_notes.add(note.object_id)
-
-        # Batch fetch work item references
-        wi_ref_map = dict(
-            WorkItem.objects.filter(id__in=wi_ids_from_notes)
-            .values_list('id', 'reference_id')
-        )
-        # Batch fetch task -> work_item mappings
-        task_wi_map = dict(
-            Task.objects.filter(id__in=task_ids_from_notes, work_item__isnull=False)
-            .values_list('id', 'work_item_id')
-        )
-        # Fetch references for work items linked via tasks
-        extra_wi_ids = set(task_wi_map.values()) - wi_ids_from_notes
-        if extra_wi_ids:
-            wi_ref_map.update(dict(
-                WorkItem.objects.filter(id__in=extra_wi_ids)
-                .values_list('id', 'reference_id')
-            ))
+        else:
+            recent_notes_qs = recent_notes_qs.filter(content_type__in=[workitem_ct, task_ct])
+        recent_notes_qs = recent_notes_qs.select_related('author', 'work_item').order_by('-created_at', '-id')[:30]
 
         recent_notes = []
         for note in recent_notes_qs:
-            work_item_id = None
-            work_item_ref = None
-            if note.content_type_id == workitem_ct.id:
-                work_item_id = note.object_id
-                work_item_ref = wi_ref_map.get(note.object_id)
-            elif note.content_type_id == task_ct.id:
-                wi_id = task_wi_map.get(note.object_id)
-                if wi_id:
-                    work_item_id = wi_id
-                    work_item_ref = wi_ref_map.get(wi_id)
-
             author_name = None
             if note.author:
                 full = f"{note.author.first_name} {note.author.last_name}".strip()
@@ -1131,8 +1108,8 @@ class DashboardView(APIView):
                 'content': note.content[:200],
                 'author_name': author_name,
                 'created_at': note.created_at.isoformat(),
-                'work_item_id': work_item_id,
-                'work_item_reference_id': work_item_ref,
+                'work_item_id': note.work_item_id,
+                'work_item_reference_id': note.work_item.reference_id if note.work_item else None,
             })
 
         # --- My Open Tasks ---
@@ -1159,78 +1136,39 @@ class DashboardView(APIView):
                 })
 
         # --- Financial Summary ---
-        # Cash register balances (annotated to avoid N+1)
-        registers = (
-            CashRegister.objects.filter(tenant=tenant, is_active=True)
-            .select_related('shop')
-            .annotate(transaction_total=Sum('transactions__amount'))
-        )
-        register_balances = []
-        for reg in registers:
-            balance = (reg.transaction_total or Decimal('0.00')) + reg.opening_balance
-            register_balances.append({
+        registers = CashRegister.objects.filter(tenant=tenant, is_active=True).select_related('shop')
+        register_balances = [
+            {
                 'id': reg.id,
                 'name': reg.name,
                 'shop_name': reg.shop.name,
-                'current_balance': str(balance),
-            })
-
-        # Revenue (single aggregate query)
-        revenue = closed_qs.aggregate(
-            today=Sum('final_price', filter=Q(closed_date__date__gte=today)),
-            week=Sum('final_price', filter=Q(closed_date__date__gte=week_start)),
-            month=Sum('final_price', filter=Q(closed_date__date__gte=month_start)),
-        )
-
+                'current_balance': str(reg.current_balance),
+            }
+            for reg in registers
+        ]
+        revenue = summary['revenue']
         financial = {
             'register_balances': register_balances,
-            'revenue_today': str(revenue['today'] or Decimal('0.00')),
-            'revenue_week': str(revenue['week'] or Decimal('0.00')),
-            'revenue_month': str(revenue['month'] or Decimal('0.00')),
+            'revenue_today': str(revenue['today']),
+            'revenue_week': str(revenue['week']),
+            'revenue_month': str(revenue['month']),
         }
 
-        # --- Technician Workload (open tasks per assignee) ---
-        tech_workload = list(
-            Task.objects
-            .filter(tenant=tenant, assigned_employee__isnull=False)
-            .exclude(status='Done')
-            .values(
-                'assigned_employee__id',
-                'assigned_employee__user__first_name',
-                'assigned_employee__user__last_name',
-            )
-            .annotate(open_count=Count('id'))
-            .order_by('-open_count')
-        )
+        # --- Technician Workload / Tasks Overdue Per Assignee ---
+        assignees = summary['workload'].keys() | summary['tasks_overdue'].keys()
+        names = {
+            employee_id: f"{first_name} {last_name}".strip()
+            for employee_id, first_name, last_name in Employee.objects.filter(
+                tenant=tenant, pk__in=assignees
+            ).values_list('id', 'user__first_name', 'user__last_name')
+        } if assignees else {}
         workload = [
-            {
-                'technician_id': tw['assigned_employee__id'],
-                'name': f"{tw['assigned_employee__user__first_name']} {tw['assigned_employee__user__last_name']}".strip(),
-                'open_count': tw['open_count'],
-            }
-            for tw in tech_workload
+            {'technician_id': employee_id, 'name': names.get(employee_id, ''), 'open_count': count}
+            for employee_id, count in sorted(summary['workload'].items(), key=lambda x: (-x[1], x[0]))
         ]
-
-        # --- Tasks Overdue Per Assignee ---
-        tasks_overdue_raw = list(
-            Task.objects
-            .filter(tenant=tenant, assigned_employee__isnull=False, due_date__lt=today)
-            .exclude(status='Done')
-            .values(
-                'assigned_employee__id',
-                'assigned_employee__user__first_name',
-                'assigned_employee__user__last_name',
-            )
-            .annotate(overdue_count=Count('id'))
-            .order_by('-overdue_count')
-        )
         tasks_overdue_by_assignee = [
-            {
-                'employee_id': t['assigned_employee__id'],
-                'name': f"{t['assigned_employee__user__first_name']} {t['assigned_employee__user__last_name']}".strip(),
-                'overdue_count': t['overdue_count'],
-            }
-            for t in tasks_overdue_raw
+            {'employee_id': employee_id, 'name': names.get(employee_id, ''), 'overdue_count': count}
+            for employee_id, count in sorted(summary['tasks_overdue'].items(), key=lambda x: (-x[1], x[0]))
         ]
 
         return Response({
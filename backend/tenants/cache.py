@@ -0,0 +1,52 @@
+"""
+Cached tenant lookups used on every request.
+
+Tenants are resolved by subdomain (header, host or configured default) and membership is
+checked per (user, tenant) pair. Both answers only change when a ``Tenant`` or a
+``UserRole`` is written, so they are kept in a two-tier cache and invalidated from
+``tenants.signals``. Without a shared cache the invalidation only reaches the process
+that wrote the change, so entries are then kept for ``LOCAL_ONLY_TTL`` seconds at most.
+"""
+from core.cache import LOCAL_ONLY_TTL, TieredCache
+from tenants.models import Tenant
+
+tenant_cache = TieredCache(
+    "tenants:subdomain", maxsize=256, local_ttl=60, shared_ttl=60 * 60, local_only_ttl=LOCAL_ONLY_TTL
+)
+membership_cache = TieredCache(
+    "tenants:member", maxsize=4096, local_ttl=60, shared_ttl=60 * 60, local_only_ttl=LOCAL_ONLY_TTL
+)
+
+
+def get_tenant_by_subdomain(subdomain):
+    """Return the tenant for ``subdomain`` or ``None``; unknown subdomains are cached too."""
+    if not subdomain:
+        return None
+    return tenant_cache.get_or_load(
+        subdomain,
+        lambda: Tenant.objects.filter(subdomain=subdomain).first(),
+    )
+
+
+def is_tenant_member(user, tenant):
+    """True when ``user`` holds at least one role in ``tenant`` (superusers always pass)."""
+    if user.is_superuser:
+        return True
+    if tenant is None:
+        return False
+
+    def load():
+        from core.models import UserRole
+        return UserRole.objects.filter(user_id=user.pk, role__tenant_id=tenant.pk).exists()
+
+    return membership_cache.get_or_load((user.pk, tenant.pk), load)
+
+
+def invalidate_tenant(*subdomains):
+    for subdomain in subdomains:
+        if subdomain:
+            tenant_cache.delete(subdomain)
+
+
+def invalidate_membership(user_id, tenant_id):
+    membership_cache.delete((user_id, tenant_id))
@@ -5,7 +5,7 @@ from django.utils.deprecation import MiddlewareMixin
 from django.core.exceptions import PermissionDenied
 from django.http import HttpRequest
 
-from tenants.models import Tenant
+from tenants.cache import get_tenant_by_subdomain, is_tenant_member
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +40,7 @@ class TenantMiddleware(MiddlewareMixin):
 
         request.tenant = None
         header_val = request.META.get("HTTP_X_TENANT")
-        logger.warning("TenantMiddleware incoming host=%s header=%s user=%s", request.get_host(), header_val, getattr(request, "user", None))
+        logger.debug("TenantMiddleware incoming host=%s header=%s user=%s", request.get_host(), header_val, getattr(request, "user", None))
 
         # 0) Check if request is authenticated via API key
         # API keys are set by DRF authentication (request.auth)
@@ -49,7 +49,7 @@ class TenantMiddleware(MiddlewareMixin):
         if api_key and hasattr(api_key, "tenant"):
             # API key determines the tenant
             request.tenant = api_key.tenant
-            logger.warning("TenantMiddleware using API key tenant %s", api_key.tenant)
+            logger.debug("TenantMiddleware using API key tenant %s", api_key.tenant)
             # Skip all other tenant resolution and membership checks for API keys
             return
 
@@ -59,26 +59,26 @@ class TenantMiddleware(MiddlewareMixin):
             active = getattr(user, "active_tenant", None)
             if active:
                 request.tenant = active
-                logger.warning("TenantMiddleware using active tenant %s", active)
+                logger.debug("TenantMiddleware using active tenant %s", active)
 
         # 2) Header hint (when not set yet)
         if request.tenant is None:
             header_slug = request.META.get("HTTP_X_TENANT")
             if header_slug:
-                request.tenant = Tenant.objects.filter(subdomain=header_slug).first()
-                logger.warning("TenantMiddleware header slug %s -> %s", header_slug, request.tenant)
+                request.tenant = get_tenant_by_subdomain(header_slug)
+                logger.debug("TenantMiddleware header slug %s -> %s", header_slug, request.tenant)
 
         # 3) Host fallback (multi-tenant via subdomain)
         if request.tenant is None:
             slug = _derive_slug_from_host(request.get_host())
             if slug:
-                request.tenant = Tenant.objects.filter(subdomain=slug).first()
-                logger.warning("TenantMiddleware host slug %s -> %s", slug, request.tenant)
+                request.tenant = get_tenant_by_subdomain(slug)
+                logger.debug("TenantMiddleware host slug %s -> %s", slug, request.tenant)
 
         # 3b) Fallback to a configured default tenant when running without subdomains.
         if request.tenant is None and DEFAULT_TENANT_SUBDOMAIN:
-            request.tenant = Tenant.objects.filter(subdomain=DEFAULT_TENANT_SUBDOMAIN).first()
-            logger.warning("TenantMiddleware default slug %s -> %s", DEFAULT_TENANT_SUBDOMAIN, request.tenant)
+            request.tenant = get_tenant_by_subdomain(DEFAULT_TENANT_SUBDOMAIN)
+            logger.debug("TenantMiddleware default slug %s -> %s", DEFAULT_TENANT_SUBDOMAIN, request.tenant)
 
         # 4) Enforce membership only when authenticated and not on optional paths
         if (
@@ -87,5 +87,5 @@ class TenantMiddleware(MiddlewareMixin):
             and user.is_authenticated
             and not any(request.path.startswith(p) for p in TENANT_OPTIONAL_PATHS)
         ):
-            if not user.tenants.filter(pk=request.tenant.pk).exists():
+            if not is_tenant_member(user, request.tenant):
                 raise PermissionDenied("You don't have access to this tenant.")
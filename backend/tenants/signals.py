@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from tenants.cache import invalidate_membership, invalidate_tenant
+from tenants.models import Tenant
+
+
+@receiver(pre_save, sender=Tenant)
+def remember_old_subdomain(sender, instance, **kwargs):
+    """Keep the previous subdomain so a rename also drops the old cache entry."""
+    if instance.pk:
+        instance._old_subdomain = (
+            Tenant.objects.filter(pk=instance.pk).values_list("subdomain", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def invalidate_tenant_cache(sender, instance, **kwargs):
+    invalidate_tenant(instance.subdomain, getattr(instance, "_old_subdomain", None))
+
+
+@receiver(pre_save, sender="core.UserRole")
+def remember_old_membership(sender, instance, **kwargs):
+    """Keep the previous user and tenant so moving a role assignment also drops the old entry."""
+    if instance.pk:
+        instance._old_membership = (
+            sender.objects.filter(pk=instance.pk).values_list("user_id", "role__tenant_id").first()
+        )
+
+
+@receiver(post_save, sender="core.UserRole")
+@receiver(post_delete, sender="core.UserRole")
+def invalidate_membership_cache(sender, instance, **kwargs):
+    invalidate_membership(instance.user_id, instance.role.tenant_id)
+    old_membership = getattr(instance, "_old_membership", None)
+    if old_membership:
+        invalidate_membership(*old_membership)
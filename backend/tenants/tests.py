@@ -1,3 +1,89 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 
-# Create your tests here.
+from core.cache import LOCAL_ONLY_TTL
+from core.models import Role, User, UserRole
+from tenants.cache import (
+    get_tenant_by_subdomain,
+    is_tenant_member,
+    membership_cache,
+    tenant_cache,
+)
+from tenants.models import Tenant
+
+
+class TenantCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        tenant_cache.clear_local()
+        membership_cache.clear_local()
+        self.tenant = Tenant.objects.create(name="Cached", subdomain="cached")
+
+    def test_subdomain_lookup_hits_database_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            first = get_tenant_by_subdomain("cached")
+            second = get_tenant_by_subdomain("cached")
+        self.assertEqual(first.pk, self.tenant.pk)
+        self.assertEqual(second.pk, self.tenant.pk)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_shared_tier_serves_other_processes(self):
+        get_tenant_by_subdomain("cached")
+        tenant_cache.clear_local()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(get_tenant_by_subdomain("cached").pk, self.tenant.pk)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_unknown_subdomain_is_cached_until_tenant_created(self):
+        self.assertIsNone(get_tenant_by_subdomain("later"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertIsNone(get_tenant_by_subdomain("later"))
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        created = Tenant.objects.create(name="Later", subdomain="later")
+        self.assertEqual(get_tenant_by_subdomain("later").pk, created.pk)
+
+    def test_rename_invalidates_old_and_new_subdomain(self):
+        get_tenant_by_subdomain("cached")
+        self.tenant.subdomain = "renamed"
+        self.tenant.save()
+        self.assertIsNone(get_tenant_by_subdomain("cached"))
+        self.assertEqual(get_tenant_by_subdomain("renamed").pk, self.tenant.pk)
+
+    def test_membership_follows_user_roles(self):
+        user = User.objects.create_user(email="member@test.com", password="x", username="member")
+        role = Role.objects.create(tenant=self.tenant, name="Technician")
+
+        self.assertFalse(is_tenant_member(user, self.tenant))
+        user_role = UserRole.objects.create(user=user, role=role)
+        self.assertTrue(is_tenant_member(user, self.tenant))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(is_tenant_member(user, self.tenant))
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        user_role.delete()
+        self.assertFalse(is_tenant_member(user, self.tenant))
+
+    def test_moving_a_user_role_to_another_tenant_drops_the_old_membership(self):
+        user = User.objects.create_user(email="mover@test.com", password="x", username="mover")
+        other = Tenant.objects.create(name="Other", subdomain="other")
+        user_role = UserRole.objects.create(user=user, role=Role.objects.create(tenant=self.tenant, name="Tech"))
+        self.assertTrue(is_tenant_member(user, self.tenant))
+        self.assertFalse(is_tenant_member(user, other))
+
+        user_role.role = Role.objects.create(tenant=other, name="Tech")
+        user_role.save()
+        self.assertFalse(is_tenant_member(user, self.tenant))
+        self.assertTrue(is_tenant_member(user, other))
+
+    def test_entries_expire_quickly_without_a_shared_cache(self):
+        # Other processes never see the invalidations of a process-local cache
+        for local in (tenant_cache, membership_cache):
+            self.assertEqual(local._ttls(), (LOCAL_ONLY_TTL, LOCAL_ONLY_TTL))
+
+    def test_superuser_is_always_member(self):
+        admin = User.objects.create_superuser(email="root@test.com", password="x", username="root")
+        self.assertTrue(is_tenant_member(admin, self.tenant))